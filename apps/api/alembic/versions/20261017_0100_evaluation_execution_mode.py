@@ -0,0 +1,33 @@
+"""Add execution mode to evaluations.
+
+Revision ID: 20261017_execution_mode
+Revises: 20260213_access
+Create Date: 2026-10-17 01:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_execution_mode"
+down_revision = "20260213_access"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "evaluations",
+        sa.Column(
+            "execution_mode",
+            sa.String(length=20),
+            nullable=False,
+            server_default="interactive",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluations", "execution_mode")
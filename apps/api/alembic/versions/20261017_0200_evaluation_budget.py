@@ -0,0 +1,29 @@
+"""Add spending budget to evaluations.
+
+Revision ID: 20261017_budget
+Revises: 20261017_execution_mode
+Create Date: 2026-10-17 02:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_budget"
+down_revision = "20261017_execution_mode"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("evaluations", sa.Column("budget_usd", sa.Float(), nullable=True))
+    op.add_column(
+        "evaluations", sa.Column("budget_tokens", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluations", "budget_tokens")
+    op.drop_column("evaluations", "budget_usd")
@@ -0,0 +1,38 @@
+"""Add multi-sample collection to evaluations and responses.
+
+Revision ID: 20261017_samples
+Revises: 20261017_budget
+Create Date: 2026-10-17 03:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_samples"
+down_revision = "20261017_budget"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "evaluations",
+        sa.Column(
+            "samples_per_question",
+            sa.Integer(),
+            nullable=False,
+            server_default="1",
+        ),
+    )
+    op.add_column(
+        "responses",
+        sa.Column("sample_index", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("responses", "sample_index")
+    op.drop_column("evaluations", "samples_per_question")
@@ -0,0 +1,71 @@
+"""Add work items for sharded evaluation runs.
+
+Revision ID: 20261017_work_items
+Revises: 20261017_jobs
+Create Date: 2026-10-17 05:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_work_items"
+down_revision = "20261017_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "work_items",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("evaluation_id", sa.UUID(), nullable=False),
+        sa.Column("question_id", sa.String(length=20), nullable=False),
+        sa.Column("model_name", sa.String(length=100), nullable=False),
+        sa.Column(
+            "status", sa.String(length=20), nullable=False, server_default="queued"
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column(
+            "run_after",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("lease_owner", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["evaluation_id"], ["evaluations.id"]),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "evaluation_id",
+            "question_id",
+            "model_name",
+            name="uq_work_items_evaluation_question_model",
+        ),
+    )
+    op.create_index(
+        "ix_work_items_evaluation_status", "work_items", ["evaluation_id", "status"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_items_evaluation_status", table_name="work_items")
+    op.drop_table("work_items")
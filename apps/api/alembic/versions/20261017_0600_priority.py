@@ -0,0 +1,33 @@
+"""Add evaluation and job priority for fair-share scheduling.
+
+Revision ID: 20261017_priority
+Revises: 20261017_work_items
+Create Date: 2026-10-17 06:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_priority"
+down_revision = "20261017_work_items"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "evaluations",
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "jobs",
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "priority")
+    op.drop_column("evaluations", "priority")
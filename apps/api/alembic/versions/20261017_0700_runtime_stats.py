@@ -0,0 +1,59 @@
+"""Add per-model runtime statistics for evaluation runs.
+
+Revision ID: 20261017_runtime_stats
+Revises: 20261017_priority
+Create Date: 2026-10-17 07:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261017_runtime_stats"
+down_revision = "20261017_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "model_runtime_stats",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("evaluation_id", sa.UUID(), nullable=False),
+        sa.Column("model_name", sa.String(length=100), nullable=False),
+        sa.Column("calls", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("errors", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latency_sketch", postgresql.JSONB(), nullable=False),
+        sa.Column("latency_seconds", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "completion_tokens", sa.BigInteger(), nullable=False, server_default="0"
+        ),
+        sa.Column("total_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("cost_usd", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["evaluation_id"], ["evaluations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "evaluation_id",
+            "model_name",
+            name="uq_model_runtime_stats_evaluation_model",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("model_runtime_stats")
@@ -0,0 +1,34 @@
+"""Add question subsets to evaluations.
+
+Revision ID: 20261017_question_subset
+Revises: 20261017_runtime_stats
+Create Date: 2026-10-17 08:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261017_question_subset"
+down_revision = "20261017_runtime_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "evaluations",
+        sa.Column("question_selector", postgresql.JSONB(), nullable=True),
+    )
+    op.add_column(
+        "evaluations",
+        sa.Column("question_ids", postgresql.JSONB(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluations", "question_ids")
+    op.drop_column("evaluations", "question_selector")
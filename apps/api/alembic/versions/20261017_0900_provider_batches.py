@@ -0,0 +1,29 @@
+"""Record submitted provider batches on evaluations.
+
+Revision ID: 20261017_provider_batches
+Revises: 20261017_question_subset
+Create Date: 2026-10-17 09:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261017_provider_batches"
+down_revision = "20261017_question_subset"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "evaluations",
+        sa.Column("provider_batches", postgresql.JSONB(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluations", "provider_batches")
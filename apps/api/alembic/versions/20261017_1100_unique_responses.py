@@ -0,0 +1,66 @@
+"""Allow one response per evaluation, question, model and sample.
+
+Existing duplicates, left by retried collection or repeated imports, are
+kept: the earliest copy keeps its sample index and later copies are moved
+to new indexes after the highest one stored for their question and model.
+
+Revision ID: 20261017_unique_responses
+Revises: 20261017_report_files
+Create Date: 2026-10-17 11:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_unique_responses"
+down_revision = "20261017_report_files"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        WITH copies AS (
+            SELECT
+                id,
+                evaluation_id,
+                question_id,
+                model_name,
+                created_at,
+                row_number() OVER (
+                    PARTITION BY evaluation_id, question_id, model_name, sample_index
+                    ORDER BY created_at, id
+                ) AS copy,
+                max(sample_index) OVER (
+                    PARTITION BY evaluation_id, question_id, model_name
+                ) AS top
+            FROM responses
+        ),
+        moved AS (
+            SELECT
+                id,
+                top + row_number() OVER (
+                    PARTITION BY evaluation_id, question_id, model_name
+                    ORDER BY created_at, id
+                ) AS sample_index
+            FROM copies
+            WHERE copy > 1
+        )
+        UPDATE responses r
+        SET sample_index = moved.sample_index
+        FROM moved
+        WHERE r.id = moved.id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_responses_evaluation_sample",
+        "responses",
+        ["evaluation_id", "question_id", "model_name", "sample_index"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_responses_evaluation_sample", "responses", type_="unique")
@@ -0,0 +1,58 @@
+"""Track committed budget spend on evaluations for sharded runs.
+
+Existing evaluations start from the spend their responses already record.
+
+Revision ID: 20261017_budget_ledger
+Revises: 20261017_unique_responses
+Create Date: 2026-10-17 12:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_budget_ledger"
+down_revision = "20261017_unique_responses"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "evaluations",
+        sa.Column(
+            "budget_committed_usd", sa.Float(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        "evaluations",
+        sa.Column(
+            "budget_committed_tokens",
+            sa.BigInteger(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+    op.execute(
+        """
+        UPDATE evaluations e
+        SET budget_committed_usd = s.usd, budget_committed_tokens = s.tokens
+        FROM (
+            SELECT
+                evaluation_id,
+                COALESCE(SUM((raw_metadata ->> 'cost_usd')::float), 0) AS usd,
+                COALESCE(SUM((raw_metadata ->> 'total_tokens')::bigint), 0)
+                    AS tokens
+            FROM responses
+            GROUP BY evaluation_id
+        ) s
+        WHERE s.evaluation_id = e.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("evaluations", "budget_committed_tokens")
+    op.drop_column("evaluations", "budget_committed_usd")
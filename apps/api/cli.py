@@ -50,5 +50,118 @@ def serve(
     uvicorn.run("src.main:app", host=host, port=port, reload=reload)
 
 
+@app.command()
+def stub_server(host: str = "127.0.0.1", port: int = 8900):
+    """Serve synthetic models over HTTP in the OpenAI chat format, for load tests.
+
+    Each model's ``stub`` block in models.yaml sets its latency, errors and
+    429 bursts; point models at it with ``api_base: http://HOST:PORT/v1``.
+    """
+    import uvicorn
+
+    from src.runners.stub_provider import build_stub_app
+
+    uvicorn.run(
+        build_stub_app(load_app_config().models),
+        host=host,
+        port=port,
+        log_level="warning",
+    )
+
+
+@app.command()
+def worker(
+    concurrency: int | None = typer.Option(
+        None, help="Jobs run at once (default: JOB_WORKER_CONCURRENCY)."
+    ),
+    kinds: str | None = typer.Option(
+        None, help="Comma-separated job kinds to run (default: all)."
+    ),
+    pool_size: int | None = typer.Option(
+        None, help="Database pool size (default: WORKER_DB_POOL_SIZE)."
+    ),
+    max_overflow: int | None = typer.Option(
+        None, help="Database pool overflow (default: WORKER_DB_MAX_OVERFLOW)."
+    ),
+    drain_seconds: float | None = typer.Option(
+        None, help="Grace period for running jobs on SIGTERM."
+    ),
+):
+    """Run a background job worker (evaluation runs, imports, report builds)."""
+    import asyncio
+
+    from src.jobs.queue import JobKind
+    from src.jobs.worker import run_worker
+
+    kind_list = [k.strip() for k in kinds.split(",") if k.strip()] if kinds else None
+    unknown = sorted(set(kind_list or []) - {k.value for k in JobKind})
+    if unknown:
+        typer.echo(f"Unknown job kinds: {', '.join(unknown)}", err=True)
+        raise typer.Exit(code=1)
+
+    asyncio.run(
+        run_worker(
+            concurrency=concurrency,
+            kinds=kind_list,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            drain_seconds=drain_seconds,
+        )
+    )
+
+
+@app.command()
+def plan(evaluation_id: str):
+    """Estimate the calls, cost and wall time of an evaluation's run."""
+    import asyncio
+    from uuid import UUID
+
+    from src.db.database import async_session_factory
+    from src.db.repository import get_evaluation
+    from src.runners.planner import PlanError, plan_evaluation
+
+    async def build() -> dict:
+        async with async_session_factory() as db:
+            evaluation = await get_evaluation(db, UUID(evaluation_id))
+            if evaluation is None:
+                raise PlanError(f"Evaluation {evaluation_id} not found")
+            return (await plan_evaluation(db, evaluation)).to_dict()
+
+    try:
+        result = asyncio.run(build())
+    except PlanError as exc:
+        typer.echo(str(exc), err=True)
+        raise typer.Exit(code=1) from exc
+
+    typer.echo(f"Plan ({result['execution_mode']}):")
+    typer.echo(f"  Samples: {result['samples']} in {result['calls']} calls")
+    typer.echo(
+        f"  Tokens: {result['prompt_tokens']} prompt, "
+        f"{result['completion_tokens']} completion"
+    )
+    typer.echo(f"  Cost: {_or_unknown(result['cost_usd'], '${:.4f}')}")
+    typer.echo(f"  Wall time: {_or_unknown(result['wall_seconds'], '{:.0f}s')}")
+    if result["within_budget"] is not None:
+        typer.echo(f"  Within budget: {'yes' if result['within_budget'] else 'no'}")
+    typer.echo("\nModels:")
+    for m in result["models"]:
+        typer.echo(
+            f"  - {m['model_name']}: {m['calls']} calls, "
+            f"{_or_unknown(m['cost_usd'], '${:.4f}')}"
+            + ("" if m["history_calls"] else " (no history)")
+        )
+    if result["providers"]:
+        typer.echo("\nProviders:")
+    for p in result["providers"]:
+        typer.echo(
+            f"  - {p['provider']}: {p['concurrency']} concurrent, "
+            f"limited by {p['limited_by'] or 'unknown'}"
+        )
+
+
+def _or_unknown(value: float | None, fmt: str) -> str:
+    return "unknown" if value is None else fmt.format(value)
+
+
 if __name__ == "__main__":
     app()
@@ -1,29 +1,67 @@
 """Evaluation API endpoints."""
 
+import asyncio
 import logging
 import random
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
 from typing import Annotated, Any
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import get_settings
 from src.db.database import get_db
-from src.db.models import Evaluation, Question, Score
+from src.db.models import Evaluation, ModelRuntimeStats, Question, Score
 from src.db.models import Response as ResponseModel
 from src.db.repository import get_evaluation, list_evaluations
-from src.dependencies.auth import CurrentUser
-from src.loaders.config_loader import load_app_config
+from src.dependencies.auth import AdminUser, CurrentUser
+from src.jobs.queue import (
+    JobKind,
+    cancel_queued_jobs,
+    enqueue_job,
+    get_active_job,
+    set_job_priority,
+)
+from src.jobs.run_control import get_status, signal_stop
+from src.jobs.work_items import ACTIVE_STATUSES as WORK_ITEM_ACTIVE_STATUSES
+from src.jobs.work_items import (
+    cancel_work_items,
+    count_failed_samples,
+    work_item_counts,
+)
+from src.loaders.question_bank import (
+    QuestionBank,
+    QuestionSelectionError,
+    questions_for,
+)
 from src.loaders.question_loader import load_all_questions
-from src.models.evaluation import EvaluationCreate, EvaluationResponse
-from src.observability.context import reset_evaluation_id, set_evaluation_id
-from src.runners.import_runner import ImportBatch, import_responses
+from src.models.evaluation import (
+    EvaluationCreate,
+    EvaluationPriorityUpdate,
+    EvaluationResponse,
+)
+from src.observability.progress import RunProgress, format_sse, get_progress_broker
+from src.runners.batch_runner import cancel_provider_batches
+from src.runners.import_runner import (
+    ImportBatch,
+    ImportConflictError,
+    import_into_evaluation,
+)
+from src.runners.planner import PlanError, plan_evaluation
+from src.runners.runtime_stats import runtime_stats_summary
+from src.runners.scheduler import THROUGHPUT_WINDOW_SECONDS
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/evaluations", tags=["evaluations"])
 
+# Statuses in which a run is collecting responses.
+RUN_STATUSES = ("collecting", "running")
+
 
 @router.post(
     "",
@@ -35,7 +73,25 @@ async def create_evaluation(
     user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> Evaluation:
-    """Create a new evaluation run."""
+    """Create a new evaluation run.
+
+    A ``question_selector`` is resolved against the question bank now, and
+    the evaluation keeps the resulting question ids: later changes to the
+    bank do not change which questions it runs, reviews and reports on.
+    """
+    question_selector = None
+    question_ids = None
+    if body.question_selector is not None:
+        try:
+            selected = QuestionBank(load_all_questions()).select(body.question_selector)
+        except QuestionSelectionError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(exc),
+            ) from exc
+        question_selector = body.question_selector.model_dump(mode="json")
+        question_ids = [q.id for q in selected]
+
     evaluation = Evaluation(
         id=uuid4(),
         name=body.name,
@@ -45,6 +101,12 @@ async def create_evaluation(
         model_list=body.model_list,
         prompt_template=body.prompt_template,
         review_mode=body.review_mode,
+        execution_mode=body.execution_mode,
+        budget_usd=body.budget_usd,
+        budget_tokens=body.budget_tokens,
+        samples_per_question=body.samples_per_question,
+        question_selector=question_selector,
+        question_ids=question_ids,
         created_by=user.id,
     )
     db.add(evaluation)
@@ -78,105 +140,88 @@ async def get_evaluation_detail(
     return evaluation
 
 
-async def _run_evaluation_task(
+@router.post("/{evaluation_id}/run")
+async def trigger_run(
     evaluation_id: UUID,
-    model_names: list[str],
-    prompt_template_id: str,
-) -> None:
-    """Background task to run LLM evaluation."""
-    from src.db.database import async_session_factory
-    from src.runners.litellm_runner import run_evaluation
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> dict:
+    """Queue response collection for an evaluation.
 
-    config = load_app_config()
-    questions = load_all_questions()
+    The run is executed by a job worker, so it survives API restarts; if a
+    run is already queued or running for the evaluation, that job is returned
+    instead of queueing another.
+    """
+    # Locking the evaluation until the commit keeps two concurrent triggers
+    # from both finding no active job and queueing a run each.
+    evaluation = await get_evaluation(db, evaluation_id, for_update=True)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
 
-    # Find matching model configs
-    model_configs = [m for m in config.models if m.name in model_names]
-    if not model_configs:
-        logger.error(
-            "No matching model configs",
-            extra={"model_names": model_names},
+    # "running" is accepted so a run whose job has failed permanently can be
+    # requeued, and "paused" to resume; already-collected responses are
+    # skipped by the runner.
+    if evaluation.status not in ("created", "collecting", "running", "paused"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot run evaluation in '{evaluation.status}' status",
         )
-        return
 
-    # Find prompt template
-    template = next(
-        (t for t in config.templates if t.id == prompt_template_id),
-        None,
+    active = await get_active_job(
+        db, evaluation_id, JobKind.EVALUATION_RUN, JobKind.EVALUATION_SHARD
     )
-    if not template:
-        logger.error(
-            "Prompt template not found",
-            extra={"prompt_template_id": prompt_template_id},
+    if active is not None and evaluation.status == "paused":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Evaluation is still pausing; try again shortly",
         )
-        return
-
-    question_ids = [q.id for q in questions]
-    question_texts = {q.id: q.text for q in questions}
-
-    async with async_session_factory() as db:
-        tok = set_evaluation_id(str(evaluation_id))
-        # Sync questions to database
-        for q in questions:
-            existing = await db.get(Question, q.id)
-            if not existing:
-                db.add(
-                    Question(
-                        id=q.id,
-                        text=q.text,
-                        type=q.type,
-                        category=q.type,
-                        difficulty=q.difficulty,
-                        metadata_json={
-                            "scripture_references": q.scripture_references,
-                            "tags": q.tags,
-                        },
-                    )
-                )
-        await db.commit()
+    if active is not None:
+        return {
+            "message": "Evaluation run already queued",
+            "evaluation_id": str(evaluation_id),
+            "job_id": str(active.id),
+        }
 
-        # Update status to running
-        eval_obj = await db.get(Evaluation, evaluation_id)
-        if eval_obj:
-            eval_obj.status = "running"
-            await db.commit()
+    model_names_any: Any = evaluation.model_list
+    model_names: list[str] = list(model_names_any) if model_names_any else []
 
-        try:
-            await run_evaluation(
-                db=db,
-                evaluation_id=evaluation_id,
-                question_ids=question_ids,
-                question_texts=question_texts,
-                model_configs=model_configs,
-                prompt_template=template,
-            )
-            # Update status to reviewing
-            eval_obj = await db.get(Evaluation, evaluation_id)
-            if eval_obj:
-                eval_obj.status = "reviewing"
-                await db.commit()
-
-        except Exception:
-            logger.exception(
-                "Evaluation failed",
-                extra={"evaluation_id": str(evaluation_id)},
-            )
-            eval_obj = await db.get(Evaluation, evaluation_id)
-            if eval_obj:
-                eval_obj.status = "created"
-                await db.commit()
+    evaluation.status = "collecting"
+    job = await enqueue_job(
+        db,
+        JobKind.EVALUATION_RUN,
+        {
+            "evaluation_id": str(evaluation_id),
+            "model_names": model_names,
+            "prompt_template": evaluation.prompt_template,
+            "execution_mode": evaluation.execution_mode,
+        },
+        evaluation_id=evaluation_id,
+        priority=evaluation.priority,
+    )
+    await db.commit()
 
-        reset_evaluation_id(tok)
+    return {
+        "message": "Evaluation run queued",
+        "evaluation_id": str(evaluation_id),
+        "job_id": str(job.id),
+    }
 
 
-@router.post("/{evaluation_id}/run")
-async def trigger_run(
+@router.post("/{evaluation_id}/plan")
+async def plan_run(
     evaluation_id: UUID,
     user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
-    background_tasks: BackgroundTasks,
 ) -> dict:
-    """Trigger response collection for an evaluation."""
+    """Dry-run an evaluation: the calls, tokens, cost and wall time it would take.
+
+    Nothing is queued or called. Samples already collected are left out, so a
+    paused or failed run is planned from where it stopped. See
+    ``src.runners.planner`` for how the projections are made.
+    """
     evaluation = await get_evaluation(db, evaluation_id)
     if not evaluation:
         raise HTTPException(
@@ -184,39 +229,343 @@ async def trigger_run(
             detail="Evaluation not found",
         )
 
-    if evaluation.status not in ("created", "collecting"):
+    try:
+        plan = await plan_evaluation(db, evaluation)
+    except PlanError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        ) from exc
+    return {"evaluation_id": str(evaluation_id), **plan.to_dict()}
+
+
+@router.post("/{evaluation_id}/pause")
+async def pause_run(
+    evaluation_id: UUID,
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> dict:
+    """Pause response collection; ``POST /run`` resumes it.
+
+    Queued jobs are cancelled and running shards stop dispatching calls at
+    once, cancel the ones in flight and keep every response that finished, so
+    resuming only collects what is still missing. Batch-mode runs cannot be
+    paused, since their provider batches cannot be resumed.
+    """
+    evaluation = await get_evaluation(db, evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
+    if evaluation.status not in ("collecting", "running"):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Cannot run evaluation in '{evaluation.status}' status",
+            detail=f"Cannot pause evaluation in '{evaluation.status}' status",
+        )
+    if evaluation.execution_mode == "batch":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch-mode runs can be cancelled but not paused",
         )
 
-    evaluation.status = "collecting"
+    evaluation.status = "paused"
+    jobs = await cancel_queued_jobs(db, evaluation_id)
     await db.commit()
+    runners = signal_stop(evaluation_id)
+    get_progress_broker().publish_status(evaluation_id, "paused")
+    logger.info(
+        "Evaluation paused",
+        extra={
+            "evaluation_id": str(evaluation_id),
+            "cancelled_jobs": jobs,
+            "signalled_runners": runners,
+        },
+    )
+    return {"message": "Evaluation paused", "evaluation_id": str(evaluation_id)}
 
-    model_names_any: Any = evaluation.model_list
-    model_names: list[str] = list(model_names_any) if model_names_any else []
 
-    background_tasks.add_task(
-        _run_evaluation_task,
-        evaluation_id,
-        model_names,
-        evaluation.prompt_template,
+@router.post("/{evaluation_id}/cancel")
+async def cancel_run(
+    evaluation_id: UUID,
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> dict:
+    """Cancel response collection for good.
+
+    Runners stop as on pause and responses already collected are kept, but
+    the remaining work items, and a batch-mode run's provider batches, are
+    cancelled and the run cannot be resumed.
+    """
+    evaluation = await get_evaluation(db, evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
+    if evaluation.status not in ("collecting", "running", "paused"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot cancel evaluation in '{evaluation.status}' status",
+        )
+
+    evaluation.status = "cancelled"
+    jobs = await cancel_queued_jobs(db, evaluation_id)
+    items = await cancel_work_items(db, evaluation_id)
+    batches = 0
+    if evaluation.execution_mode == "batch":
+        batches = await cancel_provider_batches(evaluation)
+    await db.commit()
+    runners = signal_stop(evaluation_id)
+    get_progress_broker().publish_status(evaluation_id, "cancelled")
+    logger.info(
+        "Evaluation cancelled",
+        extra={
+            "evaluation_id": str(evaluation_id),
+            "cancelled_jobs": jobs,
+            "cancelled_work_items": items,
+            "cancelled_provider_batches": batches,
+            "signalled_runners": runners,
+        },
+    )
+    return {"message": "Evaluation cancelled", "evaluation_id": str(evaluation_id)}
+
+
+@router.put("/{evaluation_id}/priority", response_model=EvaluationResponse)
+async def set_evaluation_priority(
+    evaluation_id: UUID,
+    body: EvaluationPriorityUpdate,
+    admin: AdminUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> Evaluation:
+    """Change an evaluation's share of provider capacity (admin only).
+
+    Running shards pick the new weight up at their next chunk; queued jobs
+    are re-ordered immediately.
+    """
+    evaluation = await get_evaluation(db, evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
+
+    evaluation.priority = body.priority
+    await set_job_priority(db, evaluation_id, body.priority)
+    await db.commit()
+    await db.refresh(evaluation)
+    logger.info(
+        "Evaluation priority changed",
+        extra={
+            "evaluation_id": str(evaluation_id),
+            "priority": body.priority,
+            "changed_by": str(admin.id),
+        },
     )
+    return evaluation
+
+
+@router.get("/{evaluation_id}/throughput")
+async def get_evaluation_throughput(
+    evaluation_id: UUID,
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> dict:
+    """Collection rate and capacity share, to explain why a run is slow.
+
+    ``capacity_share`` is this evaluation's priority over the total priority
+    of all running evaluations, i.e. the fraction of each provider's call
+    slots it gets while they compete. Slots are shared within each worker
+    process, so this is the nominal share: the real one depends on which
+    evaluations' shards run in the same processes.
+    """
+    evaluation = await get_evaluation(db, evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
+
+    since = datetime.now(UTC) - timedelta(seconds=THROUGHPUT_WINDOW_SECONDS)
+    recent_result = await db.execute(
+        select(func.count(ResponseModel.id)).where(
+            ResponseModel.evaluation_id == evaluation_id,
+            ResponseModel.created_at >= since,
+        )
+    )
+    recent = recent_result.scalar() or 0
+    per_minute = recent * 60.0 / THROUGHPUT_WINDOW_SECONDS
+
+    running_result = await db.execute(
+        select(
+            func.count(Evaluation.id), func.coalesce(func.sum(Evaluation.priority), 0)
+        ).where(Evaluation.status == "running")
+    )
+    running, total_priority = running_result.one()
+
+    counts = await work_item_counts(db, evaluation_id)
+    remaining = sum(counts.get(s, 0) for s in WORK_ITEM_ACTIVE_STATUSES)
+    share = None
+    if evaluation.status == "running" and total_priority:
+        share = round(evaluation.priority / total_priority, 3)
 
     return {
-        "message": "Evaluation run started",
         "evaluation_id": str(evaluation_id),
+        "status": evaluation.status,
+        "priority": evaluation.priority,
+        "running_evaluations": running,
+        "capacity_share": share,
+        "responses_per_minute": round(per_minute, 2),
+        "work_items": counts,
+        "remaining_work_items": remaining,
+        "eta_minutes": round(remaining / per_minute, 1)
+        if per_minute and remaining
+        else None,
     }
 
 
+@router.get("/{evaluation_id}/runtime-stats")
+async def get_runtime_stats(
+    evaluation_id: UUID,
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> dict:
+    """Per-model serving statistics recorded by the runner.
+
+    Latency quantiles come from a mergeable sketch and are accurate to within
+    1%; ``tokens_per_second`` is completion tokens over time spent in calls.
+    Cached and batch responses are not counted.
+    """
+    evaluation = await get_evaluation(db, evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
+
+    result = await db.execute(
+        select(ModelRuntimeStats)
+        .where(ModelRuntimeStats.evaluation_id == evaluation_id)
+        .order_by(ModelRuntimeStats.model_name)
+    )
+    return {
+        "evaluation_id": str(evaluation_id),
+        "models": [runtime_stats_summary(row) for row in result.scalars().all()],
+    }
+
+
+async def _load_run_progress(db: AsyncSession, evaluation: Evaluation) -> RunProgress:
+    """Collection progress recorded so far, as the starting point of a stream."""
+    cost = ResponseModel.raw_metadata["cost_usd"].as_float()
+    result = await db.execute(
+        select(
+            ResponseModel.model_name,
+            func.count(ResponseModel.id),
+            func.coalesce(func.sum(cost), 0),
+        )
+        .where(ResponseModel.evaluation_id == evaluation.id)
+        .group_by(ResponseModel.model_name)
+    )
+    by_model = {name: (int(n), float(spent)) for name, n, spent in result.all()}
+    samples_per_question = evaluation.samples_per_question or 1
+    errors = await count_failed_samples(db, evaluation.id, samples_per_question)
+    model_names_any: Any = evaluation.model_list
+    total = (
+        len(questions_for(load_all_questions(), evaluation.question_ids))
+        * len(model_names_any or [])
+        * samples_per_question
+    )
+    return RunProgress(total, by_model, errors=errors)
+
+
+async def _progress_stream(
+    evaluation_id: UUID, progress: RunProgress, run_status: str
+) -> AsyncIterator[str]:
+    """Server-Sent Events for a run, until it stops collecting.
+
+    Snapshots are sent at most every ``PROGRESS_STREAM_INTERVAL_SECONDS``
+    however fast calls finish. A quiet stream gets a keepalive comment every
+    ``PROGRESS_KEEPALIVE_SECONDS``, after re-reading the run's status in case
+    its change was not published to this process.
+    """
+    from src.db.database import async_session_factory
+
+    settings = get_settings()
+    interval = settings.progress_stream_interval_seconds
+    loop = asyncio.get_running_loop()
+    with get_progress_broker().subscribe(evaluation_id) as queue:
+        yield format_sse("progress", {"status": run_status, **progress.snapshot()})
+        last_sent = loop.time()
+        changed = False
+        while run_status in RUN_STATUSES:
+            if changed:
+                timeout = max(0.0, last_sent + interval - loop.time())
+            else:
+                timeout = settings.progress_keepalive_seconds
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout)
+            except TimeoutError:
+                event = None
+            if event is not None:
+                if event.kind == "status" and event.status:
+                    run_status = event.status
+                progress.apply(event)
+                changed = True
+                if run_status in RUN_STATUSES and loop.time() - last_sent < interval:
+                    continue
+            elif not changed:
+                run_status = (
+                    await get_status(async_session_factory, evaluation_id) or run_status
+                )
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse("progress", {"status": run_status, **progress.snapshot()})
+            last_sent = loop.time()
+            changed = False
+        yield format_sse("end", {"status": run_status})
+
+
+@router.get("/{evaluation_id}/events")
+async def stream_run_events(
+    evaluation_id: UUID,
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> StreamingResponse:
+    """Stream live collection progress as Server-Sent Events.
+
+    Each ``progress`` event carries completed/total responses, errors, cost
+    so far, overall and per-model responses per minute, and an ETA; an
+    ``end`` event follows once the run is no longer collecting (it finished,
+    was paused or cancelled, or failed).
+    """
+    evaluation = await get_evaluation(db, evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evaluation not found",
+        )
+    progress = await _load_run_progress(db, evaluation)
+    return StreamingResponse(
+        _progress_stream(evaluation_id, progress, evaluation.status),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{evaluation_id}/import")
 async def import_eval_responses(
     evaluation_id: UUID,
     body: ImportBatch,
     user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
+    background: bool = False,
 ) -> dict:
-    """Import pre-collected responses for an evaluation."""
+    """Import pre-collected responses for an evaluation.
+
+    With ``background=true`` the batch is queued for a job worker and the
+    job id is returned instead of waiting for the import.
+    """
     evaluation = await get_evaluation(db, evaluation_id)
     if not evaluation:
         raise HTTPException(
@@ -224,38 +573,37 @@ async def import_eval_responses(
             detail="Evaluation not found",
         )
 
-    # Sync referenced questions to database
-    questions = load_all_questions()
-    q_map = {q.id: q for q in questions}
+    questions = questions_for(load_all_questions(), evaluation.question_ids)
+    known_ids = {q.id for q in questions}
     for item in body.responses:
-        if item.question_id not in q_map:
+        if item.question_id not in known_ids:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail=f"Unknown question_id: {item.question_id}",
             )
-        existing = await db.get(Question, item.question_id)
-        if not existing:
-            q = q_map[item.question_id]
-            db.add(
-                Question(
-                    id=q.id,
-                    text=q.text,
-                    type=q.type,
-                    category=q.type,
-                    difficulty=q.difficulty,
-                    metadata_json={
-                        "scripture_references": q.scripture_references,
-                        "tags": q.tags,
-                    },
-                )
-            )
-    await db.commit()
 
-    responses = await import_responses(db, evaluation_id, body)
-
-    if evaluation.status == "created":
-        evaluation.status = "reviewing"
+    if background:
+        # Imports are not idempotent, so a failed one is not retried.
+        job = await enqueue_job(
+            db,
+            JobKind.RESPONSE_IMPORT,
+            {"evaluation_id": str(evaluation_id), "batch": body.model_dump()},
+            evaluation_id=evaluation_id,
+            max_attempts=1,
+        )
         await db.commit()
+        return {
+            "message": f"Import of {len(body.responses)} responses queued",
+            "count": len(body.responses),
+            "job_id": str(job.id),
+        }
+
+    try:
+        responses = await import_into_evaluation(db, evaluation, body, questions)
+    except ImportConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=str(exc)
+        ) from exc
 
     return {
         "message": f"Imported {len(responses)} responses",
@@ -263,6 +611,16 @@ async def import_eval_responses(
     }
 
 
+def _blind_label(index: int) -> str:
+    """Spreadsheet-style blind label: Response A..Z, then AA, AB, ..."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return f"Response {letters}"
+
+
 @router.get("/{evaluation_id}/review")
 async def get_next_unscored(
     evaluation_id: UUID,
@@ -291,7 +649,11 @@ async def get_next_unscored(
             ResponseModel.evaluation_id == evaluation_id,
             ResponseModel.id.notin_(select(scored_subq)),
         )
-        .order_by(ResponseModel.question_id, ResponseModel.model_name)
+        .order_by(
+            ResponseModel.question_id,
+            ResponseModel.model_name,
+            ResponseModel.sample_index,
+        )
     )
     unscored = list(result.scalars().all())
 
@@ -310,17 +672,23 @@ async def get_next_unscored(
     if is_blind:
         random.shuffle(question_responses)
 
-    labels = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    # Multi-sample evaluations show every sample; label them apart when the
+    # model name is visible.
+    multi_sample = evaluation.samples_per_question > 1
     items = []
     for i, resp in enumerate(question_responses):
+        label = resp.model_name
+        if multi_sample:
+            label = f"{resp.model_name} (sample {resp.sample_index + 1})"
         item = {
             "response_id": str(resp.id),
-            "label": f"Response {labels[i]}" if is_blind else resp.model_name,
+            "label": _blind_label(i) if is_blind else label,
             "response_text": resp.response_text,
             "question_id": resp.question_id,
         }
         if not is_blind:
             item["model_name"] = resp.model_name
+            item["sample_index"] = resp.sample_index
         items.append(item)
 
     # Get question text
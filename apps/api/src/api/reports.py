@@ -3,17 +3,21 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.database import get_db
 from src.db.repository import get_evaluation
 from src.dependencies.auth import CurrentUser
+from src.jobs.queue import JobKind, enqueue_job
 from src.reporting.generator import (
+    REPORT_EXTENSIONS,
+    REPORT_MEDIA_TYPES,
     generate_html_report,
     generate_markdown_report,
     generate_report_data,
+    get_report_file,
 )
 
 router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
@@ -42,8 +46,13 @@ async def generate_report(
     user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
     format: str = Query(default="json", pattern="^(json|html|markdown)$"),
+    background: bool = False,
 ):
-    """Generate a report in the specified format."""
+    """Generate a report in the specified format.
+
+    With ``background=true`` the report is built by a job worker and can be
+    fetched from ``/{evaluation_id}/files/{format}`` once the job succeeds.
+    """
     evaluation = await get_evaluation(db, evaluation_id)
     if not evaluation:
         raise HTTPException(
@@ -51,6 +60,16 @@ async def generate_report(
             detail="Evaluation not found",
         )
 
+    if background:
+        job = await enqueue_job(
+            db,
+            JobKind.REPORT_BUILD,
+            {"evaluation_id": str(evaluation_id), "format": format},
+            evaluation_id=evaluation_id,
+        )
+        await db.commit()
+        return {"message": "Report build queued", "job_id": str(job.id)}
+
     if format == "html":
         html = await generate_html_report(db, evaluation_id)
         return HTMLResponse(content=html)
@@ -59,3 +78,25 @@ async def generate_report(
         return PlainTextResponse(content=md)
     else:
         return await generate_report_data(db, evaluation_id)
+
+
+@router.get("/{evaluation_id}/files/{format}")
+async def download_report_file(
+    evaluation_id: UUID,
+    format: Annotated[str, Path(pattern="^(json|html|markdown)$")],
+    user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> Response:
+    """Download a report built in the background."""
+    report = await get_report_file(db, evaluation_id, format)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report has not been built",
+        )
+    filename = f"{evaluation_id}.{REPORT_EXTENSIONS[format]}"
+    return Response(
+        content=report.content,
+        media_type=REPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -2,19 +2,29 @@
 
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from src.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.effective_database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-)
+
+def create_engine(pool_size: int, max_overflow: int) -> AsyncEngine:
+    return create_async_engine(
+        settings.effective_database_url,
+        echo=settings.debug,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+
+
+engine = create_engine(settings.db_pool_size, settings.db_max_overflow)
 
 async_session_factory = async_sessionmaker(
     engine,
@@ -23,6 +33,22 @@ async_session_factory = async_sessionmaker(
 )
 
 
+def configure_pool(pool_size: int, max_overflow: int) -> None:
+    """Rebuild the process engine with a different connection pool size.
+
+    Standalone workers call this before opening any session, since their
+    connection needs (job polling, heartbeats and each job's own sessions)
+    differ from the API's.
+    """
+    global engine, async_session_factory
+    engine = create_engine(pool_size, max_overflow)
+    async_session_factory = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database sessions."""
     async with async_session_factory() as session:
@@ -3,7 +3,19 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func, text
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -68,6 +80,33 @@ class Evaluation(Base, TimestampMixin):
     review_mode: Mapped[str] = mapped_column(
         String(20), nullable=False, server_default=text("'blind'")
     )
+    execution_mode: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'interactive'")
+    )
+    budget_usd: Mapped[float | None] = mapped_column(Float, nullable=True)
+    budget_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Spend recorded plus spend reserved by running shards; shards reserve
+    # against the budget with a conditional UPDATE of these (runners.budget).
+    budget_committed_usd: Mapped[float] = mapped_column(
+        Float, nullable=False, server_default=text("0")
+    )
+    budget_committed_tokens: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("0")
+    )
+    samples_per_question: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("1")
+    )
+    # Share of provider capacity relative to other running evaluations.
+    priority: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("1")
+    )
+    # The selector the evaluation was created with and the question ids it
+    # resolved to; NULL ids cover every question in the bank.
+    question_selector: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    question_ids: Mapped[list | None] = mapped_column(JSONB, nullable=True)
+    # Provider batches submitted and not yet ingested, by batch id, so a
+    # retried batch-mode run polls them instead of submitting again.
+    provider_batches: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     created_by: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
 
     # Relationships
@@ -99,6 +138,15 @@ class Response(Base, TimestampMixin):
     """An LLM response to a question within an evaluation."""
 
     __tablename__ = "responses"
+    __table_args__ = (
+        UniqueConstraint(
+            "evaluation_id",
+            "question_id",
+            "model_name",
+            "sample_index",
+            name="uq_responses_evaluation_sample",
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True)
     evaluation_id: Mapped[UUID] = mapped_column(
@@ -108,6 +156,9 @@ class Response(Base, TimestampMixin):
         ForeignKey("questions.id"), nullable=False, index=True
     )
     model_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    sample_index: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
     response_text: Mapped[str] = mapped_column(Text, nullable=False)
     source: Mapped[str] = mapped_column(
         String(20), nullable=False, server_default=text("'api'")
@@ -146,3 +197,144 @@ class Score(Base):
     # Relationships
     response: Mapped["Response"] = relationship(back_populates="scores")
     user: Mapped["User"] = relationship(back_populates="scores")
+
+
+class Job(Base, TimestampMixin):
+    """A unit of background work claimed by workers through a leased queue."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default={})
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'queued'")
+    )
+    evaluation_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("evaluations.id"), nullable=True, index=True
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    max_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("3")
+    )
+    priority: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("1")
+    )
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    lease_owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class WorkItem(Base, TimestampMixin):
+    """One (question, model) cell of an evaluation, leased by shard jobs."""
+
+    __tablename__ = "work_items"
+    __table_args__ = (
+        UniqueConstraint(
+            "evaluation_id",
+            "question_id",
+            "model_name",
+            name="uq_work_items_evaluation_question_model",
+        ),
+        Index("ix_work_items_evaluation_status", "evaluation_id", "status"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    evaluation_id: Mapped[UUID] = mapped_column(
+        ForeignKey("evaluations.id"), nullable=False
+    )
+    question_id: Mapped[str] = mapped_column(ForeignKey("questions.id"), nullable=False)
+    model_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'queued'")
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    max_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("3")
+    )
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    lease_owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class ModelRuntimeStats(Base, TimestampMixin):
+    """Rolling serving statistics for one model within an evaluation."""
+
+    __tablename__ = "model_runtime_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "evaluation_id",
+            "model_name",
+            name="uq_model_runtime_stats_evaluation_model",
+        ),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    evaluation_id: Mapped[UUID] = mapped_column(
+        ForeignKey("evaluations.id"), nullable=False
+    )
+    model_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    calls: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    errors: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    # Mergeable quantile sketch of call latencies (see runners.runtime_stats).
+    latency_sketch: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    latency_seconds: Mapped[float] = mapped_column(
+        Float, nullable=False, server_default=text("0")
+    )
+    completion_tokens: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("0")
+    )
+    total_tokens: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("0")
+    )
+    cost_usd: Mapped[float] = mapped_column(
+        Float, nullable=False, server_default=text("0")
+    )
+
+
+class ReportFile(Base, TimestampMixin):
+    """A report rendered by a background job, served by any API process."""
+
+    __tablename__ = "report_files"
+    __table_args__ = (
+        UniqueConstraint(
+            "evaluation_id",
+            "format",
+            name="uq_report_files_evaluation_format",
+        ),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    evaluation_id: Mapped[UUID] = mapped_column(
+        ForeignKey("evaluations.id"), nullable=False
+    )
+    format: Mapped[str] = mapped_column(String(20), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
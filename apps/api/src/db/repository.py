@@ -1,11 +1,13 @@
 """Database repository for common query patterns."""
 
+from collections.abc import Iterable
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models import Evaluation, Question, Response, Score, User
+from src.models.question import Question as QuestionSchema
 
 
 async def get_user_by_auth_id(db: AsyncSession, auth_provider_id: str) -> User | None:
@@ -16,9 +18,39 @@ async def get_user_by_auth_id(db: AsyncSession, auth_provider_id: str) -> User |
     return result.scalar_one_or_none()
 
 
-async def get_evaluation(db: AsyncSession, evaluation_id: UUID) -> Evaluation | None:
-    """Get an evaluation by ID."""
-    result = await db.execute(select(Evaluation).where(Evaluation.id == evaluation_id))
+async def sync_questions(db: AsyncSession, questions: Iterable[QuestionSchema]) -> None:
+    """Insert loaded questions that are not in the database yet, then commit."""
+    for q in questions:
+        existing = await db.get(Question, q.id)
+        if not existing:
+            db.add(
+                Question(
+                    id=q.id,
+                    text=q.text,
+                    type=q.type,
+                    category=q.type,
+                    difficulty=q.difficulty,
+                    metadata_json={
+                        "scripture_references": q.scripture_references,
+                        "tags": q.tags,
+                    },
+                )
+            )
+    await db.commit()
+
+
+async def get_evaluation(
+    db: AsyncSession, evaluation_id: UUID, for_update: bool = False
+) -> Evaluation | None:
+    """Get an evaluation by ID.
+
+    With ``for_update`` the row stays locked until the caller's transaction
+    ends, serializing changes that are checked before they are made.
+    """
+    query = select(Evaluation).where(Evaluation.id == evaluation_id)
+    if for_update:
+        query = query.with_for_update()
+    result = await db.execute(query)
     return result.scalar_one_or_none()
 
 
@@ -47,7 +79,7 @@ async def get_responses_for_evaluation(
     result = await db.execute(
         select(Response)
         .where(Response.evaluation_id == evaluation_id)
-        .order_by(Response.question_id, Response.model_name)
+        .order_by(Response.question_id, Response.model_name, Response.sample_index)
     )
     return list(result.scalars().all())
 
@@ -0,0 +1 @@
+"""Durable background jobs (Postgres-backed queue and workers)."""
@@ -0,0 +1,505 @@
+"""Job handlers: the work each job kind performs when a worker claims it."""
+
+import asyncio
+import contextlib
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.db.models import Evaluation, Job
+from src.db.repository import sync_questions
+from src.jobs.queue import JobKind, enqueue_job
+from src.jobs.run_control import STOP_STATUSES, run_until_stopped, watch_for_stop
+from src.jobs.work_items import (
+    claim_work_items,
+    count_active_work_items,
+    finish_evaluation_if_done,
+    keep_leases,
+    plan_work_items,
+    release_work_items,
+    settle_work_items,
+    work_item_counts,
+)
+from src.loaders.config_loader import ModelConfig, load_app_config
+from src.loaders.question_bank import questions_for
+from src.loaders.question_loader import load_all_questions
+from src.observability.context import reset_evaluation_id, set_evaluation_id
+from src.observability.progress import get_progress_broker
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict, Job], Awaitable[None]]
+
+
+async def run_evaluation_task(
+    evaluation_id: UUID,
+    model_names: list[str],
+    prompt_template_id: str,
+    execution_mode: str = "interactive",
+    final_attempt: bool = True,
+) -> None:
+    """Collect responses for an evaluation.
+
+    Batch-mode runs are collected here. Interactive runs are planned as work
+    items and shard jobs, which any number of workers then run in parallel
+    (see ``src.jobs.work_items``); the last shard moves the evaluation to
+    "reviewing".
+
+    A paused or cancelled evaluation is left as it is. Cancelling a batch-mode
+    run stops collecting its batches and cancels them with the provider;
+    pausing one is refused by the API. A retried batch-mode run resumes
+    polling the batches it had already submitted.
+
+    Failures are re-raised so the job queue can retry them. The evaluation
+    goes back to "created" only after the final attempt; until then it stays
+    "collecting" while the retry waits in the queue.
+    """
+    from src.db.database import async_session_factory
+    from src.runners.batch_runner import (
+        cancel_provider_batches,
+        run_batch_evaluation,
+    )
+    from src.runners.budget import RunBudget, reset_shared_spend
+    from src.runners.litellm_runner import get_recorded_spend
+    from src.runners.scheduler import get_scheduler
+
+    config = load_app_config()
+    questions = load_all_questions()
+
+    # Find matching model configs
+    model_configs = [m for m in config.models if m.name in model_names]
+    if not model_configs:
+        logger.error(
+            "No matching model configs",
+            extra={"model_names": model_names},
+        )
+        return
+
+    # Find prompt template
+    template = next(
+        (t for t in config.templates if t.id == prompt_template_id),
+        None,
+    )
+    if not template:
+        logger.error(
+            "Prompt template not found",
+            extra={"prompt_template_id": prompt_template_id},
+        )
+        return
+
+    # Interactive models of a batch-mode run are called from this process.
+    scheduler = get_scheduler()
+    flow = str(evaluation_id)
+
+    async with async_session_factory() as db:
+        tok = set_evaluation_id(str(evaluation_id))
+        scheduler.attach(flow)
+        try:
+            await sync_questions(db, questions)
+
+            # Update status to running
+            eval_obj = await db.get(Evaluation, evaluation_id)
+            budget = None
+            samples_per_question = 1
+            priority = 1
+            if eval_obj and eval_obj.status in STOP_STATUSES:
+                logger.info(
+                    "Evaluation was stopped before its run started",
+                    extra={"status": eval_obj.status},
+                )
+                return
+            if eval_obj:
+                questions = questions_for(questions, eval_obj.question_ids)
+                samples_per_question = eval_obj.samples_per_question or 1
+                priority = eval_obj.priority or 1
+                eval_obj.status = "running"
+                await db.commit()
+                budget = RunBudget.for_evaluation(eval_obj)
+                if budget is not None:
+                    # A resumed run keeps counting from what was already spent.
+                    budget.spent_usd, budget.spent_tokens = await get_recorded_spend(
+                        db, evaluation_id
+                    )
+
+            question_ids = [q.id for q in questions]
+            question_texts = {q.id: q.text for q in questions}
+            try:
+                if execution_mode == "batch":
+                    async with watch_for_stop(
+                        async_session_factory, evaluation_id
+                    ) as stop:
+                        batch = run_batch_evaluation(
+                            db=db,
+                            evaluation_id=evaluation_id,
+                            question_ids=question_ids,
+                            question_texts=question_texts,
+                            model_configs=model_configs,
+                            prompt_template=template,
+                            budget=budget,
+                            samples_per_question=samples_per_question,
+                        )
+                        await run_until_stopped(asyncio.ensure_future(batch), stop)
+                    if stop.is_set():
+                        # Pausing is refused for batch runs, so this is a
+                        # cancel: stop paying for the submitted batches too.
+                        await db.rollback()
+                        eval_obj = await db.get(Evaluation, evaluation_id)
+                        if eval_obj is not None:
+                            await cancel_provider_batches(eval_obj)
+                            await db.commit()
+                        logger.info("Batch collection cancelled")
+                        return
+                    pending = 0
+                else:
+                    if budget is not None:
+                        # Start from the recorded spend, dropping reservations
+                        # leaked by shards of an earlier attempt that died.
+                        await reset_shared_spend(
+                            db, evaluation_id, budget.spent_usd, budget.spent_tokens
+                        )
+                    pending = await plan_shards(
+                        db,
+                        evaluation_id,
+                        question_ids,
+                        model_configs,
+                        template.id,
+                        samples_per_question,
+                        priority,
+                    )
+            except Exception:
+                logger.exception(
+                    "Evaluation failed",
+                    extra={
+                        "evaluation_id": str(evaluation_id),
+                        "final_attempt": final_attempt,
+                    },
+                )
+                await db.rollback()
+                eval_obj = await db.get(Evaluation, evaluation_id)
+                if eval_obj:
+                    eval_obj.status = "created" if final_attempt else "collecting"
+                    await db.commit()
+                    get_progress_broker().publish_status(evaluation_id, eval_obj.status)
+                raise
+
+            if pending:
+                # The shard jobs collect the work items and finish the run.
+                return
+
+            # Update status to reviewing
+            eval_obj = await db.get(Evaluation, evaluation_id)
+            if eval_obj:
+                eval_obj.status = "reviewing"
+                await db.commit()
+                get_progress_broker().publish_status(evaluation_id, "reviewing")
+        finally:
+            reset_evaluation_id(tok)
+            scheduler.detach(flow)
+
+
+async def plan_shards(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    question_ids: list[str],
+    model_configs: list[ModelConfig],
+    prompt_template_id: str,
+    samples_per_question: int,
+    priority: int = 1,
+) -> int:
+    """Queue work items for cells still missing responses, and shards to run them.
+
+    Returns the number of cells queued.
+    """
+    from src.runners.litellm_runner import get_collected_samples
+
+    settings = get_settings()
+    collected = await get_collected_samples(db, evaluation_id)
+    cells = [
+        (question_id, model_config.name)
+        for question_id in question_ids
+        for model_config in model_configs
+        if any(
+            (question_id, model_config.name, sample_index) not in collected
+            for sample_index in range(samples_per_question)
+        )
+    ]
+    await plan_work_items(db, evaluation_id, cells)
+    shards = min(
+        settings.evaluation_max_shards,
+        math.ceil(len(cells) / max(1, settings.work_item_chunk_size)),
+    )
+    for _ in range(shards):
+        await enqueue_job(
+            db,
+            JobKind.EVALUATION_SHARD,
+            {
+                "evaluation_id": str(evaluation_id),
+                "model_names": [m.name for m in model_configs],
+                "prompt_template": prompt_template_id,
+            },
+            evaluation_id=evaluation_id,
+            priority=priority,
+        )
+    await db.commit()
+    logger.info(
+        "Planned evaluation shards",
+        extra={"work_items": len(cells), "shards": shards},
+    )
+    return len(cells)
+
+
+async def run_shard_job(payload: dict, job: Job) -> None:
+    """Claim and collect an evaluation's work items until none are left.
+
+    Items are claimed ``WORK_ITEM_CHUNK_SIZE`` at a time and collected with
+    the interactive runner. A shard with nothing to claim keeps polling while
+    other shards still hold items, so it can take over any whose shard died.
+    Once the evaluation is paused or cancelled the shard stops mid-chunk,
+    keeps what finished and hands the rest of its claimed items back.
+    With a budget, each chunk's projected spend is first reserved against the
+    evaluation row (see ``runners.budget``), so concurrent shards cannot
+    together overshoot it; a chunk that no longer fits exhausts the budget.
+    """
+    from src.db.database import async_session_factory
+    from src.runners.budget import (
+        RunBudget,
+        reserve_shared_spend,
+        settle_shared_spend,
+    )
+    from src.runners.litellm_runner import (
+        get_collected_samples,
+        project_spend,
+        recorded_spend_of,
+        run_evaluation,
+    )
+    from src.runners.scheduler import get_scheduler
+
+    settings = get_settings()
+    evaluation_id = UUID(payload["evaluation_id"])
+    config = load_app_config()
+    models = {m.name: m for m in config.models if m.name in payload["model_names"]}
+    template = next(
+        (t for t in config.templates if t.id == payload["prompt_template"]), None
+    )
+    if template is None:
+        logger.error(
+            "Prompt template not found",
+            extra={"prompt_template_id": payload["prompt_template"]},
+        )
+        return
+    question_texts = {q.id: q.text for q in load_all_questions()}
+    # Per attempt, so a retried shard never mistakes its old leases for live ones.
+    owner = f"shard:{job.id}:{job.attempts}"
+    scheduler = get_scheduler()
+    flow = str(evaluation_id)
+
+    async with async_session_factory() as db:
+        tok = set_evaluation_id(str(evaluation_id))
+        scheduler.attach(flow)
+        try:
+            evaluation = await db.get(Evaluation, evaluation_id)
+            if evaluation is None or evaluation.status != "running":
+                # Deleted, paused or cancelled before this shard started.
+                return
+            samples_per_question = evaluation.samples_per_question or 1
+            budget = RunBudget.for_evaluation(evaluation)
+            async with watch_for_stop(async_session_factory, evaluation_id) as stop:
+                while not stop.is_set():
+                    items = await claim_work_items(
+                        db,
+                        evaluation_id,
+                        owner,
+                        settings.work_item_chunk_size,
+                        settings.work_item_lease_seconds,
+                    )
+                    if not items:
+                        if not await count_active_work_items(db, evaluation_id):
+                            break
+                        with contextlib.suppress(TimeoutError):
+                            await asyncio.wait_for(
+                                stop.wait(), settings.job_poll_interval_seconds
+                            )
+                        continue
+
+                    runnable = [
+                        i
+                        for i in items
+                        if i.model_name in models and i.question_id in question_texts
+                    ]
+                    pairs = [(i.question_id, models[i.model_name]) for i in runnable]
+                    reserved = None
+                    if budget is not None and not budget.exhausted:
+                        reserved = project_spend(
+                            budget,
+                            pairs,
+                            question_texts,
+                            template,
+                            samples_per_question,
+                        )
+                        committed = await reserve_shared_spend(
+                            db, evaluation_id, reserved[1], reserved[0]
+                        )
+                        await db.commit()
+                        if committed is None:
+                            budget.exhausted = True
+                            reserved = None
+                            logger.warning(
+                                "Evaluation budget exhausted",
+                                extra=budget.snapshot(),
+                            )
+                        else:
+                            # Everything committed but this chunk's own calls.
+                            budget.spent_usd = committed[0] - reserved[0]
+                            budget.spent_tokens = committed[1] - reserved[1]
+                    # Pick up priority changes made while the run is in progress.
+                    await db.refresh(evaluation, ["priority"])
+                    scheduler.set_weight(flow, evaluation.priority or 1)
+                    async with keep_leases(
+                        async_session_factory,
+                        [i.id for i in items],
+                        owner,
+                        settings.work_item_lease_seconds,
+                    ):
+                        # A failed chunk keeps its reservation, so the budget
+                        # errs towards stopping early until the next run.
+                        responses = await run_evaluation(
+                            db=db,
+                            evaluation_id=evaluation_id,
+                            question_ids=[],
+                            question_texts=question_texts,
+                            model_configs=list(models.values()),
+                            prompt_template=template,
+                            budget=budget,
+                            samples_per_question=samples_per_question,
+                            pairs=pairs,
+                            stop_event=stop,
+                        )
+                    if reserved is not None:
+                        await settle_shared_spend(
+                            db, evaluation_id, reserved, recorded_spend_of(responses)
+                        )
+                        await db.commit()
+
+                    collected = await get_collected_samples(
+                        db, evaluation_id, {i.question_id for i in runnable}
+                    )
+                    succeeded = [
+                        i
+                        for i in runnable
+                        if all(
+                            (i.question_id, i.model_name, k) in collected
+                            for k in range(samples_per_question)
+                        )
+                    ]
+                    unfinished = [i for i in runnable if i not in succeeded]
+                    if stop.is_set():
+                        # Keep what finished; a resumed run claims the rest again.
+                        await settle_work_items(db, owner, succeeded, [], [], "")
+                        await release_work_items(db, owner, unfinished)
+                        break
+                    budget_spent = budget is not None and budget.exhausted
+                    await settle_work_items(
+                        db,
+                        owner,
+                        succeeded=succeeded,
+                        # Cells whose model or question was removed from config.
+                        skipped=[i for i in items if i not in runnable]
+                        + (unfinished if budget_spent else []),
+                        failed=[] if budget_spent else unfinished,
+                        error="Budget exhausted"
+                        if budget_spent
+                        else "No response collected",
+                    )
+                    logger.info(
+                        "Work item chunk finished",
+                        extra={
+                            "claimed": len(items),
+                            "succeeded": len(succeeded),
+                            "scheduler": scheduler.snapshot(flow),
+                        },
+                    )
+                stopped = stop.is_set()
+
+            if stopped:
+                logger.info(
+                    "Shard stopped",
+                    extra={
+                        "evaluation_id": str(evaluation_id),
+                        "work_items": await work_item_counts(db, evaluation_id),
+                    },
+                )
+            elif await finish_evaluation_if_done(db, evaluation_id):
+                get_progress_broker().publish_status(evaluation_id, "reviewing")
+                logger.info(
+                    "Evaluation responses collected",
+                    extra={
+                        "evaluation_id": str(evaluation_id),
+                        "work_items": await work_item_counts(db, evaluation_id),
+                    },
+                )
+        finally:
+            reset_evaluation_id(tok)
+            scheduler.detach(flow)
+
+
+async def run_evaluation_job(payload: dict, job: Job) -> None:
+    await run_evaluation_task(
+        UUID(payload["evaluation_id"]),
+        payload["model_names"],
+        payload["prompt_template"],
+        payload.get("execution_mode", "interactive"),
+        final_attempt=job.attempts >= job.max_attempts,
+    )
+
+
+async def run_import_job(payload: dict, job: Job) -> None:
+    """Import a batch of pre-collected responses queued by the import endpoint."""
+    from src.db.database import async_session_factory
+    from src.runners.import_runner import ImportBatch, import_into_evaluation
+
+    evaluation_id = UUID(payload["evaluation_id"])
+    batch = ImportBatch.model_validate(payload["batch"])
+    async with async_session_factory() as db:
+        evaluation = await db.get(Evaluation, evaluation_id)
+        if evaluation is None:
+            logger.error(
+                "Evaluation not found for import",
+                extra={"evaluation_id": str(evaluation_id)},
+            )
+            return
+        responses = await import_into_evaluation(
+            db,
+            evaluation,
+            batch,
+            questions_for(load_all_questions(), evaluation.question_ids),
+        )
+    logger.info(
+        "Imported responses",
+        extra={"evaluation_id": str(evaluation_id), "count": len(responses)},
+    )
+
+
+async def run_report_build_job(payload: dict, job: Job) -> None:
+    """Render a report and store it for download."""
+    from src.db.database import async_session_factory
+    from src.reporting.generator import build_report_file
+
+    evaluation_id = UUID(payload["evaluation_id"])
+    async with async_session_factory() as db:
+        await build_report_file(db, evaluation_id, payload["format"])
+    logger.info(
+        "Built report",
+        extra={"evaluation_id": str(evaluation_id), "format": payload["format"]},
+    )
+
+
+HANDLERS: dict[str, JobHandler] = {
+    JobKind.EVALUATION_RUN: run_evaluation_job,
+    JobKind.EVALUATION_SHARD: run_shard_job,
+    JobKind.RESPONSE_IMPORT: run_import_job,
+    JobKind.REPORT_BUILD: run_report_build_job,
+}
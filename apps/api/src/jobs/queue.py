@@ -0,0 +1,280 @@
+"""Postgres-backed job queue with leases.
+
+Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of
+workers can poll the same table without double-claiming. A claim grants a
+lease that the worker extends with heartbeats; a job whose lease expires
+(its worker crashed or was scaled down) becomes claimable again. Failed jobs
+are retried with exponential backoff until ``max_attempts`` is reached.
+
+Every state change after the claim is guarded by ``lease_owner`` so a worker
+that has lost its lease cannot overwrite the new owner's progress.
+"""
+
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from uuid import UUID, uuid4
+
+from sqlalchemy import Select, and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.db.models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 3600.0
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+class JobKind(StrEnum):
+    EVALUATION_RUN = "evaluation_run"
+    EVALUATION_SHARD = "evaluation_shard"
+    RESPONSE_IMPORT = "response_import"
+    REPORT_BUILD = "report_build"
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+def utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+def retry_delay_seconds(attempts: int, base_seconds: float) -> float:
+    """Exponential backoff before re-running a job that failed ``attempts`` times."""
+    return min(MAX_RETRY_DELAY_SECONDS, base_seconds * 2 ** max(0, attempts - 1))
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: dict,
+    evaluation_id: UUID | None = None,
+    max_attempts: int | None = None,
+    priority: int = 1,
+) -> Job:
+    """Add a queued job to the session; the caller commits.
+
+    Committing with the caller's own changes (e.g. an evaluation's status)
+    keeps the job and the state that requested it consistent.
+    """
+    job = Job(
+        id=uuid4(),
+        kind=kind,
+        payload=payload,
+        status=JobStatus.QUEUED,
+        evaluation_id=evaluation_id,
+        attempts=0,
+        max_attempts=max_attempts or get_settings().job_max_attempts,
+        priority=priority,
+        run_after=utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+async def get_active_job(
+    db: AsyncSession, evaluation_id: UUID, *kinds: str
+) -> Job | None:
+    """Return a queued or running job of one of ``kinds`` for an evaluation."""
+    result = await db.execute(
+        select(Job)
+        .where(
+            Job.evaluation_id == evaluation_id,
+            Job.kind.in_(kinds),
+            Job.status.in_(ACTIVE_STATUSES),
+        )
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def claimable_jobs_query(now: datetime, kinds: list[str] | None = None) -> Select:
+    """Highest-priority, oldest due job (or expired lease), locked for this claim."""
+    query = select(Job).where(
+        or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now),
+        )
+    )
+    if kinds:
+        query = query.where(Job.kind.in_(kinds))
+    return (
+        query.order_by(Job.priority.desc(), Job.run_after)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def set_job_priority(
+    db: AsyncSession, evaluation_id: UUID, priority: int
+) -> None:
+    """Re-prioritise an evaluation's queued and running jobs; the caller commits."""
+    await db.execute(
+        update(Job)
+        .where(Job.evaluation_id == evaluation_id, Job.status.in_(ACTIVE_STATUSES))
+        .values(priority=priority)
+    )
+
+
+async def cancel_queued_jobs(db: AsyncSession, evaluation_id: UUID) -> int:
+    """Cancel an evaluation's jobs that no worker has claimed; the caller commits.
+
+    Running jobs are left to stop themselves (see ``src.jobs.run_control``).
+    """
+    result = await db.execute(
+        update(Job)
+        .where(Job.evaluation_id == evaluation_id, Job.status == JobStatus.QUEUED)
+        .values(status=JobStatus.CANCELLED, finished_at=utcnow())
+    )
+    return getattr(result, "rowcount", 0)
+
+
+async def claim_job(
+    db: AsyncSession,
+    worker_id: str,
+    lease_seconds: float | None = None,
+    kinds: list[str] | None = None,
+) -> Job | None:
+    """Claim the next due job for ``worker_id``, or return None if idle.
+
+    Jobs whose lease expired are reclaimed; if such a job has already used
+    all of its attempts it is marked failed instead.
+    """
+    lease = lease_seconds or get_settings().job_lease_seconds
+    while True:
+        now = utcnow()
+        result = await db.execute(claimable_jobs_query(now, kinds))
+        job = result.scalar_one_or_none()
+        if job is None:
+            await db.rollback()
+            return None
+
+        if job.status == JobStatus.RUNNING:
+            logger.warning(
+                "Recovering job with expired lease",
+                extra={
+                    "job_id": str(job.id),
+                    "kind": job.kind,
+                    "previous_owner": job.lease_owner,
+                    "attempts": job.attempts,
+                },
+            )
+            if job.attempts >= job.max_attempts:
+                job.status = JobStatus.FAILED
+                job.lease_owner = None
+                job.lease_expires_at = None
+                job.finished_at = now
+                job.last_error = job.last_error or "Lease expired on final attempt"
+                await db.commit()
+                continue
+
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.lease_owner = worker_id
+        job.lease_expires_at = now + timedelta(seconds=lease)
+        job.heartbeat_at = now
+        await db.commit()
+        logger.info(
+            "Claimed job",
+            extra={"job_id": str(job.id), "kind": job.kind, "attempt": job.attempts},
+        )
+        return job
+
+
+async def _update_owned(
+    db: AsyncSession, job_id: UUID, worker_id: str, **values: object
+) -> bool:
+    result = await db.execute(
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.lease_owner == worker_id,
+            Job.status == JobStatus.RUNNING,
+        )
+        .values(**values)
+    )
+    await db.commit()
+    return getattr(result, "rowcount", 0) == 1
+
+
+async def heartbeat(
+    db: AsyncSession, job_id: UUID, worker_id: str, lease_seconds: float | None = None
+) -> bool:
+    """Extend a job's lease. Returns False if the worker no longer owns it."""
+    lease = lease_seconds or get_settings().job_lease_seconds
+    now = utcnow()
+    return await _update_owned(
+        db,
+        job_id,
+        worker_id,
+        heartbeat_at=now,
+        lease_expires_at=now + timedelta(seconds=lease),
+    )
+
+
+async def complete_job(db: AsyncSession, job_id: UUID, worker_id: str) -> bool:
+    """Mark an owned job succeeded."""
+    return await _update_owned(
+        db,
+        job_id,
+        worker_id,
+        status=JobStatus.SUCCEEDED,
+        lease_owner=None,
+        lease_expires_at=None,
+        finished_at=utcnow(),
+        last_error=None,
+    )
+
+
+async def fail_job(
+    db: AsyncSession, job: Job, worker_id: str, error: str
+) -> JobStatus | None:
+    """Record a failed attempt: requeue with backoff, or fail permanently.
+
+    Returns the job's new status, or None if the worker had lost the lease.
+    """
+    now = utcnow()
+    if job.attempts < job.max_attempts:
+        delay = retry_delay_seconds(job.attempts, get_settings().job_retry_base_seconds)
+        new_status = JobStatus.QUEUED
+        values: dict[str, object] = {"run_after": now + timedelta(seconds=delay)}
+    else:
+        new_status = JobStatus.FAILED
+        values = {"finished_at": now}
+    updated = await _update_owned(
+        db,
+        job.id,
+        worker_id,
+        status=new_status,
+        lease_owner=None,
+        lease_expires_at=None,
+        last_error=error[:4000],
+        **values,
+    )
+    if not updated:
+        return None
+    logger.warning(
+        "Job attempt failed",
+        extra={
+            "job_id": str(job.id),
+            "kind": job.kind,
+            "attempt": job.attempts,
+            "max_attempts": job.max_attempts,
+            "status": new_status,
+            "error": error,
+        },
+    )
+    return new_status
@@ -0,0 +1,113 @@
+"""Cooperative pause and cancel for running evaluations.
+
+Pausing or cancelling an evaluation is recorded as its status. Every runner
+collecting that evaluation (a shard or batch collection, in any process)
+holds a stop event: the API sets it directly for runners in its own process,
+and a watcher polling the evaluation's status sets it everywhere else within
+``RUN_CONTROL_POLL_SECONDS``. A stopped runner dispatches no further calls,
+cancels the ones in flight and commits what had already finished, so
+resuming a paused run only collects what is still missing.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from typing import TypeVar
+from uuid import UUID
+
+from sqlalchemy import select
+
+from src.config import get_settings
+from src.db.models import Evaluation
+from src.jobs.queue import SessionFactory
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STOP_STATUSES = ("paused", "cancelled")
+
+_stop_events: dict[str, set[asyncio.Event]] = defaultdict(set)
+
+
+def signal_stop(evaluation_id: UUID) -> int:
+    """Stop this process's runners of an evaluation; returns how many there were."""
+    events = _stop_events.get(str(evaluation_id), set())
+    for event in events:
+        event.set()
+    return len(events)
+
+
+async def get_status(session_factory: SessionFactory, evaluation_id: UUID) -> str:
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Evaluation.status).where(Evaluation.id == evaluation_id)
+        )
+        return result.scalar() or ""
+
+
+@contextlib.asynccontextmanager
+async def watch_for_stop(
+    session_factory: SessionFactory,
+    evaluation_id: UUID,
+    poll_seconds: float | None = None,
+) -> AsyncIterator[asyncio.Event]:
+    """Yield an event that is set once the evaluation is paused or cancelled.
+
+    Polls with its own sessions: the runner's session is busy with its calls.
+    """
+    key = str(evaluation_id)
+    interval = poll_seconds or get_settings().run_control_poll_seconds
+    event = asyncio.Event()
+
+    async def watch() -> None:
+        while not event.is_set():
+            await asyncio.sleep(interval)
+            try:
+                status = await get_status(session_factory, evaluation_id)
+            except Exception:
+                logger.exception("Run control poll failed")
+                continue
+            if status in STOP_STATUSES:
+                logger.info(
+                    "Evaluation stop requested",
+                    extra={"evaluation_id": key, "status": status},
+                )
+                event.set()
+
+    _stop_events[key].add(event)
+    task = asyncio.create_task(watch())
+    try:
+        yield event
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        _stop_events[key].discard(event)
+        if not _stop_events[key]:
+            del _stop_events[key]
+
+
+async def run_until_stopped(
+    work: asyncio.Future[T], stop_event: asyncio.Event
+) -> T | None:
+    """Await ``work``, cancelling it if ``stop_event`` is set first.
+
+    Returns its result, or None if it was stopped.
+    """
+    waiter = asyncio.ensure_future(stop_event.wait())
+    try:
+        await asyncio.wait({work, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        work.cancel()
+        raise
+    finally:
+        waiter.cancel()
+    if work.done():
+        return work.result()
+    work.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await work
+    return None
@@ -0,0 +1,389 @@
+"""Work items: an evaluation's (question, model) cells, sharded across workers.
+
+An interactive evaluation run is planned as one work item per cell that
+still needs responses, plus a number of shard jobs. Each shard job claims
+items in chunks with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of
+shards on any number of workers can drain the same evaluation without
+collecting a cell twice. Claimed items are leased like jobs: an item whose
+shard died becomes claimable again once its lease expires, and failed items
+are retried with backoff until ``max_attempts``.
+
+Shards keep polling until no item of their evaluation is queued or running,
+so a crashed shard's items are always picked up by a surviving one; the
+last shard to find nothing left moves the evaluation to "reviewing".
+Pausing a run hands a shard's unfinished items back to the queue; cancelling
+it cancels every item still queued or running.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime, timedelta
+from enum import StrEnum
+from uuid import UUID, uuid4
+
+from sqlalchemy import Select, and_, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.db.models import Evaluation, Response, WorkItem
+from src.jobs.queue import SessionFactory, retry_delay_seconds, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT; keeps each statement well under Postgres' parameter limit.
+PLAN_CHUNK_SIZE = 1000
+
+
+class WorkItemStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_STATUSES = (WorkItemStatus.QUEUED, WorkItemStatus.RUNNING)
+
+
+async def plan_work_items(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    cells: Iterable[tuple[str, str]],
+    max_attempts: int | None = None,
+) -> int:
+    """Queue a work item for each (question_id, model_name); the caller commits.
+
+    Cells that already have an item are re-queued with fresh attempts unless
+    that item is still queued or running, so planning a run again retries
+    whatever did not finish last time. Returns the number of cells planned.
+    """
+    now = utcnow()
+    attempts = max_attempts or get_settings().job_max_attempts
+    rows = [
+        {
+            "id": uuid4(),
+            "evaluation_id": evaluation_id,
+            "question_id": question_id,
+            "model_name": model_name,
+            "status": WorkItemStatus.QUEUED,
+            "attempts": 0,
+            "max_attempts": attempts,
+            "run_after": now,
+        }
+        for question_id, model_name in cells
+    ]
+    for start in range(0, len(rows), PLAN_CHUNK_SIZE):
+        stmt = insert(WorkItem).values(rows[start : start + PLAN_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_work_items_evaluation_question_model",
+            set_={
+                "status": WorkItemStatus.QUEUED,
+                "attempts": 0,
+                "max_attempts": stmt.excluded.max_attempts,
+                "run_after": stmt.excluded.run_after,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "finished_at": None,
+                "last_error": None,
+            },
+            where=WorkItem.status.notin_(ACTIVE_STATUSES),
+        )
+        await db.execute(stmt)
+    return len(rows)
+
+
+def claimable_work_items_query(
+    evaluation_id: UUID, now: datetime, limit: int
+) -> Select:
+    """Due items (or items with an expired lease), locked for this claim."""
+    return (
+        select(WorkItem)
+        .where(
+            WorkItem.evaluation_id == evaluation_id,
+            or_(
+                and_(
+                    WorkItem.status == WorkItemStatus.QUEUED,
+                    WorkItem.run_after <= now,
+                ),
+                and_(
+                    WorkItem.status == WorkItemStatus.RUNNING,
+                    WorkItem.lease_expires_at < now,
+                ),
+            ),
+        )
+        .order_by(WorkItem.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def claim_work_items(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    owner: str,
+    limit: int,
+    lease_seconds: float,
+) -> list[WorkItem]:
+    """Lease up to ``limit`` due items of an evaluation to ``owner``.
+
+    Items reclaimed from an expired lease on their final attempt are failed
+    instead of being handed out again.
+    """
+    now = utcnow()
+    result = await db.execute(claimable_work_items_query(evaluation_id, now, limit))
+    claimed: list[WorkItem] = []
+    recovered = 0
+    for item in result.scalars().all():
+        if item.status == WorkItemStatus.RUNNING:
+            recovered += 1
+            if item.attempts >= item.max_attempts:
+                item.status = WorkItemStatus.FAILED
+                item.lease_owner = None
+                item.lease_expires_at = None
+                item.finished_at = now
+                item.last_error = "Lease expired on final attempt"
+                continue
+        item.status = WorkItemStatus.RUNNING
+        item.attempts += 1
+        item.lease_owner = owner
+        item.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        claimed.append(item)
+    await db.commit()
+    if recovered:
+        logger.warning(
+            "Recovered work items with expired leases",
+            extra={"evaluation_id": str(evaluation_id), "recovered": recovered},
+        )
+    return claimed
+
+
+async def _update_owned(
+    db: AsyncSession, item_ids: list[UUID], owner: str, **values: object
+) -> int:
+    if not item_ids:
+        return 0
+    result = await db.execute(
+        update(WorkItem)
+        .where(
+            WorkItem.id.in_(item_ids),
+            WorkItem.lease_owner == owner,
+            WorkItem.status == WorkItemStatus.RUNNING,
+        )
+        .values(**values)
+    )
+    return getattr(result, "rowcount", 0)
+
+
+async def extend_leases(
+    db: AsyncSession, item_ids: list[UUID], owner: str, lease_seconds: float
+) -> int:
+    """Extend the leases ``owner`` still holds; returns how many it holds."""
+    now = utcnow()
+    extended = await _update_owned(
+        db, item_ids, owner, lease_expires_at=now + timedelta(seconds=lease_seconds)
+    )
+    await db.commit()
+    return extended
+
+
+@contextlib.asynccontextmanager
+async def keep_leases(
+    session_factory: SessionFactory,
+    item_ids: list[UUID],
+    owner: str,
+    lease_seconds: float,
+) -> AsyncIterator[None]:
+    """Extend the items' leases in the background while the block runs.
+
+    Uses its own sessions: the block's session is busy with the items' work.
+    """
+
+    async def beat() -> None:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            try:
+                async with session_factory() as db:
+                    await extend_leases(db, item_ids, owner, lease_seconds)
+            except Exception:
+                logger.exception("Work item heartbeat failed")
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+async def settle_work_items(
+    db: AsyncSession,
+    owner: str,
+    succeeded: list[WorkItem],
+    skipped: list[WorkItem],
+    failed: list[WorkItem],
+    error: str,
+) -> None:
+    """Record the outcome of a claimed chunk and release its leases.
+
+    Failed items are re-queued with backoff, or failed for good once they
+    have used all their attempts.
+    """
+    now = utcnow()
+    released = {"lease_owner": None, "lease_expires_at": None}
+    await _update_owned(
+        db,
+        [i.id for i in succeeded],
+        owner,
+        status=WorkItemStatus.SUCCEEDED,
+        finished_at=now,
+        last_error=None,
+        **released,
+    )
+    await _update_owned(
+        db,
+        [i.id for i in skipped],
+        owner,
+        status=WorkItemStatus.SKIPPED,
+        finished_at=now,
+        last_error=error,
+        **released,
+    )
+    final = [i for i in failed if i.attempts >= i.max_attempts]
+    await _update_owned(
+        db,
+        [i.id for i in final],
+        owner,
+        status=WorkItemStatus.FAILED,
+        finished_at=now,
+        last_error=error,
+        **released,
+    )
+    base = get_settings().job_retry_base_seconds
+    for item in failed:
+        if item in final:
+            continue
+        await _update_owned(
+            db,
+            [item.id],
+            owner,
+            status=WorkItemStatus.QUEUED,
+            run_after=now + timedelta(seconds=retry_delay_seconds(item.attempts, base)),
+            last_error=error,
+            **released,
+        )
+    await db.commit()
+
+
+async def release_work_items(
+    db: AsyncSession, owner: str, items: list[WorkItem]
+) -> None:
+    """Hand claimed items back to the queue without using up an attempt.
+
+    For items a paused shard stopped before collecting; resuming the run
+    claims them again.
+    """
+    await _update_owned(
+        db,
+        [i.id for i in items],
+        owner,
+        status=WorkItemStatus.QUEUED,
+        attempts=WorkItem.attempts - 1,
+        lease_owner=None,
+        lease_expires_at=None,
+    )
+    await db.commit()
+
+
+async def cancel_work_items(db: AsyncSession, evaluation_id: UUID) -> int:
+    """Cancel an evaluation's queued and running items; the caller commits."""
+    result = await db.execute(
+        update(WorkItem)
+        .where(
+            WorkItem.evaluation_id == evaluation_id,
+            WorkItem.status.in_(ACTIVE_STATUSES),
+        )
+        .values(
+            status=WorkItemStatus.CANCELLED,
+            lease_owner=None,
+            lease_expires_at=None,
+            finished_at=utcnow(),
+        )
+    )
+    return getattr(result, "rowcount", 0)
+
+
+async def count_active_work_items(db: AsyncSession, evaluation_id: UUID) -> int:
+    result = await db.execute(
+        select(func.count())
+        .select_from(WorkItem)
+        .where(
+            WorkItem.evaluation_id == evaluation_id,
+            WorkItem.status.in_(ACTIVE_STATUSES),
+        )
+    )
+    return int(result.scalar() or 0)
+
+
+async def work_item_counts(db: AsyncSession, evaluation_id: UUID) -> dict[str, int]:
+    """Number of an evaluation's work items in each status."""
+    result = await db.execute(
+        select(WorkItem.status, func.count())
+        .where(WorkItem.evaluation_id == evaluation_id)
+        .group_by(WorkItem.status)
+    )
+    return {str(status): int(count) for status, count in result.all()}
+
+
+async def count_failed_samples(
+    db: AsyncSession, evaluation_id: UUID, samples_per_question: int
+) -> int:
+    """Samples that failed work items were meant to collect but did not."""
+    collected = (
+        select(func.count(Response.id))
+        .where(
+            Response.evaluation_id == WorkItem.evaluation_id,
+            Response.question_id == WorkItem.question_id,
+            Response.model_name == WorkItem.model_name,
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            func.coalesce(
+                func.sum(func.greatest(literal(samples_per_question) - collected, 0)),
+                0,
+            )
+        ).where(
+            WorkItem.evaluation_id == evaluation_id,
+            WorkItem.status == WorkItemStatus.FAILED,
+        )
+    )
+    return int(result.scalar() or 0)
+
+
+async def finish_evaluation_if_done(db: AsyncSession, evaluation_id: UUID) -> bool:
+    """Move a running evaluation to "reviewing" once no items are left.
+
+    A single conditional UPDATE, so exactly one of several shards finishing
+    at once makes the transition.
+    """
+    active = (
+        select(WorkItem.id)
+        .where(
+            WorkItem.evaluation_id == evaluation_id,
+            WorkItem.status.in_(ACTIVE_STATUSES),
+        )
+        .exists()
+    )
+    result = await db.execute(
+        update(Evaluation)
+        .where(Evaluation.id == evaluation_id, Evaluation.status == "running", ~active)
+        .values(status="reviewing")
+    )
+    await db.commit()
+    return getattr(result, "rowcount", 0) == 1
@@ -0,0 +1,252 @@
+"""Job worker: claims queued jobs and runs them under a heartbeated lease."""
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+from uuid import uuid4
+
+from src.config import get_settings
+from src.db.models import Job
+from src.jobs.handlers import JobHandler
+from src.jobs.queue import (
+    SessionFactory,
+    claim_job,
+    complete_job,
+    fail_job,
+    heartbeat,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+
+
+class JobWorker:
+    """Poll the job queue and run up to ``concurrency`` jobs at a time.
+
+    Each running job's lease is extended every third of ``lease_seconds``;
+    if a heartbeat finds the lease was taken over, the job is cancelled here
+    so two workers never keep running it. ``stop()`` stops claiming new jobs
+    and lets ``run()`` return once the running ones finish.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        handlers: dict[str, JobHandler],
+        worker_id: str | None = None,
+        concurrency: int | None = None,
+        lease_seconds: float | None = None,
+        poll_interval_seconds: float | None = None,
+        kinds: list[str] | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = max(1, concurrency or settings.job_worker_concurrency)
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self.poll_interval_seconds = (
+            poll_interval_seconds or settings.job_poll_interval_seconds
+        )
+        self.kinds = kinds or list(handlers)
+        self.running: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._slot_free = asyncio.Event()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def stop(self) -> None:
+        """Stop claiming new jobs; ``run()`` returns once running jobs finish."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(
+            "Job worker started",
+            extra={"worker_id": self.worker_id, "concurrency": self.concurrency},
+        )
+        try:
+            while not self._stopping.is_set():
+                if len(self.running) >= self.concurrency:
+                    await self._wait(self._slot_free)
+                    continue
+                job = await self._claim()
+                if job is None:
+                    await self._wait(None)
+                    continue
+                task = asyncio.create_task(self._execute(job))
+                self.running.add(task)
+                task.add_done_callback(self._on_done)
+            if self.running:
+                logger.info(
+                    "Draining job worker",
+                    extra={"worker_id": self.worker_id, "running": len(self.running)},
+                )
+                await asyncio.gather(*self.running, return_exceptions=True)
+        finally:
+            for task in self.running:
+                task.cancel()
+            # Let cancelled jobs release their leases and sessions before the
+            # caller disposes the engine and transport underneath them.
+            await asyncio.gather(*self.running, return_exceptions=True)
+            logger.info("Job worker stopped", extra={"worker_id": self.worker_id})
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self.running.discard(task)
+        self._slot_free.set()
+
+    async def _wait(self, event: asyncio.Event | None) -> None:
+        """Sleep for a poll interval, waking early on stop (or ``event``)."""
+        waiters = [asyncio.ensure_future(self._stopping.wait())]
+        if event is not None:
+            event.clear()
+            waiters.append(asyncio.ensure_future(event.wait()))
+        try:
+            await asyncio.wait(
+                waiters,
+                timeout=self.poll_interval_seconds,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _claim(self) -> Job | None:
+        try:
+            async with self.session_factory() as db:
+                return await claim_job(
+                    db, self.worker_id, self.lease_seconds, self.kinds
+                )
+        except Exception:
+            logger.exception("Failed to claim job", extra={"worker_id": self.worker_id})
+            return None
+
+    async def _execute(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            await self._fail(job, f"No handler for job kind {job.kind!r}")
+            return
+
+        work = asyncio.create_task(handler(job.payload, job))
+        beat = asyncio.create_task(self._heartbeat(job, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            if beat.done() and not beat.cancelled() and beat.result():
+                # Cancelled by the heartbeat: the lease now belongs to another
+                # worker, which has taken over the job.
+                return
+            raise
+        except Exception as e:
+            await self._fail(job, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            beat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await beat
+
+        async with self.session_factory() as db:
+            await complete_job(db, job.id, self.worker_id)
+        logger.info("Job succeeded", extra={"job_id": str(job.id), "kind": job.kind})
+
+    async def _fail(self, job: Job, error: str) -> None:
+        async with self.session_factory() as db:
+            await fail_job(db, job, self.worker_id, error)
+
+    async def _heartbeat(self, job: Job, work: asyncio.Task) -> bool:
+        """Extend the lease until cancelled; returns True if it was lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as db:
+                    owned = await heartbeat(
+                        db, job.id, self.worker_id, self.lease_seconds
+                    )
+            except Exception:
+                # A transient DB error; the lease has slack for another try.
+                logger.exception("Job heartbeat failed", extra={"job_id": str(job.id)})
+                continue
+            if not owned:
+                logger.warning(
+                    "Lost job lease; cancelling",
+                    extra={"job_id": str(job.id), "worker_id": self.worker_id},
+                )
+                work.cancel()
+                return True
+
+
+async def run_worker(
+    concurrency: int | None = None,
+    kinds: list[str] | None = None,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+    drain_seconds: float | None = None,
+) -> None:
+    """Run a standalone worker process until SIGTERM or SIGINT.
+
+    The first signal stops claiming jobs and gives running ones
+    ``drain_seconds`` to finish; whatever is still running then (or on a
+    second signal) is cancelled, and its lease expiry hands it to another
+    worker.
+    """
+    from src.db import database
+    from src.jobs.handlers import HANDLERS
+    from src.observability.progress import start_progress_relay
+    from src.runners.transport import close_transport, get_transport
+
+    settings = get_settings()
+    database.configure_pool(
+        pool_size or settings.worker_db_pool_size,
+        settings.worker_db_max_overflow if max_overflow is None else max_overflow,
+    )
+    drain = settings.job_drain_seconds if drain_seconds is None else drain_seconds
+    # Resolve credentials and open the shared HTTP client before taking jobs.
+    get_transport()
+    worker = JobWorker(
+        database.async_session_factory,
+        HANDLERS,
+        concurrency=concurrency,
+        kinds=kinds,
+    )
+    task = asyncio.create_task(worker.run())
+    relay_task = start_progress_relay()
+    loop = asyncio.get_running_loop()
+    deadline: list[asyncio.TimerHandle] = []
+
+    def on_signal(signum: int) -> None:
+        if worker.stopping:
+            logger.warning("Second signal; cancelling running jobs")
+            task.cancel()
+            return
+        logger.info(
+            "Stopping job worker",
+            extra={"signal": signal.Signals(signum).name, "drain_seconds": drain},
+        )
+        worker.stop()
+        deadline.append(loop.call_later(drain, task.cancel))
+
+    signals = (signal.SIGTERM, signal.SIGINT)
+    for signum in signals:
+        loop.add_signal_handler(signum, on_signal, signum)
+    try:
+        await task
+    except asyncio.CancelledError:
+        logger.warning("Job worker did not drain in time; running jobs cancelled")
+    finally:
+        for handle in deadline:
+            handle.cancel()
+        for signum in signals:
+            loop.remove_signal_handler(signum)
+        if relay_task is not None:
+            relay_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await relay_task
+        await close_transport()
+        await database.engine.dispose()
@@ -13,6 +13,43 @@ logger = logging.getLogger(__name__)
 DEFAULT_CONFIG_DIR = Path(__file__).parent.parent.parent / "config"
 
 
+class StubConfig(BaseModel):
+    """Behaviour of a synthetic model served by the stub provider."""
+
+    # Median call latency; latencies are log-normal with ``latency_jitter``
+    # as sigma (0 makes every call take exactly the median).
+    latency_seconds: float = Field(default=0.05, ge=0)
+    latency_jitter: float = Field(default=0.0, ge=0)
+    completion_tokens: int = Field(default=200, ge=1)
+    # Share of calls failing with a 500.
+    error_rate: float = Field(default=0.0, ge=0, le=1)
+    # Every ``rate_limit_every`` calls, the next ``rate_limit_burst`` get a 429
+    # with a ``Retry-After`` of ``retry_after_seconds``. Bursts count calls in
+    # arrival order across all prompts, so they are not replayed per prompt.
+    rate_limit_every: int | None = Field(default=None, gt=0)
+    rate_limit_burst: int = Field(default=1, ge=1)
+    retry_after_seconds: float = Field(default=1.0, ge=0)
+    seed: int = 0
+
+
+class FallbackRoute(BaseModel):
+    """Another way to reach a model (endpoint, region or provider), used
+    while its earlier routes are degraded.
+
+    Keys left unset are inherited from the model.
+    """
+
+    name: str
+    litellm_model: str
+    provider: str | None = None
+    api_key_env: str | None = None
+    api_base: str | None = None
+    requests_per_minute: int | None = Field(default=None, gt=0)
+    tokens_per_minute: int | None = Field(default=None, gt=0)
+    timeout_seconds: float | None = Field(default=None, gt=0)
+    stub: StubConfig | None = None
+
+
 class ModelConfig(BaseModel):
     """Configuration for a single LLM model."""
 
@@ -20,11 +57,59 @@ class ModelConfig(BaseModel):
     provider: str
     litellm_model: str
     api_key_env: str
+    requests_per_minute: int | None = Field(default=None, gt=0)
+    tokens_per_minute: int | None = Field(default=None, gt=0)
+    stream: bool = False
+    stream_max_seconds: float | None = Field(default=None, gt=0)
+    timeout_seconds: float | None = Field(default=None, gt=0)
+    hedge: bool = False
+    hedge_quantile: float = Field(default=0.95, gt=0, le=1)
+    hedge_min_samples: int = Field(default=20, ge=1)
+    supports_n: bool | None = None
+    # OpenAI-compatible endpoint to call instead of the provider's default.
+    api_base: str | None = None
+    # Synthetic behaviour for ``stub/`` models (see runners.stub_provider).
+    stub: StubConfig | None = None
+    # Routes tried in order once this one's circuit opens. A call slower than
+    # ``latency_slo_seconds`` counts as a failure towards the circuit of any
+    # route that has a fallback after it.
+    fallbacks: list[FallbackRoute] = Field(default_factory=list)
+    latency_slo_seconds: float | None = Field(default=None, gt=0)
+
+    def routes(self) -> list["ModelConfig"]:
+        """This model's routes in failover order, each as its own config.
+
+        The primary route keeps the model's name; a fallback is named
+        ``<model>@<route>``, so it gets its own circuit breaker, quotas and
+        latency history. The last route has no latency SLO, as there is
+        nothing left to fail over to.
+        """
+        routes = [self.model_copy(update={"fallbacks": []})] if self.fallbacks else []
+        for route in self.fallbacks:
+            update = {key: getattr(route, key) for key in route.model_fields_set}
+            update.update(name=f"{self.name}@{route.name}", fallbacks=[])
+            routes.append(self.model_copy(update=update))
+        if not routes:
+            routes = [self]
+        if routes[-1].latency_slo_seconds is not None:
+            routes[-1] = routes[-1].model_copy(update={"latency_slo_seconds": None})
+        return routes
+
+
+class ProviderConfig(BaseModel):
+    """Quota limits shared by every model served by one provider."""
+
+    name: str
+    requests_per_minute: int | None = Field(default=None, gt=0)
+    tokens_per_minute: int | None = Field(default=None, gt=0)
+    # Calls in flight at once, shared fairly across running evaluations.
+    max_concurrency: int | None = Field(default=None, gt=0)
 
 
 class ModelsConfig(BaseModel):
     """Top-level models configuration."""
 
+    providers: list[ProviderConfig] = Field(default_factory=list)
     models: list[ModelConfig]
 
 
@@ -68,6 +153,7 @@ class AppConfig(BaseModel):
     """Aggregated application configuration from all YAML files."""
 
     models: list[ModelConfig] = Field(default_factory=list)
+    providers: list[ProviderConfig] = Field(default_factory=list)
     perspectives: list[PerspectiveConfig] = Field(default_factory=list)
     dimensions: list[ScoreDimension] = Field(default_factory=list)
     templates: list[PromptTemplate] = Field(default_factory=list)
@@ -88,6 +174,7 @@ def load_app_config(config_dir: Path = DEFAULT_CONFIG_DIR) -> AppConfig:
         data = _load_yaml(models_path)
         parsed = ModelsConfig.model_validate(data)
         config.models = parsed.models
+        config.providers = parsed.providers
 
     perspectives_path = config_dir / "perspectives.yaml"
     if perspectives_path.exists():
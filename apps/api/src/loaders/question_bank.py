@@ -0,0 +1,106 @@
+"""Question bank indexed for selecting evaluation subsets."""
+
+import random
+from collections.abc import Iterable, Sequence
+
+from src.models.evaluation import QuestionSelector
+from src.models.question import Question
+
+
+class QuestionSelectionError(ValueError):
+    """A question selector names unknown questions or matches none."""
+
+
+class QuestionBank:
+    """Questions indexed by id and by every attribute a selector filters on."""
+
+    def __init__(self, questions: Iterable[Question]) -> None:
+        self.questions = list(questions)
+        self.by_id = {q.id: q for q in self.questions}
+        self._order = {q.id: i for i, q in enumerate(self.questions)}
+        self._index: dict[str, dict[str, set[str]]] = {
+            "type": {},
+            "difficulty": {},
+            "tag": {},
+            "denominational_sensitivity": {},
+        }
+        for q in self.questions:
+            self._add("type", q.type.value, q.id)
+            self._add("difficulty", q.difficulty, q.id)
+            self._add("denominational_sensitivity", q.denominational_sensitivity, q.id)
+            for tag in q.tags:
+                self._add("tag", tag, q.id)
+
+    def _add(self, attribute: str, value: str, question_id: str) -> None:
+        self._index[attribute].setdefault(value, set()).add(question_id)
+
+    def _matching(self, attribute: str, values: Iterable[str]) -> set[str]:
+        index = self._index[attribute]
+        return set().union(*(index.get(v, set()) for v in values))
+
+    def select(self, selector: QuestionSelector) -> list[Question]:
+        """Resolve a selector to its questions, in bank order.
+
+        Raises QuestionSelectionError if it names unknown ids or matches
+        nothing.
+        """
+        unknown = sorted(set(selector.ids) - set(self.by_id))
+        if unknown:
+            raise QuestionSelectionError(f"Unknown question ids: {', '.join(unknown)}")
+        matched = set(selector.ids) if selector.ids else set(self.by_id)
+        for attribute, values in (
+            ("type", [t.value for t in selector.types]),
+            ("difficulty", selector.difficulties),
+            ("tag", selector.tags),
+            ("denominational_sensitivity", selector.denominational_sensitivity),
+        ):
+            if values:
+                matched &= self._matching(attribute, values)
+        if not matched:
+            raise QuestionSelectionError("Question selector matches no questions")
+        selected = sorted(matched, key=self._order.__getitem__)
+        if selector.sample_size is not None and selector.sample_size < len(selected):
+            selected = self._stratified_sample(selected, selector)
+        return [self.by_id[i] for i in selected]
+
+    def _stratified_sample(
+        self, question_ids: list[str], selector: QuestionSelector
+    ) -> list[str]:
+        """Draw ``sample_size`` ids, each stratum getting its share.
+
+        Shares are rounded by largest remainder, so they add up exactly.
+        """
+        size = selector.sample_size or 0
+        strata: dict[tuple[str, ...], list[str]] = {}
+        for question_id in question_ids:
+            q = self.by_id[question_id]
+            key = tuple(
+                str(getattr(q, attribute)) for attribute in selector.stratify_by
+            )
+            strata.setdefault(key, []).append(question_id)
+
+        quotas = {
+            key: size * len(ids) / len(question_ids) for key, ids in strata.items()
+        }
+        counts = {key: int(quota) for key, quota in quotas.items()}
+        by_remainder = sorted(strata, key=lambda key: (counts[key] - quotas[key], key))
+        for key in by_remainder[: size - sum(counts.values())]:
+            counts[key] += 1
+
+        rng = random.Random(selector.seed)  # noqa: S311 - sampling, not crypto
+        chosen = [
+            question_id
+            for key in sorted(strata)
+            for question_id in rng.sample(strata[key], counts[key])
+        ]
+        return sorted(chosen, key=self._order.__getitem__)
+
+
+def questions_for(
+    questions: Sequence[Question], question_ids: Iterable[str] | None
+) -> list[Question]:
+    """The questions an evaluation covers: its persisted subset, or all."""
+    if question_ids is None:
+        return list(questions)
+    selected = set(question_ids)
+    return [q for q in questions if q.id in selected]
@@ -1,5 +1,7 @@
 """FastAPI application entry point."""
 
+import asyncio
+import contextlib
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -11,6 +13,7 @@ from src.api.access import router as access_router
 from src.api.config_routes import router as config_router
 from src.api.evaluations import router as evaluations_router
 from src.api.health import router as health_router
+from src.api.jobs import router as jobs_router
 from src.api.questions import router as questions_router
 from src.api.reports import router as reports_router
 from src.api.responses import router as responses_router
@@ -33,7 +36,38 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.info("NextAuth.js JWT authentication enabled")
     else:
         logger.warning("NEXTAUTH_SECRET not configured - auth endpoints will fail")
-    yield
+
+    from src.observability.progress import start_progress_relay
+
+    relay_task = start_progress_relay()
+    worker = worker_task = None
+    if settings.job_worker_embedded:
+        from src.db.database import async_session_factory
+        from src.jobs.handlers import HANDLERS
+        from src.jobs.worker import JobWorker
+        from src.runners.transport import get_transport
+
+        get_transport()
+        worker = JobWorker(async_session_factory, HANDLERS)
+        worker_task = asyncio.create_task(worker.run())
+    try:
+        yield
+    finally:
+        if worker is not None and worker_task is not None:
+            # Unfinished jobs keep their lease until it expires and are then
+            # picked up again, so a slow drain is cut short rather than awaited.
+            worker.stop()
+            try:
+                await asyncio.wait_for(worker_task, settings.job_drain_seconds)
+            except TimeoutError:
+                logger.warning("Embedded job worker did not drain in time")
+            from src.runners.transport import close_transport
+
+            await close_transport()
+        if relay_task is not None:
+            relay_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await relay_task
 
 
 app = FastAPI(
@@ -68,3 +102,4 @@ app.include_router(reviews_router)
 app.include_router(reports_router)
 app.include_router(config_router)
 app.include_router(access_router)
+app.include_router(jobs_router)
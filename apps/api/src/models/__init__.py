@@ -2,17 +2,23 @@
 
 from src.models.evaluation import (
     EvaluationCreate,
+    EvaluationPriorityUpdate,
     EvaluationResponse,
     EvaluationStatus,
+    ExecutionMode,
 )
+from src.models.job import JobResponse
 from src.models.question import Question, QuestionFile, QuestionType
 from src.models.response import LLMResponse, LLMResponseCreate, ResponseSource
 from src.models.score import ReviewSubmission, Score, ScoreDimension
 
 __all__ = [
     "EvaluationCreate",
+    "EvaluationPriorityUpdate",
     "EvaluationResponse",
     "EvaluationStatus",
+    "ExecutionMode",
+    "JobResponse",
     "LLMResponse",
     "LLMResponseCreate",
     "Question",
@@ -2,15 +2,20 @@
 
 from datetime import datetime
 from enum import StrEnum
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from src.models.question import QuestionType
+
 
 class EvaluationStatus(StrEnum):
     CREATED = "created"
     RUNNING = "running"
     COLLECTING = "collecting"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
     REVIEWING = "reviewing"
     COMPLETE = "complete"
 
@@ -20,6 +25,32 @@ class ReviewMode(StrEnum):
     LABELED = "labeled"
 
 
+class ExecutionMode(StrEnum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class QuestionSelector(BaseModel):
+    """Which questions of the bank an evaluation covers.
+
+    Each given filter must match (an empty one matches everything); tags match
+    if a question has any of them. ``sample_size`` then draws that many of the
+    matches at random, allocated across the ``stratify_by`` groups in
+    proportion to their size, reproducibly for a given ``seed``.
+    """
+
+    ids: list[str] = Field(default_factory=list)
+    types: list[QuestionType] = Field(default_factory=list)
+    difficulties: list[str] = Field(default_factory=list)
+    tags: list[str] = Field(default_factory=list)
+    denominational_sensitivity: list[str] = Field(default_factory=list)
+    sample_size: int | None = Field(default=None, gt=0)
+    stratify_by: list[Literal["type", "difficulty", "denominational_sensitivity"]] = (
+        Field(default_factory=lambda: ["type", "difficulty"])
+    )
+    seed: int = 0
+
+
 class EvaluationCreate(BaseModel):
     """Request schema for creating an evaluation run."""
 
@@ -29,6 +60,18 @@ class EvaluationCreate(BaseModel):
     model_list: list[str] = Field(min_length=1)
     prompt_template: str = Field(default="default")
     review_mode: ReviewMode = ReviewMode.BLIND
+    execution_mode: ExecutionMode = ExecutionMode.INTERACTIVE
+    budget_usd: float | None = Field(default=None, gt=0)
+    budget_tokens: int | None = Field(default=None, gt=0)
+    samples_per_question: int = Field(default=1, ge=1, le=20)
+    # Omitted: every question in the bank.
+    question_selector: QuestionSelector | None = None
+
+
+class EvaluationPriorityUpdate(BaseModel):
+    """Request schema for changing an evaluation's scheduling priority."""
+
+    priority: int = Field(ge=1, le=10)
 
 
 class EvaluationResponse(BaseModel):
@@ -42,6 +85,13 @@ class EvaluationResponse(BaseModel):
     model_list: list[str]
     prompt_template: str
     review_mode: ReviewMode
+    execution_mode: ExecutionMode
+    budget_usd: float | None = None
+    budget_tokens: int | None = None
+    samples_per_question: int = 1
+    priority: int = 1
+    question_selector: dict | None = None
+    question_ids: list[str] | None = None
     created_by: UUID
     created_at: datetime
     updated_at: datetime
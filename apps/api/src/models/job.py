@@ -0,0 +1,24 @@
+"""Pydantic schemas for background jobs."""
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    """Response schema for a queued background job."""
+
+    id: UUID
+    kind: str
+    status: str
+    evaluation_id: UUID | None = None
+    attempts: int
+    max_attempts: int
+    last_error: str | None = None
+    run_after: datetime
+    finished_at: datetime | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
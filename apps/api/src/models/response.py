@@ -17,6 +17,7 @@ class LLMResponseCreate(BaseModel):
 
     question_id: str
     model_name: str
+    sample_index: int = Field(default=0, ge=0)
     response_text: str
     source: ResponseSource = ResponseSource.API
     raw_metadata: dict = Field(default_factory=dict)
@@ -29,6 +30,7 @@ class LLMResponse(BaseModel):
     evaluation_id: UUID
     question_id: str
     model_name: str
+    sample_index: int = 0
     response_text: str
     source: ResponseSource
     raw_metadata: dict
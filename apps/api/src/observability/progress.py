@@ -0,0 +1,272 @@
+"""Live collection progress for running evaluations.
+
+Runners publish a ``ProgressEvent`` for every finished model call, and the
+run's status changes are published too. Subscribers in the same process
+(the SSE endpoint) receive them from an in-process broker. With
+``PROGRESS_NOTIFY`` on, a relay forwards each process's events over Postgres
+NOTIFY in small batches and republishes the events of other processes it
+LISTENs to, so a stream served by one API instance sees calls made by shards
+on any worker.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any
+from uuid import UUID, uuid4
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_CHANNEL = "evaluation_progress"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_PAYLOAD_LIMIT = 7500
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Window for the responses-per-minute figures.
+THROUGHPUT_WINDOW_SECONDS = 300.0
+
+
+@dataclass
+class ProgressEvent:
+    """A finished model call ("call") or a run status change ("status")."""
+
+    evaluation_id: str
+    kind: str = "call"
+    model: str | None = None
+    samples: int = 1
+    succeeded: bool = True
+    cost_usd: float = 0.0
+    status: str | None = None
+    at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ProgressEvent":
+        return cls(**data)
+
+
+class ProgressBroker:
+    """In-process pub/sub of progress events, keyed by evaluation id."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self.origin = uuid4().hex
+        # Set by the NOTIFY relay; events are kept for it only while it runs.
+        self.forwarding = False
+        self._subscribers: dict[str, set[asyncio.Queue[ProgressEvent]]] = defaultdict(
+            set
+        )
+        self._outbox: list[ProgressEvent] = []
+
+    def publish(self, event: ProgressEvent, forward: bool = True) -> None:
+        """Deliver to local subscribers and queue for other processes.
+
+        A subscriber that has fallen ``queue_size`` events behind loses its
+        oldest events rather than slowing the runner down.
+        """
+        for queue in self._subscribers.get(event.evaluation_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        if forward and self.forwarding:
+            self._outbox.append(event)
+
+    def publish_status(self, evaluation_id: UUID | str, status: str) -> None:
+        self.publish(
+            ProgressEvent(
+                evaluation_id=str(evaluation_id), kind="status", status=status
+            )
+        )
+
+    @contextlib.contextmanager
+    def subscribe(
+        self, evaluation_id: UUID | str
+    ) -> Iterator[asyncio.Queue[ProgressEvent]]:
+        key = str(evaluation_id)
+        queue: asyncio.Queue[ProgressEvent] = asyncio.Queue(self.queue_size)
+        self._subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[key].discard(queue)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+    def drain_outbox(self) -> list[ProgressEvent]:
+        events, self._outbox = self._outbox, []
+        return events
+
+
+@lru_cache
+def get_progress_broker() -> ProgressBroker:
+    """Get the process-wide progress broker."""
+    return ProgressBroker()
+
+
+def notify_payloads(origin: str, events: list[ProgressEvent]) -> list[str]:
+    """Pack events into as few NOTIFY payloads as fit the size limit."""
+    payloads: list[str] = []
+    batch: list[dict[str, Any]] = []
+    size = 0
+    for event in events:
+        item = asdict(event)
+        item_size = len(json.dumps(item)) + 1
+        if batch and size + item_size > NOTIFY_PAYLOAD_LIMIT:
+            payloads.append(json.dumps({"origin": origin, "events": batch}))
+            batch, size = [], 0
+        batch.append(item)
+        size += item_size
+    if batch:
+        payloads.append(json.dumps({"origin": origin, "events": batch}))
+    return payloads
+
+
+class NotifyRelay:
+    """Fan progress events out across processes with LISTEN/NOTIFY.
+
+    Holds one dedicated connection, used both to LISTEN and to send this
+    process's events every ``flush_seconds``; reconnects after errors.
+    """
+
+    def __init__(self, broker: ProgressBroker, flush_seconds: float) -> None:
+        self.broker = broker
+        self.flush_seconds = flush_seconds
+
+    def on_notify(
+        self, _connection: Any, _pid: int, _channel: str, payload: str
+    ) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed progress notification")
+            return
+        if message.get("origin") == self.broker.origin:
+            return
+        for item in message.get("events", []):
+            self.broker.publish(ProgressEvent.from_dict(item), forward=False)
+
+    async def flush(self, connection: Any) -> int:
+        events = self.broker.drain_outbox()
+        for payload in notify_payloads(self.broker.origin, events):
+            await connection.execute(
+                "SELECT pg_notify($1, $2)", PROGRESS_CHANNEL, payload
+            )
+        return len(events)
+
+    async def run(self) -> None:
+        from src.db import database
+
+        self.broker.forwarding = True
+        try:
+            while True:
+                try:
+                    async with database.engine.connect() as conn:
+                        raw = await conn.get_raw_connection()
+                        driver = raw.driver_connection
+                        await driver.add_listener(PROGRESS_CHANNEL, self.on_notify)
+                        while True:
+                            await asyncio.sleep(self.flush_seconds)
+                            await self.flush(driver)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Progress relay failed; reconnecting")
+                    self.broker.drain_outbox()
+                    await asyncio.sleep(max(1.0, self.flush_seconds))
+        finally:
+            self.broker.forwarding = False
+
+
+def start_progress_relay() -> asyncio.Task | None:
+    """Start the NOTIFY relay for this process if ``PROGRESS_NOTIFY`` is on."""
+    settings = get_settings()
+    if not settings.progress_notify:
+        return None
+    relay = NotifyRelay(get_progress_broker(), settings.progress_flush_seconds)
+    return asyncio.create_task(relay.run())
+
+
+@dataclass
+class _Counts:
+    completed: int = 0
+    errors: int = 0
+    cost_usd: float = 0.0
+    recent: deque[tuple[float, int]] = field(default_factory=deque)
+
+    def add(self, event: ProgressEvent) -> None:
+        if event.succeeded:
+            self.completed += event.samples
+            self.recent.append((event.at, event.samples))
+        else:
+            self.errors += event.samples
+        self.cost_usd += event.cost_usd
+
+    def per_minute(self, now: float, since: float) -> float:
+        while self.recent and self.recent[0][0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self.recent.popleft()
+        window = min(THROUGHPUT_WINDOW_SECONDS, max(1.0, now - since))
+        return round(sum(n for _, n in self.recent) * 60.0 / window, 2)
+
+
+class RunProgress:
+    """Collection progress of one evaluation, kept current from its events.
+
+    Starts from what is already recorded; throughput (and so the ETA) only
+    counts calls seen since the stream started. Like ``completed``,
+    ``errors`` counts samples: those a failed call was meant to collect.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        by_model: dict[str, tuple[int, float]] | None = None,
+        errors: int = 0,
+    ) -> None:
+        self.total = total
+        self.started = time.time()
+        self.overall = _Counts(errors=errors)
+        self.models: dict[str, _Counts] = defaultdict(_Counts)
+        for model, (completed, cost_usd) in (by_model or {}).items():
+            self.models[model] = _Counts(completed=completed, cost_usd=cost_usd)
+            self.overall.completed += completed
+            self.overall.cost_usd += cost_usd
+
+    def apply(self, event: ProgressEvent) -> None:
+        if event.kind != "call":
+            return
+        self.overall.add(event)
+        if event.model:
+            self.models[event.model].add(event)
+
+    def snapshot(self, now: float | None = None) -> dict[str, Any]:
+        now = time.time() if now is None else now
+        rate = self.overall.per_minute(now, self.started)
+        remaining = max(0, self.total - self.overall.completed)
+        return {
+            "completed": self.overall.completed,
+            "total": self.total,
+            "errors": self.overall.errors,
+            "cost_usd": round(self.overall.cost_usd, 6),
+            "responses_per_minute": rate,
+            "eta_seconds": round(remaining * 60.0 / rate, 1) if rate else None,
+            "models": {
+                name: {
+                    "completed": counts.completed,
+                    "errors": counts.errors,
+                    "cost_usd": round(counts.cost_usd, 6),
+                    "responses_per_minute": counts.per_minute(now, self.started),
+                }
+                for name, counts in sorted(self.models.items())
+            },
+        }
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,12 +1,16 @@
 """Report generation from aggregated scores."""
 
+import json
 import logging
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.db.models import ReportFile
 from src.db.repository import get_evaluation
 from src.scoring.aggregator import aggregate_scores
 from src.scoring.engine import identify_strengths_weaknesses, rank_models
@@ -15,6 +19,13 @@ logger = logging.getLogger(__name__)
 
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 
+REPORT_EXTENSIONS = {"json": "json", "html": "html", "markdown": "md"}
+REPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "html": "text/html",
+    "markdown": "text/markdown",
+}
+
 
 def _get_jinja_env() -> Environment:
     return Environment(
@@ -70,3 +81,55 @@ async def generate_html_report(
     env = _get_jinja_env()
     template = env.get_template("report.html.j2")
     return template.render(**data)
+
+
+async def build_report_file(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    format: str,
+) -> ReportFile:
+    """Render a report and store it for ``get_report_file``.
+
+    Reports live in the database rather than on the worker's disk, so any
+    API process can serve them. Rebuilding a format replaces its report.
+    """
+    if format == "html":
+        content = await generate_html_report(db, evaluation_id)
+    elif format == "markdown":
+        content = await generate_markdown_report(db, evaluation_id)
+    else:
+        data = await generate_report_data(db, evaluation_id)
+        content = json.dumps(data, indent=2, default=str)
+
+    result = await db.execute(
+        insert(ReportFile)
+        .values(
+            id=uuid4(),
+            evaluation_id=evaluation_id,
+            format=format,
+            content=content,
+        )
+        .on_conflict_do_update(
+            constraint="uq_report_files_evaluation_format",
+            set_={"content": content, "updated_at": func.now()},
+        )
+        .returning(ReportFile)
+    )
+    report = result.scalar_one()
+    await db.commit()
+    return report
+
+
+async def get_report_file(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    format: str,
+) -> ReportFile | None:
+    """Load a report built in the background, if there is one."""
+    result = await db.execute(
+        select(ReportFile).where(
+            ReportFile.evaluation_id == evaluation_id,
+            ReportFile.format == format,
+        )
+    )
+    return result.scalar_one_or_none()
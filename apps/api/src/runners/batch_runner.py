@@ -0,0 +1,823 @@
+"""Batch-API runner for bulk, asynchronous response collection.
+
+Instead of one interactive call per (question, model) pair, the whole matrix
+is submitted through the providers' asynchronous batch endpoints (OpenAI Batch,
+Anthropic Message Batches), polled until complete and ingested in bulk. Batch
+calls are billed at roughly half price and do not count against interactive
+rate limits. ``LocalBatchBackend`` is a file-based stand-in that lets the full
+flow run offline.
+
+Submitted batches are recorded on the evaluation until their results are
+ingested, so a retried or re-leased run resumes polling them rather than
+paying for the matrix twice, and cancelling the evaluation cancels them.
+A batch that ends early (failed, expired or cancelled) is ingested like a
+completed one; the requests it never processed are resubmitted in a new
+batch, up to ``BATCH_REQUEST_ATTEMPTS`` submissions per request.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+from uuid import UUID, uuid4
+
+import httpx
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.db.models import Evaluation
+from src.db.models import Response as ResponseModel
+from src.loaders.config_loader import ModelConfig, PromptTemplate, load_app_config
+from src.observability.context import reset_evaluation_id, set_evaluation_id
+from src.observability.progress import ProgressEvent, get_progress_broker
+from src.runners.budget import Reservation, RunBudget
+from src.runners.litellm_runner import (
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_TEMPERATURE,
+    estimate_cost,
+    get_collected_samples,
+    render_prompt,
+    reserve_call,
+    run_evaluation,
+)
+from src.runners.transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+BATCH_DISCOUNT = 0.5
+BATCH_REQUEST_ATTEMPTS = 3
+
+
+class BatchRequest(BaseModel):
+    """One (question, model, sample) completion request inside a batch."""
+
+    custom_id: str
+    question_id: str
+    model_name: str
+    sample_index: int = 0
+    model: str
+    prompt: str
+    temperature: float = DEFAULT_TEMPERATURE
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    # How many batches this cell has been submitted in.
+    attempt: int = 1
+
+
+class BatchResult(BaseModel):
+    """The outcome of one request in a completed batch."""
+
+    custom_id: str
+    response_text: str | None = None
+    error: str | None = None
+    metadata: dict = Field(default_factory=dict)
+    # The batch ended (expired or cancelled) before the request was run.
+    unprocessed: bool = False
+
+
+class BatchBackend(Protocol):
+    """A provider batch endpoint: submit, poll for completion, fetch results."""
+
+    name: str
+
+    async def submit(self, requests: list[BatchRequest]) -> str: ...
+
+    async def is_complete(self, batch_id: str) -> bool:
+        """Whether the batch has ended, successfully or not."""
+        ...
+
+    async def fetch_results(self, batch_id: str) -> list[BatchResult]: ...
+
+    async def cancel(self, batch_id: str) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+def _provider_model(model_config: ModelConfig) -> str:
+    """Strip a LiteLLM ``provider/`` prefix to get the provider's model id."""
+    prefix = f"{model_config.provider}/"
+    model = model_config.litellm_model
+    return model[len(prefix) :] if model.startswith(prefix) else model
+
+
+def build_openai_batch_line(request: BatchRequest) -> dict:
+    """Build one OpenAI Batch API JSONL line for a chat completion."""
+    return {
+        "custom_id": request.custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": request.model,
+            "messages": [{"role": "user", "content": request.prompt}],
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+        },
+    }
+
+
+def parse_openai_batch_line(line: dict) -> BatchResult:
+    """Parse one line of an OpenAI Batch API output file."""
+    custom_id = line["custom_id"]
+    error = line.get("error")
+    if error:
+        code = error.get("code") if isinstance(error, dict) else None
+        return BatchResult(
+            custom_id=custom_id,
+            error=str(error),
+            unprocessed=code in ("batch_expired", "batch_cancelled"),
+        )
+
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code", 200) != 200:
+        return BatchResult(
+            custom_id=custom_id,
+            error=str(body.get("error") or response.get("status_code")),
+        )
+
+    choices = body.get("choices") or [{}]
+    usage = body.get("usage") or {}
+    return BatchResult(
+        custom_id=custom_id,
+        response_text=(choices[0].get("message") or {}).get("content") or "",
+        metadata={
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "total_tokens": usage.get("total_tokens"),
+        },
+    )
+
+
+def build_anthropic_batch_request(request: BatchRequest) -> dict:
+    """Build one entry of an Anthropic Message Batches ``requests`` list."""
+    return {
+        "custom_id": request.custom_id,
+        "params": {
+            "model": request.model,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            "messages": [{"role": "user", "content": request.prompt}],
+        },
+    }
+
+
+def parse_anthropic_batch_line(line: dict) -> BatchResult:
+    """Parse one line of an Anthropic Message Batches results file."""
+    custom_id = line["custom_id"]
+    result = line.get("result") or {}
+    if result.get("type") != "succeeded":
+        return BatchResult(
+            custom_id=custom_id,
+            error=str(result.get("error") or result.get("type")),
+            unprocessed=result.get("type") in ("canceled", "expired"),
+        )
+
+    message = result.get("message") or {}
+    text = "".join(
+        block.get("text", "")
+        for block in message.get("content") or []
+        if block.get("type") == "text"
+    )
+    usage = message.get("usage") or {}
+    input_tokens = usage.get("input_tokens")
+    output_tokens = usage.get("output_tokens")
+    total = (
+        input_tokens + output_tokens
+        if input_tokens is not None and output_tokens is not None
+        else None
+    )
+    return BatchResult(
+        custom_id=custom_id,
+        response_text=text,
+        metadata={
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": total,
+        },
+    )
+
+
+def _parse_jsonl(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API: upload a JSONL file, create a batch, download output."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.openai.com/v1",
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=120.0,
+        )
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        payload = "\n".join(
+            json.dumps(build_openai_batch_line(r), ensure_ascii=False) for r in requests
+        )
+        upload = await self._client.post(
+            "/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", payload.encode("utf-8"))},
+        )
+        upload.raise_for_status()
+        created = await self._client.post(
+            "/batches",
+            json={
+                "input_file_id": upload.json()["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+        )
+        created.raise_for_status()
+        return created.json()["id"]
+
+    async def _batch(self, batch_id: str) -> dict:
+        resp = await self._client.get(f"/batches/{batch_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    async def is_complete(self, batch_id: str) -> bool:
+        status = (await self._batch(batch_id))["status"]
+        if status in ("failed", "expired", "cancelled"):
+            logger.warning(
+                "Provider batch ended early",
+                extra={"provider": self.name, "batch_id": batch_id, "status": status},
+            )
+        return status in ("completed", "failed", "expired", "cancelled")
+
+    async def fetch_results(self, batch_id: str) -> list[BatchResult]:
+        batch = await self._batch(batch_id)
+        results: list[BatchResult] = []
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            content = await self._client.get(f"/files/{file_id}/content")
+            content.raise_for_status()
+            results.extend(
+                parse_openai_batch_line(line) for line in _parse_jsonl(content.text)
+            )
+        return results
+
+    async def cancel(self, batch_id: str) -> None:
+        resp = await self._client.post(f"/batches/{batch_id}/cancel")
+        resp.raise_for_status()
+
+
+class AnthropicBatchBackend:
+    """Anthropic Message Batches API."""
+
+    name = "anthropic"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.anthropic.com/v1",
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            base_url=base_url,
+            headers={"x-api-key": api_key, "anthropic-version": "2023-06-01"},
+            timeout=120.0,
+        )
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        resp = await self._client.post(
+            "/messages/batches",
+            json={"requests": [build_anthropic_batch_request(r) for r in requests]},
+        )
+        resp.raise_for_status()
+        return resp.json()["id"]
+
+    async def is_complete(self, batch_id: str) -> bool:
+        resp = await self._client.get(f"/messages/batches/{batch_id}")
+        resp.raise_for_status()
+        return resp.json()["processing_status"] == "ended"
+
+    async def fetch_results(self, batch_id: str) -> list[BatchResult]:
+        resp = await self._client.get(f"/messages/batches/{batch_id}/results")
+        resp.raise_for_status()
+        return [parse_anthropic_batch_line(line) for line in _parse_jsonl(resp.text)]
+
+    async def cancel(self, batch_id: str) -> None:
+        resp = await self._client.post(f"/messages/batches/{batch_id}/cancel")
+        resp.raise_for_status()
+
+
+def _echo_responder(request: BatchRequest) -> str:
+    return f"[{request.model}] {request.prompt}"
+
+
+class LocalBatchBackend:
+    """File-based stand-in for a provider batch endpoint.
+
+    ``submit`` writes ``<dir>/<batch_id>/input.jsonl`` in OpenAI batch format.
+    The batch completes once ``output.jsonl`` exists next to it; if a
+    ``responder`` is configured the backend writes that file itself on the
+    first poll, otherwise an external process is expected to. Output lines use
+    the OpenAI batch output format so the same parsing path is exercised.
+    A cancelled batch gets a ``cancelled`` marker file and ends without
+    output unless it already had some.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: Path,
+        responder: Callable[[BatchRequest], str] | None = _echo_responder,
+    ) -> None:
+        self.directory = directory
+        self.responder = responder
+
+    def _batch_dir(self, batch_id: str) -> Path:
+        return self.directory / batch_id
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"batch_{uuid4().hex}"
+        batch_dir = self._batch_dir(batch_id)
+        lines = [json.dumps(build_openai_batch_line(r)) for r in requests]
+        await asyncio.to_thread(batch_dir.mkdir, parents=True, exist_ok=True)
+        await asyncio.to_thread(
+            (batch_dir / "input.jsonl").write_text, "\n".join(lines) + "\n"
+        )
+        return batch_id
+
+    def _respond(self, batch_id: str) -> None:
+        assert self.responder is not None
+        batch_dir = self._batch_dir(batch_id)
+        output = []
+        for line in _parse_jsonl((batch_dir / "input.jsonl").read_text()):
+            body = line["body"]
+            request = BatchRequest(
+                custom_id=line["custom_id"],
+                question_id="",
+                model_name="",
+                model=body["model"],
+                prompt=body["messages"][0]["content"],
+            )
+            text = self.responder(request)
+            output.append(
+                {
+                    "custom_id": line["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"content": text}}],
+                            "usage": {
+                                "prompt_tokens": len(request.prompt.split()),
+                                "completion_tokens": len(text.split()),
+                                "total_tokens": len(request.prompt.split())
+                                + len(text.split()),
+                            },
+                        },
+                    },
+                    "error": None,
+                }
+            )
+        (batch_dir / "output.jsonl").write_text(
+            "\n".join(json.dumps(o) for o in output) + "\n"
+        )
+
+    async def is_complete(self, batch_id: str) -> bool:
+        if (self._batch_dir(batch_id) / "cancelled").exists():
+            return True
+        output_path = self._batch_dir(batch_id) / "output.jsonl"
+        if not output_path.exists() and self.responder is not None:
+            await asyncio.to_thread(self._respond, batch_id)
+        return output_path.exists()
+
+    async def fetch_results(self, batch_id: str) -> list[BatchResult]:
+        output_path = self._batch_dir(batch_id) / "output.jsonl"
+        if not await asyncio.to_thread(output_path.exists):
+            return []
+        text = await asyncio.to_thread(output_path.read_text)
+        return [parse_openai_batch_line(line) for line in _parse_jsonl(text)]
+
+    async def cancel(self, batch_id: str) -> None:
+        await asyncio.to_thread((self._batch_dir(batch_id) / "cancelled").touch)
+
+    async def aclose(self) -> None:
+        return None
+
+
+def default_batch_backends(
+    model_configs: list[ModelConfig],
+) -> dict[str, BatchBackend]:
+    """Build batch backends for the providers used by ``model_configs``.
+
+    With ``BATCH_BACKEND=local`` every provider is served by the file-based
+    stand-in. Otherwise OpenAI and Anthropic models use their batch APIs,
+    with the API keys resolved by the shared runner transport, and other
+    providers are left to the interactive runner. Close the backends with
+    ``close_batch_backends``.
+    """
+    settings = get_settings()
+    providers = {m.provider: m for m in model_configs}
+    if settings.batch_backend == "local":
+        local = LocalBatchBackend(Path(settings.batch_local_dir))
+        return dict.fromkeys(providers, local)
+
+    credentials = get_transport().credentials
+    backends: dict[str, BatchBackend] = {}
+    for provider, model_config in providers.items():
+        api_key = credentials.get(model_config.api_key_env)
+        if not api_key:
+            continue
+        if provider == "openai":
+            backends[provider] = OpenAIBatchBackend(api_key)
+        elif provider == "anthropic":
+            backends[provider] = AnthropicBatchBackend(api_key)
+    return backends
+
+
+async def close_batch_backends(backends: dict[str, BatchBackend]) -> None:
+    for backend in {id(b): b for b in backends.values()}.values():
+        with contextlib.suppress(Exception):
+            await backend.aclose()
+
+
+def _record_batches(
+    evaluation: Evaluation | None,
+    submitted: dict[str, tuple[str, list[BatchRequest]]],
+) -> None:
+    """Store the batches still to be ingested on the evaluation."""
+    if evaluation is None:
+        return
+    evaluation.provider_batches = {
+        batch_id: {
+            "provider": provider,
+            # Prompts are rebuilt from the questions when a run resumes.
+            "requests": [r.model_dump(exclude={"prompt"}) for r in requests],
+        }
+        for batch_id, (provider, requests) in submitted.items()
+    } or None
+
+
+async def cancel_provider_batches(
+    evaluation: Evaluation, backends: dict[str, BatchBackend] | None = None
+) -> int:
+    """Cancel an evaluation's submitted, uningested provider batches.
+
+    Forgets them on the evaluation (the caller commits) and returns how many
+    were cancelled; a batch whose cancel fails is logged and left to expire.
+    """
+    batches = evaluation.provider_batches or {}
+    if not batches:
+        return 0
+    owned = backends is None
+    if backends is None:
+        backends = default_batch_backends(
+            [m for m in load_app_config().models if m.name in evaluation.model_list]
+        )
+    cancelled = 0
+    try:
+        for batch_id, entry in batches.items():
+            backend = backends.get(entry["provider"])
+            if backend is None:
+                logger.warning(
+                    "No backend to cancel provider batch",
+                    extra={"provider": entry["provider"], "batch_id": batch_id},
+                )
+                continue
+            try:
+                await backend.cancel(batch_id)
+            except Exception:
+                logger.exception(
+                    "Could not cancel provider batch",
+                    extra={"provider": entry["provider"], "batch_id": batch_id},
+                )
+                continue
+            cancelled += 1
+    finally:
+        if owned:
+            await close_batch_backends(backends)
+    evaluation.provider_batches = None
+    logger.info(
+        "Cancelled provider batches",
+        extra={"evaluation_id": str(evaluation.id), "cancelled": cancelled},
+    )
+    return cancelled
+
+
+async def run_batch_evaluation(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    question_ids: list[str],
+    question_texts: dict[str, str],
+    model_configs: list[ModelConfig],
+    prompt_template: PromptTemplate,
+    backends: dict[str, BatchBackend] | None = None,
+    poll_interval_seconds: float | None = None,
+    max_wait_seconds: float | None = None,
+    budget: RunBudget | None = None,
+    samples_per_question: int = 1,
+) -> list[ResponseModel]:
+    """Collect an evaluation's responses through provider batch endpoints.
+
+    Pairs that already have a Response row are skipped. Models whose provider
+    has no batch backend are collected with the interactive runner while the
+    batches are processing. With a ``budget``, requests whose projected spend
+    (at the batch discount) would exceed it are not submitted. Each of the
+    ``samples_per_question`` samples is submitted as its own batch request.
+
+    Each submitted batch is recorded on the evaluation before polling starts
+    and forgotten once its results are committed; a rerun polls the recorded
+    batches and only submits cells none of them cover. Cells a batch ended
+    without running are resubmitted in a new batch. Returns the Response
+    records created.
+    """
+    settings = get_settings()
+    owned = backends is None
+    if backends is None:
+        backends = default_batch_backends(model_configs)
+    poll_interval = poll_interval_seconds or settings.batch_poll_interval_seconds
+    max_wait = max_wait_seconds or settings.batch_max_wait_hours * 3600
+
+    responses: list[ResponseModel] = []
+    progress = get_progress_broker()
+    tok = set_evaluation_id(str(evaluation_id))
+    try:
+        collected = await get_collected_samples(db, evaluation_id)
+        evaluation = await db.get(Evaluation, evaluation_id)
+
+        batched_models = [m for m in model_configs if m.provider in backends]
+        interactive_models = [m for m in model_configs if m.provider not in backends]
+        models_by_name = {m.name: m for m in batched_models}
+
+        # batch id -> (provider, requests), for every batch not yet ingested.
+        submitted: dict[str, tuple[str, list[BatchRequest]]] = {}
+        reservations: dict[str, Reservation] = {}
+        for batch_id, entry in (
+            (evaluation and evaluation.provider_batches) or {}
+        ).items():
+            if entry["provider"] not in backends:
+                raise RuntimeError(
+                    f"No batch backend for provider {entry['provider']} to resume "
+                    f"batch {batch_id}"
+                )
+            requests = [BatchRequest(prompt="", **r) for r in entry["requests"]]
+            submitted[batch_id] = (entry["provider"], requests)
+            for request in requests:
+                model_config = models_by_name.get(request.model_name)
+                if budget is None or model_config is None:
+                    continue
+                # Submitted and paid for either way; count it against the budget.
+                reservation = reserve_call(
+                    budget,
+                    model_config,
+                    render_prompt(
+                        prompt_template, question_texts.get(request.question_id, "")
+                    ),
+                    discount=BATCH_DISCOUNT,
+                )
+                if reservation is not None:
+                    reservations[request.custom_id] = reservation
+        if submitted:
+            logger.info(
+                "Resuming provider batches",
+                extra={"batch_ids": sorted(submitted)},
+            )
+        in_flight = {
+            (r.question_id, r.model_name, r.sample_index)
+            for _, requests in submitted.values()
+            for r in requests
+        }
+
+        requests_by_provider: dict[str, list[BatchRequest]] = defaultdict(list)
+        # Opaque ids, unique across attempts so resumed and new batches never
+        # share one: Anthropic only allows [A-Za-z0-9_-] here.
+        run_token = uuid4().hex[:8]
+        request_numbers = itertools.count()
+        for question_id in question_ids:
+            prompt = render_prompt(prompt_template, question_texts[question_id])
+            for model_config in batched_models:
+                for sample_index in range(samples_per_question):
+                    cell = (question_id, model_config.name, sample_index)
+                    if cell in collected or cell in in_flight:
+                        continue
+                    custom_id = f"req-{run_token}-{next(request_numbers)}"
+                    if budget is not None:
+                        reservation = reserve_call(
+                            budget, model_config, prompt, discount=BATCH_DISCOUNT
+                        )
+                        if reservation is None:
+                            continue
+                        reservations[custom_id] = reservation
+                    requests_by_provider[model_config.provider].append(
+                        BatchRequest(
+                            custom_id=custom_id,
+                            question_id=question_id,
+                            model_name=model_config.name,
+                            sample_index=sample_index,
+                            model=_provider_model(model_config),
+                            prompt=prompt,
+                        )
+                    )
+
+        for provider, requests in requests_by_provider.items():
+            batch_id = await backends[provider].submit(requests)
+            submitted[batch_id] = (provider, requests)
+            _record_batches(evaluation, submitted)
+            await db.commit()
+            logger.info(
+                "Submitted batch",
+                extra={
+                    "provider": provider,
+                    "batch_id": batch_id,
+                    "requests": len(requests),
+                },
+            )
+
+        if interactive_models:
+            responses.extend(
+                await run_evaluation(
+                    db=db,
+                    evaluation_id=evaluation_id,
+                    question_ids=question_ids,
+                    question_texts=question_texts,
+                    model_configs=interactive_models,
+                    prompt_template=prompt_template,
+                    budget=budget,
+                    samples_per_question=samples_per_question,
+                )
+            )
+
+        deadline = time.monotonic() + max_wait
+        remaining = dict(submitted)
+        while remaining:
+            for batch_id, (provider, requests) in list(remaining.items()):
+                if not await backends[provider].is_complete(batch_id):
+                    continue
+                del remaining[batch_id]
+                by_id = {r.custom_id: r for r in requests}
+                results = await backends[provider].fetch_results(batch_id)
+                events: list[ProgressEvent] = []
+                seen: set[str] = set()
+                unprocessed: list[BatchRequest] = []
+                failures: list[tuple[BatchRequest, str | None]] = []
+
+                for result in results:
+                    request = by_id.get(result.custom_id)
+                    if request is None:
+                        continue
+                    seen.add(result.custom_id)
+                    if result.unprocessed:
+                        unprocessed.append(request)
+                        continue
+                    if result.response_text is None:
+                        failures.append((request, result.error))
+                        continue
+                    reservation = reservations.pop(result.custom_id, None)
+                    model_config = models_by_name[request.model_name]
+                    metadata = {
+                        "model": model_config.litellm_model,
+                        "provider": model_config.provider,
+                        **result.metadata,
+                        "source": "batch",
+                        "batch_id": batch_id,
+                    }
+                    cost = estimate_cost(
+                        model_config.litellm_model,
+                        metadata.get("prompt_tokens"),
+                        metadata.get("completion_tokens"),
+                    )
+                    if cost is not None:
+                        metadata["cost_usd"] = cost * BATCH_DISCOUNT
+                    if budget is not None and reservation is not None:
+                        budget.settle(reservation, metadata)
+                    response = ResponseModel(
+                        id=uuid4(),
+                        evaluation_id=evaluation_id,
+                        question_id=request.question_id,
+                        model_name=request.model_name,
+                        sample_index=request.sample_index,
+                        response_text=result.response_text,
+                        source="api",
+                        raw_metadata=metadata,
+                    )
+                    db.add(response)
+                    responses.append(response)
+                    events.append(
+                        ProgressEvent(
+                            evaluation_id=str(evaluation_id),
+                            model=request.model_name,
+                            cost_usd=metadata.get("cost_usd") or 0.0,
+                        )
+                    )
+
+                # Cells the batch ended without running go out again in a new
+                # batch, keeping their budget reservations.
+                unprocessed.extend(r for r in requests if r.custom_id not in seen)
+                resubmit: list[BatchRequest] = []
+                for request in unprocessed:
+                    if request.attempt >= BATCH_REQUEST_ATTEMPTS:
+                        failures.append(
+                            (request, f"not processed in {request.attempt} batches")
+                        )
+                        continue
+                    custom_id = f"req-{run_token}-{next(request_numbers)}"
+                    reservation = reservations.pop(request.custom_id, None)
+                    if reservation is not None:
+                        reservations[custom_id] = reservation
+                    resubmit.append(
+                        request.model_copy(
+                            update={
+                                "custom_id": custom_id,
+                                "prompt": render_prompt(
+                                    prompt_template,
+                                    question_texts[request.question_id],
+                                ),
+                                "attempt": request.attempt + 1,
+                            }
+                        )
+                    )
+                for request, error in failures:
+                    reservation = reservations.pop(request.custom_id, None)
+                    if budget is not None and reservation is not None:
+                        budget.settle(reservation, None)
+                    events.append(
+                        ProgressEvent(
+                            evaluation_id=str(evaluation_id),
+                            model=request.model_name,
+                            succeeded=False,
+                        )
+                    )
+                    logger.warning(
+                        "Batch request failed",
+                        extra={
+                            "model": request.model_name,
+                            "question_id": request.question_id,
+                            "error": error,
+                        },
+                    )
+                if resubmit:
+                    retry_id = await backends[provider].submit(resubmit)
+                    remaining[retry_id] = (provider, resubmit)
+                    logger.info(
+                        "Resubmitted unprocessed batch requests",
+                        extra={
+                            "provider": provider,
+                            "batch_id": retry_id,
+                            "ended_batch_id": batch_id,
+                            "requests": len(resubmit),
+                        },
+                    )
+                _record_batches(evaluation, remaining)
+                await db.commit()
+                for event in events:
+                    progress.publish(event)
+                logger.info(
+                    "Ingested batch results",
+                    extra={
+                        "provider": provider,
+                        "batch_id": batch_id,
+                        "results": len(results),
+                        "failed": len(failures),
+                    },
+                )
+            if remaining:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"Batches still pending after {max_wait:.0f}s: "
+                        + ", ".join(remaining)
+                    )
+                await asyncio.sleep(poll_interval)
+    finally:
+        if owned:
+            await close_batch_backends(backends)
+        reset_evaluation_id(tok)
+
+    logger.info(
+        "Evaluation batch responses collected",
+        extra={
+            "evaluation_id": str(evaluation_id),
+            "responses_collected": len(responses),
+            "budget": budget.snapshot() if budget is not None else None,
+        },
+    )
+    return responses
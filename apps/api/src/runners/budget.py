@@ -0,0 +1,202 @@
+"""Spending guard for evaluation runs.
+
+An evaluation may cap its spend in USD and/or total tokens. Before each call
+the runner reserves a projected cost (prompt tokens from a local tokenizer
+plus the expected completion length); once a reservation would push spend
+plus in-flight reservations over a limit, the budget is marked exhausted and
+no further calls are dispatched. Reservations are settled against the real
+usage reported by the provider.
+
+A sharded run spreads those calls over several processes, so each shard
+also reserves a chunk's projected spend against the evaluation row before
+running it (``reserve_shared_spend``): one conditional UPDATE of the
+committed totals, which concurrent shards cannot both pass once the budget
+is nearly spent. The chunk's real spend replaces the reservation when it
+finishes. A shard that dies mid-chunk leaves its reservation in place,
+which errs on the side of stopping early; the next run resets the totals
+from the recorded spend.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Evaluation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Projected spend held for one in-flight call."""
+
+    model_name: str
+    tokens: int
+    usd: float
+
+
+class RunBudget:
+    """Running spend totals for one evaluation run against optional limits."""
+
+    def __init__(
+        self,
+        max_usd: float | None = None,
+        max_tokens: int | None = None,
+        spent_usd: float = 0.0,
+        spent_tokens: int = 0,
+    ) -> None:
+        self.max_usd = max_usd
+        self.max_tokens = max_tokens
+        self.spent_usd = spent_usd
+        self.spent_tokens = spent_tokens
+        self.reserved_usd = 0.0
+        self.reserved_tokens = 0
+        self.exhausted = False
+        self.skipped = 0
+        self._completion_tokens: dict[str, tuple[int, int]] = {}
+
+    @classmethod
+    def for_evaluation(
+        cls, evaluation: Any, spent_usd: float = 0.0, spent_tokens: int = 0
+    ) -> "RunBudget | None":
+        """Build the budget for an Evaluation row, or None if it has no limits."""
+        max_usd = getattr(evaluation, "budget_usd", None)
+        max_tokens = getattr(evaluation, "budget_tokens", None)
+        if max_usd is None and max_tokens is None:
+            return None
+        return cls(max_usd, max_tokens, spent_usd, spent_tokens)
+
+    def expected_completion_tokens(self, model_name: str, default: int) -> int:
+        """Mean completion length seen for this model, or ``default`` if none."""
+        total, count = self._completion_tokens.get(model_name, (0, 0))
+        return round(total / count) if count else default
+
+    def reserve(self, model_name: str, tokens: int, usd: float) -> Reservation | None:
+        """Hold the projected spend for a call, or return None if over budget.
+
+        The first refusal exhausts the budget so that no later (possibly
+        smaller) call slips in after the run has started winding down.
+        """
+        if not self.exhausted and (
+            (
+                self.max_tokens is not None
+                and self.spent_tokens + self.reserved_tokens + tokens > self.max_tokens
+            )
+            or (
+                self.max_usd is not None
+                and self.spent_usd + self.reserved_usd + usd > self.max_usd
+            )
+        ):
+            self.exhausted = True
+            logger.warning("Evaluation budget exhausted", extra=self.snapshot())
+        if self.exhausted:
+            self.skipped += 1
+            return None
+        self.reserved_tokens += tokens
+        self.reserved_usd += usd
+        return Reservation(model_name, tokens, usd)
+
+    def settle(self, reservation: Reservation, metadata: dict | None) -> None:
+        """Release a reservation and record the call's actual usage.
+
+        ``metadata`` is the response metadata, or None if the call failed.
+        Calls with no reported cost are charged their projected cost.
+        """
+        self.reserved_tokens -= reservation.tokens
+        self.reserved_usd -= reservation.usd
+        if metadata is None:
+            return
+        self.spent_tokens += metadata.get("total_tokens") or reservation.tokens
+        cost = metadata.get("cost_usd")
+        self.spent_usd += reservation.usd if cost is None else cost
+        completion_tokens = metadata.get("completion_tokens")
+        if completion_tokens is not None:
+            total, count = self._completion_tokens.get(reservation.model_name, (0, 0))
+            self._completion_tokens[reservation.model_name] = (
+                total + completion_tokens,
+                count + metadata.get("samples_in_call", 1),
+            )
+
+    def snapshot(self) -> dict:
+        return {
+            "max_usd": self.max_usd,
+            "max_tokens": self.max_tokens,
+            "spent_usd": round(self.spent_usd, 6),
+            "spent_tokens": self.spent_tokens,
+            "exhausted": self.exhausted,
+            "skipped": self.skipped,
+        }
+
+
+async def reset_shared_spend(
+    db: AsyncSession, evaluation_id: UUID, spent_usd: float, spent_tokens: int
+) -> None:
+    """Start an evaluation's committed totals from its recorded spend.
+
+    Only safe while no shard is running; the caller commits.
+    """
+    await db.execute(
+        update(Evaluation)
+        .where(Evaluation.id == evaluation_id)
+        .values(budget_committed_usd=spent_usd, budget_committed_tokens=spent_tokens)
+    )
+
+
+async def reserve_shared_spend(
+    db: AsyncSession, evaluation_id: UUID, tokens: int, usd: float
+) -> tuple[float, int] | None:
+    """Add a projected spend to the committed totals if it fits the budget.
+
+    Returns the committed (usd, tokens) including this reservation, or None
+    if it would go over a limit. The caller commits.
+    """
+    result = await db.execute(
+        update(Evaluation)
+        .where(
+            Evaluation.id == evaluation_id,
+            or_(
+                Evaluation.budget_usd.is_(None),
+                Evaluation.budget_committed_usd + usd <= Evaluation.budget_usd,
+            ),
+            or_(
+                Evaluation.budget_tokens.is_(None),
+                Evaluation.budget_committed_tokens + tokens <= Evaluation.budget_tokens,
+            ),
+        )
+        .values(
+            budget_committed_usd=Evaluation.budget_committed_usd + usd,
+            budget_committed_tokens=Evaluation.budget_committed_tokens + tokens,
+        )
+        .returning(Evaluation.budget_committed_usd, Evaluation.budget_committed_tokens)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    committed_usd, committed_tokens = row
+    return float(committed_usd), int(committed_tokens)
+
+
+async def settle_shared_spend(
+    db: AsyncSession,
+    evaluation_id: UUID,
+    reserved: tuple[float, int],
+    spent: tuple[float, int],
+) -> None:
+    """Replace a reserved (usd, tokens) with what was actually spent.
+
+    The caller commits.
+    """
+    await db.execute(
+        update(Evaluation)
+        .where(Evaluation.id == evaluation_id)
+        .values(
+            budget_committed_usd=Evaluation.budget_committed_usd
+            + (spent[0] - reserved[0]),
+            budget_committed_tokens=Evaluation.budget_committed_tokens
+            + (spent[1] - reserved[1]),
+        )
+    )
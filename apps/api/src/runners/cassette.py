@@ -0,0 +1,325 @@
+"""Record and replay of model calls, for reproducible benchmarks and tests.
+
+With ``RUNNER_CASSETTE_MODE=record`` every completion request the runner
+makes, and its response or error with timings, is appended as one JSON line
+to ``RUNNER_CASSETTE_PATH`` (gzip-compressed if the path ends in ``.gz``).
+With ``replay`` no provider is called: each request is answered with the
+next recorded call for the same model, messages and ``n``, after its
+recorded latency scaled by ``RUNNER_CASSETTE_TIME_SCALE`` (1 replays the
+original timing, 0 answers at once). Everything around the call runs for
+real: scheduler, limits, retries, checkpoints and DB writes, so a replayed
+evaluation profiles the pipeline without the network. (Turn the response
+cache off to replay every call rather than only cache misses.)
+
+Calls cancelled before they finish (timeouts, hedges that lost the race)
+are not recorded. A request with no recorded call left fails as a 404,
+which the retry policy treats as fatal.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import IO, Any
+
+from src.config import get_settings
+from src.loaders.config_loader import ModelConfig
+from src.runners.retry import retry_after_seconds
+from src.runners.stub_provider import (
+    StubChoice,
+    StubChunk,
+    StubDelta,
+    StubMessage,
+    StubResponse,
+    StubStreamChoice,
+    StubUsage,
+)
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """No recorded call is left for a replayed request."""
+
+    status_code = 404
+
+
+class ReplayedError(Exception):
+    """A provider error served back from a cassette."""
+
+    def __init__(
+        self, status_code: int | None, message: str, headers: dict[str, str]
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers
+
+
+def request_key(litellm_model: str, messages: list[dict[str, Any]], n: int) -> str:
+    payload = json.dumps([litellm_model, messages, n], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")  # noqa: SIM115 - kept open
+
+
+def _error_entry(exc: BaseException) -> dict[str, Any]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    headers = {}
+    hint = retry_after_seconds(exc)
+    if hint is not None:
+        headers["retry-after"] = f"{hint:g}"
+    return {
+        "status": status if isinstance(status, int) else None,
+        "type": type(exc).__name__,
+        "message": str(exc),
+        "headers": headers,
+    }
+
+
+def _replayed_error(error: dict[str, Any]) -> Exception:
+    if error["status"] is None and error["type"] == "TimeoutError":
+        return TimeoutError(error["message"])
+    if error["status"] is None:
+        return ConnectionError(error["message"])
+    return ReplayedError(error["status"], error["message"], error["headers"])
+
+
+class Cassette:
+    """The recorded calls of one file, appended to or replayed from."""
+
+    def __init__(self, path: Path, mode: str, time_scale: float = 1.0) -> None:
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.time_scale = max(0.0, time_scale)
+        self.recorded = 0
+        self.replayed = 0
+        self._file: IO[str] | None = None
+        self._lock = threading.Lock()
+        self._calls: dict[str, deque[dict[str, Any]]] | None = None
+
+    def wrap(self, api: Any, model_config: ModelConfig) -> "CassetteAPI":
+        return CassetteAPI(self, api, model_config)
+
+    def append(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = _open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def next_call(self, key: str) -> dict[str, Any]:
+        if self._calls is None:
+            self._calls = {}
+            if self.path.exists():
+                with _open(self.path, "r") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._calls.setdefault(entry["key"], deque()).append(entry)
+            logger.info(
+                "Cassette loaded",
+                extra={
+                    "path": str(self.path),
+                    "calls": sum(len(q) for q in self._calls.values()),
+                },
+            )
+        queue = self._calls.get(key)
+        if not queue:
+            raise CassetteMissError(f"No recorded call left for request {key}")
+        self.replayed += 1
+        return queue.popleft()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def open_cassette() -> Cassette | None:
+    """The cassette set by the ``RUNNER_CASSETTE_*`` settings, if any."""
+    settings = get_settings()
+    if settings.runner_cassette_mode == "off":
+        return None
+    cassette = Cassette(
+        Path(settings.runner_cassette_path),
+        settings.runner_cassette_mode,
+        settings.runner_cassette_time_scale,
+    )
+    logger.info(
+        "Model calls use a cassette",
+        extra={"mode": cassette.mode, "path": str(cassette.path)},
+    )
+    return cassette
+
+
+class _RecordingStream:
+    """Passes a streamed response through, recording it once it ends.
+
+    A stream that runs to the end, or fails, is recorded as such; one the
+    runner closes early (its ``stream_max_seconds`` cap) is recorded with the
+    text received so far. A stream abandoned because its call was cancelled
+    is not recorded at all.
+    """
+
+    def __init__(
+        self, cassette: Cassette, stream: Any, entry: dict[str, Any], start: float
+    ) -> None:
+        self.cassette = cassette
+        self.stream = stream
+        self.entry = entry
+        self.start = start
+        self.parts: list[str] = []
+        self.usage: Any = None
+        self.first_token: float | None = None
+        self.recorded = False
+        self._chunks = stream.__aiter__()
+
+    def __aiter__(self) -> "_RecordingStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._record()
+            raise
+        except Exception as exc:
+            self._record(exc)
+            raise
+        choices = getattr(chunk, "choices", None) or []
+        delta = getattr(choices[0].delta, "content", None) if choices else None
+        if delta:
+            if self.first_token is None:
+                self.first_token = time.monotonic() - self.start
+            self.parts.append(delta)
+        self.usage = getattr(chunk, "usage", None) or self.usage
+        return chunk
+
+    async def aclose(self) -> None:
+        self._record()
+        aclose = getattr(self.stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    def _record(self, exc: BaseException | None = None) -> None:
+        if self.recorded:
+            return
+        self.recorded = True
+        entry = self.entry
+        entry["latency"] = round(time.monotonic() - self.start, 4)
+        if exc is not None:
+            entry["error"] = _error_entry(exc)
+        else:
+            entry["first_token"] = (
+                round(self.first_token, 4) if self.first_token is not None else None
+            )
+            entry["texts"] = ["".join(self.parts)]
+            entry["usage"] = _usage(self.usage)
+        self.cassette.append(entry)
+
+
+class CassetteAPI:
+    """A model's completion API, recorded to or replayed from a cassette."""
+
+    def __init__(self, cassette: Cassette, api: Any, model_config: ModelConfig):
+        self.cassette = cassette
+        self.api = api
+        self.model_config = model_config
+
+    async def acompletion(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        stream: bool = False,
+        n: int = 1,
+        **kwargs: Any,
+    ) -> Any:
+        key = request_key(self.model_config.litellm_model, messages, n)
+        if self.cassette.mode == "replay":
+            return await self._replay(self.cassette.next_call(key), stream)
+        entry: dict[str, Any] = {
+            "key": key,
+            "model": self.model_config.litellm_model,
+            "messages": messages,
+            "n": n,
+            "stream": stream,
+        }
+        start = time.monotonic()
+        try:
+            response = await self.api.acompletion(
+                messages=messages,
+                stream=stream,
+                **({"n": n} if n > 1 else {}),
+                **kwargs,
+            )
+        except Exception as exc:
+            entry["latency"] = round(time.monotonic() - start, 4)
+            entry["error"] = _error_entry(exc)
+            self.cassette.append(entry)
+            raise
+        if stream:
+            return _RecordingStream(self.cassette, response, entry, start)
+        entry["latency"] = round(time.monotonic() - start, 4)
+        resp: Any = response
+        usage = getattr(resp, "usage", None)
+        entry["texts"] = [choice.message.content or "" for choice in resp.choices]
+        entry["usage"] = _usage(usage)
+        entry["cost"] = getattr(resp, "_hidden_params", {}).get("response_cost")
+        self.cassette.append(entry)
+        return response
+
+    async def _replay(self, entry: dict[str, Any], stream: bool) -> Any:
+        scale = self.cassette.time_scale
+        if "error" in entry:
+            await asyncio.sleep(entry["latency"] * scale)
+            raise _replayed_error(entry["error"])
+        usage = StubUsage(*entry["usage"]) if entry.get("usage") else None
+        if stream:
+            return self._replay_stream(entry, usage)
+        await asyncio.sleep(entry["latency"] * scale)
+        response = StubResponse(
+            choices=[
+                StubChoice(StubMessage(text), index=i)
+                for i, text in enumerate(entry["texts"])
+            ],
+            usage=usage,
+            model=entry["model"],
+        )
+        response._hidden_params = {"response_cost": entry.get("cost")}
+        return response
+
+    async def _replay_stream(
+        self, entry: dict[str, Any], usage: StubUsage | None
+    ) -> AsyncIterator[StubChunk]:
+        scale = self.cassette.time_scale
+        first_token = entry.get("first_token") or entry["latency"]
+        await asyncio.sleep(first_token * scale)
+        yield StubChunk([StubStreamChoice(StubDelta(entry["texts"][0]))])
+        await asyncio.sleep(max(0.0, entry["latency"] - first_token) * scale)
+        yield StubChunk([], usage=usage)
+
+
+def _usage(usage: Any) -> list[int] | None:
+    if usage is None:
+        return None
+    return [usage.prompt_tokens, usage.completion_tokens, usage.total_tokens]
@@ -0,0 +1,162 @@
+"""Per-model circuit breakers for the LLM runner.
+
+When a provider is down, retrying every work item wastes minutes of backoff.
+A breaker opens after ``failure_threshold`` consecutive failed attempts and
+rejects calls immediately until ``reset_timeout_seconds`` have passed, then
+lets a single half-open probe through: success closes it again, failure
+re-opens it. A probe that ends any other way (a fatal error, a cancel) is
+released without a verdict, and one that has not finished within another
+``reset_timeout_seconds`` is given up on, so a lost probe cannot keep the
+breaker half-open forever.
+"""
+
+import logging
+from enum import StrEnum
+from functools import lru_cache
+
+from src.config import get_settings
+from src.runners.clock import Clock, SystemClock
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a model whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one model."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 60.0,
+        clock: Clock | None = None,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock or SystemClock()
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock.monotonic() - self._opened_at >= self.reset_timeout_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed (claiming the probe when half-open)."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and (
+            not self._probe_in_flight
+            or self._clock.monotonic() - self._probe_started_at
+            >= self.reset_timeout_seconds
+        ):
+            self._probe_in_flight = True
+            self._probe_started_at = self._clock.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def release_probe(self) -> None:
+        """Let another probe through after one that ended without a verdict."""
+        if self._state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info("Circuit closed", extra={"model": self.name})
+        self._state = CircuitState.CLOSED
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == CircuitState.HALF_OPEN or (
+            self._state == CircuitState.CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        logger.warning(
+            "Circuit opened",
+            extra={
+                "model": self.name,
+                "consecutive_failures": self.consecutive_failures,
+                "reset_timeout_seconds": self.reset_timeout_seconds,
+            },
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "state": str(self.state),
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one breaker per model name."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 60.0,
+        clock: Clock | None = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=self.failure_threshold,
+                reset_timeout_seconds=self.reset_timeout_seconds,
+                clock=self._clock,
+            )
+            self._breakers[name] = breaker
+        return breaker
+
+    def snapshot(self, names: list[str] | None = None) -> dict[str, dict]:
+        selected = names if names is not None else list(self._breakers)
+        return {name: self.get(name).snapshot() for name in selected}
+
+
+@lru_cache
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Get the process-wide breaker registry configured from settings."""
+    settings = get_settings()
+    return CircuitBreakerRegistry(
+        failure_threshold=settings.circuit_breaker_failure_threshold,
+        reset_timeout_seconds=settings.circuit_breaker_reset_seconds,
+    )
@@ -0,0 +1,144 @@
+"""Hedged requests to cut tail latency.
+
+When a call has been outstanding longer than the model's observed latency
+quantile (p95 by default), a duplicate request is sent; whichever answers
+first wins and the other is cancelled. Observed latencies and hedge counts
+are tracked per model so the hedge rate can be reported.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import TypeVar
+
+from src.loaders.config_loader import ModelConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LATENCY_WINDOW = 500
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies for one model."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgeStats:
+    """Counts of calls, hedges fired and hedges that won for one model."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+        }
+
+
+class HedgingRegistry:
+    """Per-model latency trackers and hedge statistics."""
+
+    def __init__(self) -> None:
+        self._trackers: dict[str, LatencyTracker] = {}
+        self._stats: dict[str, HedgeStats] = {}
+
+    def tracker(self, name: str) -> LatencyTracker:
+        return self._trackers.setdefault(name, LatencyTracker())
+
+    def stats(self, name: str) -> HedgeStats:
+        return self._stats.setdefault(name, HedgeStats())
+
+    def hedge_delay(self, model_config: ModelConfig) -> float | None:
+        """Seconds to wait before hedging, or None if hedging is off/unready."""
+        if not model_config.hedge:
+            return None
+        tracker = self.tracker(model_config.name)
+        if len(tracker) < model_config.hedge_min_samples:
+            return None
+        return tracker.quantile(model_config.hedge_quantile)
+
+    def record(self, name: str, latency: float, hedged: bool, hedge_won: bool) -> None:
+        self.tracker(name).record(latency)
+        stats = self.stats(name)
+        stats.calls += 1
+        stats.hedged += int(hedged)
+        stats.hedge_wins += int(hedge_won)
+
+    def snapshot(self, names: list[str]) -> dict[str, dict]:
+        return {name: self.stats(name).snapshot() for name in names}
+
+
+async def run_hedged(
+    primary: Awaitable[T],
+    make_hedge: Callable[[], Awaitable[T] | None],
+    hedge_after: float | None,
+) -> tuple[T, bool, bool]:
+    """Await ``primary``, racing a hedge if it outlives ``hedge_after`` seconds.
+
+    Returns (result, hedged, hedge_won). The first leg to succeed wins and the
+    other is cancelled; if one leg fails the other is still awaited, and only
+    when both fail is the primary's error raised. ``make_hedge`` may return
+    None to decline the hedge, e.g. when there is no capacity for it.
+    """
+    primary_task = asyncio.ensure_future(primary)
+    hedge_task: asyncio.Future[T] | None = None
+    # Whichever way this returns, including being cancelled while waiting,
+    # no leg is left running unowned.
+    try:
+        if hedge_after is None:
+            return await primary_task, False, False
+
+        done, _ = await asyncio.wait({primary_task}, timeout=hedge_after)
+        if done:
+            return primary_task.result(), False, False
+
+        hedge = make_hedge()
+        if hedge is None:
+            return await primary_task, False, False
+        hedge_task = asyncio.ensure_future(hedge)
+        pending = {primary_task, hedge_task}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True, task is hedge_task
+        return primary_task.result(), True, False
+    finally:
+        for task in (primary_task, hedge_task):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(BaseException):
+                    await task
+
+
+@lru_cache
+def get_hedging_registry() -> HedgingRegistry:
+    """Get the process-wide latency/hedge registry."""
+    return HedgingRegistry()
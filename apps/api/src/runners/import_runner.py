@@ -1,21 +1,34 @@
 """Import runner for pre-collected LLM responses."""
 
 import logging
+from collections.abc import Iterable
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.db.models import Evaluation
 from src.db.models import Response as ResponseModel
+from src.db.repository import sync_questions
+from src.models.question import Question
+from src.runners.litellm_runner import get_collected_samples
 
 logger = logging.getLogger(__name__)
 
 
+class ImportConflictError(Exception):
+    """The imported samples were stored concurrently by another writer."""
+
+
 class ImportedResponse(BaseModel):
     """Schema for a single imported response."""
 
     question_id: str
     model_name: str
+    # A sample that is already stored moves to the next free index, so
+    # re-imports and several answers per question and model are kept.
+    sample_index: int = Field(default=0, ge=0)
     response_text: str
     metadata: dict = Field(default_factory=dict)
 
@@ -33,16 +46,25 @@ async def import_responses(
 ) -> list[ResponseModel]:
     """Import pre-collected responses into an evaluation.
 
-    Returns list of created Response records.
+    Returns list of created Response records. Raises ImportConflictError if
+    another writer stored one of the assigned samples first.
     """
     responses: list[ResponseModel] = []
+    taken = await get_collected_samples(
+        db, evaluation_id, {item.question_id for item in batch.responses}
+    )
 
     for item in batch.responses:
+        sample_index = item.sample_index
+        while (item.question_id, item.model_name, sample_index) in taken:
+            sample_index += 1
+        taken.add((item.question_id, item.model_name, sample_index))
         response = ResponseModel(
             id=uuid4(),
             evaluation_id=evaluation_id,
             question_id=item.question_id,
             model_name=item.model_name,
+            sample_index=sample_index,
             response_text=item.response_text,
             source="import",
             raw_metadata=item.metadata,
@@ -50,7 +72,13 @@ async def import_responses(
         db.add(response)
         responses.append(response)
 
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise ImportConflictError(
+            "Responses were stored concurrently; retry the import"
+        ) from exc
     for r in responses:
         await db.refresh(r)
 
@@ -60,3 +88,24 @@ async def import_responses(
         evaluation_id,
     )
     return responses
+
+
+async def import_into_evaluation(
+    db: AsyncSession,
+    evaluation: Evaluation,
+    batch: ImportBatch,
+    questions: Iterable[Question],
+) -> list[ResponseModel]:
+    """Sync the batch's questions, store its responses and open review.
+
+    The batch's question ids must already be validated against ``questions``.
+    """
+    referenced = {item.question_id for item in batch.responses}
+    await sync_questions(db, (q for q in questions if q.id in referenced))
+
+    responses = await import_responses(db, evaluation.id, batch)
+
+    if evaluation.status == "created":
+        evaluation.status = "reviewing"
+        await db.commit()
+    return responses
@@ -1,57 +1,322 @@
 """LiteLLM runner for calling LLM APIs and collecting responses."""
 
+import asyncio
+import contextlib
 import logging
-import os
 import time
+from collections import Counter
+from collections.abc import Awaitable, Iterable
+from dataclasses import dataclass
 from typing import Any, cast
 from uuid import UUID, uuid4
 
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import get_settings
 from src.db.models import Response as ResponseModel
 from src.loaders.config_loader import ModelConfig, PromptTemplate
-from src.observability.context import reset_evaluation_id, set_evaluation_id
+from src.observability.context import (
+    get_evaluation_id,
+    reset_evaluation_id,
+    set_evaluation_id,
+)
+from src.observability.progress import ProgressEvent, get_progress_broker
+from src.runners.budget import Reservation, RunBudget
+from src.runners.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    get_circuit_breakers,
+)
+from src.runners.hedging import get_hedging_registry, run_hedged
+from src.runners.rate_limiter import get_rate_limiter
+from src.runners.response_cache import ResponseCache, cache_key, get_response_cache
+from src.runners.retry import get_retry_policy
+from src.runners.runtime_stats import RuntimeStatsCollector
+from src.runners.scheduler import get_scheduler
+from src.runners.transport import RunnerTransport, get_transport
+from src.runners.write_behind import ResponseWriter
 
 logger = logging.getLogger(__name__)
 
-MAX_RETRIES = 3
-RETRY_DELAY_SECONDS = 2.0
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_TOKENS = 2048
+
+
+def render_prompt(prompt_template: PromptTemplate, question_text: str) -> str:
+    """Substitute a question into a prompt template."""
+    return prompt_template.template.replace("{question}", question_text)
+
+
+def estimate_prompt_tokens(prompt: str) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) for quota checks."""
+    return len(prompt) // 4 + 1
+
+
+def count_prompt_tokens(litellm_model: str, prompt: str) -> int:
+    """Count prompt tokens with LiteLLM's bundled tokenizer for the model.
+
+    Falls back to the character estimate if no tokenizer can be loaded.
+    """
+    try:
+        import litellm
+
+        return litellm.token_counter(model=litellm_model, text=prompt)
+    except Exception:
+        return estimate_prompt_tokens(prompt)
+
+
+def estimate_cost(
+    litellm_model: str,
+    prompt_tokens: int | None,
+    completion_tokens: int | None,
+) -> float | None:
+    """Price a completion from token counts using LiteLLM's cost map."""
+    if prompt_tokens is None or completion_tokens is None:
+        return None
+    try:
+        import litellm
+
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=litellm_model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+    except Exception:
+        return None
+    return prompt_cost + completion_cost
+
+
+async def _stream_completion(
+    transport: RunnerTransport,
+    model_config: ModelConfig,
+    prompt: str,
+) -> tuple[str, Any, dict]:
+    """Consume a streamed completion, measuring time-to-first-token.
+
+    If the model's ``stream_max_seconds`` cap is reached the stream is closed
+    and the partial text is returned with ``truncated`` set; a cap hit before
+    any token arrives raises ``TimeoutError`` so the call can be retried.
+    Returns (text, usage, streaming metadata).
+    """
+    start = time.monotonic()
+    parts: list[str] = []
+    usage = None
+    first_token_at: float | None = None
+    truncated = False
+
+    stream = cast(
+        Any,
+        await transport.completion_api(model_config).acompletion(
+            model=model_config.litellm_model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=DEFAULT_TEMPERATURE,
+            max_tokens=DEFAULT_MAX_TOKENS,
+            stream=True,
+            stream_options={"include_usage": True},
+            **transport.completion_kwargs(model_config),
+        ),
+    )
+    cap = model_config.stream_max_seconds
+    remaining = None if cap is None else max(0.0, cap - (time.monotonic() - start))
+    try:
+        async with asyncio.timeout(remaining):
+            async for chunk in stream:
+                choices = getattr(chunk, "choices", None) or []
+                delta = getattr(choices[0].delta, "content", None) if choices else None
+                if delta:
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    parts.append(delta)
+                usage = getattr(chunk, "usage", None) or usage
+    except TimeoutError:
+        if first_token_at is None:
+            raise
+        truncated = True
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            with contextlib.suppress(Exception):
+                await aclose()
+    end = time.monotonic()
+
+    completion_tokens = usage.completion_tokens if usage else None
+    generated = completion_tokens if completion_tokens is not None else len(parts)
+    generation_seconds = end - first_token_at if first_token_at is not None else 0.0
+    metadata = {
+        "streamed": True,
+        "truncated": truncated,
+        "time_to_first_token_seconds": (
+            round(first_token_at - start, 3) if first_token_at is not None else None
+        ),
+        "tokens_per_second": (
+            round(generated / generation_seconds, 2) if generation_seconds > 0 else None
+        ),
+    }
+    return "".join(parts), usage, metadata
+
+
+@dataclass
+class _Completion:
+    texts: list[str]
+    usage: Any
+    metadata: dict
+    cost: float | None
+    latency: float
+
+
+async def _complete_once(
+    transport: RunnerTransport, model_config: ModelConfig, prompt: str, n: int = 1
+) -> _Completion:
+    """Make one completion request, bounded by the model's ``timeout_seconds``.
+
+    With ``n > 1`` the provider is asked for ``n`` choices in a single call;
+    multi-choice requests are never streamed.
+    """
+    start = time.monotonic()
+    async with asyncio.timeout(model_config.timeout_seconds):
+        if model_config.stream and n == 1:
+            text, usage, metadata = await _stream_completion(
+                transport, model_config, prompt
+            )
+            texts = [text]
+            cost = None
+        else:
+            response = await transport.completion_api(model_config).acompletion(
+                model=model_config.litellm_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=DEFAULT_TEMPERATURE,
+                max_tokens=DEFAULT_MAX_TOKENS,
+                timeout=model_config.timeout_seconds,
+                **({"n": n} if n > 1 else {}),
+                **transport.completion_kwargs(model_config),
+            )
+            resp = cast(Any, response)
+            texts = [choice.message.content or "" for choice in resp.choices[:n]]
+            usage = getattr(resp, "usage", None)
+            metadata = {}
+            # LiteLLM provides cost tracking
+            cost = getattr(resp, "_hidden_params", {}).get("response_cost")
+    return _Completion(texts, usage, metadata, cost, time.monotonic() - start)
 
 
 async def call_model(
     model_config: ModelConfig,
     question_text: str,
     prompt_template: PromptTemplate,
+    n: int = 1,
 ) -> dict:
     """Call a single LLM model via LiteLLM.
 
     Returns a dict with response_text and metadata (tokens, cost, latency).
-    Retries up to MAX_RETRIES times on transient failures.
+    With ``n > 1`` the model is sampled ``n`` times in one call and the dict
+    also carries every choice under ``samples``. Retryable failures are
+    retried according to the process-wide RetryPolicy; fatal ones (auth,
+    validation) fail immediately.
+
+    A model with ``fallbacks`` fails over to its next route whenever the
+    current route's circuit is open (or opens during the call), and the
+    route that answered is recorded as ``route`` in the metadata.
     """
-    # Canonical Google key is GOOGLE_AI_API_KEY, but some providers/libraries still
-    # look for GOOGLE_API_KEY. Preserve compatibility at call time.
-    if not os.getenv("GOOGLE_API_KEY") and os.getenv("GOOGLE_AI_API_KEY"):
-        os.environ["GOOGLE_API_KEY"] = os.environ["GOOGLE_AI_API_KEY"]
+    routes = model_config.routes()
+    labels = ["primary", *(route.name for route in model_config.fallbacks)]
+    for label, route in zip(labels[:-1], routes[:-1], strict=True):
+        try:
+            result = await _call_route(route, question_text, prompt_template, n)
+        except CircuitOpenError as e:
+            logger.warning(
+                "Failing over to next route",
+                extra={"model": model_config.name, "route": label, "error": str(e)},
+            )
+            continue
+        result["metadata"]["route"] = label
+        return result
+    result = await _call_route(routes[-1], question_text, prompt_template, n)
+    if len(routes) > 1:
+        result["metadata"]["route"] = labels[-1]
+    return result
 
-    import litellm
 
-    prompt = prompt_template.template.replace("{question}", question_text)
+async def _call_route(
+    model_config: ModelConfig,
+    question_text: str,
+    prompt_template: PromptTemplate,
+    n: int,
+) -> dict:
+    """Call one of a model's routes, retrying while its circuit stays closed."""
+    breaker = get_circuit_breakers().get(model_config.name)
+    probing = breaker.state == CircuitState.HALF_OPEN
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for model {model_config.name}")
+    try:
+        return await _attempt_route(
+            model_config, breaker, question_text, prompt_template, n
+        )
+    finally:
+        # A probe that failed fatally or was cancelled gave no verdict on
+        # the route; let the next call probe it instead.
+        if probing:
+            breaker.release_probe()
+
+
+async def _attempt_route(
+    model_config: ModelConfig,
+    breaker: CircuitBreaker,
+    question_text: str,
+    prompt_template: PromptTemplate,
+    n: int,
+) -> dict:
+    transport = get_transport()
+    prompt = render_prompt(prompt_template, question_text)
+    limiter = get_rate_limiter()
+    # Providers count max_tokens against TPM up front, so reserve it too and
+    # refund the unused part once real usage is known.
+    reserved_tokens = estimate_prompt_tokens(prompt) + DEFAULT_MAX_TOKENS * n
+    policy = get_retry_policy()
+    budget = policy.budget(model_config.name)
+    budget.deposit()
+    hedging = get_hedging_registry()
+    # Each attempt holds a provider slot, shared fairly across evaluations.
+    scheduler = get_scheduler()
+    flow = get_evaluation_id() or "default"
 
     last_error: Exception | None = None
-    for attempt in range(1, MAX_RETRIES + 1):
+    attempt = 0
+    delay = 0.0
+    while True:
+        attempt += 1
         try:
-            start_time = time.time()
-            response = await litellm.acompletion(
-                model=model_config.litellm_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=2048,
-            )
-            latency = time.time() - start_time
+            async with scheduler.slot(model_config.provider, flow) as queued:
+                await limiter.acquire(model_config, reserved_tokens)
 
-            resp = cast(Any, response)
-            response_text = resp.choices[0].message.content or ""
-            usage = getattr(resp, "usage", None)
+                async def leg() -> _Completion:
+                    try:
+                        return await _complete_once(transport, model_config, prompt, n)
+                    except asyncio.CancelledError:
+                        # The other leg won; only the winner's reservation is
+                        # settled against real usage, so return this one.
+                        limiter.settle(model_config, reserved_tokens, 0)
+                        raise
+
+                async def hedge() -> _Completion:
+                    async with scheduler.slot(model_config.provider, flow):
+                        await limiter.acquire(model_config, reserved_tokens)
+                        return await leg()
+
+                def hedge_leg() -> Awaitable[_Completion] | None:
+                    # A hedge is extra load; send it only into spare capacity.
+                    if not scheduler.has_free_slot(model_config.provider):
+                        return None
+                    return hedge()
+
+                start_time = time.time()
+                completion, hedged, hedge_won = await run_hedged(
+                    leg(), hedge_leg, hedging.hedge_delay(model_config)
+                )
+                latency = time.time() - start_time
+            hedging.record(model_config.name, completion.latency, hedged, hedge_won)
+            usage = completion.usage
+            cost = completion.cost
 
             metadata = {
                 "model": model_config.litellm_model,
@@ -60,13 +325,33 @@ async def call_model(
                 "completion_tokens": (usage.completion_tokens if usage else None),
                 "total_tokens": usage.total_tokens if usage else None,
                 "latency_seconds": round(latency, 3),
+                **completion.metadata,
             }
+            if n > 1:
+                metadata["samples_in_call"] = n
+            if hedged:
+                metadata["hedged"] = True
+                metadata["hedge_won"] = hedge_won
+            if queued >= 0.001:
+                metadata["scheduler_wait_seconds"] = round(queued, 3)
+            limiter.settle(model_config, reserved_tokens, metadata["total_tokens"])
+            slo = model_config.latency_slo_seconds
+            if slo is not None and latency > slo:
+                # The answer is kept, but a route this slow should be failed
+                # over from like one that errors.
+                metadata["latency_slo_breached"] = True
+                breaker.record_failure()
+            else:
+                breaker.record_success()
 
-            # LiteLLM provides cost tracking
-            if hasattr(resp, "_hidden_params"):
-                cost = resp._hidden_params.get("response_cost")
-                if cost is not None:
-                    metadata["cost_usd"] = cost
+            if cost is None and usage is not None:
+                cost = estimate_cost(
+                    model_config.litellm_model,
+                    usage.prompt_tokens,
+                    usage.completion_tokens,
+                )
+            if cost is not None:
+                metadata["cost_usd"] = cost
 
             logger.info(
                 "Model responded",
@@ -77,42 +362,198 @@ async def call_model(
                     "total_tokens": metadata.get("total_tokens"),
                 },
             )
-            return {
-                "response_text": response_text,
+            result = {
+                "response_text": completion.texts[0] if completion.texts else "",
                 "metadata": metadata,
             }
+            if n > 1:
+                result["samples"] = completion.texts
+            return result
 
         except Exception as e:
             last_error = e
+            retryable = policy.is_retryable(e)
+            if retryable:
+                breaker.record_failure()
             logger.warning(
                 "Model attempt failed",
                 extra={
                     "model": model_config.name,
                     "provider": model_config.provider,
                     "attempt": attempt,
-                    "max_retries": MAX_RETRIES,
+                    "max_attempts": policy.max_attempts,
+                    "retryable": retryable,
                     "error": str(e),
                 },
             )
-            if attempt < MAX_RETRIES:
-                import asyncio
-
-                await asyncio.sleep(RETRY_DELAY_SECONDS * attempt)
+            if breaker.state == CircuitState.OPEN:
+                # The breaker tripped (or a half-open probe failed); stop
+                # retrying so the rest of this model's work fails fast.
+                raise CircuitOpenError(
+                    f"Circuit opened for model {model_config.name}: {e}"
+                ) from e
+            if not retryable or attempt >= policy.max_attempts:
+                break
+            if not budget.try_spend():
+                logger.warning(
+                    "Retry budget exhausted",
+                    extra={"model": model_config.name, "attempt": attempt},
+                )
+                break
+            delay = policy.next_delay(e, delay)
+            await asyncio.sleep(delay)
 
     logger.error(
         "Model failed after retries",
         extra={
             "model": model_config.name,
             "provider": model_config.provider,
-            "max_retries": MAX_RETRIES,
+            "attempts": attempt,
             "error": str(last_error) if last_error else None,
         },
     )
     raise RuntimeError(
-        f"Model {model_config.name} failed after {MAX_RETRIES} attempts: {last_error}"
+        f"Model {model_config.name} failed after {attempt} attempts: {last_error}"
     )
 
 
+def supports_n(model_config: ModelConfig) -> bool:
+    """Whether the model can return several samples from one call via ``n``.
+
+    ``supports_n`` in models.yaml overrides LiteLLM's provider capability map.
+    """
+    if model_config.supports_n is not None:
+        return model_config.supports_n
+    try:
+        import litellm
+
+        params = litellm.get_supported_openai_params(model=model_config.litellm_model)
+    except Exception:
+        return False
+    return "n" in (params or [])
+
+
+def split_samples(result: dict) -> list[dict]:
+    """Split a multi-choice ``call_model`` result into one result per sample.
+
+    The call's usage and cost stay on the first sample; the others are marked
+    as sharing that call so summing metadata over rows does not double count.
+    """
+    texts = result.get("samples") or [result["response_text"]]
+    metadata = result["metadata"]
+    shared = {
+        **metadata,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "total_tokens": None,
+        "cost_usd": 0.0,
+        "shared_call": True,
+    }
+    return [
+        {"response_text": text, "metadata": metadata if i == 0 else dict(shared)}
+        for i, text in enumerate(texts)
+    ]
+
+
+async def get_collected_samples(
+    db: AsyncSession, evaluation_id: UUID, question_ids: Iterable[str] | None = None
+) -> set[tuple[str, str, int]]:
+    """Return the (question_id, model_name, sample_index) already collected.
+
+    ``question_ids`` narrows the lookup to those questions.
+    """
+    query = select(
+        ResponseModel.question_id,
+        ResponseModel.model_name,
+        ResponseModel.sample_index,
+    ).where(ResponseModel.evaluation_id == evaluation_id)
+    if question_ids is not None:
+        query = query.where(ResponseModel.question_id.in_(list(question_ids)))
+    result = await db.execute(query)
+    return {
+        (question_id, model_name, sample_index)
+        for question_id, model_name, sample_index in result.all()
+    }
+
+
+async def get_recorded_spend(
+    db: AsyncSession, evaluation_id: UUID
+) -> tuple[float, int]:
+    """Return the (cost_usd, total_tokens) already recorded for an evaluation."""
+    cost = ResponseModel.raw_metadata["cost_usd"].as_float()
+    tokens = ResponseModel.raw_metadata["total_tokens"].as_integer()
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(cost), 0),
+            func.coalesce(func.sum(tokens), 0),
+        ).where(ResponseModel.evaluation_id == evaluation_id)
+    )
+    spent_usd, spent_tokens = result.one()
+    return float(spent_usd), int(spent_tokens)
+
+
+def reserve_call(
+    budget: RunBudget,
+    model_config: ModelConfig,
+    prompt: str,
+    discount: float = 1.0,
+    samples: int = 1,
+) -> Reservation | None:
+    """Reserve a call's projected spend against ``budget``.
+
+    The projection counts the prompt with a local tokenizer and assumes each
+    of the ``samples`` completions will be as long as this model's answers
+    have been so far (or ``max_tokens`` before any have been seen).
+    """
+    tokens, usd = _project_call(budget, model_config, prompt, samples)
+    return budget.reserve(model_config.name, tokens, usd * discount)
+
+
+def _project_call(
+    budget: RunBudget, model_config: ModelConfig, prompt: str, samples: int
+) -> tuple[int, float]:
+    prompt_tokens = count_prompt_tokens(model_config.litellm_model, prompt)
+    completion_tokens = samples * budget.expected_completion_tokens(
+        model_config.name, DEFAULT_MAX_TOKENS
+    )
+    usd = estimate_cost(model_config.litellm_model, prompt_tokens, completion_tokens)
+    return prompt_tokens + completion_tokens, usd or 0.0
+
+
+def project_spend(
+    budget: RunBudget,
+    pairs: list[tuple[str, ModelConfig]],
+    question_texts: dict[str, str],
+    prompt_template: PromptTemplate,
+    samples_per_question: int = 1,
+) -> tuple[float, int]:
+    """Projected (cost_usd, total_tokens) of collecting every sample of ``pairs``.
+
+    Uses the same projection as ``reserve_call``, so a shard can reserve a
+    whole chunk up front.
+    """
+    usd = 0.0
+    tokens = 0
+    for question_id, model_config in pairs:
+        prompt = render_prompt(prompt_template, question_texts[question_id])
+        if samples_per_question > 1 and supports_n(model_config):
+            calls = [samples_per_question]
+        else:
+            calls = [1] * samples_per_question
+        for samples in calls:
+            call_tokens, call_usd = _project_call(budget, model_config, prompt, samples)
+            tokens += call_tokens
+            usd += call_usd
+    return usd, tokens
+
+
+def recorded_spend_of(responses: list[ResponseModel]) -> tuple[float, int]:
+    """The (cost_usd, total_tokens) ``get_recorded_spend`` counts for rows."""
+    usd = sum((r.raw_metadata or {}).get("cost_usd") or 0.0 for r in responses)
+    tokens = sum((r.raw_metadata or {}).get("total_tokens") or 0 for r in responses)
+    return float(usd), int(tokens)
+
+
 async def run_evaluation(
     db: AsyncSession,
     evaluation_id: UUID,
@@ -120,55 +561,277 @@ async def run_evaluation(
     question_texts: dict[str, str],
     model_configs: list[ModelConfig],
     prompt_template: PromptTemplate,
+    max_concurrency: int | None = None,
+    cache: ResponseCache | None = None,
+    checkpoint_every: int | None = None,
+    budget: RunBudget | None = None,
+    samples_per_question: int = 1,
+    pairs: list[tuple[str, ModelConfig]] | None = None,
+    stop_event: asyncio.Event | None = None,
 ) -> list[ResponseModel]:
     """Run all models against all questions for an evaluation.
 
-    Returns list of created Response records.
+    Every (question, model) pair is dispatched as its own asyncio task, with at
+    most ``max_concurrency`` calls in flight (defaults to the
+    ``RUNNER_MAX_CONCURRENCY`` setting). Pairs already in the response cache
+    are served from it without calling the provider and are marked with
+    ``source="cache"`` in their metadata.
+
+    Responses are written behind the calls by a ``ResponseWriter`` (see
+    ``src.runners.write_behind``): one multi-row INSERT per
+    ``checkpoint_every`` rows or ``RUNNER_FLUSH_INTERVAL_MS``, committed
+    together with each model's runtime statistics (see
+    ``src.runners.runtime_stats``), with dispatch held back while
+    ``RUNNER_WRITE_MAX_PENDING`` rows are unwritten. Pairs that already have
+    a Response row are skipped, so rerunning an interrupted evaluation
+    resumes where it stopped. With a ``budget``, each
+    call's projected spend is reserved before it is dispatched, and once the
+    budget would be exceeded the remaining calls are skipped.
+
+    With ``samples_per_question > 1`` each pair is sampled that many times and
+    every sample is stored as its own Response with a ``sample_index``. Models
+    that support ``n`` return all missing samples from one call (paying for
+    the prompt once); others get one concurrent call per sample. The response
+    cache is bypassed, since replaying one answer would hide the variance the
+    samples are meant to measure.
+
+    ``pairs`` restricts the run to those (question, model) cells instead of
+    every model against every question; shard jobs use it to collect the
+    work items they have claimed.
+
+    Setting ``stop_event`` (on pause or cancel) stops the run: no further
+    calls are dispatched, those in flight are cancelled, and whatever had
+    already finished is committed. Returns the Response records created by
+    this run (written with a bulk INSERT, so not attached to ``db``).
     """
+    settings = get_settings()
     tok = set_evaluation_id(str(evaluation_id))
     responses: list[ResponseModel] = []
-    total = len(question_ids) * len(model_configs)
-    completed = 0
+    tasks: dict[asyncio.Task, tuple[str, ModelConfig, tuple[int, ...]]] = {}
+    samples_per_question = max(1, samples_per_question)
+    narrowed = pairs is not None
+    if pairs is None:
+        pairs = [(q, m) for q in question_ids for m in model_configs]
+    total = len(pairs) * samples_per_question
+    cache_hits = 0
+    short_circuited: Counter[str] = Counter()
+    if samples_per_question > 1:
+        cache = None
+    elif cache is None:
+        cache = get_response_cache()
+    batch_size = max(1, checkpoint_every or settings.runner_checkpoint_every)
+    progress = get_progress_broker()
+    runtime_stats = RuntimeStatsCollector()
+    writer = ResponseWriter(
+        db,
+        evaluation_id,
+        runtime_stats,
+        batch_size=batch_size,
+        flush_interval_seconds=settings.runner_flush_interval_ms / 1000,
+        max_pending=settings.runner_write_max_pending,
+    )
+    stop_waiter: asyncio.Future | None = None
+    stopped = False
+
+    limit = max_concurrency or settings.runner_max_concurrency
+    semaphore = asyncio.Semaphore(max(1, limit))
 
-    for question_id in question_ids:
+    async def collect(
+        question_id: str, model_config: ModelConfig, sample_indexes: tuple[int, ...]
+    ) -> list[dict] | None:
+        nonlocal cache_hits
+        n = len(sample_indexes)
         question_text = question_texts[question_id]
-        for model_config in model_configs:
-            completed += 1
-            logger.info(
-                "Running model",
-                extra={
-                    "completed": completed,
-                    "total": total,
-                    "model": model_config.name,
-                    "question_id": question_id,
-                },
+        key = None
+        if cache is not None:
+            key = cache_key(
+                model_config.litellm_model,
+                render_prompt(prompt_template, question_text),
+                DEFAULT_TEMPERATURE,
+                DEFAULT_MAX_TOKENS,
             )
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                cache_hits += 1
+                metadata = {
+                    **cached["metadata"],
+                    "source": "cache",
+                    "cache_key": key,
+                    "cost_usd": 0.0,
+                }
+                return [
+                    {"response_text": cached["response_text"], "metadata": metadata}
+                ]
 
-            try:
-                result = await call_model(model_config, question_text, prompt_template)
-                response = ResponseModel(
-                    id=uuid4(),
-                    evaluation_id=evaluation_id,
-                    question_id=question_id,
-                    model_name=model_config.name,
-                    response_text=result["response_text"],
-                    source="api",
-                    raw_metadata=result["metadata"],
+        await writer.wait_for_room()
+        async with semaphore:
+            reservation = None
+            if budget is not None:
+                reservation = reserve_call(
+                    budget,
+                    model_config,
+                    render_prompt(prompt_template, question_text),
+                    samples=n,
                 )
-                db.add(response)
-                responses.append(response)
-
+                if reservation is None:
+                    # Never called, so neither collected nor failed.
+                    return []
+            result = None
+            try:
+                if n > 1:
+                    result = await call_model(
+                        model_config, question_text, prompt_template, n=n
+                    )
+                else:
+                    result = await call_model(
+                        model_config, question_text, prompt_template
+                    )
+            except CircuitOpenError:
+                short_circuited[model_config.name] += 1
+                return []
             except RuntimeError:
+                runtime_stats.record_error(model_config.name)
                 logger.exception(
                     "Skipping model after retries",
                     extra={"model": model_config.name, "question_id": question_id},
                 )
+                return None
+            finally:
+                if budget is not None and reservation is not None:
+                    budget.settle(reservation, result and result["metadata"])
+
+        runtime_stats.record_call(model_config.name, result["metadata"])
+        # A stream cut off by its stall or time guard is kept for this run but
+        # not replayed to later ones as if it were a complete answer.
+        cacheable = not (
+            result["metadata"].get("truncated") or result["metadata"].get("error")
+        )
+        if cache is not None and key is not None and cacheable:
+            await asyncio.to_thread(cache.put, key, result)
+        return split_samples(result) if n > 1 else [result]
+
+    try:
+        collected = await get_collected_samples(
+            db,
+            evaluation_id,
+            {q for q, _ in pairs} if narrowed else None,
+        )
+        writer.start()
+        completed = 0
+        for question_id, model_config in pairs:
+            missing = []
+            for sample_index in range(samples_per_question):
+                if (question_id, model_config.name, sample_index) in collected:
+                    completed += 1
+                else:
+                    missing.append(sample_index)
+            if not missing:
+                continue
+            if len(missing) > 1 and supports_n(model_config):
+                groups = [tuple(missing)]
+            else:
+                groups = [(sample_index,) for sample_index in missing]
+            for sample_indexes in groups:
+                task = asyncio.create_task(
+                    collect(question_id, model_config, sample_indexes)
+                )
+                tasks[task] = (question_id, model_config, sample_indexes)
+
+        if completed:
+            logger.info(
+                "Resuming evaluation",
+                extra={"already_collected": completed, "total": total},
+            )
+
+        pending = set(tasks)
+        if stop_event is not None:
+            stop_waiter = asyncio.ensure_future(stop_event.wait())
+        while pending:
+            waiting = pending if stop_waiter is None else pending | {stop_waiter}
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if stop_waiter is not None and stop_waiter in done:
+                stopped = True
+                for task in pending:
+                    task.cancel()
+                # Let the cancellations land; calls that finished before
+                # theirs did are still recorded below.
+                finished, _ = await asyncio.wait(pending)
+                done = {t for t in finished if not t.cancelled()}
+                pending = set()
+            else:
+                pending -= done
+            # Record every successful result before surfacing an unexpected
+            # error from a sibling task, so finished work is not discarded.
+            failures = [t for t in done if t.exception() is not None]
+            for task in done:
+                if task in failures:
+                    continue
+                question_id, model_config, sample_indexes = tasks[task]
+                results = task.result()
+                if results == []:
+                    # Skipped for the budget or an open circuit: left for a
+                    # later run rather than reported as an error.
+                    continue
+                completed += len(sample_indexes)
+                logger.info(
+                    "Model call finished",
+                    extra={
+                        "completed": completed,
+                        "total": total,
+                        "model": model_config.name,
+                        "question_id": question_id,
+                        "succeeded": results is not None,
+                    },
+                )
+                progress.publish(
+                    ProgressEvent(
+                        evaluation_id=str(evaluation_id),
+                        model=model_config.name,
+                        samples=len(results or sample_indexes),
+                        succeeded=results is not None,
+                        cost_usd=sum(
+                            r["metadata"].get("cost_usd") or 0.0 for r in results or []
+                        ),
+                    )
+                )
+                if results is None:
+                    continue
+
+                # A provider may return fewer choices than requested; the
+                # missing samples are picked up when the run is resumed.
+                for sample_index, result in zip(sample_indexes, results, strict=False):
+                    response = ResponseModel(
+                        id=uuid4(),
+                        evaluation_id=evaluation_id,
+                        question_id=question_id,
+                        model_name=model_config.name,
+                        sample_index=sample_index,
+                        response_text=result["response_text"],
+                        source="api",
+                        raw_metadata=result["metadata"],
+                    )
+                    responses.append(response)
+                    writer.put(response)
+            if failures:
+                failures[0].result()
 
-    await db.commit()
-    for r in responses:
-        await db.refresh(r)
+        await writer.close()
+    except BaseException:
+        # Keep everything that finished before the failure so a rerun can
+        # resume from here instead of paying for those calls again.
+        with contextlib.suppress(Exception):
+            await writer.close()
+        raise
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if stop_waiter is not None:
+            stop_waiter.cancel()
+        reset_evaluation_id(tok)
 
-    reset_evaluation_id(tok)
+    if cache is not None:
+        await asyncio.to_thread(cache.evict)
 
     logger.info(
         "Evaluation responses collected",
@@ -176,6 +839,20 @@ async def run_evaluation(
             "evaluation_id": str(evaluation_id),
             "responses_collected": len(responses),
             "total": total,
+            "cache_hits": cache_hits,
+            # Process-wide totals of the shared cache, across runs.
+            "response_cache": cache.stats() if cache is not None else None,
+            "short_circuited": dict(short_circuited),
+            "circuit_breakers": get_circuit_breakers().snapshot(
+                [m.name for m in model_configs]
+            ),
+            "retry_budgets": get_retry_policy().budget_snapshot(
+                [m.name for m in model_configs]
+            ),
+            "hedging": get_hedging_registry().snapshot([m.name for m in model_configs]),
+            "scheduler": get_scheduler().snapshot(str(evaluation_id)),
+            "budget": budget.snapshot() if budget is not None else None,
+            "stopped": stopped,
         },
     )
     return responses
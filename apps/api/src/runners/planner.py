@@ -0,0 +1,335 @@
+"""Dry-run planning: what a run would call, cost and take before it starts.
+
+A plan works out the exact calls a run would make: every (question, model)
+sample not collected yet, grouped into calls the way the runner groups them.
+It counts prompt tokens with the local tokenizer and takes completion
+length, latency and price from the ``model_runtime_stats`` of earlier runs,
+then projects wall time from the concurrency and rate limits that would
+bound the run. Models that have never run have no latency to project from;
+their completions are assumed to be ``max_tokens`` long, as the budget
+does, and the plan lists them.
+"""
+
+import math
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.db.models import Evaluation, ModelRuntimeStats
+from src.loaders.config_loader import (
+    ModelConfig,
+    PromptTemplate,
+    ProviderConfig,
+    load_app_config,
+)
+from src.loaders.question_bank import questions_for
+from src.loaders.question_loader import load_all_questions
+from src.runners.batch_runner import BATCH_DISCOUNT
+from src.runners.litellm_runner import (
+    DEFAULT_MAX_TOKENS,
+    count_prompt_tokens,
+    estimate_cost,
+    get_collected_samples,
+    get_recorded_spend,
+    render_prompt,
+    supports_n,
+)
+
+
+class PlanError(ValueError):
+    """The evaluation cannot be planned as configured."""
+
+
+@dataclass(frozen=True)
+class ModelHistory:
+    """Per-call means over every earlier run of a model."""
+
+    calls: int
+    latency_seconds: float
+    completion_tokens: float
+    cost_usd: float
+
+
+@dataclass
+class ModelPlan:
+    """The calls one model would serve."""
+
+    model_name: str
+    provider: str
+    samples: int = 0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float | None = 0.0
+    # Time spent inside calls, summed; None without latency history.
+    call_seconds: float | None = None
+    history_calls: int = 0
+
+
+@dataclass
+class ProviderPlan:
+    """Projected wall time of one provider's share of the run."""
+
+    provider: str
+    concurrency: int
+    wall_seconds: float | None
+    limited_by: str | None
+
+
+@dataclass
+class RunPlan:
+    """A dry run of an evaluation: calls, tokens, cost and wall time."""
+
+    execution_mode: str
+    samples: int = 0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float | None = 0.0
+    wall_seconds: float | None = None
+    concurrency: int = 0
+    within_budget: bool | None = None
+    models: list[ModelPlan] = field(default_factory=list)
+    providers: list[ProviderPlan] = field(default_factory=list)
+    unpriced_models: list[str] = field(default_factory=list)
+    models_without_history: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for item in (data, *data["models"], *data["providers"]):
+            for key in ("cost_usd", "call_seconds", "wall_seconds"):
+                if item.get(key) is not None:
+                    item[key] = round(item[key], 6 if key == "cost_usd" else 1)
+        return data
+
+
+async def load_model_history(
+    db: AsyncSession, model_names: Iterable[str]
+) -> dict[str, ModelHistory]:
+    """Average each model's recorded calls across every evaluation."""
+    result = await db.execute(
+        select(ModelRuntimeStats).where(
+            ModelRuntimeStats.model_name.in_(list(model_names)),
+            ModelRuntimeStats.calls > 0,
+        )
+    )
+    rows: dict[str, list[ModelRuntimeStats]] = {}
+    for row in result.scalars().all():
+        rows.setdefault(row.model_name, []).append(row)
+    history = {}
+    for name, stats in rows.items():
+        calls = sum(row.calls for row in stats)
+        history[name] = ModelHistory(
+            calls=calls,
+            latency_seconds=sum(row.latency_seconds for row in stats) / calls,
+            completion_tokens=sum(row.completion_tokens for row in stats) / calls,
+            cost_usd=sum(row.cost_usd for row in stats) / calls,
+        )
+    return history
+
+
+def _limit_seconds(amount: float, per_minute: int | None) -> float:
+    """Time a token bucket (which starts with a minute's worth) needs."""
+    if not per_minute or amount <= per_minute:
+        return 0.0
+    return (amount - per_minute) * 60.0 / per_minute
+
+
+def _provider_plan(
+    quota: ProviderConfig,
+    models: list[ModelPlan],
+    configs: dict[str, ModelConfig],
+    concurrency: int,
+) -> ProviderPlan:
+    """Take the longest of the bounds on one provider's calls."""
+    bounds = {
+        "requests_per_minute": max(
+            _limit_seconds(sum(m.calls for m in models), quota.requests_per_minute),
+            *(
+                _limit_seconds(m.calls, configs[m.model_name].requests_per_minute)
+                for m in models
+            ),
+        ),
+        "tokens_per_minute": max(
+            _limit_seconds(
+                sum(m.prompt_tokens + m.completion_tokens for m in models),
+                quota.tokens_per_minute,
+            ),
+            *(
+                _limit_seconds(
+                    m.prompt_tokens + m.completion_tokens,
+                    configs[m.model_name].tokens_per_minute,
+                )
+                for m in models
+            ),
+        ),
+    }
+    if any(m.call_seconds is None for m in models):
+        # Without latency the time in flight, usually the longest, is unknown.
+        return ProviderPlan(quota.name, concurrency, None, None)
+    bounds["concurrency"] = sum(m.call_seconds or 0.0 for m in models) / concurrency
+    limited_by = max(bounds, key=lambda k: bounds[k])
+    return ProviderPlan(quota.name, concurrency, bounds[limited_by], limited_by)
+
+
+def build_plan(
+    questions: dict[str, str],
+    model_configs: list[ModelConfig],
+    prompt_template: PromptTemplate,
+    history: dict[str, ModelHistory],
+    providers: Iterable[ProviderConfig] = (),
+    samples_per_question: int = 1,
+    collected: set[tuple[str, str, int]] | None = None,
+    execution_mode: str = "interactive",
+) -> RunPlan:
+    """Plan the calls for ``questions`` (id -> text) against each model.
+
+    Interactive runs are projected as sharded the way the planner shards them,
+    assuming enough workers to run every shard at once; each provider's calls
+    take the longest of their time in flight at its concurrency and the time
+    its requests- and tokens-per-minute limits allow. Batch runs are priced at
+    the batch discount, but their wall time is the provider's turnaround and
+    is not projected.
+    """
+    settings = get_settings()
+    collected = collected or set()
+    samples_per_question = max(1, samples_per_question)
+    batch = execution_mode == "batch"
+    plan = RunPlan(execution_mode=execution_mode)
+    cells = 0
+
+    for model_config in model_configs:
+        past = history.get(model_config.name)
+        completion = (
+            round(past.completion_tokens) if past is not None else DEFAULT_MAX_TOKENS
+        )
+        bundled = not batch and samples_per_question > 1 and supports_n(model_config)
+        model = ModelPlan(
+            model_config.name,
+            model_config.provider,
+            history_calls=past.calls if past is not None else 0,
+        )
+        for question_id, text in questions.items():
+            missing = sum(
+                (question_id, model_config.name, k) not in collected
+                for k in range(samples_per_question)
+            )
+            if not missing:
+                continue
+            cells += 1
+            calls = 1 if bundled else missing
+            prompt = render_prompt(prompt_template, text)
+            model.samples += missing
+            model.calls += calls
+            model.prompt_tokens += calls * count_prompt_tokens(
+                model_config.litellm_model, prompt
+            )
+            # History is a mean per call, which for a bundled call covers all
+            # its samples; the max-tokens fallback applies to each sample.
+            per_call = bundled and past is not None
+            model.completion_tokens += (calls if per_call else missing) * completion
+        price = estimate_cost(
+            model_config.litellm_model, model.prompt_tokens, model.completion_tokens
+        )
+        if price is None and past is not None:
+            price = model.calls * past.cost_usd
+        if price is not None and batch:
+            price *= BATCH_DISCOUNT
+        model.cost_usd = price
+        if past is not None:
+            model.call_seconds = model.calls * past.latency_seconds
+        plan.models.append(model)
+
+    for model in plan.models:
+        plan.samples += model.samples
+        plan.calls += model.calls
+        plan.prompt_tokens += model.prompt_tokens
+        plan.completion_tokens += model.completion_tokens
+        if model.cost_usd is None:
+            plan.unpriced_models.append(model.model_name)
+        if not model.history_calls:
+            plan.models_without_history.append(model.model_name)
+    priced = [m.cost_usd for m in plan.models if m.cost_usd is not None]
+    plan.cost_usd = sum(priced) if len(priced) == len(plan.models) else None
+    if batch:
+        return plan
+
+    shards = min(
+        settings.evaluation_max_shards,
+        math.ceil(cells / max(1, settings.work_item_chunk_size)),
+    )
+    plan.concurrency = settings.runner_max_concurrency * max(1, shards)
+    quotas = {p.name: p for p in providers}
+    configs = {c.name: c for c in model_configs}
+    for provider in sorted({m.provider for m in plan.models}):
+        quota = quotas.get(provider, ProviderConfig(name=provider))
+        plan.providers.append(
+            _provider_plan(
+                quota,
+                [m for m in plan.models if m.provider == provider],
+                configs,
+                min(
+                    plan.concurrency,
+                    quota.max_concurrency or settings.scheduler_provider_concurrency,
+                ),
+            )
+        )
+
+    walls = [p.wall_seconds for p in plan.providers]
+    if None not in walls:
+        call_seconds = sum(m.call_seconds or 0.0 for m in plan.models)
+        plan.wall_seconds = max(
+            call_seconds / plan.concurrency, *(w or 0.0 for w in walls)
+        )
+    return plan
+
+
+async def plan_evaluation(db: AsyncSession, evaluation: Evaluation) -> RunPlan:
+    """Plan the rest of an evaluation's run, skipping samples already collected.
+
+    Raises PlanError if none of its models or its prompt template are
+    configured.
+    """
+    config = load_app_config()
+    model_names_any: Any = evaluation.model_list
+    model_names = set(model_names_any or [])
+    model_configs = [m for m in config.models if m.name in model_names]
+    if not model_configs:
+        raise PlanError("None of the evaluation's models are configured")
+    template = next(
+        (t for t in config.templates if t.id == evaluation.prompt_template), None
+    )
+    if template is None:
+        raise PlanError(f"Prompt template '{evaluation.prompt_template}' not found")
+
+    evaluation_id: UUID = evaluation.id
+    plan = build_plan(
+        {
+            q.id: q.text
+            for q in questions_for(load_all_questions(), evaluation.question_ids)
+        },
+        model_configs,
+        template,
+        await load_model_history(db, model_names),
+        providers=config.providers,
+        samples_per_question=evaluation.samples_per_question or 1,
+        collected=await get_collected_samples(db, evaluation_id),
+        execution_mode=evaluation.execution_mode,
+    )
+    # The budget also covers what earlier attempts of the run already spent.
+    checks = []
+    if evaluation.budget_usd is not None or evaluation.budget_tokens is not None:
+        spent_usd, spent_tokens = await get_recorded_spend(db, evaluation_id)
+        if evaluation.budget_usd is not None and plan.cost_usd is not None:
+            checks.append(spent_usd + plan.cost_usd <= evaluation.budget_usd)
+        if evaluation.budget_tokens is not None:
+            tokens = plan.prompt_tokens + plan.completion_tokens
+            checks.append(spent_tokens + tokens <= evaluation.budget_tokens)
+    if checks:
+        plan.within_budget = all(checks)
+    return plan
@@ -0,0 +1,179 @@
+"""Async token-bucket rate limiting for provider and model quotas.
+
+Buckets live in one process. When several worker processes call the same
+providers, each is given ``1/processes`` of every quota
+(``RATE_LIMIT_PROCESSES``) so that together they stay within it.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from functools import lru_cache
+
+from src.config import get_settings
+from src.loaders.config_loader import ModelConfig, ProviderConfig, load_app_config
+from src.runners.clock import Clock, SystemClock
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at ``per_minute`` tokens per minute.
+
+    The bucket starts full with one minute's worth of capacity. Waiters are
+    served in FIFO order so a large request cannot be starved by small ones.
+    """
+
+    def __init__(self, per_minute: int, clock: Clock) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated_at = clock.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock.monotonic()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens, sleeping until they are available.
+
+        Requests larger than the bucket are clamped to its capacity. Returns the
+        number of seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) / self.rate
+                await self._clock.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= amount
+        return waited
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens, e.g. when a reservation overestimated usage."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Per-provider and per-model request/token limits for runner calls.
+
+    A call must clear every bucket that applies to it: the provider's request
+    and token buckets plus the model's own. Token buckets are charged with an
+    up-front estimate which is settled against actual usage after the call.
+    Every limit is divided by ``processes``, the number of processes sharing
+    the quotas.
+    """
+
+    def __init__(
+        self,
+        providers: Iterable[ProviderConfig] = (),
+        clock: Clock | None = None,
+        processes: int = 1,
+    ) -> None:
+        self._clock = clock or SystemClock()
+        self._providers = {p.name: p for p in providers}
+        self._processes = max(1, processes)
+        self._buckets: dict[tuple[str, str, str], TokenBucket] = {}
+
+    def _bucket(
+        self, scope: str, name: str, kind: str, limit: int | None
+    ) -> TokenBucket | None:
+        if not limit:
+            return None
+        key = (scope, name, kind)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(max(1, limit // self._processes), self._clock)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _buckets_for(
+        self, model_config: ModelConfig
+    ) -> tuple[list[TokenBucket], list[TokenBucket]]:
+        provider = self._providers.get(model_config.provider)
+        request_buckets = [
+            self._bucket(
+                "provider",
+                model_config.provider,
+                "requests",
+                provider.requests_per_minute if provider else None,
+            ),
+            self._bucket(
+                "model",
+                model_config.name,
+                "requests",
+                model_config.requests_per_minute,
+            ),
+        ]
+        token_buckets = [
+            self._bucket(
+                "provider",
+                model_config.provider,
+                "tokens",
+                provider.tokens_per_minute if provider else None,
+            ),
+            self._bucket(
+                "model",
+                model_config.name,
+                "tokens",
+                model_config.tokens_per_minute,
+            ),
+        ]
+        return (
+            [b for b in request_buckets if b is not None],
+            [b for b in token_buckets if b is not None],
+        )
+
+    async def acquire(self, model_config: ModelConfig, estimated_tokens: int) -> float:
+        """Wait until a call with ``estimated_tokens`` fits every quota.
+
+        Returns the total seconds spent waiting.
+        """
+        request_buckets, token_buckets = self._buckets_for(model_config)
+        waited = 0.0
+        for bucket in request_buckets:
+            waited += await bucket.acquire(1)
+        for bucket in token_buckets:
+            waited += await bucket.acquire(estimated_tokens)
+        if waited > 0:
+            logger.debug(
+                "Rate limited model call",
+                extra={
+                    "model": model_config.name,
+                    "provider": model_config.provider,
+                    "waited_seconds": round(waited, 3),
+                },
+            )
+        return waited
+
+    def settle(
+        self,
+        model_config: ModelConfig,
+        estimated_tokens: int,
+        actual_tokens: int | None,
+    ) -> None:
+        """Refund the difference when a call used fewer tokens than reserved."""
+        if actual_tokens is None or actual_tokens >= estimated_tokens:
+            return
+        _, token_buckets = self._buckets_for(model_config)
+        for bucket in token_buckets:
+            bucket.refund(estimated_tokens - actual_tokens)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide limiter built from models.yaml."""
+    return RateLimiter(
+        load_app_config().providers, processes=get_settings().rate_limit_processes
+    )
@@ -0,0 +1,143 @@
+"""Content-addressed on-disk cache for LLM completions.
+
+Entries are keyed by a hash of everything that determines a completion
+(model, rendered prompt, sampling parameters), so identical calls made by any
+evaluation are served from disk instead of being paid for again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(
+    litellm_model: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Return the SHA-256 content address for a completion request."""
+    payload = json.dumps(
+        [litellm_model, prompt, temperature, max_tokens],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """A directory of JSON entries with hit/miss counters and size/age eviction.
+
+    Entries older than ``max_age_seconds`` are treated as misses and removed.
+    ``evict`` additionally trims the oldest entries until the cache fits in
+    ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int | None = None,
+        max_age_seconds: float | None = None,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached result for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            if self._expired(path.stat().st_mtime, time.time()):
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError(path)
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, result: dict) -> None:
+        """Store ``result`` under ``key``, replacing any existing entry."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """Drop expired entries, then the oldest ones beyond ``max_bytes``.
+
+        Returns the number of entries removed.
+        """
+        if not self.directory.exists():
+            return 0
+
+        now = time.time()
+        entries: list[tuple[float, int, Path]] = []
+        removed = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if self._expired(st.st_mtime, now):
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info(
+                "Evicted cached responses",
+                extra={"removed": removed, "cache_dir": str(self.directory)},
+            )
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache | None:
+    """Get the process-wide response cache, or None when caching is disabled."""
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    return ResponseCache(
+        Path(settings.llm_cache_dir),
+        max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+        max_age_seconds=settings.llm_cache_max_age_days * 86400,
+    )
@@ -0,0 +1,186 @@
+"""Retry policy for LLM calls.
+
+Errors are classified as retryable (rate limits, overload, timeouts, 5xx,
+connection failures) or fatal (auth, validation, not-found). Retryable errors
+back off with decorrelated jitter, honouring provider ``Retry-After`` hints,
+and each model has a retry budget so a struggling provider cannot turn every
+request into several.
+"""
+
+import logging
+import random
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that will not succeed on retry (bad request, auth, not found,
+# payload too large, validation). 408/409/429 and 5xx are retryable.
+FATAL_STATUS_CODES = frozenset({400, 401, 403, 404, 413, 422})
+
+# Local programming errors are never fixed by retrying.
+FATAL_EXCEPTION_TYPES: tuple[type[BaseException], ...] = (
+    AttributeError,
+    KeyError,
+    TypeError,
+    ValueError,
+)
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True if ``exc`` is a transient failure worth retrying."""
+    if type(exc).__name__ == "BudgetExceededError":
+        return False
+    status = _status_code(exc)
+    if status is not None:
+        return status not in FATAL_STATUS_CODES
+    return not isinstance(exc, FATAL_EXCEPTION_TYPES)
+
+
+def _headers(exc: BaseException) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    response = getattr(exc, "response", None)
+    for source in (
+        getattr(response, "headers", None),
+        getattr(exc, "litellm_response_headers", None),
+        getattr(exc, "headers", None),
+    ):
+        if source:
+            headers.update({str(k).lower(): str(v) for k, v in dict(source).items()})
+    return headers
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Extract a provider ``Retry-After`` hint (seconds) from an exception."""
+    headers = _headers(exc)
+    if "retry-after-ms" in headers:
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+class RetryBudget:
+    """Caps retries at a fraction of request volume for one model.
+
+    Every call deposits ``ratio`` tokens and every retry spends one. The
+    budget starts with ``reserve`` tokens so low-volume models can still
+    retry, and never holds more than ``capacity``.
+    """
+
+    def __init__(self, ratio: float, reserve: float, capacity: float) -> None:
+        self.ratio = ratio
+        self.capacity = max(capacity, reserve)
+        self.balance = float(reserve)
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+class RetryPolicy:
+    """Decides whether and when to retry a failed LLM call.
+
+    Subclass and override ``is_retryable`` or ``next_delay`` to plug in a
+    different strategy, then install it via ``get_retry_policy``.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        max_retry_after: float = 300.0,
+        budget_ratio: float = 0.2,
+        budget_reserve: float = 10.0,
+        budget_capacity: float = 100.0,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget_ratio = budget_ratio
+        self.budget_reserve = budget_reserve
+        self.budget_capacity = budget_capacity
+        self._rng = rng or random.Random()  # noqa: S311 - jitter, not crypto
+        self._budgets: dict[str, RetryBudget] = {}
+
+    def budget(self, model_name: str) -> RetryBudget:
+        budget = self._budgets.get(model_name)
+        if budget is None:
+            budget = RetryBudget(
+                self.budget_ratio, self.budget_reserve, self.budget_capacity
+            )
+            self._budgets[model_name] = budget
+        return budget
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        return is_retryable(exc)
+
+    def next_delay(self, exc: BaseException, previous_delay: float) -> float:
+        """Decorrelated jitter: uniform(base, 3 * previous), capped.
+
+        A provider ``Retry-After`` hint acts as a floor on the delay.
+        """
+        upper = max(self.base_delay, previous_delay * 3)
+        delay = min(self.max_delay, self._rng.uniform(self.base_delay, upper))
+        hint = retry_after_seconds(exc)
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_retry_after))
+        return delay
+
+    def budget_snapshot(
+        self, names: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        selected = names if names is not None else list(self._budgets)
+        return {
+            name: {"balance": round(b.balance, 2), "exhausted": b.exhausted}
+            for name in selected
+            if (b := self._budgets.get(name)) is not None
+        }
+
+
+@lru_cache
+def get_retry_policy() -> RetryPolicy:
+    """Get the process-wide retry policy configured from settings."""
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.retry_max_attempts,
+        base_delay=settings.retry_base_delay_seconds,
+        max_delay=settings.retry_max_delay_seconds,
+        budget_ratio=settings.retry_budget_ratio,
+        budget_reserve=settings.retry_budget_reserve,
+    )
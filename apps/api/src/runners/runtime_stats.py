@@ -0,0 +1,232 @@
+"""Per-model serving statistics collected by the runner.
+
+Each run accumulates call counts, errors, a latency sketch, tokens and cost
+per model in memory and merges them into the ``model_runtime_stats`` row of
+its (evaluation, model) at every checkpoint. Latency quantiles come from a
+log-bucketed sketch with bounded relative error: sketches from any number
+of shards merge by adding bucket counts, so p50/p95/p99 stay accurate
+without keeping individual latencies.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import ModelRuntimeStats
+
+# Quantiles are within 1% of the true latency.
+SKETCH_RELATIVE_ACCURACY = 0.01
+# Latencies below this (in seconds) share the sketch's zero bucket.
+SKETCH_MIN_VALUE = 1e-3
+REPORTED_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Streaming quantile sketch over positive values (DDSketch-style).
+
+    Value ``x`` is counted in bucket ``ceil(log(x) / log(gamma))``, so every
+    value in a bucket is within ``relative_accuracy`` of the bucket's
+    representative value.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = SKETCH_RELATIVE_ACCURACY,
+        buckets: dict[int, int] | None = None,
+        zero_count: int = 0,
+    ) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = dict(buckets or {})
+        self.zero_count = zero_count
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, value: float) -> None:
+        if value < SKETCH_MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.zero_count += other.zero_count
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+
+    def quantile(self, q: float) -> float | None:
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma**index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): n for index, n in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> "QuantileSketch":
+        if not data:
+            return cls()
+        return cls(
+            data.get("relative_accuracy", SKETCH_RELATIVE_ACCURACY),
+            {int(index): int(n) for index, n in data.get("buckets", {}).items()},
+            int(data.get("zero_count", 0)),
+        )
+
+
+@dataclass
+class ModelRuntimeDelta:
+    """Statistics gathered for one model since the last flush."""
+
+    calls: int = 0
+    errors: int = 0
+    latency: QuantileSketch = field(default_factory=QuantileSketch)
+    latency_seconds: float = 0.0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class RuntimeStatsCollector:
+    """In-memory statistics of one run, drained at each checkpoint."""
+
+    def __init__(self) -> None:
+        self.pending: dict[str, ModelRuntimeDelta] = {}
+
+    def _delta(self, model_name: str) -> ModelRuntimeDelta:
+        return self.pending.setdefault(model_name, ModelRuntimeDelta())
+
+    def record_call(self, model_name: str, metadata: dict) -> None:
+        """Record a call the provider served, from ``call_model``'s metadata."""
+        delta = self._delta(model_name)
+        delta.calls += 1
+        latency = metadata.get("latency_seconds")
+        if latency is not None:
+            delta.latency.add(latency)
+            delta.latency_seconds += latency
+        delta.completion_tokens += metadata.get("completion_tokens") or 0
+        delta.total_tokens += metadata.get("total_tokens") or 0
+        delta.cost_usd += metadata.get("cost_usd") or 0.0
+
+    def record_error(self, model_name: str) -> None:
+        self._delta(model_name).errors += 1
+
+    def drain(self) -> dict[str, ModelRuntimeDelta]:
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def restore(self, deltas: dict[str, ModelRuntimeDelta]) -> None:
+        """Put back drained deltas whose flush failed."""
+        for model_name, restored in deltas.items():
+            delta = self._delta(model_name)
+            delta.calls += restored.calls
+            delta.errors += restored.errors
+            delta.latency.merge(restored.latency)
+            delta.latency_seconds += restored.latency_seconds
+            delta.completion_tokens += restored.completion_tokens
+            delta.total_tokens += restored.total_tokens
+            delta.cost_usd += restored.cost_usd
+
+
+async def flush_runtime_stats(
+    db: AsyncSession, evaluation_id: UUID, deltas: dict[str, ModelRuntimeDelta]
+) -> None:
+    """Merge deltas into the evaluation's rows; the caller commits.
+
+    Rows are locked while merging, so concurrent shards never lose counts.
+    """
+    for model_name, delta in sorted(deltas.items()):
+        await db.execute(
+            insert(ModelRuntimeStats)
+            .values(
+                id=uuid4(),
+                evaluation_id=evaluation_id,
+                model_name=model_name,
+                latency_sketch=QuantileSketch().to_dict(),
+            )
+            .on_conflict_do_nothing(
+                constraint="uq_model_runtime_stats_evaluation_model"
+            )
+        )
+        result = await db.execute(
+            select(ModelRuntimeStats)
+            .where(
+                ModelRuntimeStats.evaluation_id == evaluation_id,
+                ModelRuntimeStats.model_name == model_name,
+            )
+            .with_for_update()
+        )
+        row = result.scalar_one_or_none()
+        if row is None:
+            row = ModelRuntimeStats(
+                id=uuid4(),
+                evaluation_id=evaluation_id,
+                model_name=model_name,
+                calls=0,
+                errors=0,
+                latency_seconds=0.0,
+                completion_tokens=0,
+                total_tokens=0,
+                cost_usd=0.0,
+            )
+            db.add(row)
+        sketch = QuantileSketch.from_dict(row.latency_sketch)
+        sketch.merge(delta.latency)
+        row.latency_sketch = sketch.to_dict()
+        row.calls += delta.calls
+        row.errors += delta.errors
+        row.latency_seconds += delta.latency_seconds
+        row.completion_tokens += delta.completion_tokens
+        row.total_tokens += delta.total_tokens
+        row.cost_usd += delta.cost_usd
+
+
+def runtime_stats_summary(row: ModelRuntimeStats) -> dict[str, Any]:
+    """Report one model's statistics with latency quantiles and throughput."""
+    sketch = QuantileSketch.from_dict(row.latency_sketch)
+    quantiles = {
+        f"p{round(q * 100)}_latency_seconds": (
+            round(value, 3) if (value := sketch.quantile(q)) is not None else None
+        )
+        for q in REPORTED_QUANTILES
+    }
+    attempts = row.calls + row.errors
+    return {
+        "model_name": row.model_name,
+        "calls": row.calls,
+        "errors": row.errors,
+        "error_rate": round(row.errors / attempts, 4) if attempts else 0.0,
+        **quantiles,
+        "mean_latency_seconds": round(row.latency_seconds / sketch.count, 3)
+        if sketch.count
+        else None,
+        "tokens_per_second": round(row.completion_tokens / row.latency_seconds, 2)
+        if row.latency_seconds
+        else None,
+        "completion_tokens": row.completion_tokens,
+        "total_tokens": row.total_tokens,
+        "cost_usd": round(row.cost_usd, 6),
+        "updated_at": row.updated_at,
+    }
@@ -0,0 +1,219 @@
+"""Fair sharing of provider capacity across concurrent evaluations.
+
+Every model call holds one of its provider's call slots while it runs. When
+evaluations compete for a provider's slots, a freed slot goes to the waiting
+evaluation that has received the least service relative to its weight
+(weighted fair queuing over call counts), so a run with twice the weight gets
+roughly twice the calls and no run can starve another, however many calls it
+has queued. An evaluation that was idle rejoins at the current service level
+instead of cashing in the time it was away.
+
+The scheduler is per process: each API or worker process has its own slots,
+so a provider's ``max_concurrency`` caps the calls of one process, and
+evaluations only compete for slots with those whose shards run in the same
+process. Each run or shard attaches its evaluation while it runs, and the
+flow's weight and statistics are forgotten once the last one in the process
+detaches.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from src.config import get_settings
+from src.loaders.config_loader import ProviderConfig, load_app_config
+
+# Window for the calls-per-minute figure in snapshots.
+THROUGHPUT_WINDOW_SECONDS = 300.0
+
+
+@dataclass
+class FlowStats:
+    """Service an evaluation has received from the scheduler."""
+
+    calls: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    recent: deque[float] = field(default_factory=deque)
+
+    def record(self, waited: float, now: float) -> None:
+        self.calls += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.recent.append(now)
+        while self.recent and self.recent[0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self.recent.popleft()
+
+    def calls_per_minute(self, now: float) -> float:
+        recent = [t for t in self.recent if t >= now - THROUGHPUT_WINDOW_SECONDS]
+        return round(len(recent) * 60.0 / THROUGHPUT_WINDOW_SECONDS, 2)
+
+
+class _ProviderPool:
+    """Call slots for one provider, granted in weighted fair order."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.in_use: dict[str, int] = {}
+        self.waiters: dict[str, deque[asyncio.Future]] = {}
+        # Virtual service time: calls granted divided by the flow's weight.
+        self.service: dict[str, float] = {}
+
+    @property
+    def busy(self) -> int:
+        return sum(self.in_use.values())
+
+    def join(self, flow: str) -> None:
+        if self.in_use.get(flow) or self.waiters.get(flow):
+            return
+        active = [
+            self.service[f]
+            for f in self.service
+            if f != flow and (self.in_use.get(f) or self.waiters.get(f))
+        ]
+        floor = min(active) if active else 0.0
+        self.service[flow] = max(self.service.get(flow, 0.0), floor)
+
+    def grant(self, flow: str, weight: float) -> None:
+        self.in_use[flow] = self.in_use.get(flow, 0) + 1
+        self.service[flow] = self.service.get(flow, 0.0) + 1.0 / weight
+
+    def release(self, flow: str) -> None:
+        self.in_use[flow] -= 1
+        if not self.in_use[flow]:
+            del self.in_use[flow]
+
+    def next_flow(self) -> str | None:
+        waiting = [f for f, q in self.waiters.items() if q]
+        if not waiting or self.busy >= self.capacity:
+            return None
+        return min(waiting, key=lambda f: self.service.get(f, 0.0))
+
+
+class FairShareScheduler:
+    """Per-provider call slots shared by weight across evaluations ("flows")."""
+
+    def __init__(
+        self,
+        providers: Iterable[ProviderConfig] = (),
+        default_capacity: int | None = None,
+    ) -> None:
+        self._capacity = {
+            p.name: p.max_concurrency for p in providers if p.max_concurrency
+        }
+        self._default_capacity = max(
+            1,
+            default_capacity or get_settings().scheduler_provider_concurrency,
+        )
+        self._pools: dict[str, _ProviderPool] = {}
+        self._weights: dict[str, float] = {}
+        self._stats: dict[str, FlowStats] = {}
+        self._attached: dict[str, int] = {}
+
+    def _pool(self, provider: str) -> _ProviderPool:
+        pool = self._pools.get(provider)
+        if pool is None:
+            capacity = self._capacity.get(provider, self._default_capacity)
+            pool = self._pools[provider] = _ProviderPool(capacity)
+        return pool
+
+    def set_weight(self, flow: str, weight: float) -> None:
+        """Set a flow's share; takes effect from the next slot it is granted."""
+        self._weights[flow] = max(0.01, float(weight))
+
+    def weight(self, flow: str) -> float:
+        return self._weights.get(flow, 1.0)
+
+    def _dispatch(self, pool: _ProviderPool) -> None:
+        while (flow := pool.next_flow()) is not None:
+            future = pool.waiters[flow].popleft()
+            if future.done():
+                continue
+            pool.grant(flow, self.weight(flow))
+            future.set_result(None)
+
+    def has_free_slot(self, provider: str) -> bool:
+        """Whether a slot for ``provider`` would be granted without queueing."""
+        pool = self._pool(provider)
+        return pool.busy < pool.capacity and not any(pool.waiters.values())
+
+    @contextlib.asynccontextmanager
+    async def slot(self, provider: str, flow: str) -> AsyncIterator[float]:
+        """Hold one of ``provider``'s call slots on behalf of ``flow``.
+
+        Yields the seconds spent queued for the slot.
+        """
+        pool = self._pool(provider)
+        pool.join(flow)
+        started = time.monotonic()
+        if pool.busy < pool.capacity and not any(pool.waiters.values()):
+            pool.grant(flow, self.weight(flow))
+        else:
+            future = asyncio.get_running_loop().create_future()
+            pool.waiters.setdefault(flow, deque()).append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted just as the waiter was cancelled: pass it on.
+                    pool.release(flow)
+                    self._dispatch(pool)
+                raise
+            finally:
+                if not pool.waiters.get(flow):
+                    pool.waiters.pop(flow, None)
+        now = time.monotonic()
+        waited = now - started
+        self._stats.setdefault(flow, FlowStats()).record(waited, now)
+        try:
+            yield waited
+        finally:
+            pool.release(flow)
+            self._dispatch(pool)
+
+    def snapshot(self, flow: str) -> dict:
+        """Throughput and queueing figures for one flow."""
+        stats = self._stats.get(flow, FlowStats())
+        pools = self._pools.values()
+        return {
+            "weight": self.weight(flow),
+            "in_flight": sum(p.in_use.get(flow, 0) for p in pools),
+            "waiting": sum(len(p.waiters.get(flow, ())) for p in pools),
+            "calls": stats.calls,
+            "calls_per_minute": stats.calls_per_minute(time.monotonic()),
+            "mean_wait_seconds": round(stats.wait_seconds / stats.calls, 3)
+            if stats.calls
+            else 0.0,
+            "max_wait_seconds": round(stats.max_wait_seconds, 3),
+        }
+
+    def attach(self, flow: str) -> None:
+        """Note that a run or shard of ``flow`` started in this process."""
+        self._attached[flow] = self._attached.get(flow, 0) + 1
+
+    def detach(self, flow: str) -> None:
+        """Note that one ended; the last to end here forgets the flow."""
+        left = self._attached.get(flow, 0) - 1
+        if left > 0:
+            self._attached[flow] = left
+            return
+        self._attached.pop(flow, None)
+        self.forget(flow)
+
+    def forget(self, flow: str) -> None:
+        """Drop a finished flow's weight and statistics."""
+        self._weights.pop(flow, None)
+        self._stats.pop(flow, None)
+        for pool in self._pools.values():
+            if not pool.in_use.get(flow) and not pool.waiters.get(flow):
+                pool.service.pop(flow, None)
+
+
+@lru_cache
+def get_scheduler() -> FairShareScheduler:
+    """Get the process-wide scheduler built from models.yaml."""
+    return FairShareScheduler(load_app_config().providers)
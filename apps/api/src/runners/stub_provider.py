@@ -0,0 +1,267 @@
+"""Deterministic synthetic LLM provider for load and throughput testing.
+
+A model whose ``litellm_model`` starts with ``stub/`` is served in-process
+instead of by LiteLLM, with the latency, token counts, errors and 429 bursts
+set in its ``stub`` block of models.yaml, so runner concurrency, rate
+limiting, retries and hedging can be exercised at thousands of calls per
+second without a network or an API bill. ``cli.py stub-server`` serves the
+same behaviour over HTTP in the OpenAI chat format, for driving the real
+transport: point a model at it with ``litellm_model: openai/<name>`` and
+``api_base``.
+
+Answers, latencies and 500s are drawn from a generator seeded with the
+model's seed, the prompt and how many times that prompt has been sent, so a
+run replays them however its calls interleave. 429 bursts model a provider's
+shared quota instead: they follow the order calls reach the stub across all
+prompts, so which attempts are limited depends on how calls interleave.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.loaders.config_loader import ModelConfig, StubConfig
+
+STUB_PREFIX = "stub/"
+
+# Completions are words drawn from this list, one token per word.
+STUB_VOCABULARY = ("grace", "faith", "covenant", "scripture", "gospel", "mercy")
+
+
+def is_stub_model(model_config: ModelConfig) -> bool:
+    return model_config.litellm_model.startswith(STUB_PREFIX)
+
+
+class StubProviderError(Exception):
+    """A synthetic provider failure, shaped like LiteLLM's HTTP errors."""
+
+    def __init__(
+        self, status_code: int, message: str, headers: dict[str, str] | None = None
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@dataclass
+class StubUsage:
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+@dataclass
+class StubMessage:
+    content: str
+    role: str = "assistant"
+
+
+@dataclass
+class StubChoice:
+    message: StubMessage
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass
+class StubResponse:
+    choices: list[StubChoice]
+    usage: StubUsage | None
+    model: str
+    # The stub is free; LiteLLM reports cost here.
+    _hidden_params: dict[str, Any] = field(
+        default_factory=lambda: {"response_cost": 0.0}
+    )
+
+
+@dataclass
+class StubDelta:
+    content: str | None
+
+
+@dataclass
+class StubStreamChoice:
+    delta: StubDelta
+    index: int = 0
+
+
+@dataclass
+class StubChunk:
+    choices: list[StubStreamChoice]
+    usage: StubUsage | None = None
+
+
+@dataclass
+class StubCompletion:
+    """The drawn outcome of one call."""
+
+    texts: list[str]
+    usage: StubUsage
+    latency_seconds: float
+
+
+class StubProvider:
+    """Synthetic completions for one model, configured by a ``StubConfig``."""
+
+    def __init__(self, name: str, config: StubConfig | None = None) -> None:
+        self.name = name
+        self.config = config or StubConfig()
+        self.calls = 0
+        self._sent: Counter[str] = Counter()
+
+    def draw(self, prompt: str, n: int = 1) -> StubCompletion:
+        """Decide one call's outcome; raises StubProviderError for failures."""
+        config = self.config
+        self.calls += 1
+        self._sent[prompt] += 1
+        rng = random.Random(  # noqa: S311 - synthetic load, not crypto
+            f"{config.seed}:{self.name}:{self._sent[prompt]}:{prompt}"
+        )
+        every = config.rate_limit_every
+        # Bursts count every call, like a shared quota, not this prompt's sends.
+        if (
+            every is not None
+            and (self.calls - 1) % (every + config.rate_limit_burst) >= every
+        ):
+            raise StubProviderError(
+                429,
+                f"Stub rate limit for {self.name}",
+                {"retry-after": f"{config.retry_after_seconds:g}"},
+            )
+        latency = config.latency_seconds
+        if config.latency_jitter:
+            latency *= rng.lognormvariate(0, config.latency_jitter)
+        if rng.random() < config.error_rate:
+            raise StubProviderError(500, f"Stub server error for {self.name}")
+        texts = [
+            " ".join(rng.choices(STUB_VOCABULARY, k=config.completion_tokens))
+            for _ in range(max(1, n))
+        ]
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = config.completion_tokens * len(texts)
+        usage = StubUsage(
+            prompt_tokens, completion_tokens, prompt_tokens + completion_tokens
+        )
+        return StubCompletion(texts, usage, latency)
+
+    async def acompletion(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        stream: bool = False,
+        n: int = 1,
+        **_kwargs: Any,
+    ) -> Any:
+        """Serve a call the way ``litellm.acompletion`` returns one."""
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        try:
+            completion = self.draw(prompt, n)
+        except StubProviderError as exc:
+            if exc.status_code == 500:
+                # Servers fail after working on the request for a while.
+                await asyncio.sleep(self.config.latency_seconds)
+            raise
+        if stream:
+            return self._stream(completion)
+        await asyncio.sleep(completion.latency_seconds)
+        return StubResponse(
+            choices=[
+                StubChoice(StubMessage(text), index=i)
+                for i, text in enumerate(completion.texts)
+            ],
+            usage=completion.usage,
+            model=self.name,
+        )
+
+    async def _stream(self, completion: StubCompletion) -> AsyncIterator[StubChunk]:
+        await asyncio.sleep(completion.latency_seconds)
+        for word in completion.texts[0].split(" "):
+            yield StubChunk([StubStreamChoice(StubDelta(word + " "))])
+        yield StubChunk([], usage=completion.usage)
+
+
+def build_stub_app(models: Iterable[ModelConfig]) -> FastAPI:
+    """An OpenAI-compatible chat completions server for the given models.
+
+    A request's ``model`` is matched against each model's name and the name
+    its ``litellm_model`` sends to an OpenAI endpoint; unknown names get a
+    default ``StubConfig``.
+    """
+    stubs: dict[str, StubProvider] = {}
+    for model in models:
+        provider = StubProvider(model.name, model.stub)
+        stubs[model.name] = provider
+        stubs.setdefault(model.litellm_model.split("/", 1)[-1], provider)
+
+    app = FastAPI(title="biblical-evals stub provider")
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        name = str(body.get("model", ""))
+        stub = stubs.setdefault(name, StubProvider(name))
+        try:
+            result = await stub.acompletion(
+                messages=body.get("messages", []),
+                stream=bool(body.get("stream")),
+                n=int(body.get("n") or 1),
+            )
+        except StubProviderError as exc:
+            return JSONResponse(
+                {"error": {"message": str(exc), "type": "stub_error"}},
+                status_code=exc.status_code,
+                headers=exc.headers,
+            )
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        created = int(time.time())
+        if body.get("stream"):
+            return StreamingResponse(
+                _sse_chunks(result, completion_id, created, name),
+                media_type="text/event-stream",
+            )
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": name,
+            "choices": [
+                {
+                    "index": choice.index,
+                    "message": {"role": "assistant", "content": choice.message.content},
+                    "finish_reason": choice.finish_reason,
+                }
+                for choice in result.choices
+            ],
+            "usage": vars(result.usage),
+        }
+
+    return app
+
+
+async def _sse_chunks(
+    chunks: AsyncIterator[StubChunk], completion_id: str, created: int, model: str
+) -> AsyncIterator[str]:
+    async for chunk in chunks:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [
+                {"index": c.index, "delta": {"content": c.delta.content}}
+                for c in chunk.choices
+            ],
+        }
+        if chunk.usage is not None:
+            payload["usage"] = vars(chunk.usage)
+        yield f"data: {json.dumps(payload)}\n\n"
+    yield "data: [DONE]\n\n"
@@ -0,0 +1,147 @@
+"""Process-wide HTTP transport and provider credentials for model calls.
+
+Built once per process, on first use or at startup: one pooled
+``httpx.AsyncClient`` (keep-alive, HTTP/2 when the ``h2`` package is
+installed) handed to LiteLLM as its shared client session, and every
+configured model's API key read from the environment up front, so calls
+neither re-import LiteLLM nor touch ``os.environ``. Calls go to LiteLLM,
+or to the in-process stub provider for ``stub/`` models, recorded to or
+replayed from a cassette when one is configured.
+"""
+
+import importlib.util
+import logging
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import httpx
+
+from src.config import get_settings
+from src.loaders.config_loader import ModelConfig, load_app_config
+from src.runners.cassette import Cassette, open_cassette
+from src.runners.stub_provider import StubProvider, is_stub_model
+
+logger = logging.getLogger(__name__)
+
+# Environment variables that name the same credential. GOOGLE_AI_API_KEY is
+# canonical, but some providers and libraries still read GOOGLE_API_KEY.
+CREDENTIAL_ALIASES: dict[str, tuple[str, ...]] = {
+    "GOOGLE_AI_API_KEY": ("GOOGLE_API_KEY",),
+    "GOOGLE_API_KEY": ("GOOGLE_AI_API_KEY",),
+}
+
+
+def resolve_credentials(models: Iterable[ModelConfig]) -> dict[str, str]:
+    """Read each model's API key variable (or an alias); missing ones are left out."""
+    credentials: dict[str, str] = {}
+    for model in models:
+        env = model.api_key_env
+        if env in credentials:
+            continue
+        for name in (env, *CREDENTIAL_ALIASES.get(env, ())):
+            value = (os.getenv(name) or "").strip()
+            if value:
+                credentials[env] = value
+                break
+    return credentials
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client(http2: bool) -> httpx.AsyncClient:
+    """A pooled client tuned by the ``RUNNER_HTTP_*`` settings."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.runner_http_max_connections,
+            max_keepalive_connections=settings.runner_http_max_keepalive,
+            keepalive_expiry=settings.runner_http_keepalive_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.runner_http_timeout_seconds,
+            connect=settings.runner_http_connect_timeout_seconds,
+        ),
+    )
+
+
+@dataclass
+class RunnerTransport:
+    """LiteLLM, its shared HTTP client, and credentials resolved at startup."""
+
+    litellm: Any
+    client: httpx.AsyncClient
+    credentials: dict[str, str] = field(default_factory=dict)
+    http2: bool = False
+    stubs: dict[str, StubProvider] = field(default_factory=dict)
+    cassette: Cassette | None = None
+
+    def completion_api(self, model_config: ModelConfig) -> Any:
+        """What serves a model's calls: LiteLLM or a stub, via any cassette."""
+        api = self.litellm
+        if is_stub_model(model_config):
+            api = self.stubs.get(model_config.name)
+            if api is None:
+                api = StubProvider(model_config.name, model_config.stub)
+                self.stubs[model_config.name] = api
+        if self.cassette is not None:
+            return self.cassette.wrap(api, model_config)
+        return api
+
+    def completion_kwargs(self, model_config: ModelConfig) -> dict[str, Any]:
+        """Extra ``acompletion`` arguments for a model: its resolved API key
+        and ``api_base``, if it has them.
+
+        Without a key LiteLLM falls back to its own environment lookup.
+        """
+        kwargs: dict[str, Any] = {}
+        key = self.credentials.get(model_config.api_key_env)
+        if key:
+            kwargs["api_key"] = key
+        if model_config.api_base:
+            kwargs["api_base"] = model_config.api_base
+        return kwargs
+
+
+@lru_cache
+def get_transport() -> RunnerTransport:
+    """Get the process-wide transport, creating it on first use."""
+    import litellm
+
+    http2 = get_settings().runner_http2 and http2_available()
+    client = build_http_client(http2)
+    # Used by LiteLLM's OpenAI-compatible clients; its other provider
+    # handlers keep their own per-process pooled clients.
+    litellm.aclient_session = client
+    models = [route for m in load_app_config().models for route in m.routes()]
+    credentials = resolve_credentials(models)
+    missing = sorted({m.api_key_env for m in models} - set(credentials))
+    logger.info(
+        "Runner transport ready",
+        extra={
+            "http2": http2,
+            "credentials": len(credentials),
+            "missing_credentials": missing,
+        },
+    )
+    return RunnerTransport(
+        litellm, client, credentials, http2, cassette=open_cassette()
+    )
+
+
+async def close_transport() -> None:
+    """Close the shared client, if one was created; the next call rebuilds it."""
+    if not get_transport.cache_info().currsize:
+        return
+    transport = get_transport()
+    get_transport.cache_clear()
+    if getattr(transport.litellm, "aclient_session", None) is transport.client:
+        transport.litellm.aclient_session = None
+    if transport.cassette is not None:
+        transport.cassette.close()
+    await transport.client.aclose()
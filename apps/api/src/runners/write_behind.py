@@ -0,0 +1,171 @@
+"""Write-behind persistence of the responses a run collects.
+
+Collected responses are buffered and written by a background task, so model
+calls never wait on Postgres: every ``batch_size`` rows, or every
+``flush_interval_seconds`` for a slower trickle, the buffered rows go out as
+one multi-row INSERT and are committed together with the run's pending
+runtime statistics. A sample that is already stored, e.g. by an earlier
+attempt at the same work item, is skipped. Once ``max_pending`` rows are
+waiting to be written the dispatcher is held back until a flush catches up.
+Whatever is still buffered is written when the writer is closed, including
+after a failure or cancel.
+"""
+
+import asyncio
+import contextlib
+import logging
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Response as ResponseModel
+from src.runners.runtime_stats import RuntimeStatsCollector, flush_runtime_stats
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_COLUMNS = (
+    "id",
+    "evaluation_id",
+    "question_id",
+    "model_name",
+    "sample_index",
+    "response_text",
+    "source",
+    "raw_metadata",
+)
+
+
+class ResponseWriter:
+    """Buffers one run's responses and flushes them in batches.
+
+    The writer owns ``db`` from ``start`` until ``close``; nothing else may
+    use the session in between.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        evaluation_id: UUID,
+        runtime_stats: RuntimeStatsCollector,
+        batch_size: int,
+        flush_interval_seconds: float,
+        max_pending: int,
+    ) -> None:
+        self.db = db
+        self.evaluation_id = evaluation_id
+        self.runtime_stats = runtime_stats
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = max(0.001, flush_interval_seconds)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.batches = 0
+        self.rows_written = 0
+        self._buffer: list[ResponseModel] = []
+        self._in_flight = 0
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._room = asyncio.Event()
+        self._room.set()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        """Rows buffered or being written."""
+        return len(self._buffer) + self._in_flight
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, response: ResponseModel) -> None:
+        """Buffer a response; it is written by a later flush."""
+        self._raise_if_failed()
+        self._buffer.append(response)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        if self.pending >= self.max_pending:
+            self._room.clear()
+
+    async def wait_for_room(self) -> None:
+        """Wait while ``max_pending`` rows are waiting to be written."""
+        while not self._room.is_set():
+            self._raise_if_failed()
+            room = asyncio.ensure_future(self._room.wait())
+            waiting: set[asyncio.Future] = {room}
+            if self._task is not None:
+                waiting.add(self._task)
+            try:
+                await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                room.cancel()
+        self._raise_if_failed()
+
+    async def close(self) -> None:
+        """Stop the background flushes and write whatever is left.
+
+        A flush in progress is allowed to finish rather than cancelled, so
+        its rows are not lost.
+        """
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            with contextlib.suppress(Exception):
+                await asyncio.shield(self._task)
+            self._raise_if_failed()
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered rows and pending statistics in one commit.
+
+        If the write fails the transaction is rolled back and the rows and
+        statistics go back into the buffer before the error is raised.
+        """
+        async with self._lock:
+            rows, self._buffer = self._buffer, []
+            if not rows and not self.runtime_stats.pending:
+                return
+            deltas = self.runtime_stats.drain()
+            self._in_flight = len(rows)
+            try:
+                if rows:
+                    # A sample already written by an earlier attempt of this
+                    # work is kept rather than failing the whole batch.
+                    await self.db.execute(
+                        insert(ResponseModel).on_conflict_do_nothing(
+                            constraint="uq_responses_evaluation_sample"
+                        ),
+                        [{c: getattr(r, c) for c in RESPONSE_COLUMNS} for r in rows],
+                    )
+                await flush_runtime_stats(self.db, self.evaluation_id, deltas)
+                await self.db.commit()
+            except BaseException:
+                with contextlib.suppress(Exception):
+                    await self.db.rollback()
+                self._buffer[:0] = rows
+                self.runtime_stats.restore(deltas)
+                raise
+            finally:
+                self._in_flight = 0
+                if self.pending < self.max_pending:
+                    self._room.set()
+            self.batches += 1
+            self.rows_written += len(rows)
+            logger.debug(
+                "Flushed responses",
+                extra={"evaluation_id": str(self.evaluation_id), "rows": len(rows)},
+            )
+
+    async def _run(self) -> None:
+        while not self._closing:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self.flush_interval_seconds):
+                    await self._wake.wait()
+            self._wake.clear()
+            await self.flush()
+
+    def _raise_if_failed(self) -> None:
+        task = self._task
+        if task is not None and task.done() and not task.cancelled():
+            exc = task.exception()
+            if exc is not None:
+                raise exc
@@ -1,6 +1,7 @@
 """Score aggregation for evaluation reports."""
 
 import logging
+import statistics
 from collections import defaultdict
 from uuid import UUID
 
@@ -22,6 +23,7 @@ class AggregatedReport:
         self.dimension_averages: dict[str, dict[str, float]] = {}
         self.head_to_head: dict[str, dict[str, dict[str, float]]] = {}
         self.question_scores: dict[str, dict[str, dict[str, float]]] = {}
+        self.sample_spread: dict[str, dict[str, float]] = {}
         self.total_responses: int = 0
         self.total_scores: int = 0
         self.reviewer_count: int = 0
@@ -33,6 +35,7 @@ class AggregatedReport:
             "dimension_averages": self.dimension_averages,
             "head_to_head": self.head_to_head,
             "question_scores": self.question_scores,
+            "sample_spread": self.sample_spread,
             "total_responses": self.total_responses,
             "total_scores": self.total_scores,
             "reviewer_count": self.reviewer_count,
@@ -81,6 +84,11 @@ async def aggregate_scores(
     q_model_dim: dict[str, dict[str, dict[str, list[int]]]] = defaultdict(
         lambda: defaultdict(lambda: defaultdict(list))
     )
+    # And by (question, model, dimension) -> sample index -> values, so the
+    # spread between repeated samples of the same answer can be measured.
+    sample_values: dict[tuple[str, str, str], dict[int, list[int]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
 
     for score in scores:
         resp = response_map.get(score.response_id)
@@ -90,6 +98,9 @@ async def aggregate_scores(
         q_model_dim[resp.question_id][resp.model_name][score.dimension].append(
             score.value
         )
+        sample_values[(resp.question_id, resp.model_name, score.dimension)][
+            resp.sample_index
+        ].append(score.value)
 
     # Per-model averages by dimension
     for model, dims in model_dim_scores.items():
@@ -141,4 +152,17 @@ async def aggregate_scores(
                     sum(values) / len(values), 2
                 )
 
+    # Sample spread: standard deviation of per-sample mean scores for each
+    # question, averaged over questions. Only multi-sample answers count.
+    spreads: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    for (_q_id, model, dim), by_sample in sample_values.items():
+        if len(by_sample) < 2:
+            continue
+        sample_means = [sum(v) / len(v) for v in by_sample.values()]
+        spreads[model][dim].append(statistics.pstdev(sample_means))
+    for model, dims in spreads.items():
+        report.sample_spread[model] = {
+            dim: round(sum(values) / len(values), 2) for dim, values in dims.items()
+        }
+
     return report
@@ -7,6 +7,7 @@ session interface used by handlers and domain logic.
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
 from types import SimpleNamespace
 from typing import Any
@@ -25,21 +26,38 @@ class FakeScalarResult:
 
 class FakeExecuteResult:
     def __init__(
-        self, one: Any | None = None, many: list[Any] | None = None, scalar: Any = None
+        self,
+        one: Any | None = None,
+        many: list[Any] | None = None,
+        scalar: Any = None,
+        rowcount: int = 0,
     ):
         self._one = one
         self._many = list(many or [])
         self._scalar = scalar
+        self.rowcount = rowcount
 
     def scalar_one_or_none(self) -> Any | None:
         return self._one
 
+    def scalar_one(self) -> Any:
+        return self._one
+
     def scalars(self) -> FakeScalarResult:
         return FakeScalarResult(self._many)
 
     def scalar(self) -> Any:
         return self._scalar
 
+    def one(self) -> Any:
+        return self._one
+
+    def one_or_none(self) -> Any | None:
+        return self._one
+
+    def all(self) -> list[Any]:
+        return self._many
+
 
 class FakeAsyncSession:
     """Minimal async session fake used by unit tests."""
@@ -55,11 +73,16 @@ class FakeAsyncSession:
         self.commit_error = commit_error
 
         self.added: list[Any] = []
+        # Row dicts of bulk INSERTs, i.e. ``execute(insert(Model), rows)``.
+        self.inserted: list[dict[str, Any]] = []
         self.commits = 0
         self.rollbacks = 0
         self.refreshed: list[Any] = []
 
-    async def execute(self, _query: Any) -> FakeExecuteResult:
+    async def execute(self, _query: Any, params: Any = None) -> FakeExecuteResult:
+        if isinstance(params, list):
+            self.inserted.extend(params)
+            return FakeExecuteResult()
         if not self.execute_results:
             return FakeExecuteResult()
 
@@ -88,7 +111,7 @@ class FakeAsyncSession:
     async def rollback(self) -> None:
         self.rollbacks += 1
 
-    async def refresh(self, obj: Any) -> None:
+    async def refresh(self, obj: Any, attribute_names: Any = None) -> None:
         self.refreshed.append(obj)
 
 
@@ -116,6 +139,56 @@ class FakeLiteLLMResponse:
     _hidden_params: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class FakeLiteLLMDelta:
+    content: str | None
+
+
+@dataclass
+class FakeLiteLLMStreamChoice:
+    delta: FakeLiteLLMDelta
+
+
+@dataclass
+class FakeLiteLLMChunk:
+    choices: list[FakeLiteLLMStreamChoice]
+    usage: FakeLiteLLMUsage | None = None
+
+
+class FakeLiteLLMStream:
+    """Async iterator of streamed chunks with an optional per-chunk delay."""
+
+    def __init__(
+        self,
+        deltas: list[str],
+        usage: FakeLiteLLMUsage | None = None,
+        delay: float = 0.0,
+    ):
+        self.chunks = [
+            FakeLiteLLMChunk(
+                choices=[FakeLiteLLMStreamChoice(delta=FakeLiteLLMDelta(content=d))]
+            )
+            for d in deltas
+        ]
+        if usage is not None:
+            self.chunks.append(FakeLiteLLMChunk(choices=[], usage=usage))
+        self.delay = delay
+        self.closed = False
+
+    def __aiter__(self) -> FakeLiteLLMStream:
+        return self
+
+    async def __anext__(self) -> FakeLiteLLMChunk:
+        if not self.chunks:
+            raise StopAsyncIteration
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.chunks.pop(0)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
 @dataclass
 class LiteLLMStub:
     """Configurable stub for litellm.acompletion."""
@@ -170,9 +243,57 @@ def current_user() -> Any:
     return SimpleNamespace(id=uuid4(), role="reviewer", access_status="approved")
 
 
+class FakeClock:
+    """Manually advanced clock for rate limiter tests."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def reset_runner_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Drop process-wide runner state between tests and disable the disk cache."""
+    import litellm
+
+    from src.observability.progress import get_progress_broker
+    from src.runners import litellm_runner
+    from src.runners.circuit_breaker import get_circuit_breakers
+    from src.runners.hedging import get_hedging_registry
+    from src.runners.rate_limiter import get_rate_limiter
+    from src.runners.retry import get_retry_policy
+    from src.runners.scheduler import get_scheduler
+    from src.runners.transport import get_transport
+
+    get_rate_limiter.cache_clear()
+    get_retry_policy.cache_clear()
+    get_circuit_breakers.cache_clear()
+    get_hedging_registry.cache_clear()
+    get_scheduler.cache_clear()
+    get_progress_broker.cache_clear()
+    get_transport.cache_clear()
+    monkeypatch.setattr(litellm, "aclient_session", None)
+    monkeypatch.setattr(litellm_runner, "get_response_cache", lambda: None)
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    return FakeClock()
+
+
 @pytest.fixture
 def model_config() -> Any:
-    return SimpleNamespace(
+    from src.loaders.config_loader import ModelConfig
+
+    return ModelConfig(
         name="gpt-4o",
         provider="openai",
         litellm_model="openai/gpt-4o",
@@ -19,10 +19,18 @@ async def test_aggregate_scores_computes_averages():
 
     responses = [
         SimpleNamespace(
-            id=rid1, evaluation_id=uuid4(), model_name="m1", question_id="Q1"
+            id=rid1,
+            evaluation_id=uuid4(),
+            model_name="m1",
+            question_id="Q1",
+            sample_index=0,
         ),
         SimpleNamespace(
-            id=rid2, evaluation_id=uuid4(), model_name="m2", question_id="Q1"
+            id=rid2,
+            evaluation_id=uuid4(),
+            model_name="m2",
+            question_id="Q1",
+            sample_index=0,
         ),
     ]
     scores = [
@@ -7,12 +7,14 @@ from uuid import uuid4
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError
 
 from src.api import evaluations, reports, reviews
 from src.core.jwt import TokenVerificationError
 from src.db import repository
 from src.dependencies import auth
+from src.jobs import handlers
 from src.main import lifespan
 from tests.conftest import FakeAsyncSession, FakeExecuteResult
 
@@ -159,6 +161,24 @@ async def test_repository_functions():
     assert await repository.get_scores_for_response(db, uuid4()) == many
 
 
+@pytest.mark.asyncio
+async def test_get_evaluation_can_lock_the_row():
+    statements: list[Any] = []
+
+    class RecordingSession(FakeAsyncSession):
+        async def execute(self, query: Any, params: Any = None) -> Any:
+            statements.append(query)
+            return await super().execute(query, params)
+
+    db: Any = RecordingSession()
+    await repository.get_evaluation(db, uuid4())
+    await repository.get_evaluation(db, uuid4(), for_update=True)
+
+    plain, locked = (str(s.compile(dialect=postgresql.dialect())) for s in statements)
+    assert "FOR UPDATE" not in plain
+    assert locked.endswith("FOR UPDATE")
+
+
 @pytest.mark.asyncio
 async def test_reports_get_and_generate_branches(monkeypatch: pytest.MonkeyPatch):
     async def fake_get_eval(_db, _eid):
@@ -267,11 +287,17 @@ async def test_get_evaluation_detail_not_found(monkeypatch: pytest.MonkeyPatch):
 
 @pytest.mark.asyncio
 async def test_lifespan_logs_with_and_without_secret(monkeypatch: pytest.MonkeyPatch):
-    monkeypatch.setattr("src.main.settings", SimpleNamespace(nextauth_secret="abc"))
+    monkeypatch.setattr(
+        "src.main.settings",
+        SimpleNamespace(nextauth_secret="abc", job_worker_embedded=False),
+    )
     async with lifespan(SimpleNamespace()):
         pass
 
-    monkeypatch.setattr("src.main.settings", SimpleNamespace(nextauth_secret=None))
+    monkeypatch.setattr(
+        "src.main.settings",
+        SimpleNamespace(nextauth_secret=None, job_worker_embedded=False),
+    )
     async with lifespan(SimpleNamespace()):
         pass
 
@@ -293,10 +319,10 @@ async def test_run_evaluation_task_returns_when_model_missing(
         yield Session()
 
     monkeypatch.setattr(
-        evaluations, "load_app_config", lambda: SimpleNamespace(models=[], templates=[])
+        handlers, "load_app_config", lambda: SimpleNamespace(models=[], templates=[])
     )
-    monkeypatch.setattr(evaluations, "load_all_questions", lambda: [])
+    monkeypatch.setattr(handlers, "load_all_questions", lambda: [])
     monkeypatch.setattr("src.db.database.async_session_factory", fake_session_factory)
 
-    await evaluations._run_evaluation_task(uuid4(), ["m1"], "default")
+    await handlers.run_evaluation_task(uuid4(), ["m1"], "default")
     assert eval_obj.status == "running"
@@ -5,10 +5,14 @@ from typing import Any, cast
 from uuid import uuid4
 
 import pytest
-from fastapi import BackgroundTasks, HTTPException
+from fastapi import HTTPException
 
 from src.api import config_routes, evaluations, reports, responses, reviews
-from src.runners.import_runner import ImportBatch, ImportedResponse
+from src.runners.import_runner import (
+    ImportBatch,
+    ImportConflictError,
+    ImportedResponse,
+)
 from tests.conftest import FakeAsyncSession, FakeExecuteResult
 
 
@@ -22,6 +26,11 @@ async def test_create_evaluation_sets_fields():
         model_list=["gpt-4o"],
         prompt_template="default",
         review_mode="blind",
+        execution_mode="interactive",
+        budget_usd=5.0,
+        budget_tokens=None,
+        samples_per_question=1,
+        question_selector=None,
     )
     db: Any = FakeAsyncSession()
 
@@ -30,13 +39,14 @@ async def test_create_evaluation_sets_fields():
     assert created.name == "Test Eval"
     assert created.created_by == user.id
     assert created.status == "created"
+    assert created.budget_usd == 5.0
     assert db.commits == 1
     assert len(db.added) == 1
 
 
 @pytest.mark.asyncio
 async def test_trigger_run_raises_404_when_missing(monkeypatch: pytest.MonkeyPatch):
-    async def fake_get_eval(_db, _eid):
+    async def fake_get_eval(_db, _eid, **_kwargs):
         return None
 
     monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
@@ -46,7 +56,6 @@ async def test_trigger_run_raises_404_when_missing(monkeypatch: pytest.MonkeyPat
             uuid4(),
             cast(Any, SimpleNamespace()),
             cast(Any, FakeAsyncSession()),
-            BackgroundTasks(),
         )
     assert exc.value.status_code == 404
 
@@ -55,7 +64,7 @@ async def test_trigger_run_raises_404_when_missing(monkeypatch: pytest.MonkeyPat
 async def test_trigger_run_raises_409_for_invalid_state(
     monkeypatch: pytest.MonkeyPatch,
 ):
-    async def fake_get_eval(_db, _eid):
+    async def fake_get_eval(_db, _eid, **_kwargs):
         return SimpleNamespace(
             status="reviewing", model_list=["m"], prompt_template="default"
         )
@@ -67,17 +76,71 @@ async def test_trigger_run_raises_409_for_invalid_state(
             uuid4(),
             cast(Any, SimpleNamespace()),
             cast(Any, FakeAsyncSession()),
-            BackgroundTasks(),
         )
     assert exc.value.status_code == 409
 
 
+@pytest.mark.asyncio
+async def test_trigger_run_resumes_interrupted_run(monkeypatch: pytest.MonkeyPatch):
+    eval_obj = SimpleNamespace(
+        status="running",
+        model_list=["m"],
+        prompt_template="default",
+        execution_mode="interactive",
+        priority=2,
+    )
+    locks: list[Any] = []
+
+    async def fake_get_eval(_db, _eid, **kwargs):
+        locks.append(kwargs.get("for_update"))
+        return eval_obj
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    db: Any = FakeAsyncSession()
+
+    out = await evaluations.trigger_run(uuid4(), cast(Any, SimpleNamespace()), db)
+
+    assert out["message"] == "Evaluation run queued"
+    # The evaluation stays locked until the job is committed.
+    assert locks == [True]
+    assert eval_obj.status == "collecting"
+    assert db.commits == 1
+    [job] = db.added
+    assert job.kind == "evaluation_run"
+    assert job.payload["model_names"] == ["m"]
+    assert job.priority == 2
+    assert out["job_id"] == str(job.id)
+
+
+@pytest.mark.asyncio
+async def test_trigger_run_returns_active_job(monkeypatch: pytest.MonkeyPatch):
+    eval_obj = SimpleNamespace(
+        status="collecting",
+        model_list=["m"],
+        prompt_template="default",
+        execution_mode="interactive",
+    )
+
+    async def fake_get_eval(_db, _eid, **_kwargs):
+        return eval_obj
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    active = SimpleNamespace(id=uuid4())
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(one=active)])
+
+    out = await evaluations.trigger_run(uuid4(), cast(Any, SimpleNamespace()), db)
+
+    assert out["message"] == "Evaluation run already queued"
+    assert out["job_id"] == str(active.id)
+    assert db.added == []
+
+
 @pytest.mark.asyncio
 async def test_import_eval_responses_raises_for_unknown_question(
     monkeypatch: pytest.MonkeyPatch,
 ):
     async def fake_get_eval(_db, _eid):
-        return SimpleNamespace(status="created")
+        return SimpleNamespace(status="created", question_ids=None)
 
     monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
     monkeypatch.setattr(evaluations, "load_all_questions", lambda: [])
@@ -102,6 +165,73 @@ async def test_import_eval_responses_raises_for_unknown_question(
     assert exc.value.status_code == 422
 
 
+@pytest.mark.asyncio
+async def test_import_eval_responses_reports_conflicts_as_409(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def fake_get_eval(_db, _eid):
+        return SimpleNamespace(status="created", question_ids=None)
+
+    async def conflicting_import(*_args):
+        raise ImportConflictError("stored concurrently")
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(
+        evaluations, "load_all_questions", lambda: [SimpleNamespace(id="Q1")]
+    )
+    monkeypatch.setattr(evaluations, "import_into_evaluation", conflicting_import)
+    body = ImportBatch(
+        responses=[
+            ImportedResponse(question_id="Q1", model_name="m", response_text="t")
+        ]
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await evaluations.import_eval_responses(
+            uuid4(),
+            body,
+            cast(Any, SimpleNamespace()),
+            cast(Any, FakeAsyncSession()),
+        )
+    assert exc.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_import_eval_responses_queues_background_job(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def fake_get_eval(_db, _eid):
+        return SimpleNamespace(status="created", question_ids=None)
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(
+        evaluations, "load_all_questions", lambda: [SimpleNamespace(id="Q1")]
+    )
+    body = ImportBatch(
+        responses=[
+            ImportedResponse(question_id="Q1", model_name="m", response_text="t")
+        ]
+    )
+    db = FakeAsyncSession()
+    evaluation_id = uuid4()
+
+    out = await evaluations.import_eval_responses(
+        evaluation_id,
+        body,
+        cast(Any, SimpleNamespace()),
+        cast(Any, db),
+        background=True,
+    )
+
+    job = db.added[0]
+    assert out["job_id"] == str(job.id)
+    assert job.kind == "response_import"
+    assert job.max_attempts == 1
+    assert job.payload["evaluation_id"] == str(evaluation_id)
+    assert job.payload["batch"]["responses"][0]["question_id"] == "Q1"
+    assert db.commits == 1
+
+
 @pytest.mark.asyncio
 async def test_get_next_unscored_returns_complete_when_none(
     monkeypatch: pytest.MonkeyPatch,
@@ -0,0 +1,447 @@
+"""Tests for the provider batch-API runner."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from src.loaders.config_loader import ModelConfig
+from src.runners import batch_runner
+from src.runners.batch_runner import (
+    AnthropicBatchBackend,
+    BatchRequest,
+    BatchResult,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    parse_anthropic_batch_line,
+    parse_openai_batch_line,
+    run_batch_evaluation,
+)
+from tests.conftest import FakeAsyncSession
+
+
+def _model(name: str, provider: str, litellm_model: str) -> ModelConfig:
+    return ModelConfig(
+        name=name,
+        provider=provider,
+        litellm_model=litellm_model,
+        api_key_env=f"{provider.upper()}_API_KEY",
+    )
+
+
+def _request(custom_id: str = "Q1::gpt-4o") -> BatchRequest:
+    return BatchRequest(
+        custom_id=custom_id,
+        question_id="Q1",
+        model_name="gpt-4o",
+        model="gpt-4o",
+        prompt="Q: grace?",
+    )
+
+
+TEMPLATE = cast(Any, SimpleNamespace(template="Q: {question}"))
+
+
+@pytest.mark.asyncio
+async def test_run_batch_evaluation_with_local_backend(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    interactive_calls: list[list[str]] = []
+
+    async def fake_run_evaluation(**kwargs):
+        interactive_calls.append([m.name for m in kwargs["model_configs"]])
+        return []
+
+    monkeypatch.setattr(batch_runner, "run_evaluation", fake_run_evaluation)
+
+    local = LocalBatchBackend(tmp_path)
+    db: Any = FakeAsyncSession(execute_results=[[("Q1", "gpt-4o", 0)]])
+    responses = await run_batch_evaluation(
+        db=db,
+        evaluation_id=uuid4(),
+        question_ids=["Q1", "Q2"],
+        question_texts={"Q1": "What is grace?", "Q2": "What is faith?"},
+        model_configs=[
+            _model("gpt-4o", "openai", "openai/gpt-4o"),
+            _model("claude", "anthropic", "claude-sonnet-4-5"),
+            _model("gemini", "google", "gemini/gemini-2.0-flash"),
+        ],
+        prompt_template=TEMPLATE,
+        backends={"openai": local, "anthropic": local},
+        poll_interval_seconds=0.01,
+    )
+
+    assert interactive_calls == [["gemini"]]
+    pairs = sorted((r.question_id, r.model_name) for r in responses)
+    assert pairs == [("Q1", "claude"), ("Q2", "claude"), ("Q2", "gpt-4o")]
+    by_pair = {(r.question_id, r.model_name): r for r in responses}
+    assert by_pair[("Q2", "gpt-4o")].response_text == "[gpt-4o] Q: What is faith?"
+    assert by_pair[("Q2", "gpt-4o")].raw_metadata["source"] == "batch"
+    # Each batch is recorded when submitted and forgotten when ingested.
+    assert db.commits == 4
+
+
+@pytest.mark.asyncio
+async def test_rerun_polls_recorded_batches_instead_of_resubmitting(tmp_path: Path):
+    local = LocalBatchBackend(tmp_path)
+    model = _model("gpt-4o", "openai", "gpt-4o")
+    first_id = await local.submit(
+        [
+            BatchRequest(
+                custom_id="req-old-0",
+                question_id="Q1",
+                model_name="gpt-4o",
+                model="gpt-4o",
+                prompt="Q: What is grace?",
+            )
+        ]
+    )
+    evaluation_id = uuid4()
+    evaluation = SimpleNamespace(
+        id=evaluation_id,
+        provider_batches={
+            first_id: {
+                "provider": "openai",
+                "requests": [
+                    {
+                        "custom_id": "req-old-0",
+                        "question_id": "Q1",
+                        "model_name": "gpt-4o",
+                        "sample_index": 0,
+                        "model": "gpt-4o",
+                    }
+                ],
+            }
+        },
+    )
+    db: Any = FakeAsyncSession(get_by_id={evaluation_id: evaluation})
+
+    responses = await run_batch_evaluation(
+        db=db,
+        evaluation_id=evaluation_id,
+        question_ids=["Q1", "Q2"],
+        question_texts={"Q1": "What is grace?", "Q2": "What is faith?"},
+        model_configs=[model],
+        prompt_template=TEMPLATE,
+        backends={"openai": local},
+        poll_interval_seconds=0.01,
+    )
+
+    assert sorted(r.question_id for r in responses) == ["Q1", "Q2"]
+    by_question = {r.question_id: r for r in responses}
+    assert by_question["Q1"].raw_metadata["batch_id"] == first_id
+    assert by_question["Q2"].raw_metadata["batch_id"] != first_id
+    # Both batches are forgotten once ingested.
+    assert evaluation.provider_batches is None
+
+
+class ExpiringBackend:
+    """Ends its first batch after answering only its first request."""
+
+    name = "expiring"
+
+    def __init__(self) -> None:
+        self.batches: dict[str, list[BatchRequest]] = {}
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = requests
+        return batch_id
+
+    async def is_complete(self, batch_id: str) -> bool:
+        return True
+
+    async def fetch_results(self, batch_id: str) -> list[BatchResult]:
+        requests = self.batches[batch_id]
+        if batch_id != "batch-0":
+            return [
+                BatchResult(custom_id=r.custom_id, response_text="late")
+                for r in requests
+            ]
+        first, *rest = requests
+        return [
+            BatchResult(custom_id=first.custom_id, response_text="early"),
+            *(
+                BatchResult(custom_id=r.custom_id, error="expired", unprocessed=True)
+                for r in rest[:1]
+            ),
+        ]
+
+    async def cancel(self, batch_id: str) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_cells_an_ended_batch_never_ran_are_resubmitted():
+    backend = ExpiringBackend()
+    evaluation_id = uuid4()
+    evaluation = SimpleNamespace(id=evaluation_id, provider_batches=None)
+    db: Any = FakeAsyncSession(get_by_id={evaluation_id: evaluation})
+
+    responses = await run_batch_evaluation(
+        db=db,
+        evaluation_id=evaluation_id,
+        question_ids=["Q1", "Q2", "Q3"],
+        question_texts={"Q1": "One?", "Q2": "Two?", "Q3": "Three?"},
+        model_configs=[_model("gpt-4o", "openai", "gpt-4o")],
+        prompt_template=TEMPLATE,
+        backends=cast(Any, {"openai": backend}),
+        poll_interval_seconds=0.001,
+    )
+
+    by_question = {r.question_id: r for r in responses}
+    assert by_question["Q1"].response_text == "early"
+    # Q2 expired unrun and Q3 had no result at all; both went out again.
+    assert {q: by_question[q].response_text for q in ("Q2", "Q3")} == {
+        "Q2": "late",
+        "Q3": "late",
+    }
+    retried = backend.batches["batch-1"]
+    assert [(r.question_id, r.attempt) for r in retried] == [("Q2", 2), ("Q3", 2)]
+    assert retried[0].prompt == "Q: Two?"
+    assert evaluation.provider_batches is None
+
+
+@pytest.mark.asyncio
+async def test_cells_are_given_up_after_the_last_batch_attempt():
+    class FailingBackend(ExpiringBackend):
+        async def fetch_results(self, batch_id: str) -> list[BatchResult]:
+            return []
+
+    backend = FailingBackend()
+
+    responses = await run_batch_evaluation(
+        db=cast(Any, FakeAsyncSession()),
+        evaluation_id=uuid4(),
+        question_ids=["Q1"],
+        question_texts={"Q1": "One?"},
+        model_configs=[_model("gpt-4o", "openai", "gpt-4o")],
+        prompt_template=TEMPLATE,
+        backends=cast(Any, {"openai": backend}),
+        poll_interval_seconds=0.001,
+    )
+
+    assert responses == []
+    assert len(backend.batches) == batch_runner.BATCH_REQUEST_ATTEMPTS
+
+
+@pytest.mark.asyncio
+async def test_cancel_provider_batches_cancels_and_forgets_them(tmp_path: Path):
+    local = LocalBatchBackend(tmp_path, responder=None)
+    batch_id = await local.submit([_request()])
+    evaluation: Any = SimpleNamespace(
+        id=uuid4(),
+        provider_batches={batch_id: {"provider": "openai", "requests": []}},
+    )
+
+    cancelled = await batch_runner.cancel_provider_batches(
+        evaluation, {"openai": local}
+    )
+
+    assert cancelled == 1
+    assert evaluation.provider_batches is None
+    assert await local.is_complete(batch_id)
+    assert await local.fetch_results(batch_id) == []
+
+
+@pytest.mark.asyncio
+async def test_run_batch_evaluation_times_out(tmp_path: Path):
+    local = LocalBatchBackend(tmp_path, responder=None)
+    with pytest.raises(TimeoutError, match="still pending"):
+        await run_batch_evaluation(
+            db=cast(Any, FakeAsyncSession()),
+            evaluation_id=uuid4(),
+            question_ids=["Q1"],
+            question_texts={"Q1": "text"},
+            model_configs=[_model("gpt-4o", "openai", "gpt-4o")],
+            prompt_template=TEMPLATE,
+            backends={"openai": local},
+            poll_interval_seconds=0.001,
+            max_wait_seconds=0.005,
+        )
+
+
+def test_parse_openai_batch_line_variants():
+    ok = parse_openai_batch_line(
+        {
+            "custom_id": "a",
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"content": "hi"}}],
+                    "usage": {"prompt_tokens": 1, "total_tokens": 3},
+                },
+            },
+        }
+    )
+    assert ok.response_text == "hi"
+    assert ok.metadata["total_tokens"] == 3
+
+    errored = parse_openai_batch_line({"custom_id": "b", "error": {"code": "x"}})
+    assert errored.response_text is None
+    assert "x" in (errored.error or "")
+
+    rejected = parse_openai_batch_line(
+        {"custom_id": "c", "response": {"status_code": 400, "body": {}}}
+    )
+    assert rejected.error == "400"
+    assert not errored.unprocessed
+
+    expired = parse_openai_batch_line(
+        {"custom_id": "d", "response": None, "error": {"code": "batch_expired"}}
+    )
+    assert expired.response_text is None
+    assert expired.unprocessed
+
+
+def test_parse_anthropic_batch_line_variants():
+    ok = parse_anthropic_batch_line(
+        {
+            "custom_id": "a",
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "content": [{"type": "text", "text": "grace"}],
+                    "usage": {"input_tokens": 4, "output_tokens": 6},
+                },
+            },
+        }
+    )
+    assert ok.response_text == "grace"
+    assert ok.metadata["total_tokens"] == 10
+
+    expired = parse_anthropic_batch_line(
+        {"custom_id": "b", "result": {"type": "expired"}}
+    )
+    assert expired.error == "expired"
+    assert expired.unprocessed
+    errored = parse_anthropic_batch_line(
+        {"custom_id": "c", "result": {"type": "errored", "error": {"type": "x"}}}
+    )
+    assert not errored.unprocessed
+
+
+@pytest.mark.asyncio
+async def test_openai_batch_backend_flow():
+    seen: list[str] = []
+    output = json.dumps(
+        {
+            "custom_id": "Q1::gpt-4o",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": "answer"}}]},
+            },
+        }
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(f"{request.method} {request.url.path}")
+        if request.url.path == "/v1/files":
+            assert b'"custom_id": "Q1::gpt-4o"' in request.content
+            return httpx.Response(200, json={"id": "file-in"})
+        if request.url.path == "/v1/batches":
+            return httpx.Response(200, json={"id": "batch-1"})
+        if request.url.path == "/v1/batches/batch-1":
+            return httpx.Response(
+                200, json={"status": "completed", "output_file_id": "file-out"}
+            )
+        if request.url.path == "/v1/files/file-out/content":
+            return httpx.Response(200, text=output + "\n")
+        if request.url.path == "/v1/batches/batch-1/cancel":
+            return httpx.Response(200, json={"status": "cancelling"})
+        return httpx.Response(404)
+
+    client = httpx.AsyncClient(
+        base_url="https://api.openai.com/v1", transport=httpx.MockTransport(handler)
+    )
+    backend = OpenAIBatchBackend("key", client=client)
+
+    batch_id = await backend.submit([_request()])
+    assert await backend.is_complete(batch_id)
+    results = await backend.fetch_results(batch_id)
+    await backend.cancel(batch_id)
+    await backend.aclose()
+
+    assert batch_id == "batch-1"
+    assert results[0].response_text == "answer"
+    assert seen[:2] == ["POST /v1/files", "POST /v1/batches"]
+    assert seen[-1] == "POST /v1/batches/batch-1/cancel"
+    # A client passed in belongs to the caller and is left open.
+    assert not client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_openai_batch_backend_reports_batches_that_ended_early():
+    batch = {"status": "in_progress"}
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=batch)
+
+    client = httpx.AsyncClient(
+        base_url="https://api.openai.com/v1", transport=httpx.MockTransport(handler)
+    )
+    backend = OpenAIBatchBackend("key", client=client)
+
+    assert not await backend.is_complete("batch-1")
+    for status in ("failed", "expired", "cancelled"):
+        batch["status"] = status
+        assert await backend.is_complete("batch-1")
+
+
+@pytest.mark.asyncio
+async def test_anthropic_batch_backend_flow():
+    line = json.dumps(
+        {
+            "custom_id": "Q1::claude",
+            "result": {
+                "type": "succeeded",
+                "message": {"content": [{"type": "text", "text": "answer"}]},
+            },
+        }
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            body = json.loads(request.content)
+            assert body["requests"][0]["params"]["model"] == "gpt-4o"
+            return httpx.Response(200, json={"id": "msgbatch_1"})
+        if request.url.path.endswith("/results"):
+            return httpx.Response(200, text=line)
+        return httpx.Response(200, json={"processing_status": "ended"})
+
+    client = httpx.AsyncClient(
+        base_url="https://api.anthropic.com/v1",
+        transport=httpx.MockTransport(handler),
+    )
+    backend = AnthropicBatchBackend("key", client=client)
+
+    batch_id = await backend.submit([_request("Q1::claude")])
+    assert await backend.is_complete(batch_id)
+    results = await backend.fetch_results(batch_id)
+    assert results[0].response_text == "answer"
+
+
+def test_default_batch_backends(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    models = [
+        _model("gpt-4o", "openai", "gpt-4o"),
+        _model("claude", "anthropic", "claude-sonnet-4-5"),
+        _model("gemini", "google", "gemini/gemini-2.0-flash"),
+    ]
+    settings = SimpleNamespace(batch_backend="local", batch_local_dir=str(tmp_path))
+    monkeypatch.setattr(batch_runner, "get_settings", lambda: settings)
+    local = batch_runner.default_batch_backends(models)
+    assert set(local) == {"openai", "anthropic", "google"}
+
+    settings.batch_backend = "provider"
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    remote = batch_runner.default_batch_backends(models)
+    assert set(remote) == {"openai"}
+    assert isinstance(remote["openai"], OpenAIBatchBackend)
@@ -0,0 +1,183 @@
+"""Tests for evaluation spending budgets."""
+
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.loaders.config_loader import ModelConfig
+from src.observability.progress import get_progress_broker
+from src.runners import litellm_runner
+from src.runners.budget import RunBudget, reserve_shared_spend
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+TEMPLATE: Any = SimpleNamespace(template="Q: {question}")
+
+
+def test_budget_exhausts_on_first_refusal():
+    budget = RunBudget(max_tokens=100)
+
+    first = budget.reserve("m", 60, 0.0)
+    assert first is not None
+    assert budget.reserve("m", 60, 0.0) is None
+    # Even a call that would fit is refused once the budget is exhausted.
+    assert budget.reserve("m", 1, 0.0) is None
+    assert budget.exhausted
+    assert budget.skipped == 2
+
+    budget.settle(first, {"total_tokens": 40, "completion_tokens": 30})
+    assert budget.reserved_tokens == 0
+    assert budget.spent_tokens == 40
+
+
+def test_budget_tracks_usd_and_charges_projection_without_cost():
+    budget = RunBudget(max_usd=1.0, spent_usd=0.5)
+
+    reservation = budget.reserve("m", 10, 0.3)
+    assert reservation is not None
+    budget.settle(reservation, {"total_tokens": 10})
+    assert budget.spent_usd == pytest.approx(0.8)
+
+    failed = budget.reserve("m", 10, 0.1)
+    assert failed is not None
+    budget.settle(failed, None)
+    assert budget.spent_usd == pytest.approx(0.8)
+    assert budget.reserve("m", 10, 0.3) is None
+
+
+def test_expected_completion_tokens_uses_observed_mean():
+    budget = RunBudget(max_tokens=10_000)
+    assert budget.expected_completion_tokens("m", 2048) == 2048
+
+    for completion_tokens in (100, 300):
+        reservation = budget.reserve("m", 10, 0.0)
+        assert reservation is not None
+        budget.settle(
+            reservation,
+            {"total_tokens": completion_tokens, "completion_tokens": completion_tokens},
+        )
+
+    assert budget.expected_completion_tokens("m", 2048) == 200
+    assert budget.expected_completion_tokens("other", 2048) == 2048
+
+
+def test_for_evaluation_requires_a_limit():
+    assert RunBudget.for_evaluation(SimpleNamespace()) is None
+    budget = RunBudget.for_evaluation(
+        SimpleNamespace(budget_usd=None, budget_tokens=500), spent_tokens=20
+    )
+    assert budget is not None
+    assert budget.max_tokens == 500
+    assert budget.spent_tokens == 20
+
+
+def test_count_prompt_tokens_uses_local_tokenizer():
+    prompt = "In the beginning was the Word, and the Word was with God."
+    counted = litellm_runner.count_prompt_tokens("openai/gpt-4o", prompt)
+    assert 0 < counted < len(prompt)
+
+
+@pytest.mark.asyncio
+async def test_get_recorded_spend_sums_existing_responses():
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(one=(1.25, 300))])
+    assert await litellm_runner.get_recorded_spend(db, uuid4()) == (1.25, 300)
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_stops_dispatching_when_budget_exhausted(
+    monkeypatch: pytest.MonkeyPatch,
+    model_config: ModelConfig,
+):
+    calls: list[str] = []
+
+    async def fake_call_model(_cfg, question_text, _template):
+        calls.append(question_text)
+        return {
+            "response_text": "ok",
+            "metadata": {
+                "total_tokens": 120,
+                "completion_tokens": 100,
+                "cost_usd": 0.01,
+            },
+        }
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    monkeypatch.setattr(litellm_runner, "count_prompt_tokens", lambda _m, _p: 20)
+    monkeypatch.setattr(litellm_runner, "DEFAULT_MAX_TOKENS", 300)
+    # The first call is projected at max_tokens (320); later ones use the
+    # observed 100-token completions (120), so three calls fit and a fourth
+    # (360 spent + 120 projected) would not.
+    budget = RunBudget(max_tokens=400)
+    evaluation_id = uuid4()
+
+    db: Any = FakeAsyncSession()
+    with get_progress_broker().subscribe(evaluation_id) as events:
+        results = await litellm_runner.run_evaluation(
+            db=db,
+            evaluation_id=evaluation_id,
+            question_ids=[f"Q{i}" for i in range(6)],
+            question_texts={f"Q{i}": f"text {i}" for i in range(6)},
+            model_configs=[model_config],
+            prompt_template=TEMPLATE,
+            max_concurrency=1,
+            budget=budget,
+        )
+
+    # Skipped calls are not reported to the progress stream as errors.
+    published = [events.get_nowait() for _ in range(events.qsize())]
+    assert [e.succeeded for e in published] == [True, True, True]
+    assert len(results) == 3
+    assert calls == ["text 0", "text 1", "text 2"]
+    assert budget.exhausted
+    assert budget.skipped == 3
+    assert budget.spent_tokens == 360
+    assert budget.spent_usd == pytest.approx(0.03)
+    assert budget.reserved_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_reserve_shared_spend_is_one_conditional_update():
+    statements: list[Any] = []
+
+    class RecordingSession(FakeAsyncSession):
+        async def execute(self, query: Any, params: Any = None) -> Any:
+            statements.append(query)
+            return await super().execute(query, params)
+
+    db: Any = RecordingSession(
+        execute_results=[FakeExecuteResult(one=(0.75, 900)), FakeExecuteResult()]
+    )
+
+    assert await reserve_shared_spend(db, uuid4(), 400, 0.25) == (0.75, 900)
+    assert await reserve_shared_spend(db, uuid4(), 400, 0.25) is None
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE evaluations SET")
+    assert "<= evaluations.budget_tokens" in sql
+    assert "<= evaluations.budget_usd" in sql
+    assert "RETURNING" in sql
+
+
+def test_project_spend_matches_recorded_spend_units(
+    monkeypatch: pytest.MonkeyPatch, model_config: ModelConfig
+):
+    monkeypatch.setattr(litellm_runner, "count_prompt_tokens", lambda _m, _p: 20)
+    monkeypatch.setattr(litellm_runner, "estimate_cost", lambda *_args: 0.01)
+    budget = RunBudget(max_tokens=10_000)
+
+    usd, tokens = litellm_runner.project_spend(
+        budget,
+        [("Q1", model_config), ("Q2", model_config)],
+        {"Q1": "a", "Q2": "b"},
+        TEMPLATE,
+    )
+
+    expected = 2 * (20 + litellm_runner.DEFAULT_MAX_TOKENS)
+    assert (usd, tokens) == (pytest.approx(0.02), expected)
+    rows: Any = [
+        SimpleNamespace(raw_metadata={"cost_usd": 0.02, "total_tokens": 30}),
+        SimpleNamespace(raw_metadata={"cost_usd": None, "total_tokens": None}),
+    ]
+    assert litellm_runner.recorded_spend_of(rows) == (0.02, 30)
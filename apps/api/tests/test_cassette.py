@@ -0,0 +1,178 @@
+"""Tests for recording and replaying model calls."""
+
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+
+from src.loaders.config_loader import ModelConfig, StubConfig
+from src.runners import cassette as cassette_module
+from src.runners import litellm_runner, transport
+from src.runners.cassette import Cassette, CassetteMissError, open_cassette
+from src.runners.retry import is_retryable, retry_after_seconds
+from src.runners.stub_provider import StubProvider
+
+TEMPLATE = cast(Any, SimpleNamespace(template="{question}"))
+MESSAGES = [{"role": "user", "content": "Q"}]
+
+
+def _stub_model(**overrides: Any) -> ModelConfig:
+    return ModelConfig(
+        name="m",
+        provider="stub",
+        litellm_model="stub/m",
+        api_key_env="STUB_API_KEY",
+        stub=StubConfig(latency_seconds=0.0, completion_tokens=3),
+        **overrides,
+    )
+
+
+@pytest.mark.asyncio
+async def test_recorded_calls_replay_in_order_with_scaled_timing(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    path = tmp_path / "calls.jsonl.gz"
+    model = _stub_model()
+    stub = StubProvider(
+        "m",
+        StubConfig(latency_seconds=0.0, rate_limit_every=1, retry_after_seconds=2),
+    )
+    recorder = Cassette(path, "record").wrap(stub, model)
+    first = await recorder.acompletion(messages=MESSAGES, n=2)
+    with pytest.raises(Exception, match="rate limit"):
+        await recorder.acompletion(messages=MESSAGES, n=2)
+    recorder.cassette.close()
+
+    lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[1])["error"]["status"] == 429
+
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(cassette_module.asyncio, "sleep", fake_sleep)
+    player = Cassette(path, "replay", time_scale=0.5).wrap(object(), model)
+    replayed = await player.acompletion(messages=MESSAGES, n=2)
+    with pytest.raises(Exception, match="rate limit") as exc:
+        await player.acompletion(messages=MESSAGES, n=2)
+    with pytest.raises(CassetteMissError):
+        await player.acompletion(messages=MESSAGES, n=2)
+
+    assert [c.message.content for c in replayed.choices] == [
+        c.message.content for c in first.choices
+    ]
+    assert replayed.usage == first.usage
+    assert replayed._hidden_params["response_cost"] == 0.0
+    assert is_retryable(exc.value)
+    assert retry_after_seconds(exc.value) == 2.0
+    assert len(sleeps) == 2
+    assert player.cassette.replayed == 2
+
+
+@pytest.mark.asyncio
+async def test_streamed_calls_replay_through_call_model(tmp_path: Path):
+    path = tmp_path / "calls.jsonl"
+    model = _stub_model(stream=True)
+    runner_transport = transport.get_transport()
+    runner_transport.cassette = Cassette(path, "record")
+
+    recorded = await litellm_runner.call_model(model, "Q", TEMPLATE)
+    runner_transport.cassette.close()
+    # Replay never reaches the provider.
+    runner_transport.stubs["m"] = cast(Any, object())
+    runner_transport.cassette = Cassette(path, "replay", time_scale=0.0)
+    replayed = await litellm_runner.call_model(model, "Q", TEMPLATE)
+
+    assert replayed["response_text"] == recorded["response_text"]
+    assert replayed["metadata"]["completion_tokens"] == 3
+    assert replayed["metadata"]["streamed"] is True
+    entry = json.loads(path.read_text())
+    assert entry["stream"] is True
+    assert entry["first_token"] is not None
+    await transport.close_transport()
+
+
+@pytest.mark.asyncio
+async def test_unrecorded_requests_fail_without_retrying(tmp_path: Path):
+    runner_transport = transport.get_transport()
+    runner_transport.cassette = Cassette(tmp_path / "empty.jsonl", "replay")
+
+    with pytest.raises(RuntimeError, match="after 1 attempts"):
+        await litellm_runner.call_model(_stub_model(), "Q", TEMPLATE)
+    await transport.close_transport()
+
+
+def test_open_cassette_follows_settings(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    settings = SimpleNamespace(
+        runner_cassette_mode="off",
+        runner_cassette_path=str(tmp_path / "c.jsonl"),
+        runner_cassette_time_scale=0.0,
+    )
+    monkeypatch.setattr(cassette_module, "get_settings", lambda: settings)
+
+    assert open_cassette() is None
+    settings.runner_cassette_mode = "replay"
+    opened = open_cassette()
+    assert opened is not None
+    assert (opened.mode, opened.time_scale) == ("replay", 0.0)
+    settings.runner_cassette_mode = "rewind"
+    with pytest.raises(ValueError, match="Unknown cassette mode"):
+        open_cassette()
+
+
+class SlowStreamAPI:
+    """Streams one chunk, then stalls until cancelled or closed."""
+
+    async def acompletion(self, **_kwargs: Any) -> Any:
+        return self._chunks()
+
+    async def _chunks(self) -> Any:
+        delta = SimpleNamespace(content="partial")
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        await asyncio.sleep(10)
+
+
+async def _read_first_chunk(stream: Any) -> None:
+    async for _chunk in stream:
+        await asyncio.sleep(10)
+
+
+async def _drain(stream: Any) -> None:
+    async for _chunk in stream:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_cancelled_streams_are_not_recorded_but_closed_ones_are(
+    tmp_path: Path,
+):
+    cassette = Cassette(tmp_path / "calls.jsonl", "record")
+    api = cassette.wrap(SlowStreamAPI(), _stub_model(stream=True))
+
+    stream = await api.acompletion(messages=MESSAGES, stream=True)
+    task = asyncio.create_task(_read_first_chunk(stream))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cassette.recorded == 0
+
+    # The runner closes a stream it cuts off at stream_max_seconds.
+    stream = await api.acompletion(messages=MESSAGES, stream=True)
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(_drain(stream), 0.01)
+    await stream.aclose()
+    cassette.close()
+
+    entry = json.loads((tmp_path / "calls.jsonl").read_text())
+    assert cassette.recorded == 1
+    assert entry["texts"] == ["partial"]
+    assert "error" not in entry
@@ -0,0 +1,172 @@
+"""Tests for per-model circuit breakers in the LiteLLM runner."""
+
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+
+from src.runners import litellm_runner
+from src.runners.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+)
+from tests.conftest import FakeAsyncSession, FakeClock, LiteLLMStub
+
+
+def test_breaker_opens_after_threshold_and_half_opens(fake_clock: FakeClock):
+    breaker = CircuitBreaker(
+        "gpt-4o", failure_threshold=3, reset_timeout_seconds=30, clock=fake_clock
+    )
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+
+    fake_clock.now += 30
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow()
+    # Only one probe is let through while half-open.
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.snapshot() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "times_opened": 1,
+        "rejected": 2,
+    }
+
+
+def test_failed_probe_reopens_breaker(fake_clock: FakeClock):
+    breaker = CircuitBreaker(
+        "gpt-4o", failure_threshold=1, reset_timeout_seconds=10, clock=fake_clock
+    )
+    breaker.record_failure()
+    fake_clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+
+
+def test_lost_probe_is_released_or_times_out(fake_clock: FakeClock):
+    breaker = CircuitBreaker(
+        "gpt-4o", failure_threshold=1, reset_timeout_seconds=10, clock=fake_clock
+    )
+    breaker.record_failure()
+    fake_clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release_probe()
+    assert breaker.allow()
+    assert not breaker.allow()
+    # A probe that never reports back is given up on after the timeout.
+    fake_clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_registry_reuses_breakers_and_snapshots():
+    registry = CircuitBreakerRegistry(failure_threshold=2)
+    assert registry.get("m1") is registry.get("m1")
+    assert registry.get("m1").failure_threshold == 2
+    assert set(registry.snapshot()) == {"m1"}
+    assert registry.snapshot(["m2"])["m2"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_call_model_fails_fast_once_circuit_opens(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_litellm_failing: LiteLLMStub,
+    model_config: Any,
+):
+    async def fake_sleep(_seconds: float) -> None:
+        return None
+
+    monkeypatch.setattr(litellm_runner.asyncio, "sleep", fake_sleep)
+    registry = CircuitBreakerRegistry(failure_threshold=4)
+    monkeypatch.setattr(litellm_runner, "get_circuit_breakers", lambda: registry)
+    mock_litellm_failing.set_response("openai/gpt-4o", RuntimeError("down"))
+    template: Any = type("Tpl", (), {"template": "Q: {question}"})()
+
+    with pytest.raises(RuntimeError, match="failed after"):
+        await litellm_runner.call_model(model_config, "q1", template)
+    with pytest.raises(CircuitOpenError, match="opened"):
+        await litellm_runner.call_model(model_config, "q2", template)
+    assert len(mock_litellm_failing.calls) == 4
+
+    with pytest.raises(CircuitOpenError, match="open for model"):
+        await litellm_runner.call_model(model_config, "q3", template)
+    assert len(mock_litellm_failing.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_reports_short_circuited_items(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    async def fake_call_model(cfg, _question_text, _template):
+        if cfg.name == "down":
+            raise CircuitOpenError("Circuit open for model down")
+        return {"response_text": "ok", "metadata": {}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+
+    with caplog.at_level("INFO", logger="src.runners.litellm_runner"):
+        results = await litellm_runner.run_evaluation(
+            db=cast(Any, FakeAsyncSession()),
+            evaluation_id=uuid4(),
+            question_ids=["Q1", "Q2"],
+            question_texts={"Q1": "a", "Q2": "b"},
+            model_configs=cast(
+                Any,
+                [
+                    type("MC", (), {"name": "up"})(),
+                    type("MC", (), {"name": "down"})(),
+                ],
+            ),
+            prompt_template=cast(Any, type("Tpl", (), {"template": "{question}"})()),
+        )
+
+    assert len(results) == 2
+    summary = next(
+        r for r in caplog.records if r.message == "Evaluation responses collected"
+    )
+    assert summary.short_circuited == {"down": 2}
+    assert set(summary.circuit_breakers) == {"up", "down"}
+    assert not any(r.message == "Skipping model after retries" for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_fatal_probe_releases_the_half_open_breaker(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_litellm_failing: LiteLLMStub,
+    model_config: Any,
+    fake_clock: FakeClock,
+):
+    registry = CircuitBreakerRegistry(
+        failure_threshold=1, reset_timeout_seconds=10, clock=fake_clock
+    )
+    monkeypatch.setattr(litellm_runner, "get_circuit_breakers", lambda: registry)
+    registry.get(model_config.name).record_failure()
+    fake_clock.now += 10
+
+    class AuthError(Exception):
+        status_code = 401
+
+    mock_litellm_failing.set_response("openai/gpt-4o", AuthError("bad key"))
+    template: Any = type("Tpl", (), {"template": "Q: {question}"})()
+
+    with pytest.raises(RuntimeError, match="failed after 1 attempts"):
+        await litellm_runner.call_model(model_config, "q1", template)
+
+    breaker = registry.get(model_config.name)
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow()
@@ -44,6 +44,13 @@ def test_environment_flags():
     assert prod.is_production is True
 
 
+def test_runs_execute_in_standalone_workers_by_default(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.delenv("JOB_WORKER_EMBEDDED", raising=False)
+    assert Settings(_env_file=None).job_worker_embedded is False
+
+
 def test_admin_email_settings_helpers():
     settings = Settings(admin_emails="a@example.com, b@example.com")
     assert settings.admin_email_set == {"a@example.com", "b@example.com"}
@@ -0,0 +1,94 @@
+"""Tests for failing over to a model's fallback routes."""
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+
+from src.loaders.config_loader import FallbackRoute, ModelConfig, StubConfig
+from src.runners import litellm_runner, transport
+from src.runners.circuit_breaker import CircuitOpenError, get_circuit_breakers
+
+TEMPLATE = cast(Any, SimpleNamespace(template="{question}"))
+
+
+def _model(latency_seconds: float = 0.0, **overrides: Any) -> ModelConfig:
+    return ModelConfig(
+        name="m",
+        provider="stub",
+        litellm_model="stub/primary",
+        api_key_env="STUB_API_KEY",
+        stub=StubConfig(latency_seconds=latency_seconds, completion_tokens=2),
+        fallbacks=[
+            FallbackRoute(
+                name="backup",
+                litellm_model="stub/backup",
+                provider="stub-backup",
+                api_key_env="BACKUP_API_KEY",
+                stub=StubConfig(latency_seconds=0.0, completion_tokens=3),
+            )
+        ],
+        **overrides,
+    )
+
+
+def test_routes_inherit_unset_keys_and_drop_the_last_slo():
+    model = _model(latency_slo_seconds=5.0, requests_per_minute=10)
+
+    primary, backup = model.routes()
+
+    assert (primary.name, primary.latency_slo_seconds) == ("m", 5.0)
+    assert primary.fallbacks == []
+    assert backup.name == "m@backup"
+    assert (backup.provider, backup.api_key_env) == ("stub-backup", "BACKUP_API_KEY")
+    assert backup.requests_per_minute == 10
+    assert backup.stub is not None
+    assert backup.stub.completion_tokens == 3
+    assert backup.latency_slo_seconds is None
+    single = ModelConfig(
+        name="s",
+        provider="p",
+        litellm_model="p/s",
+        api_key_env="K",
+        latency_slo_seconds=1.0,
+    )
+    assert [r.latency_slo_seconds for r in single.routes()] == [None]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_over_and_records_the_route():
+    model = _model()
+    breakers = get_circuit_breakers()
+
+    healthy = await litellm_runner.call_model(model, "Q", TEMPLATE)
+    for _ in range(breakers.failure_threshold):
+        breakers.get("m").record_failure()
+    failed_over = await litellm_runner.call_model(model, "Q", TEMPLATE)
+
+    assert healthy["metadata"]["route"] == "primary"
+    assert len(healthy["response_text"].split()) == 2
+    assert failed_over["metadata"]["route"] == "backup"
+    assert failed_over["metadata"]["provider"] == "stub-backup"
+    assert failed_over["metadata"]["model"] == "stub/backup"
+    assert len(failed_over["response_text"].split()) == 3
+
+    for _ in range(breakers.failure_threshold):
+        breakers.get("m@backup").record_failure()
+    with pytest.raises(CircuitOpenError, match="m@backup"):
+        await litellm_runner.call_model(model, "Q", TEMPLATE)
+    await transport.close_transport()
+
+
+@pytest.mark.asyncio
+async def test_latency_slo_breaches_trip_the_route():
+    model = _model(latency_seconds=0.02, latency_slo_seconds=0.001)
+    get_circuit_breakers().failure_threshold = 1
+
+    slow = await litellm_runner.call_model(model, "Q", TEMPLATE)
+    next_call = await litellm_runner.call_model(model, "Q", TEMPLATE)
+
+    assert slow["metadata"]["route"] == "primary"
+    assert slow["metadata"]["latency_slo_breached"] is True
+    assert next_call["metadata"]["route"] == "backup"
+    assert "latency_slo_breached" not in next_call["metadata"]
+    await transport.close_transport()
@@ -0,0 +1,261 @@
+"""Tests for per-call timeouts and hedged requests."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.loaders.config_loader import ModelConfig
+from src.runners import litellm_runner
+from src.runners.hedging import (
+    HedgingRegistry,
+    LatencyTracker,
+    get_hedging_registry,
+    run_hedged,
+)
+from src.runners.retry import RetryPolicy
+from src.runners.scheduler import FairShareScheduler
+from tests.conftest import (
+    FakeLiteLLMChoice,
+    FakeLiteLLMMessage,
+    FakeLiteLLMResponse,
+    FakeLiteLLMUsage,
+)
+
+TEMPLATE: Any = SimpleNamespace(template="Q: {question}")
+
+
+def _model(**overrides: Any) -> ModelConfig:
+    return ModelConfig(
+        name="gpt-4o",
+        provider="openai",
+        litellm_model="openai/gpt-4o",
+        api_key_env="OPENAI_API_KEY",
+        **overrides,
+    )
+
+
+def _response(content: str) -> FakeLiteLLMResponse:
+    return FakeLiteLLMResponse(
+        choices=[FakeLiteLLMChoice(message=FakeLiteLLMMessage(content=content))],
+        usage=FakeLiteLLMUsage(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+        _hidden_params={"response_cost": 0.0},
+    )
+
+
+async def _after(seconds: float, value: Any) -> Any:
+    await asyncio.sleep(seconds)
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+def test_latency_tracker_quantile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.quantile(0.95) is None
+    for i in range(1, 101):
+        tracker.record(float(i))
+    assert tracker.quantile(0.5) == 51.0
+    assert tracker.quantile(0.95) == 95.0
+
+
+def test_hedge_delay_requires_opt_in_and_samples():
+    registry = HedgingRegistry()
+    for _ in range(3):
+        registry.record("gpt-4o", 2.0, hedged=False, hedge_won=False)
+
+    assert registry.hedge_delay(_model()) is None
+    assert registry.hedge_delay(_model(hedge=True, hedge_min_samples=5)) is None
+    assert registry.hedge_delay(_model(hedge=True, hedge_min_samples=3)) == 2.0
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_skips_hedge_when_primary_is_fast():
+    hedges: list[int] = []
+
+    def make_hedge():
+        hedges.append(1)
+        return _after(0, "hedge")
+
+    result = await run_hedged(_after(0, "primary"), make_hedge, hedge_after=0.5)
+
+    assert result == ("primary", False, False)
+    assert hedges == []
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_returns_faster_hedge_and_cancels_primary():
+    primary = asyncio.ensure_future(_after(5, "primary"))
+
+    result = await run_hedged(primary, lambda: _after(0.01, "hedge"), 0.01)
+
+    assert result == ("hedge", True, True)
+    assert primary.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_falls_back_when_one_leg_fails():
+    result = await run_hedged(
+        _after(0.05, "primary"), lambda: _after(0, RuntimeError("boom")), 0.01
+    )
+    assert result == ("primary", True, False)
+
+    with pytest.raises(RuntimeError, match="primary failed"):
+        await run_hedged(
+            _after(0.05, RuntimeError("primary failed")),
+            lambda: _after(0, RuntimeError("hedge failed")),
+            0.01,
+        )
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_keeps_waiting_when_the_hedge_is_declined():
+    result = await run_hedged(_after(0.03, "primary"), lambda: None, 0.01)
+
+    assert result == ("primary", False, False)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_caller_before_the_hedge_cancels_the_primary():
+    primary = asyncio.ensure_future(_after(5, "primary"))
+    caller = asyncio.ensure_future(
+        run_hedged(primary, lambda: _after(0, "hedge"), hedge_after=1.0)
+    )
+    await asyncio.sleep(0.01)
+
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    assert primary.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_call_model_times_out_slow_requests(monkeypatch: pytest.MonkeyPatch):
+    import litellm
+
+    calls: list[dict] = []
+
+    async def slow_then_fast(**kwargs: Any) -> Any:
+        calls.append(kwargs)
+        return await _after(5 if len(calls) == 1 else 0, _response("ok"))
+
+    monkeypatch.setattr(litellm, "acompletion", slow_then_fast)
+    monkeypatch.setattr(
+        litellm_runner,
+        "get_retry_policy",
+        lambda: RetryPolicy(max_attempts=2, base_delay=0, max_delay=0),
+    )
+
+    out = await litellm_runner.call_model(
+        _model(timeout_seconds=0.05), "What is grace?", TEMPLATE
+    )
+
+    assert out["response_text"] == "ok"
+    assert len(calls) == 2
+    assert calls[0]["timeout"] == 0.05
+
+
+@pytest.mark.asyncio
+async def test_call_model_hedges_past_observed_p95(monkeypatch: pytest.MonkeyPatch):
+    import litellm
+
+    calls: list[str] = []
+
+    async def slow_primary(**kwargs: Any) -> Any:
+        calls.append(kwargs["model"])
+        if len(calls) == 1:
+            return await _after(5, _response("primary"))
+        return _response("hedge")
+
+    monkeypatch.setattr(litellm, "acompletion", slow_primary)
+    model = _model(hedge=True, hedge_min_samples=2)
+    registry = get_hedging_registry()
+    for _ in range(2):
+        registry.record(model.name, 0.01, hedged=False, hedge_won=False)
+
+    out = await litellm_runner.call_model(model, "What is grace?", TEMPLATE)
+
+    assert out["response_text"] == "hedge"
+    assert out["metadata"]["hedged"] is True
+    assert out["metadata"]["hedge_won"] is True
+    assert registry.snapshot([model.name])[model.name] == {
+        "calls": 3,
+        "hedged": 1,
+        "hedge_wins": 1,
+        "hedge_rate": 0.333,
+    }
+
+
+class RecordingLimiter:
+    def __init__(self) -> None:
+        self.acquired: list[int] = []
+        self.settled: list[tuple[int, int | None]] = []
+
+    async def acquire(self, _model_config: Any, estimated_tokens: int) -> float:
+        self.acquired.append(estimated_tokens)
+        return 0.0
+
+    def settle(
+        self, _model_config: Any, estimated_tokens: int, actual: int | None
+    ) -> None:
+        self.settled.append((estimated_tokens, actual))
+
+
+def _slow_first_call(calls: list[str]) -> Any:
+    async def acompletion(**kwargs: Any) -> Any:
+        calls.append(kwargs["model"])
+        if len(calls) == 1:
+            return await _after(5, _response("primary"))
+        return _response("hedge")
+
+    return acompletion
+
+
+@pytest.mark.asyncio
+async def test_hedge_loser_returns_its_rate_limit_reservation(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    import litellm
+
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(litellm_runner, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(litellm, "acompletion", _slow_first_call([]))
+    model = _model(hedge=True, hedge_min_samples=1)
+    get_hedging_registry().record(model.name, 0.01, hedged=False, hedge_won=False)
+
+    out = await litellm_runner.call_model(model, "What is grace?", TEMPLATE)
+
+    assert out["metadata"]["hedge_won"] is True
+    reserved = limiter.acquired[0]
+    assert limiter.acquired == [reserved, reserved]
+    # The cancelled primary is refunded in full, the winner against usage.
+    assert limiter.settled == [(reserved, 0), (reserved, 2)]
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_a_free_provider_slot(monkeypatch: pytest.MonkeyPatch):
+    import litellm
+
+    calls: list[str] = []
+    monkeypatch.setattr(litellm, "acompletion", _slow_first_call(calls))
+    monkeypatch.setattr(
+        litellm_runner,
+        "get_scheduler",
+        lambda: FairShareScheduler(default_capacity=1),
+    )
+    model = _model(hedge=True, hedge_min_samples=1, timeout_seconds=0.1)
+    get_hedging_registry().record(model.name, 0.01, hedged=False, hedge_won=False)
+    monkeypatch.setattr(
+        litellm_runner,
+        "get_retry_policy",
+        lambda: RetryPolicy(max_attempts=2, base_delay=0, max_delay=0),
+    )
+
+    out = await litellm_runner.call_model(model, "What is grace?", TEMPLATE)
+
+    # The only slot was the primary's: no hedge, so it timed out and retried.
+    assert out["response_text"] == "hedge"
+    assert "hedged" not in out["metadata"]
+    assert len(calls) == 2
@@ -0,0 +1,448 @@
+"""Tests for the durable job queue and worker."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from src.db.models import Job
+from src.jobs import handlers, queue, worker
+from src.jobs.queue import JobStatus
+from src.jobs.worker import JobWorker
+from src.observability import progress
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+def _job(**overrides: Any) -> Job:
+    fields: dict[str, Any] = {
+        "id": uuid4(),
+        "kind": "evaluation_run",
+        "payload": {},
+        "status": JobStatus.QUEUED,
+        "attempts": 0,
+        "max_attempts": 3,
+        "run_after": datetime.now(UTC),
+    }
+    return Job(**{**fields, **overrides})
+
+
+def test_claim_query_skips_locked_rows():
+    sql = str(
+        queue.claimable_jobs_query(datetime.now(UTC), ["evaluation_run"]).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "lease_expires_at" in sql
+    assert "ORDER BY jobs.priority DESC, jobs.run_after" in sql
+
+
+def test_retry_delay_grows_exponentially_and_caps():
+    assert queue.retry_delay_seconds(1, 30) == 30
+    assert queue.retry_delay_seconds(3, 30) == 120
+    assert queue.retry_delay_seconds(20, 30) == queue.MAX_RETRY_DELAY_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_claim_job_takes_lease():
+    job = _job()
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(one=job)])
+
+    claimed = await queue.claim_job(db, "worker-1", lease_seconds=60)
+
+    assert claimed is job
+    assert job.status == JobStatus.RUNNING
+    assert job.attempts == 1
+    assert job.lease_owner == "worker-1"
+    assert job.lease_expires_at is not None
+    assert job.lease_expires_at > datetime.now(UTC) + timedelta(seconds=50)
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_job_fails_stale_job_on_final_attempt():
+    stale = _job(
+        status=JobStatus.RUNNING,
+        attempts=3,
+        lease_owner="dead-worker",
+        lease_expires_at=datetime.now(UTC) - timedelta(seconds=1),
+    )
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(one=stale)])
+
+    assert await queue.claim_job(db, "worker-1") is None
+    assert stale.status == JobStatus.FAILED
+    assert stale.lease_owner is None
+    assert stale.last_error == "Lease expired on final attempt"
+
+
+@pytest.mark.asyncio
+async def test_claim_job_recovers_stale_lease():
+    stale = _job(
+        status=JobStatus.RUNNING,
+        attempts=1,
+        lease_owner="dead-worker",
+        lease_expires_at=datetime.now(UTC) - timedelta(seconds=1),
+    )
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(one=stale)])
+
+    assert await queue.claim_job(db, "worker-1") is stale
+    assert stale.lease_owner == "worker-1"
+    assert stale.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_fail_job_requeues_then_fails_permanently():
+    job = _job(status=JobStatus.RUNNING, attempts=1)
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(rowcount=1)])
+    assert await queue.fail_job(db, job, "w", "boom") == JobStatus.QUEUED
+
+    job.attempts = 3
+    db = FakeAsyncSession(execute_results=[FakeExecuteResult(rowcount=1)])
+    assert await queue.fail_job(db, job, "w", "boom") == JobStatus.FAILED
+
+    # A worker that lost its lease cannot record anything.
+    db = FakeAsyncSession(execute_results=[FakeExecuteResult(rowcount=0)])
+    assert await queue.fail_job(db, job, "w", "boom") is None
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_reports_lost_lease():
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(rowcount=0)])
+    assert await queue.heartbeat(db, uuid4(), "w") is False
+
+
+class FakeQueue:
+    """In-memory stand-in for the queue functions used by the worker."""
+
+    def __init__(self, jobs: list[Job]) -> None:
+        self.pending = list(jobs)
+        self.completed: list[Any] = []
+        self.failed: list[tuple[Any, str]] = []
+        self.owned = True
+
+    def install(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        async def claim_job(_db, worker_id, _lease, _kinds):
+            if not self.pending:
+                return None
+            job = self.pending.pop(0)
+            job.attempts += 1
+            job.lease_owner = worker_id
+            return job
+
+        async def complete_job(_db, job_id, _worker_id):
+            self.completed.append(job_id)
+            return True
+
+        async def fail_job(_db, job, _worker_id, error):
+            self.failed.append((job.id, error))
+            return JobStatus.QUEUED
+
+        async def heartbeat(_db, _job_id, _worker_id, _lease):
+            return self.owned
+
+        monkeypatch.setattr(worker, "claim_job", claim_job)
+        monkeypatch.setattr(worker, "complete_job", complete_job)
+        monkeypatch.setattr(worker, "fail_job", fail_job)
+        monkeypatch.setattr(worker, "heartbeat", heartbeat)
+
+
+@asynccontextmanager
+async def _session():
+    yield FakeAsyncSession()
+
+
+async def _run_until(job_worker: JobWorker, done: Any) -> None:
+    task = asyncio.create_task(job_worker.run())
+    for _ in range(200):
+        if done():
+            break
+        await asyncio.sleep(0.01)
+    job_worker.stop()
+    await asyncio.wait_for(task, 2)
+
+
+@pytest.mark.asyncio
+async def test_worker_completes_and_fails_jobs(monkeypatch: pytest.MonkeyPatch):
+    ok, bad, unknown = _job(), _job(kind="explode"), _job(kind="unknown")
+    fake = FakeQueue([ok, bad, unknown])
+    fake.install(monkeypatch)
+    seen: list[Any] = []
+
+    async def succeed(payload, job):
+        seen.append(job.id)
+
+    async def explode(payload, job):
+        raise RuntimeError("provider down")
+
+    job_worker = JobWorker(
+        _session,
+        {"evaluation_run": succeed, "explode": explode},
+        concurrency=2,
+        poll_interval_seconds=0.01,
+    )
+    await _run_until(job_worker, lambda: len(fake.completed) + len(fake.failed) == 3)
+
+    assert fake.completed == [ok.id]
+    assert seen == [ok.id]
+    errors = dict(fake.failed)
+    assert errors[bad.id] == "RuntimeError: provider down"
+    assert "No handler" in errors[unknown.id]
+
+
+@pytest.mark.asyncio
+async def test_worker_cancels_job_when_lease_is_lost(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeQueue([_job()])
+    fake.owned = False
+    fake.install(monkeypatch)
+    cancelled = asyncio.Event()
+
+    async def slow(payload, job):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    job_worker = JobWorker(
+        _session,
+        {"evaluation_run": slow},
+        lease_seconds=0.03,
+        poll_interval_seconds=0.01,
+    )
+    await _run_until(job_worker, cancelled.is_set)
+
+    assert cancelled.is_set()
+    assert fake.completed == []
+    assert fake.failed == []
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_running_jobs_on_stop(monkeypatch: pytest.MonkeyPatch):
+    fake = FakeQueue([_job()])
+    fake.install(monkeypatch)
+    started = asyncio.Event()
+
+    async def slowish(payload, job):
+        started.set()
+        await asyncio.sleep(0.05)
+
+    job_worker = JobWorker(
+        _session, {"evaluation_run": slowish}, poll_interval_seconds=0.01
+    )
+    await _run_until(job_worker, started.is_set)
+
+    assert len(fake.completed) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_worker_waits_for_its_jobs_to_unwind(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    fake = FakeQueue([_job()])
+    fake.install(monkeypatch)
+    started = asyncio.Event()
+    unwound: list[str] = []
+
+    async def stuck(payload, job):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        finally:
+            await asyncio.sleep(0.01)
+            unwound.append("released")
+
+    job_worker = JobWorker(
+        _session, {"evaluation_run": stuck}, poll_interval_seconds=0.01
+    )
+    task = asyncio.create_task(job_worker.run())
+    await asyncio.wait_for(started.wait(), 1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert unwound == ["released"]
+    assert job_worker.running == set()
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_task_reraises_for_retry(monkeypatch: pytest.MonkeyPatch):
+    eval_obj = SimpleNamespace(
+        status="collecting", samples_per_question=1, priority=1, question_ids=None
+    )
+
+    class Session(FakeAsyncSession):
+        async def get(self, model, _id):
+            return eval_obj if model.__name__ == "Evaluation" else None
+
+    @asynccontextmanager
+    async def fake_session_factory():
+        yield Session()
+
+    async def failing_plan(*_args, **_kwargs):
+        raise RuntimeError("db went away")
+
+    model = SimpleNamespace(name="m1")
+    template = SimpleNamespace(id="default")
+    monkeypatch.setattr(
+        handlers,
+        "load_app_config",
+        lambda: SimpleNamespace(models=[model], templates=[template]),
+    )
+    monkeypatch.setattr(handlers, "load_all_questions", lambda: [])
+    monkeypatch.setattr("src.db.database.async_session_factory", fake_session_factory)
+    monkeypatch.setattr(handlers, "plan_shards", failing_plan)
+
+    with pytest.raises(RuntimeError):
+        await handlers.run_evaluation_task(
+            uuid4(), ["m1"], "default", final_attempt=False
+        )
+    assert eval_obj.status == "collecting"
+
+    with pytest.raises(RuntimeError):
+        await handlers.run_evaluation_task(uuid4(), ["m1"], "default")
+    assert eval_obj.status == "created"
+
+
+@pytest.mark.asyncio
+async def test_lifespan_runs_and_stops_embedded_worker(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    from src import main
+
+    events: list[str] = []
+
+    class FakeWorker:
+        def __init__(self, _session_factory, _handlers):
+            self._stopped = asyncio.Event()
+
+        async def run(self):
+            events.append("run")
+            await self._stopped.wait()
+
+        def stop(self):
+            events.append("stop")
+            self._stopped.set()
+
+    monkeypatch.setattr(worker, "JobWorker", FakeWorker)
+    monkeypatch.setattr(progress, "start_progress_relay", lambda: None)
+    monkeypatch.setattr(
+        main,
+        "settings",
+        SimpleNamespace(
+            nextauth_secret="abc", job_worker_embedded=True, job_drain_seconds=1
+        ),
+    )
+
+    async with main.lifespan(SimpleNamespace()):
+        await asyncio.sleep(0)
+
+    assert events == ["run", "stop"]
+
+
+@pytest.mark.asyncio
+async def test_run_worker_drains_on_sigterm(monkeypatch: pytest.MonkeyPatch):
+    import os
+    import signal
+
+    from src.db import database
+
+    events: list[Any] = []
+
+    class FakeWorker:
+        def __init__(self, _session_factory, _handlers, concurrency, kinds):
+            events.append(("init", concurrency, kinds))
+            self._stopped = asyncio.Event()
+
+        @property
+        def stopping(self):
+            return self._stopped.is_set()
+
+        async def run(self):
+            os.kill(os.getpid(), signal.SIGTERM)
+            await self._stopped.wait()
+            events.append("drained")
+
+        def stop(self):
+            events.append("stop")
+            self._stopped.set()
+
+    class FakeEngine:
+        async def dispose(self):
+            events.append("dispose")
+
+    def configure_pool(pool_size, max_overflow):
+        events.append(("pool", pool_size, max_overflow))
+
+    monkeypatch.setattr(database, "configure_pool", configure_pool)
+    monkeypatch.setattr(database, "engine", FakeEngine())
+    monkeypatch.setattr(worker, "JobWorker", FakeWorker)
+    monkeypatch.setattr(progress, "start_progress_relay", lambda: None)
+
+    await asyncio.wait_for(
+        worker.run_worker(concurrency=3, kinds=["report_build"], pool_size=4), 2
+    )
+
+    assert events == [
+        ("pool", 4, 5),
+        ("init", 3, ["report_build"]),
+        "stop",
+        "drained",
+        "dispose",
+    ]
+
+
+def test_worker_cli_rejects_unknown_kinds():
+    from typer.testing import CliRunner
+
+    from cli import app
+
+    result = CliRunner().invoke(app, ["worker", "--kinds", "evaluation_run,nope"])
+    assert result.exit_code == 1
+    assert "Unknown job kinds: nope" in result.output
+
+
+@pytest.mark.asyncio
+async def test_built_reports_are_stored_and_served_from_the_database(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    from src.api import reports
+    from src.db.models import ReportFile
+    from src.reporting import generator
+
+    async def fake_markdown(_db, _eid):
+        return "# report"
+
+    monkeypatch.setattr(generator, "generate_markdown_report", fake_markdown)
+    evaluation_id = uuid4()
+    stored = ReportFile(
+        id=uuid4(), evaluation_id=evaluation_id, format="markdown", content="# report"
+    )
+    db = FakeAsyncSession(execute_results=[FakeExecuteResult(one=stored)])
+
+    report = await generator.build_report_file(cast(Any, db), evaluation_id, "markdown")
+
+    assert report is stored
+    assert db.commits == 1
+
+    user = cast(Any, SimpleNamespace(id=uuid4()))
+    served = await reports.download_report_file(
+        evaluation_id,
+        "markdown",
+        user,
+        cast(Any, FakeAsyncSession(execute_results=[FakeExecuteResult(one=stored)])),
+    )
+    assert served.body == b"# report"
+    assert served.media_type == "text/markdown"
+    assert f"{evaluation_id}.md" in served.headers["content-disposition"]
+
+    with pytest.raises(HTTPException) as exc:
+        await reports.download_report_file(
+            evaluation_id, "html", user, cast(Any, FakeAsyncSession())
+        )
+    assert exc.value.status_code == 404
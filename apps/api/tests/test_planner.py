@@ -0,0 +1,271 @@
+"""Tests for dry-run planning of evaluation runs."""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import evaluations
+from src.db.models import ModelRuntimeStats
+from src.loaders.config_loader import ModelConfig, PromptTemplate, ProviderConfig
+from src.runners import planner
+from src.runners.planner import ModelHistory, PlanError, build_plan
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+TEMPLATE = PromptTemplate(
+    id="t", name="T", version="1", description="", template="Q: {question}"
+)
+
+
+def _model(name: str, provider: str = "p", **kwargs: Any) -> ModelConfig:
+    return ModelConfig(
+        name=name,
+        provider=provider,
+        litellm_model=f"{provider}/{name}",
+        api_key_env="K",
+        **kwargs,
+    )
+
+
+@pytest.fixture(autouse=True)
+def plan_env(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        planner,
+        "get_settings",
+        lambda: SimpleNamespace(
+            runner_max_concurrency=4,
+            evaluation_max_shards=2,
+            work_item_chunk_size=2,
+            scheduler_provider_concurrency=6,
+        ),
+    )
+    monkeypatch.setattr(planner, "count_prompt_tokens", lambda _m, prompt: 10)
+    monkeypatch.setattr(planner, "supports_n", lambda cfg: cfg.supports_n is True)
+    monkeypatch.setattr(
+        planner,
+        "estimate_cost",
+        lambda model, p, c: None if model.startswith("free") else (p + c) * 1e-4,
+    )
+
+
+def test_plan_counts_missing_samples_and_groups_them_into_calls():
+    plan = build_plan(
+        {"Q1": "a", "Q2": "b"},
+        [_model("bundled", supports_n=True), _model("single")],
+        TEMPLATE,
+        {"single": ModelHistory(10, 2.0, 50.0, 0.01)},
+        samples_per_question=3,
+        collected={("Q1", "bundled", 0), ("Q1", "single", 0), ("Q1", "single", 1)},
+    )
+
+    bundled, single = plan.models
+    assert (bundled.samples, bundled.calls) == (5, 2)
+    assert bundled.prompt_tokens == 20
+    assert bundled.completion_tokens == 5 * planner.DEFAULT_MAX_TOKENS
+    assert (single.samples, single.calls) == (4, 4)
+    assert single.completion_tokens == 200
+    assert single.call_seconds == 8.0
+    assert plan.cost_usd == pytest.approx((20 + 5 * 2048 + 40 + 200) * 1e-4)
+    assert plan.models_without_history == ["bundled"]
+    # Without latency for every model the wall time is not projected.
+    assert plan.wall_seconds is None
+    assert plan.providers[0].limited_by is None
+
+
+def test_bundled_calls_project_completion_history_per_call():
+    plan = build_plan(
+        {"Q1": "a", "Q2": "b"},
+        [_model("bundled", supports_n=True)],
+        TEMPLATE,
+        {"bundled": ModelHistory(10, 2.0, 150.0, 0.01)},
+        samples_per_question=3,
+    )
+
+    [bundled] = plan.models
+    assert (bundled.samples, bundled.calls) == (6, 2)
+    # One call returns all three samples, so its mean covers them all.
+    assert bundled.completion_tokens == 2 * 150
+    assert bundled.cost_usd == pytest.approx((20 + 300) * 1e-4)
+
+
+def test_plan_projects_wall_time_from_concurrency_and_rate_limits():
+    history = {
+        "a": ModelHistory(10, 3.0, 90.0, 0.0),
+        "b": ModelHistory(10, 1.0, 90.0, 0.0),
+    }
+    questions = {f"Q{n}": "q" for n in range(10)}
+
+    plan = build_plan(
+        questions,
+        [_model("a"), _model("b", provider="slow", requests_per_minute=4)],
+        TEMPLATE,
+        history,
+        providers=[ProviderConfig(name="p", max_concurrency=2)],
+    )
+
+    # 20 cells in chunks of 2 would make 10 shards; at most 2 run.
+    assert plan.concurrency == 8
+    fast, slow = plan.providers
+    assert (fast.concurrency, fast.limited_by, fast.wall_seconds) == (
+        2,
+        "concurrency",
+        15.0,
+    )
+    # A full bucket covers 4 calls; the other 6 come at 4 per minute.
+    assert (slow.limited_by, slow.wall_seconds) == ("requests_per_minute", 90.0)
+    assert plan.wall_seconds == 90.0
+    data = plan.to_dict()
+    assert data["providers"][1]["limited_by"] == "requests_per_minute"
+    assert data["models"][0]["call_seconds"] == 30.0
+
+
+def test_batch_plan_is_discounted_and_has_no_wall_time():
+    plan = build_plan(
+        {"Q1": "a"},
+        [_model("m", supports_n=True), _model("free")],
+        TEMPLATE,
+        {"free": ModelHistory(4, 1.0, 10.0, 0.002)},
+        samples_per_question=2,
+        execution_mode="batch",
+    )
+
+    paid, free = plan.models
+    # Batch requests carry one sample each.
+    assert paid.calls == 2
+    assert paid.cost_usd == pytest.approx((20 + 2 * 2048) * 1e-4 * 0.5)
+    # No cost-map price: charged at the model's mean recorded call cost.
+    assert free.cost_usd == pytest.approx(2 * 0.002 * 0.5)
+    assert plan.providers == []
+    assert plan.wall_seconds is None
+
+
+@pytest.mark.asyncio
+async def test_load_model_history_averages_across_evaluations():
+    rows = [
+        ModelRuntimeStats(
+            model_name="m",
+            calls=calls,
+            latency_seconds=latency,
+            completion_tokens=tokens,
+            cost_usd=cost,
+        )
+        for calls, latency, tokens, cost in ((2, 4.0, 100, 0.02), (6, 4.0, 300, 0.06))
+    ]
+    db: Any = FakeAsyncSession(execute_results=[rows])
+
+    history = await planner.load_model_history(db, ["m"])
+
+    assert history == {"m": ModelHistory(8, 1.0, 50.0, 0.01)}
+
+
+def _evaluation(**overrides: Any) -> Any:
+    fields = {
+        "id": uuid4(),
+        "model_list": ["m"],
+        "prompt_template": "t",
+        "samples_per_question": 1,
+        "execution_mode": "interactive",
+        "budget_usd": None,
+        "budget_tokens": None,
+        "question_ids": None,
+    }
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+@pytest.mark.asyncio
+async def test_plan_evaluation_checks_budget_including_spend(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        planner,
+        "load_app_config",
+        lambda: SimpleNamespace(
+            models=[_model("m")], templates=[TEMPLATE], providers=[]
+        ),
+    )
+    monkeypatch.setattr(
+        planner, "load_all_questions", lambda: [SimpleNamespace(id="Q1", text="a")]
+    )
+    db: Any = FakeAsyncSession(
+        execute_results=[
+            FakeExecuteResult(many=[]),
+            FakeExecuteResult(many=[]),
+            FakeExecuteResult(one=(0.15, 100)),
+        ]
+    )
+
+    plan = await planner.plan_evaluation(db, _evaluation(budget_usd=0.3))
+
+    # 2058 projected tokens cost ~0.21, over what is left of the budget.
+    assert plan.samples == 1
+    assert plan.within_budget is False
+
+    with pytest.raises(PlanError, match="template 'nope' not found"):
+        await planner.plan_evaluation(db, _evaluation(prompt_template="nope"))
+    with pytest.raises(PlanError, match="models are configured"):
+        await planner.plan_evaluation(db, _evaluation(model_list=["other"]))
+
+
+@pytest.mark.asyncio
+async def test_plan_endpoint_reports_unplannable_evaluations(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    evaluation = _evaluation()
+
+    async def fake_get_eval(_db, _eid):
+        return evaluation
+
+    async def fake_plan(_db, _evaluation):
+        if _evaluation.prompt_template == "nope":
+            raise PlanError("Prompt template 'nope' not found")
+        return planner.RunPlan(execution_mode="interactive", samples=3)
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(evaluations, "plan_evaluation", fake_plan)
+    user = cast(Any, SimpleNamespace())
+    db = cast(Any, FakeAsyncSession())
+
+    out = await evaluations.plan_run(evaluation.id, user, db)
+    assert out["evaluation_id"] == str(evaluation.id)
+    assert out["samples"] == 3
+
+    evaluation.prompt_template = "nope"
+    with pytest.raises(HTTPException) as exc:
+        await evaluations.plan_run(evaluation.id, user, db)
+    assert exc.value.status_code == 422
+
+
+def test_plan_cli_prints_the_plan(monkeypatch: pytest.MonkeyPatch):
+    from typer.testing import CliRunner
+
+    from cli import app
+    from src.db import database, repository
+
+    @asynccontextmanager
+    async def fake_session_factory():
+        yield FakeAsyncSession()
+
+    async def fake_get_eval(_db, _eid):
+        return _evaluation()
+
+    async def fake_plan(_db, _evaluation):
+        return build_plan(
+            {"Q1": "a"},
+            [_model("m")],
+            TEMPLATE,
+            {"m": ModelHistory(1, 8.0, 10.0, 0.0)},
+        )
+
+    monkeypatch.setattr(database, "async_session_factory", fake_session_factory)
+    monkeypatch.setattr(repository, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(planner, "plan_evaluation", fake_plan)
+
+    result = CliRunner().invoke(app, ["plan", str(uuid4())])
+
+    assert result.exit_code == 0
+    assert "Samples: 1 in 1 calls" in result.output
+    assert "Wall time: 2s" in result.output
+    assert "- p: 4 concurrent, limited by concurrency" in result.output
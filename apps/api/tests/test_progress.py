@@ -0,0 +1,204 @@
+"""Tests for the live run-progress stream."""
+
+import json
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+
+from src.api import evaluations
+from src.observability import progress
+from src.observability.progress import (
+    NotifyRelay,
+    ProgressBroker,
+    ProgressEvent,
+    RunProgress,
+    get_progress_broker,
+)
+from src.runners import litellm_runner
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+def test_broker_drops_oldest_events_for_slow_subscribers():
+    broker = ProgressBroker(queue_size=2)
+    with broker.subscribe("e1") as queue:
+        for n in range(3):
+            broker.publish(ProgressEvent(evaluation_id="e1", samples=n))
+        broker.publish(ProgressEvent(evaluation_id="other"))
+        assert [queue.get_nowait().samples for _ in range(queue.qsize())] == [1, 2]
+    # Nothing is kept for other processes unless the relay is running.
+    assert broker.drain_outbox() == []
+
+
+def test_notify_payloads_stay_under_the_postgres_limit(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(progress, "NOTIFY_PAYLOAD_LIMIT", 400)
+    events = [ProgressEvent(evaluation_id="e1", model=f"m{n}") for n in range(10)]
+
+    payloads = progress.notify_payloads("origin", events)
+
+    assert len(payloads) > 1
+    assert all(len(p) < 500 for p in payloads)
+    unpacked = [e for p in payloads for e in json.loads(p)["events"]]
+    assert [e["model"] for e in unpacked] == [f"m{n}" for n in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_relay_forwards_local_events_and_republishes_foreign_ones():
+    broker = ProgressBroker()
+    broker.forwarding = True
+    relay = NotifyRelay(broker, flush_seconds=0.1)
+    sent: list[tuple[Any, ...]] = []
+
+    class Connection:
+        async def execute(self, *args: Any) -> None:
+            sent.append(args)
+
+    broker.publish(ProgressEvent(evaluation_id="e1", model="m1"))
+    assert await relay.flush(Connection()) == 1
+    assert sent[0][1] == progress.PROGRESS_CHANNEL
+    own = sent[0][2]
+
+    with broker.subscribe("e1") as queue:
+        relay.on_notify(None, 1, progress.PROGRESS_CHANNEL, own)
+        assert queue.empty()
+        relay.on_notify(
+            None, 1, progress.PROGRESS_CHANNEL, own.replace(broker.origin, "x")
+        )
+        assert queue.get_nowait().model == "m1"
+    # Republished events are not sent back out.
+    assert broker.drain_outbox() == []
+
+
+def test_run_progress_snapshot_reports_throughput_and_eta():
+    run = RunProgress(total=100, by_model={"m1": (40, 0.4)}, errors=1)
+    now = run.started + 60
+    for _ in range(10):
+        run.apply(ProgressEvent(evaluation_id="e1", model="m2", cost_usd=0.01, at=now))
+    run.apply(
+        ProgressEvent(
+            evaluation_id="e1", model="m2", samples=3, succeeded=False, at=now
+        )
+    )
+
+    snapshot = run.snapshot(now)
+
+    assert snapshot["completed"] == 50
+    # Failed calls count the samples they were meant to collect.
+    assert snapshot["errors"] == 4
+    assert snapshot["cost_usd"] == 0.5
+    assert snapshot["responses_per_minute"] == 10.0
+    assert snapshot["eta_seconds"] == 300.0
+    assert snapshot["models"]["m1"]["completed"] == 40
+    assert snapshot["models"]["m2"]["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_publishes_call_events(monkeypatch: pytest.MonkeyPatch):
+    async def fake_call_model(_cfg, _question_text, _template):
+        return {"response_text": "ok", "metadata": {"cost_usd": 0.002}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    evaluation_id = uuid4()
+
+    with get_progress_broker().subscribe(evaluation_id) as queue:
+        await litellm_runner.run_evaluation(
+            db=cast(Any, FakeAsyncSession()),
+            evaluation_id=evaluation_id,
+            question_ids=["Q1"],
+            question_texts={"Q1": "Q1"},
+            model_configs=cast(Any, [type("MC", (), {"name": "m1"})()]),
+            prompt_template=cast(Any, type("Tpl", (), {"template": "{question}"})()),
+        )
+        event = queue.get_nowait()
+
+    assert event.model == "m1"
+    assert event.succeeded is True
+    assert event.cost_usd == 0.002
+
+
+@pytest.mark.asyncio
+async def test_events_stream_sends_snapshots_until_the_run_stops(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        evaluations,
+        "get_settings",
+        lambda: SimpleNamespace(
+            progress_stream_interval_seconds=0.0, progress_keepalive_seconds=5.0
+        ),
+    )
+    evaluation_id = uuid4()
+    broker = get_progress_broker()
+    stream = evaluations._progress_stream(
+        evaluation_id, RunProgress(total=2), "running"
+    )
+
+    first = await anext(stream)
+    broker.publish(ProgressEvent(evaluation_id=str(evaluation_id), model="m1"))
+    broker.publish_status(evaluation_id, "reviewing")
+    rest = [chunk async for chunk in stream]
+
+    assert first.startswith("event: progress\n")
+    assert json.loads(first.split("data: ")[1])["completed"] == 0
+    last_progress = json.loads(rest[-2].split("data: ")[1])
+    assert last_progress["completed"] == 1
+    assert last_progress["status"] == "reviewing"
+    assert rest[-1] == 'event: end\ndata: {"status": "reviewing"}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_load_run_progress_starts_from_recorded_responses(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def fake_failed_samples(_db, _eid, samples_per_question):
+        assert samples_per_question == 2
+        return 3
+
+    monkeypatch.setattr(evaluations, "count_failed_samples", fake_failed_samples)
+    monkeypatch.setattr(
+        evaluations, "load_all_questions", lambda: [SimpleNamespace()] * 3
+    )
+    evaluation: Any = SimpleNamespace(
+        id=uuid4(),
+        model_list=["m1", "m2"],
+        samples_per_question=2,
+        question_ids=None,
+    )
+    db: Any = FakeAsyncSession(
+        execute_results=[FakeExecuteResult(many=[("m1", 4, 0.5)])]
+    )
+
+    run = await evaluations._load_run_progress(db, evaluation)
+    snapshot = run.snapshot()
+
+    assert snapshot["total"] == 12
+    assert snapshot["completed"] == 4
+    assert snapshot["errors"] == 3
+    assert snapshot["models"]["m1"]["cost_usd"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_returns_event_stream(monkeypatch: pytest.MonkeyPatch):
+    eval_obj = SimpleNamespace(
+        id=uuid4(),
+        status="reviewing",
+        model_list=[],
+        samples_per_question=1,
+        question_ids=None,
+    )
+
+    async def fake_get_eval(_db, _eid):
+        return eval_obj
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+
+    response = await evaluations.stream_run_events(
+        eval_obj.id, cast(Any, SimpleNamespace()), cast(Any, FakeAsyncSession())
+    )
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert response.media_type == "text/event-stream"
+    assert chunks[-1] == 'event: end\ndata: {"status": "reviewing"}\n\n'
@@ -0,0 +1,158 @@
+"""Tests for selecting question subsets."""
+
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import evaluations
+from src.loaders.question_bank import (
+    QuestionBank,
+    QuestionSelectionError,
+    questions_for,
+)
+from src.models.evaluation import QuestionSelector
+from src.models.question import Question, QuestionType
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+def _question(
+    qid: str,
+    type_: QuestionType = QuestionType.FACTUAL,
+    difficulty: str = "easy",
+    tags: list[str] | None = None,
+    sensitivity: str = "low",
+) -> Question:
+    return Question(
+        id=qid,
+        text=f"Question {qid}",
+        type=type_,
+        difficulty=difficulty,
+        tags=tags or [],
+        denominational_sensitivity=sensitivity,
+    )
+
+
+BANK = [
+    _question("F1", tags=["gospels"]),
+    _question("F2", difficulty="advanced", tags=["gospels", "paul"]),
+    _question("T1", QuestionType.THEOLOGICAL, tags=["paul"], sensitivity="high"),
+    _question("T2", QuestionType.THEOLOGICAL, "advanced", sensitivity="high"),
+    _question("I1", QuestionType.INTERPRETIVE, tags=["prophets"]),
+]
+
+
+def _ids(questions: list[Question]) -> list[str]:
+    return [q.id for q in questions]
+
+
+def test_filters_combine_across_attributes_and_within_one():
+    bank = QuestionBank(BANK)
+
+    assert _ids(bank.select(QuestionSelector(tags=["paul"]))) == ["F2", "T1"]
+    assert _ids(
+        bank.select(
+            QuestionSelector(tags=["gospels", "prophets"], difficulties=["easy"])
+        )
+    ) == ["F1", "I1"]
+    assert _ids(
+        bank.select(
+            QuestionSelector(
+                types=[QuestionType.THEOLOGICAL], denominational_sensitivity=["high"]
+            )
+        )
+    ) == ["T1", "T2"]
+    assert _ids(bank.select(QuestionSelector(ids=["I1", "F1"]))) == ["F1", "I1"]
+    assert len(bank.select(QuestionSelector())) == len(BANK)
+
+
+def test_unknown_ids_and_empty_matches_are_rejected():
+    bank = QuestionBank(BANK)
+
+    with pytest.raises(QuestionSelectionError, match="Unknown question ids: X1"):
+        bank.select(QuestionSelector(ids=["F1", "X1"]))
+    with pytest.raises(QuestionSelectionError, match="matches no questions"):
+        bank.select(QuestionSelector(tags=["paul"], difficulties=["intermediate"]))
+
+
+def test_samples_are_stratified_and_reproducible():
+    bank = QuestionBank(
+        [_question(f"F{i}") for i in range(6)]
+        + [_question(f"T{i}", QuestionType.THEOLOGICAL) for i in range(3)]
+        + [_question(f"I{i}", QuestionType.INTERPRETIVE) for i in range(3)]
+    )
+    selector = QuestionSelector(sample_size=4, stratify_by=["type"], seed=7)
+
+    sample = bank.select(selector)
+
+    assert len(sample) == 4
+    assert Counter(q.type for q in sample) == {
+        QuestionType.FACTUAL: 2,
+        QuestionType.THEOLOGICAL: 1,
+        QuestionType.INTERPRETIVE: 1,
+    }
+    assert _ids(bank.select(selector)) == _ids(sample)
+    # A sample no smaller than the match is the match itself.
+    assert len(bank.select(QuestionSelector(sample_size=50))) == 12
+
+
+def test_questions_for_keeps_all_questions_without_a_subset():
+    assert questions_for(BANK, None) == BANK
+    assert _ids(questions_for(BANK, ["T2", "F1"])) == ["F1", "T2"]
+
+
+def _create_body(selector: QuestionSelector | None) -> Any:
+    return SimpleNamespace(
+        name="Subset",
+        perspective="multi_perspective",
+        scoring_dimensions=["accuracy"],
+        model_list=["m"],
+        prompt_template="default",
+        review_mode="blind",
+        execution_mode="interactive",
+        budget_usd=None,
+        budget_tokens=None,
+        samples_per_question=1,
+        question_selector=selector,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_evaluation_persists_the_selected_ids(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(evaluations, "load_all_questions", lambda: BANK)
+    user = cast(Any, SimpleNamespace(id=uuid4()))
+
+    created = await evaluations.create_evaluation(
+        _create_body(QuestionSelector(tags=["paul"])),
+        user,
+        cast(Any, FakeAsyncSession()),
+    )
+
+    assert created.question_ids == ["F2", "T1"]
+    assert created.question_selector["tags"] == ["paul"]
+
+    with pytest.raises(HTTPException) as exc:
+        await evaluations.create_evaluation(
+            _create_body(QuestionSelector(tags=["missing"])),
+            user,
+            cast(Any, FakeAsyncSession()),
+        )
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_run_progress_counts_only_the_subset(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(evaluations, "load_all_questions", lambda: BANK)
+    evaluation: Any = SimpleNamespace(
+        id=uuid4(), model_list=["m"], samples_per_question=2, question_ids=["F1", "I1"]
+    )
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(many=[])])
+
+    run = await evaluations._load_run_progress(db, evaluation)
+
+    assert run.snapshot()["total"] == 4
@@ -0,0 +1,135 @@
+"""Tests for the provider/model token-bucket rate limiter."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.loaders.config_loader import ModelConfig, ProviderConfig, load_app_config
+from src.runners.rate_limiter import RateLimiter, TokenBucket
+from tests.conftest import FakeClock
+
+
+def _model(**overrides) -> ModelConfig:
+    fields = {
+        "name": "gpt-4o",
+        "provider": "openai",
+        "litellm_model": "gpt-4o",
+        "api_key_env": "OPENAI_API_KEY",
+    }
+    fields.update(overrides)
+    return ModelConfig(**fields)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill(fake_clock: FakeClock):
+    bucket = TokenBucket(60, fake_clock)
+
+    for _ in range(60):
+        assert await bucket.acquire() == 0
+    waited = await bucket.acquire()
+
+    assert waited == pytest.approx(1.0)
+    assert fake_clock.now == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_clamps_oversized_requests(fake_clock: FakeClock):
+    bucket = TokenBucket(100, fake_clock)
+    assert await bucket.acquire(500) == 0
+    assert bucket.tokens == 0
+
+
+def test_token_bucket_rejects_non_positive_rate(fake_clock: FakeClock):
+    with pytest.raises(ValueError, match="positive"):
+        TokenBucket(0, fake_clock)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_applies_provider_and_model_limits(
+    fake_clock: FakeClock,
+):
+    limiter = RateLimiter(
+        [ProviderConfig(name="openai", requests_per_minute=120)], clock=fake_clock
+    )
+    fast = _model(name="gpt-4o-mini")
+    slow = _model(name="gpt-4o", requests_per_minute=30)
+
+    # The model-level limit (30/min) is tighter than the provider (120/min).
+    for _ in range(30):
+        await limiter.acquire(slow, estimated_tokens=10)
+    assert fake_clock.now == 0
+    await limiter.acquire(slow, estimated_tokens=10)
+    assert fake_clock.now == pytest.approx(2.0)
+
+    # Both models draw from the shared provider bucket: 120 - 31 + 4 refilled.
+    for _ in range(93):
+        await limiter.acquire(fast, estimated_tokens=10)
+    before = fake_clock.now
+    await limiter.acquire(fast, estimated_tokens=10)
+    assert fake_clock.now > before
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_serializes_concurrent_waiters(fake_clock: FakeClock):
+    limiter = RateLimiter(clock=fake_clock)
+    model = _model(requests_per_minute=60)
+
+    await asyncio.gather(*(limiter.acquire(model, 1) for _ in range(63)))
+    assert fake_clock.now == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_splits_quotas_between_processes(fake_clock: FakeClock):
+    limiter = RateLimiter(
+        [ProviderConfig(name="openai", requests_per_minute=120)],
+        clock=fake_clock,
+        processes=4,
+    )
+    model = _model()
+
+    for _ in range(30):
+        await limiter.acquire(model, estimated_tokens=10)
+    assert fake_clock.now == 0
+    await limiter.acquire(model, estimated_tokens=10)
+    assert fake_clock.now == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_settle_refunds_unused_tokens(fake_clock: FakeClock):
+    limiter = RateLimiter(
+        [ProviderConfig(name="openai", tokens_per_minute=1000)], clock=fake_clock
+    )
+    model = _model()
+
+    await limiter.acquire(model, estimated_tokens=900)
+    limiter.settle(model, estimated_tokens=900, actual_tokens=100)
+    await limiter.acquire(model, estimated_tokens=900)
+
+    assert fake_clock.now == 0
+    assert fake_clock.sleeps == []
+
+
+def test_load_app_config_reads_provider_limits(tmp_path: Path):
+    (tmp_path / "models.yaml").write_text(
+        "providers:\n"
+        "  - name: openai\n"
+        "    requests_per_minute: 500\n"
+        "    tokens_per_minute: 30000\n"
+        "models:\n"
+        "  - name: gpt-4o\n"
+        "    provider: openai\n"
+        "    litellm_model: gpt-4o\n"
+        "    api_key_env: OPENAI_API_KEY\n"
+        "    requests_per_minute: 100\n"
+    )
+    cfg = load_app_config(tmp_path)
+    assert cfg.providers[0].tokens_per_minute == 30000
+    assert cfg.models[0].requests_per_minute == 100
+    assert cfg.models[0].tokens_per_minute is None
+
+
+def test_default_models_config_declares_provider_quotas():
+    cfg = load_app_config()
+    providers = {p.name for p in cfg.providers}
+    assert {m.provider for m in cfg.models} <= providers
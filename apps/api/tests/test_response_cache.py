@@ -0,0 +1,155 @@
+"""Tests for the content-addressed LLM response cache."""
+
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+
+from src.runners import litellm_runner, response_cache
+from src.runners.response_cache import ResponseCache, cache_key
+from tests.conftest import FakeAsyncSession
+
+
+def test_cache_key_depends_on_every_input():
+    base = cache_key("gpt-4o", "Q: grace?", 0.7, 2048)
+    assert base == cache_key("gpt-4o", "Q: grace?", 0.7, 2048)
+    assert base != cache_key("gpt-4o-mini", "Q: grace?", 0.7, 2048)
+    assert base != cache_key("gpt-4o", "Q: faith?", 0.7, 2048)
+    assert base != cache_key("gpt-4o", "Q: grace?", 0.0, 2048)
+    assert base != cache_key("gpt-4o", "Q: grace?", 0.7, 1024)
+
+
+def test_cache_get_put_counts_hits_and_misses(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+    key = cache_key("m", "p", 0.7, 10)
+
+    assert cache.get(key) is None
+    cache.put(key, {"response_text": "hi", "metadata": {}})
+    assert cache.get(key) == {"response_text": "hi", "metadata": {}}
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_cache_expires_old_entries(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_age_seconds=60)
+    key = cache_key("m", "p", 0.7, 10)
+    cache.put(key, {"response_text": "old", "metadata": {}})
+    stale = time.time() - 120
+    os.utime(cache._path(key), (stale, stale))
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+
+def test_cache_evict_trims_oldest_beyond_max_bytes(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_bytes=250)
+    keys = [cache_key("m", f"p{i}", 0.7, 10) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, {"response_text": "x" * 80, "metadata": {}})
+        ts = time.time() - 100 + i
+        os.utime(cache._path(key), (ts, ts))
+
+    assert cache.evict() == 1
+    assert not cache._path(keys[0]).exists()
+    assert cache._path(keys[2]).exists()
+
+
+def test_get_response_cache_respects_settings(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    settings = SimpleNamespace(
+        llm_cache_enabled=True,
+        llm_cache_dir=str(tmp_path),
+        llm_cache_max_mb=1,
+        llm_cache_max_age_days=1,
+    )
+    monkeypatch.setattr(response_cache, "get_settings", lambda: settings)
+    response_cache.get_response_cache.cache_clear()
+    cache = response_cache.get_response_cache()
+    assert cache is not None
+    assert cache.max_bytes == 1024 * 1024
+
+    settings.llm_cache_enabled = False
+    response_cache.get_response_cache.cache_clear()
+    assert response_cache.get_response_cache() is None
+    response_cache.get_response_cache.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_serves_cache_hits(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    model_config: Any,
+    caplog: pytest.LogCaptureFixture,
+):
+    calls = 0
+
+    async def fake_call_model(_cfg, _question_text, _template):
+        nonlocal calls
+        calls += 1
+        return {"response_text": "fresh", "metadata": {"cost_usd": 0.02}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    cache = ResponseCache(tmp_path)
+    template = cast(Any, SimpleNamespace(template="Q: {question}"))
+
+    async def run() -> list:
+        return await litellm_runner.run_evaluation(
+            db=cast(Any, FakeAsyncSession()),
+            evaluation_id=uuid4(),
+            question_ids=["Q1"],
+            question_texts={"Q1": "What is grace?"},
+            model_configs=[model_config],
+            prompt_template=template,
+            cache=cache,
+        )
+
+    first = await run()
+    second = await run()
+
+    assert calls == 1
+    assert "source" not in first[0].raw_metadata
+    assert second[0].response_text == "fresh"
+    assert second[0].raw_metadata["source"] == "cache"
+    assert second[0].raw_metadata["cost_usd"] == 0.0
+    assert cache.hits == 1
+    summary = [
+        r for r in caplog.records if r.getMessage() == "Evaluation responses collected"
+    ]
+    assert summary[-1].response_cache == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_does_not_cache_truncated_answers(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, model_config: Any
+):
+    calls = 0
+
+    async def fake_call_model(_cfg, _question_text, _template):
+        nonlocal calls
+        calls += 1
+        return {
+            "response_text": "cut o",
+            "metadata": {"cost_usd": 0.02, "streamed": True, "truncated": True},
+        }
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    cache = ResponseCache(tmp_path)
+
+    for _ in range(2):
+        await litellm_runner.run_evaluation(
+            db=cast(Any, FakeAsyncSession()),
+            evaluation_id=uuid4(),
+            question_ids=["Q1"],
+            question_texts={"Q1": "What is grace?"},
+            model_configs=[model_config],
+            prompt_template=cast(Any, SimpleNamespace(template="Q: {question}")),
+            cache=cache,
+        )
+
+    assert calls == 2
+    assert cache.hits == 0
@@ -0,0 +1,157 @@
+"""Tests for the error-classified retry policy."""
+
+import random
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import httpx
+import litellm
+import pytest
+
+from src.loaders.config_loader import ModelConfig
+from src.runners import litellm_runner
+from src.runners.retry import (
+    RetryBudget,
+    RetryPolicy,
+    is_retryable,
+    retry_after_seconds,
+)
+from tests.conftest import FakeAsyncSession, LiteLLMStub
+
+
+def _rate_limited(headers: dict[str, str]) -> Exception:
+    response = httpx.Response(
+        429, headers=headers, request=httpx.Request("POST", "https://api.test")
+    )
+    return litellm.RateLimitError("slow down", "openai", "gpt-4o", response=response)
+
+
+def test_is_retryable_classifies_litellm_errors():
+    assert is_retryable(_rate_limited({}))
+    assert is_retryable(litellm.InternalServerError("overloaded", "anthropic", "c"))
+    assert is_retryable(litellm.Timeout("timed out", "openai", "gpt-4o"))
+    assert is_retryable(RuntimeError("connection reset"))
+    assert not is_retryable(litellm.AuthenticationError("bad key", "openai", "g"))
+    assert not is_retryable(litellm.BadRequestError("invalid", "gpt-4o", "openai"))
+    assert not is_retryable(KeyError("choices"))
+
+
+def test_retry_after_seconds_parses_header_variants():
+    assert retry_after_seconds(_rate_limited({"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(_rate_limited({"retry-after-ms": "1500"})) == 1.5
+    later = datetime.now(UTC) + timedelta(seconds=30)
+    seconds = retry_after_seconds(
+        _rate_limited({"retry-after": format_datetime(later, usegmt=True)})
+    )
+    assert seconds is not None
+    assert 25 <= seconds <= 30
+    assert retry_after_seconds(_rate_limited({"retry-after": "soon"})) is None
+    assert retry_after_seconds(RuntimeError("no headers")) is None
+
+
+def test_next_delay_uses_decorrelated_jitter_and_retry_after_floor():
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0, rng=random.Random(7))  # noqa: S311
+
+    delay = 0.0
+    for _ in range(20):
+        previous = delay
+        delay = policy.next_delay(RuntimeError("x"), previous)
+        assert 1.0 <= delay <= min(10.0, max(1.0, previous * 3))
+
+    hinted = policy.next_delay(_rate_limited({"retry-after": "42"}), 0.0)
+    assert hinted == 42.0
+
+
+def test_retry_budget_limits_retries_to_ratio_of_requests():
+    budget = RetryBudget(ratio=0.5, reserve=1, capacity=2)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.balance == 2
+    assert budget.exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_call_model_does_not_retry_fatal_errors(
+    mock_litellm_failing: LiteLLMStub, model_config: Any
+):
+    mock_litellm_failing.set_response(
+        "openai/gpt-4o", litellm.AuthenticationError("bad key", "openai", "gpt-4o")
+    )
+    template: Any = SimpleNamespace(template="Q: {question}")
+
+    with pytest.raises(RuntimeError, match="failed after 1 attempts"):
+        await litellm_runner.call_model(model_config, "q", template)
+    assert len(mock_litellm_failing.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_call_model_honours_retry_after_and_budget(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_litellm_failing: LiteLLMStub,
+    model_config: Any,
+):
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(litellm_runner.asyncio, "sleep", fake_sleep)
+    policy = RetryPolicy(
+        max_attempts=5,
+        base_delay=0.5,
+        budget_reserve=2,
+        rng=random.Random(1),  # noqa: S311
+    )
+    monkeypatch.setattr(litellm_runner, "get_retry_policy", lambda: policy)
+    mock_litellm_failing.set_response(
+        "openai/gpt-4o", _rate_limited({"retry-after": "3"})
+    )
+    template: Any = SimpleNamespace(template="Q: {question}")
+
+    with pytest.raises(RuntimeError, match="failed after 3 attempts"):
+        await litellm_runner.call_model(model_config, "q", template)
+
+    # Reserve of 2 (+0.2 deposit) allows two retries, each waiting >= Retry-After.
+    assert len(sleeps) == 2
+    assert all(s >= 3.0 for s in sleeps)
+    assert policy.budget_snapshot()["gpt-4o"]["exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_summary_reports_retry_budgets(
+    monkeypatch: pytest.MonkeyPatch,
+    model_config: ModelConfig,
+    caplog: pytest.LogCaptureFixture,
+):
+    policy = RetryPolicy(budget_reserve=3)
+    policy.budget(model_config.name).deposit()
+    policy.budget("other-model").deposit()
+    monkeypatch.setattr(litellm_runner, "get_retry_policy", lambda: policy)
+
+    async def fake_call_model(_cfg, _question_text, _template):
+        return {"response_text": "ok", "metadata": {}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    await litellm_runner.run_evaluation(
+        db=cast(Any, FakeAsyncSession()),
+        evaluation_id=uuid4(),
+        question_ids=["Q1"],
+        question_texts={"Q1": "What is grace?"},
+        model_configs=[model_config],
+        prompt_template=cast(Any, SimpleNamespace(template="Q: {question}")),
+    )
+
+    summary = next(
+        r for r in caplog.records if r.getMessage() == "Evaluation responses collected"
+    )
+    assert summary.retry_budgets == {
+        model_config.name: {"balance": 3.2, "exhausted": 0}
+    }
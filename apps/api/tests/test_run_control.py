@@ -0,0 +1,165 @@
+"""Tests for pausing and cancelling running evaluations."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import evaluations
+from src.jobs import run_control
+from src.runners import litellm_runner
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_stops_and_keeps_finished_calls(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    stop = asyncio.Event()
+    started: list[str] = []
+    cancelled: list[str] = []
+
+    async def fake_call_model(cfg, _question_text, _template):
+        started.append(cfg.name)
+        if cfg.name == "fast":
+            stop.set()
+            return {"response_text": "ok", "metadata": {}}
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(cfg.name)
+            raise
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+
+    db: Any = FakeAsyncSession()
+    results = await litellm_runner.run_evaluation(
+        db=db,
+        evaluation_id=uuid4(),
+        question_ids=["Q1"],
+        question_texts={"Q1": "Q1"},
+        model_configs=cast(
+            Any,
+            [type("MC", (), {"name": "slow"})(), type("MC", (), {"name": "fast"})()],
+        ),
+        prompt_template=cast(Any, type("Tpl", (), {"template": "Q: {question}"})()),
+        stop_event=stop,
+    )
+
+    assert [r.model_name for r in results] == ["fast"]
+    assert cancelled == ["slow"]
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_watch_for_stop_sets_event_when_evaluation_paused():
+    statuses = ["running", "paused"]
+
+    @asynccontextmanager
+    async def session_factory():
+        yield FakeAsyncSession(execute_results=[FakeExecuteResult(scalar=statuses[0])])
+        if len(statuses) > 1:
+            statuses.pop(0)
+
+    evaluation_id = uuid4()
+    async with run_control.watch_for_stop(
+        session_factory, evaluation_id, poll_seconds=0.001
+    ) as stop:
+        await asyncio.wait_for(stop.wait(), 1)
+
+    assert statuses == ["paused"]
+    assert run_control.signal_stop(evaluation_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_signal_stop_reaches_runners_in_this_process():
+    @asynccontextmanager
+    async def session_factory():
+        yield FakeAsyncSession()
+
+    evaluation_id = uuid4()
+    async with run_control.watch_for_stop(
+        session_factory, evaluation_id, poll_seconds=60
+    ) as stop:
+        work = asyncio.ensure_future(asyncio.Event().wait())
+        assert run_control.signal_stop(evaluation_id) == 1
+        assert await run_control.run_until_stopped(work, stop) is None
+
+    assert work.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_pause_cancels_queued_jobs_and_signals_runners(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    eval_obj = SimpleNamespace(status="running", execution_mode="interactive")
+    signalled: list[Any] = []
+
+    async def fake_get_eval(_db, _eid):
+        return eval_obj
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(evaluations, "signal_stop", signalled.append)
+    db: Any = FakeAsyncSession(execute_results=[FakeExecuteResult(rowcount=2)])
+    evaluation_id = uuid4()
+
+    out = await evaluations.pause_run(evaluation_id, cast(Any, SimpleNamespace()), db)
+
+    assert out["message"] == "Evaluation paused"
+    assert eval_obj.status == "paused"
+    assert signalled == [evaluation_id]
+    assert db.commits == 1
+
+    eval_obj.status = "paused"
+    db = FakeAsyncSession()
+    out = await evaluations.cancel_run(evaluation_id, cast(Any, SimpleNamespace()), db)
+    assert eval_obj.status == "cancelled"
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_pause_rejects_batch_runs_and_finished_evaluations(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    eval_obj = SimpleNamespace(status="running", execution_mode="batch")
+
+    async def fake_get_eval(_db, _eid):
+        return eval_obj
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    user = cast(Any, SimpleNamespace())
+
+    with pytest.raises(HTTPException) as exc:
+        await evaluations.pause_run(uuid4(), user, cast(Any, FakeAsyncSession()))
+    assert exc.value.status_code == 409
+
+    eval_obj.status = "reviewing"
+    with pytest.raises(HTTPException) as exc:
+        await evaluations.cancel_run(uuid4(), user, cast(Any, FakeAsyncSession()))
+    assert exc.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_resume_waits_for_paused_shards_to_stop(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    eval_obj = SimpleNamespace(status="paused")
+
+    async def fake_get_eval(_db, _eid, **_kwargs):
+        return eval_obj
+
+    async def fake_active(_db, _eid, *_kinds):
+        return SimpleNamespace(id=uuid4())
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(evaluations, "get_active_job", fake_active)
+
+    with pytest.raises(HTTPException) as exc:
+        await evaluations.trigger_run(
+            uuid4(), cast(Any, SimpleNamespace()), cast(Any, FakeAsyncSession())
+        )
+    assert exc.value.status_code == 409
@@ -5,10 +5,17 @@ from typing import Any, cast
 from uuid import uuid4
 
 import pytest
+from sqlalchemy.exc import IntegrityError
 
 from src.loaders import config_loader, question_loader
 from src.runners import litellm_runner
-from src.runners.import_runner import ImportBatch, ImportedResponse, import_responses
+from src.runners.import_runner import (
+    ImportBatch,
+    ImportConflictError,
+    ImportedResponse,
+    import_responses,
+)
+from src.runners.retry import get_retry_policy
 from tests.conftest import (
     FakeAsyncSession,
     FakeLiteLLMChoice,
@@ -60,7 +67,42 @@ async def test_import_responses_creates_rows():
 
 
 @pytest.mark.asyncio
-async def test_call_model_success_with_metadata(mock_litellm_acompletion: LiteLLMStub):
+async def test_import_responses_moves_taken_samples_to_the_next_free_index():
+    db: Any = FakeAsyncSession(
+        execute_results=[[("SOT-001", "gpt-4o", 0), ("SOT-001", "gpt-4o", 1)]]
+    )
+    batch = ImportBatch(
+        responses=[
+            ImportedResponse(question_id="SOT-001", model_name=m, response_text=t)
+            for m, t in (("gpt-4o", "again"), ("gpt-4o", "another"), ("claude", "x"))
+        ]
+    )
+
+    responses = await import_responses(db, uuid4(), batch)
+
+    assert [r.sample_index for r in responses] == [2, 3, 0]
+
+
+@pytest.mark.asyncio
+async def test_import_responses_reports_concurrently_stored_samples():
+    db: Any = FakeAsyncSession(
+        commit_error=IntegrityError("INSERT", {}, Exception("duplicate key"))
+    )
+    batch = ImportBatch(
+        responses=[
+            ImportedResponse(question_id="SOT-001", model_name="m", response_text="a")
+        ]
+    )
+
+    with pytest.raises(ImportConflictError):
+        await import_responses(db, uuid4(), batch)
+    assert db.rollbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_call_model_success_with_metadata(
+    mock_litellm_acompletion: LiteLLMStub, model_config: Any
+):
     response = FakeLiteLLMResponse(
         choices=[FakeLiteLLMChoice(message=FakeLiteLLMMessage(content="result"))],
         usage=FakeLiteLLMUsage(prompt_tokens=10, completion_tokens=20, total_tokens=30),
@@ -68,11 +110,6 @@ async def test_call_model_success_with_metadata(mock_litellm_acompletion: LiteLL
     )
     mock_litellm_acompletion.set_response("openai/gpt-4o", response)
 
-    model_config = type(
-        "ModelCfg",
-        (),
-        {"name": "gpt-4o", "provider": "openai", "litellm_model": "openai/gpt-4o"},
-    )()
     template = type("Tpl", (), {"template": "Q: {question}"})()
 
     result = await litellm_runner.call_model(
@@ -89,6 +126,7 @@ async def test_call_model_success_with_metadata(mock_litellm_acompletion: LiteLL
 async def test_call_model_retries_and_fails(
     monkeypatch: pytest.MonkeyPatch,
     mock_litellm_failing: LiteLLMStub,
+    model_config: Any,
 ):
     import asyncio
 
@@ -99,11 +137,6 @@ async def test_call_model_retries_and_fails(
 
     mock_litellm_failing.set_response("openai/gpt-4o", RuntimeError("boom"))
 
-    model_config = type(
-        "ModelCfg",
-        (),
-        {"name": "gpt-4o", "provider": "openai", "litellm_model": "openai/gpt-4o"},
-    )()
     template = type("Tpl", (), {"template": "Q: {question}"})()
 
     with pytest.raises(RuntimeError, match="failed after"):
@@ -113,7 +146,7 @@ async def test_call_model_retries_and_fails(
             cast(Any, template),
         )
 
-    assert len(mock_litellm_failing.calls) == litellm_runner.MAX_RETRIES
+    assert len(mock_litellm_failing.calls) == get_retry_policy().max_attempts
 
 
 @pytest.mark.asyncio
@@ -143,4 +176,146 @@ async def test_run_evaluation_collects_successful_calls(
 
     assert len(results) == 4
     assert db.commits == 1
-    assert len(db.refreshed) == 4
+    assert len(db.inserted) == 4
+    assert db.refreshed == []
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_respects_concurrency_limit(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    import asyncio
+
+    in_flight = 0
+    peak = 0
+
+    async def fake_call_model(cfg, _question_text, _template):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if cfg.name == "broken":
+            raise RuntimeError("failed after retries")
+        return {"response_text": "ok", "metadata": {}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+
+    db: Any = FakeAsyncSession()
+    results = await litellm_runner.run_evaluation(
+        db=db,
+        evaluation_id=uuid4(),
+        question_ids=[f"Q{i}" for i in range(5)],
+        question_texts={f"Q{i}": f"text {i}" for i in range(5)},
+        model_configs=cast(
+            Any,
+            [
+                type("MC", (), {"name": "m1"})(),
+                type("MC", (), {"name": "broken"})(),
+            ],
+        ),
+        prompt_template=cast(Any, type("Tpl", (), {"template": "Q: {question}"})()),
+        max_concurrency=3,
+    )
+
+    assert peak == 3
+    assert len(results) == 5
+    assert {r.model_name for r in results} == {"m1"}
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_checkpoints_and_skips_collected_pairs(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    called: list[tuple[str, str]] = []
+
+    async def fake_call_model(cfg, question_text, _template):
+        called.append((question_text, cfg.name))
+        return {"response_text": "ok", "metadata": {}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+
+    db: Any = FakeAsyncSession(execute_results=[[("Q1", "m1", 0), ("Q2", "m2", 0)]])
+    results = await litellm_runner.run_evaluation(
+        db=db,
+        evaluation_id=uuid4(),
+        question_ids=["Q1", "Q2", "Q3"],
+        question_texts={"Q1": "Q1", "Q2": "Q2", "Q3": "Q3"},
+        model_configs=cast(
+            Any,
+            [
+                type("MC", (), {"name": "m1"})(),
+                type("MC", (), {"name": "m2"})(),
+            ],
+        ),
+        prompt_template=cast(Any, type("Tpl", (), {"template": "Q: {question}"})()),
+        max_concurrency=1,
+        checkpoint_every=2,
+    )
+
+    assert sorted(called) == [("Q1", "m2"), ("Q2", "m1"), ("Q3", "m1"), ("Q3", "m2")]
+    assert len(results) == 4
+    assert len(db.inserted) == 4
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_limits_run_to_given_pairs(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    called: list[tuple[str, str]] = []
+
+    async def fake_call_model(cfg, question_text, _template):
+        called.append((question_text, cfg.name))
+        return {"response_text": "ok", "metadata": {}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    m1 = type("MC", (), {"name": "m1"})()
+    m2 = type("MC", (), {"name": "m2"})()
+
+    db: Any = FakeAsyncSession(execute_results=[[("Q1", "m1", 0)]])
+    results = await litellm_runner.run_evaluation(
+        db=db,
+        evaluation_id=uuid4(),
+        question_ids=[],
+        question_texts={"Q1": "Q1", "Q2": "Q2"},
+        model_configs=cast(Any, [m1, m2]),
+        prompt_template=cast(Any, type("Tpl", (), {"template": "Q: {question}"})()),
+        pairs=cast(Any, [("Q1", m1), ("Q2", m2)]),
+    )
+
+    assert called == [("Q2", "m2")]
+    assert len(results) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_persists_finished_work_on_failure(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def fake_call_model(cfg, _question_text, _template):
+        if cfg.name == "crash":
+            raise KeyError("unexpected")
+        return {"response_text": "ok", "metadata": {}}
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+
+    db: Any = FakeAsyncSession()
+    with pytest.raises(KeyError):
+        await litellm_runner.run_evaluation(
+            db=db,
+            evaluation_id=uuid4(),
+            question_ids=["Q1"],
+            question_texts={"Q1": "Q1"},
+            model_configs=cast(
+                Any,
+                [
+                    type("MC", (), {"name": "m1"})(),
+                    type("MC", (), {"name": "crash"})(),
+                ],
+            ),
+            prompt_template=cast(Any, type("Tpl", (), {"template": "Q: {question}"})()),
+            max_concurrency=1,
+        )
+
+    assert [r["model_name"] for r in db.inserted] == ["m1"]
+    assert db.commits == 1
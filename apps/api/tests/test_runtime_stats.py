@@ -0,0 +1,163 @@
+"""Tests for per-model runtime statistics."""
+
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.api import evaluations
+from src.db.models import ModelRuntimeStats
+from src.runners import litellm_runner, write_behind
+from src.runners.runtime_stats import (
+    QuantileSketch,
+    RuntimeStatsCollector,
+    flush_runtime_stats,
+    runtime_stats_summary,
+)
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+def test_sketch_quantiles_stay_within_relative_accuracy():
+    values = [0.05 * 1.0013**n for n in range(5000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[round(q * (len(ordered) - 1))]
+        estimate = sketch.quantile(q)
+        assert estimate is not None
+        assert abs(estimate - exact) / exact <= 0.011
+
+
+def test_sketches_merge_and_round_trip():
+    left, right = QuantileSketch(), QuantileSketch()
+    for n in range(1, 51):
+        left.add(n / 10)
+        right.add(n / 10 + 5)
+    right.add(0.0)
+
+    merged = QuantileSketch.from_dict(left.to_dict())
+    merged.merge(QuantileSketch.from_dict(right.to_dict()))
+
+    assert merged.count == 101
+    assert merged.zero_count == 1
+    assert merged.quantile(0.0) == 0.0
+    assert merged.quantile(1.0) == pytest.approx(10.0, rel=0.01)
+    assert QuantileSketch().quantile(0.5) is None
+    with pytest.raises(ValueError, match="different accuracy"):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+@pytest.mark.asyncio
+async def test_flush_merges_deltas_into_locked_rows():
+    collector = RuntimeStatsCollector()
+    collector.record_call(
+        "m1",
+        {
+            "latency_seconds": 2.0,
+            "completion_tokens": 100,
+            "total_tokens": 150,
+            "cost_usd": 0.01,
+        },
+    )
+    collector.record_error("m1")
+    existing = ModelRuntimeStats(
+        model_name="m1",
+        calls=1,
+        errors=0,
+        latency_sketch={"relative_accuracy": 0.01, "buckets": {"0": 1}},
+        latency_seconds=1.0,
+        completion_tokens=50,
+        total_tokens=60,
+        cost_usd=0.02,
+    )
+    statements: list[Any] = []
+
+    class Session(FakeAsyncSession):
+        async def execute(self, query: Any) -> FakeExecuteResult:
+            statements.append(query)
+            return FakeExecuteResult(one=existing)
+
+    await flush_runtime_stats(Session(), uuid4(), collector.drain())
+
+    insert_sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_model_runtime_stats_evaluation_model" in (
+        insert_sql
+    )
+    assert "FOR UPDATE" in str(statements[1].compile(dialect=postgresql.dialect()))
+    assert existing.calls == 2
+    assert existing.errors == 1
+    assert existing.completion_tokens == 150
+    assert existing.cost_usd == pytest.approx(0.03)
+    summary = runtime_stats_summary(existing)
+    assert summary["error_rate"] == pytest.approx(0.3333)
+    assert summary["tokens_per_second"] == 50.0
+    assert summary["p50_latency_seconds"] == pytest.approx(1.0, rel=0.02)
+    assert summary["mean_latency_seconds"] == 1.5
+    assert collector.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_records_runtime_stats(monkeypatch: pytest.MonkeyPatch):
+    async def fake_call_model(cfg, _question_text, _template):
+        if cfg.name == "down":
+            raise RuntimeError("retries exhausted")
+        return {"response_text": "ok", "metadata": {"latency_seconds": 1.5}}
+
+    flushed: list[dict] = []
+
+    async def fake_flush(_db, _eid, deltas):
+        flushed.append(deltas)
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+    monkeypatch.setattr(write_behind, "flush_runtime_stats", fake_flush)
+
+    await litellm_runner.run_evaluation(
+        db=cast(Any, FakeAsyncSession()),
+        evaluation_id=uuid4(),
+        question_ids=["Q1", "Q2"],
+        question_texts={"Q1": "Q1", "Q2": "Q2"},
+        model_configs=cast(
+            Any,
+            [type("MC", (), {"name": "up"})(), type("MC", (), {"name": "down"})()],
+        ),
+        prompt_template=cast(Any, type("Tpl", (), {"template": "{question}"})()),
+    )
+
+    totals: dict[str, tuple[int, int]] = {}
+    for deltas in flushed:
+        for name, delta in deltas.items():
+            calls, errors = totals.get(name, (0, 0))
+            totals[name] = (calls + delta.calls, errors + delta.errors)
+    assert totals == {"up": (2, 0), "down": (0, 2)}
+
+
+@pytest.mark.asyncio
+async def test_runtime_stats_endpoint_summarises_each_model(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def fake_get_eval(_db, _eid):
+        return SimpleNamespace()
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    row = ModelRuntimeStats(
+        model_name="m1",
+        calls=4,
+        errors=0,
+        latency_sketch={},
+        latency_seconds=0.0,
+        completion_tokens=0,
+        total_tokens=0,
+        cost_usd=0.0,
+    )
+    db: Any = FakeAsyncSession(execute_results=[[row]])
+
+    out = await evaluations.get_runtime_stats(uuid4(), cast(Any, SimpleNamespace()), db)
+
+    assert [m["model_name"] for m in out["models"]] == ["m1"]
+    assert out["models"][0]["p95_latency_seconds"] is None
+    assert out["models"][0]["tokens_per_second"] is None
@@ -0,0 +1,158 @@
+"""Tests for multi-sample collection per (question, model)."""
+
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.api.evaluations import _blind_label
+from src.loaders.config_loader import ModelConfig
+from src.runners import litellm_runner
+from src.scoring.aggregator import aggregate_scores
+from tests.conftest import (
+    FakeAsyncSession,
+    FakeExecuteResult,
+    FakeLiteLLMChoice,
+    FakeLiteLLMMessage,
+    FakeLiteLLMResponse,
+    FakeLiteLLMUsage,
+    LiteLLMStub,
+)
+
+TEMPLATE: Any = SimpleNamespace(template="Q: {question}")
+
+
+def _model(**overrides: Any) -> ModelConfig:
+    fields = {
+        "name": "gpt-4o",
+        "provider": "openai",
+        "litellm_model": "openai/gpt-4o",
+        "api_key_env": "OPENAI_API_KEY",
+    }
+    return ModelConfig(**{**fields, **overrides})
+
+
+@pytest.mark.asyncio
+async def test_call_model_requests_n_choices_in_one_call(
+    mock_litellm_acompletion: LiteLLMStub,
+):
+    mock_litellm_acompletion.set_response(
+        "openai/gpt-4o",
+        FakeLiteLLMResponse(
+            choices=[
+                FakeLiteLLMChoice(message=FakeLiteLLMMessage(content=f"answer {i}"))
+                for i in range(3)
+            ],
+            usage=FakeLiteLLMUsage(
+                prompt_tokens=10, completion_tokens=30, total_tokens=40
+            ),
+            _hidden_params={"response_cost": 0.03},
+        ),
+    )
+
+    out = await litellm_runner.call_model(_model(), "What is grace?", TEMPLATE, n=3)
+
+    assert len(mock_litellm_acompletion.calls) == 1
+    assert mock_litellm_acompletion.calls[0]["n"] == 3
+    assert out["samples"] == ["answer 0", "answer 1", "answer 2"]
+    assert out["metadata"]["samples_in_call"] == 3
+
+
+def test_split_samples_keeps_usage_on_first_sample():
+    samples = litellm_runner.split_samples(
+        {
+            "response_text": "a",
+            "samples": ["a", "b"],
+            "metadata": {"total_tokens": 40, "cost_usd": 0.03, "samples_in_call": 2},
+        }
+    )
+
+    assert [s["response_text"] for s in samples] == ["a", "b"]
+    assert samples[0]["metadata"]["total_tokens"] == 40
+    assert samples[1]["metadata"]["total_tokens"] is None
+    assert samples[1]["metadata"]["cost_usd"] == 0.0
+    assert samples[1]["metadata"]["shared_call"] is True
+
+
+def test_supports_n_prefers_config_override():
+    assert litellm_runner.supports_n(_model())
+    assert not litellm_runner.supports_n(_model(supports_n=False))
+    assert not litellm_runner.supports_n(
+        _model(provider="anthropic", litellm_model="anthropic/claude-3-5-haiku")
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("n_supported", "expected_calls"), [(True, 1), (False, 2)])
+async def test_run_evaluation_collects_missing_samples(
+    monkeypatch: pytest.MonkeyPatch, n_supported: bool, expected_calls: int
+):
+    calls: list[int] = []
+
+    async def fake_call_model(_cfg, _question_text, _template, n=1):
+        calls.append(n)
+        if n == 1:
+            return {"response_text": "single", "metadata": {}}
+        return {
+            "response_text": "s0",
+            "samples": [f"s{i}" for i in range(n)],
+            "metadata": {"samples_in_call": n},
+        }
+
+    monkeypatch.setattr(litellm_runner, "call_model", fake_call_model)
+
+    # Sample 1 was collected before the run was interrupted.
+    db: Any = FakeAsyncSession(execute_results=[[("Q1", "gpt-4o", 1)]])
+    results = await litellm_runner.run_evaluation(
+        db=db,
+        evaluation_id=uuid4(),
+        question_ids=["Q1"],
+        question_texts={"Q1": "What is grace?"},
+        model_configs=[_model(supports_n=n_supported)],
+        prompt_template=TEMPLATE,
+        samples_per_question=3,
+    )
+
+    assert len(calls) == expected_calls
+    assert sorted(r.sample_index for r in results) == [0, 2]
+    if n_supported:
+        assert calls == [2]
+        assert results[1].raw_metadata["shared_call"] is True
+
+
+@pytest.mark.asyncio
+async def test_aggregate_scores_reports_sample_spread():
+    uid = uuid4()
+    responses = [
+        SimpleNamespace(id=uuid4(), model_name="m1", question_id="Q1", sample_index=i)
+        for i in range(2)
+    ]
+    scores = [
+        SimpleNamespace(
+            response_id=responses[0].id, user_id=uid, dimension="accuracy", value=5
+        ),
+        SimpleNamespace(
+            response_id=responses[1].id, user_id=uid, dimension="accuracy", value=3
+        ),
+    ]
+    db: Any = FakeAsyncSession(
+        execute_results=[
+            FakeExecuteResult(many=responses),
+            FakeExecuteResult(many=scores),
+        ]
+    )
+
+    report = await aggregate_scores(db, uuid4())
+
+    assert report.model_averages["m1"]["accuracy"] == 4.0
+    assert report.sample_spread == {"m1": {"accuracy": 1.0}}
+
+
+def test_blind_labels_extend_past_z():
+    assert [_blind_label(i) for i in (0, 25, 26, 27)] == [
+        "Response A",
+        "Response Z",
+        "Response AA",
+        "Response AB",
+    ]
@@ -0,0 +1,189 @@
+"""Tests for fair sharing of provider capacity across evaluations."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+
+from src.api import evaluations
+from src.loaders.config_loader import ProviderConfig
+from src.models.evaluation import EvaluationPriorityUpdate
+from src.runners.scheduler import FairShareScheduler
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+async def _contend(scheduler: FairShareScheduler, calls: dict[str, int]) -> list[str]:
+    """Queue ``calls`` per flow behind a slot held by "a"; return grant order."""
+    order: list[str] = []
+    gate = asyncio.Event()
+
+    async def call(flow: str) -> None:
+        async with scheduler.slot("openai", flow):
+            order.append(flow)
+            await asyncio.sleep(0)
+
+    async def blocker() -> None:
+        async with scheduler.slot("openai", "a"):
+            await gate.wait()
+
+    holder = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(call(flow))
+        for flow, count in calls.items()
+        for _ in range(count)
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_slots_are_shared_by_weight():
+    scheduler = FairShareScheduler(default_capacity=1)
+    scheduler.set_weight("a", 3)
+
+    order = await _contend(scheduler, {"a": 12, "b": 12})
+
+    first = order[:8]
+    assert first.count("a") == 6
+    assert first.count("b") == 2
+
+
+@pytest.mark.asyncio
+async def test_late_evaluation_is_not_starved_or_favoured():
+    scheduler = FairShareScheduler(default_capacity=1)
+    # "a" has already made many calls on its own...
+    for _ in range(20):
+        async with scheduler.slot("openai", "a"):
+            pass
+
+    order = await _contend(scheduler, {"a": 6, "b": 6})
+
+    # ...but "b" joins at a's service level: they alternate instead of "b"
+    # being starved, or running 20 calls first to catch up.
+    assert order[:6].count("b") == 3
+
+
+@pytest.mark.asyncio
+async def test_provider_capacity_comes_from_config():
+    scheduler = FairShareScheduler(
+        [ProviderConfig(name="openai", max_concurrency=2)], default_capacity=5
+    )
+    in_flight = peak = 0
+
+    async def call(provider: str) -> None:
+        nonlocal in_flight, peak
+        async with scheduler.slot(provider, "a"):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(call("openai") for _ in range(6)))
+    assert peak == 2
+
+    peak = 0
+    await asyncio.gather(*(call("google") for _ in range(6)))
+    assert peak == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_its_slot():
+    scheduler = FairShareScheduler(default_capacity=1)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot("openai", "a"):
+            await release.wait()
+
+    async def wait_for_slot() -> None:
+        async with scheduler.slot("openai", "b"):
+            pass
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(wait_for_slot())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    async with asyncio.timeout(1):
+        async with scheduler.slot("openai", "c") as waited:
+            assert waited < 0.5
+
+    snapshot = scheduler.snapshot("a")
+    assert snapshot["calls"] == 1
+    assert snapshot["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_set_priority_updates_evaluation_and_queued_jobs(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    eval_obj = SimpleNamespace(priority=1)
+
+    async def fake_get_eval(_db, _eid):
+        return eval_obj
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    db: Any = FakeAsyncSession()
+
+    out = await evaluations.set_evaluation_priority(
+        uuid4(),
+        EvaluationPriorityUpdate(priority=5),
+        cast(Any, SimpleNamespace(id=uuid4())),
+        db,
+    )
+
+    assert out is eval_obj
+    assert eval_obj.priority == 5
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_throughput_reports_share_and_eta(monkeypatch: pytest.MonkeyPatch):
+    eval_obj = SimpleNamespace(status="running", priority=3)
+
+    async def fake_get_eval(_db, _eid):
+        return eval_obj
+
+    async def fake_counts(_db, _eid):
+        return {"succeeded": 50, "queued": 90, "running": 10}
+
+    monkeypatch.setattr(evaluations, "get_evaluation", fake_get_eval)
+    monkeypatch.setattr(evaluations, "work_item_counts", fake_counts)
+    db: Any = FakeAsyncSession(
+        execute_results=[
+            FakeExecuteResult(scalar=100),
+            FakeExecuteResult(one=(2, 4)),
+        ]
+    )
+
+    out = await evaluations.get_evaluation_throughput(
+        uuid4(), cast(Any, SimpleNamespace()), db
+    )
+
+    assert out["responses_per_minute"] == 20.0
+    assert out["capacity_share"] == 0.75
+    assert out["running_evaluations"] == 2
+    assert out["remaining_work_items"] == 100
+    assert out["eta_minutes"] == 5.0
+
+
+def test_flow_is_forgotten_when_its_last_run_detaches():
+    scheduler = FairShareScheduler(default_capacity=1)
+    scheduler.attach("e1")
+    scheduler.attach("e1")
+    scheduler.set_weight("e1", 3)
+
+    scheduler.detach("e1")
+    assert scheduler.weight("e1") == 3
+    scheduler.detach("e1")
+    assert scheduler.weight("e1") == 1.0
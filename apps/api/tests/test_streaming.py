@@ -0,0 +1,88 @@
+"""Tests for streamed completions and time-to-first-token capture."""
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.loaders.config_loader import ModelConfig
+from src.runners import litellm_runner
+from src.runners.retry import RetryPolicy
+from tests.conftest import FakeLiteLLMStream, FakeLiteLLMUsage, LiteLLMStub
+
+TEMPLATE: Any = SimpleNamespace(template="Q: {question}")
+
+
+def _streaming_model(**overrides: Any) -> ModelConfig:
+    return ModelConfig(
+        name="gpt-4o",
+        provider="openai",
+        litellm_model="openai/gpt-4o",
+        api_key_env="OPENAI_API_KEY",
+        stream=True,
+        **overrides,
+    )
+
+
+@pytest.mark.asyncio
+async def test_call_model_streams_and_records_latency_breakdown(
+    mock_litellm_acompletion: LiteLLMStub,
+):
+    mock_litellm_acompletion.set_response(
+        "openai/gpt-4o",
+        FakeLiteLLMStream(
+            ["Grace ", "is ", "unmerited ", "favor."],
+            usage=FakeLiteLLMUsage(
+                prompt_tokens=5, completion_tokens=4, total_tokens=9
+            ),
+            delay=0.01,
+        ),
+    )
+
+    result = await litellm_runner.call_model(
+        _streaming_model(), "What is grace?", TEMPLATE
+    )
+
+    assert result["response_text"] == "Grace is unmerited favor."
+    metadata = result["metadata"]
+    assert metadata["streamed"] is True
+    assert metadata["truncated"] is False
+    assert metadata["total_tokens"] == 9
+    assert metadata["time_to_first_token_seconds"] >= 0.01
+    assert metadata["tokens_per_second"] > 0
+    call = mock_litellm_acompletion.calls[0]
+    assert call["stream"] is True
+    assert call["stream_options"] == {"include_usage": True}
+
+
+@pytest.mark.asyncio
+async def test_call_model_stream_cap_truncates_runaway_generation(
+    mock_litellm_acompletion: LiteLLMStub,
+):
+    stream = FakeLiteLLMStream(["word "] * 50, delay=0.01)
+    mock_litellm_acompletion.set_response("openai/gpt-4o", stream)
+
+    result = await litellm_runner.call_model(
+        _streaming_model(stream_max_seconds=0.05), "q", TEMPLATE
+    )
+
+    assert result["metadata"]["truncated"] is True
+    assert 0 < len(result["response_text"].split()) < 50
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_call_model_stream_cap_without_tokens_is_an_error(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_litellm_acompletion: LiteLLMStub,
+):
+    mock_litellm_acompletion.set_response(
+        "openai/gpt-4o", FakeLiteLLMStream(["late"], delay=0.2)
+    )
+    policy = RetryPolicy(max_attempts=1)
+    monkeypatch.setattr(litellm_runner, "get_retry_policy", lambda: policy)
+
+    with pytest.raises(RuntimeError, match="failed after 1 attempts"):
+        await litellm_runner.call_model(
+            _streaming_model(stream_max_seconds=0.02), "q", TEMPLATE
+        )
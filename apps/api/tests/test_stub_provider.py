@@ -0,0 +1,180 @@
+"""Tests for the synthetic stub provider."""
+
+import json
+from types import SimpleNamespace
+from typing import Any, cast
+
+import httpx
+import pytest
+
+from src.loaders.config_loader import ModelConfig, StubConfig
+from src.runners import litellm_runner, transport
+from src.runners.retry import is_retryable, retry_after_seconds
+from src.runners.stub_provider import StubProvider, StubProviderError, build_stub_app
+
+TEMPLATE = cast(Any, SimpleNamespace(template="{question}"))
+
+
+def _stub_model(name: str = "fast", **stub: Any) -> ModelConfig:
+    return ModelConfig(
+        name=name,
+        provider="stub",
+        litellm_model=f"stub/{name}",
+        api_key_env="STUB_API_KEY",
+        stub=StubConfig(latency_seconds=0.0, **stub),
+    )
+
+
+def test_draws_are_reproducible_per_prompt_and_attempt():
+    config = StubConfig(completion_tokens=5, latency_jitter=0.5, seed=3)
+    first, second = StubProvider("m", config), StubProvider("m", config)
+
+    a = first.draw("Q1", n=2)
+    second.draw("Q2")
+    b = second.draw("Q1", n=2)
+
+    assert a == b
+    assert len(a.texts) == 2
+    assert len(a.texts[0].split()) == 5
+    assert a.usage.completion_tokens == 10
+    # Sending the same prompt again draws a new outcome.
+    assert first.draw("Q1", n=2) != a
+
+
+def test_rate_limit_bursts_and_errors_look_like_provider_failures():
+    bursty = StubProvider(
+        "m", StubConfig(rate_limit_every=2, rate_limit_burst=1, retry_after_seconds=3)
+    )
+    outcomes = []
+    for _ in range(6):
+        try:
+            bursty.draw("Q")
+            outcomes.append("ok")
+        except StubProviderError as exc:
+            outcomes.append(exc)
+    assert [o if o == "ok" else o.status_code for o in outcomes] == [
+        "ok",
+        "ok",
+        429,
+        "ok",
+        "ok",
+        429,
+    ]
+    limited = cast(StubProviderError, outcomes[2])
+    assert is_retryable(limited)
+    assert retry_after_seconds(limited) == 3.0
+    # Bursts count calls across prompts, like a shared quota.
+    shared = StubProvider("m", StubConfig(rate_limit_every=2, rate_limit_burst=1))
+    shared.draw("Q1")
+    shared.draw("Q2")
+    with pytest.raises(StubProviderError, match="rate limit"):
+        shared.draw("Q3")
+
+    with pytest.raises(StubProviderError) as exc:
+        StubProvider("m", StubConfig(error_rate=1.0)).draw("Q")
+    assert exc.value.status_code == 500
+    assert is_retryable(exc.value)
+
+
+@pytest.mark.asyncio
+async def test_call_model_is_served_by_the_stub_and_retries_its_429s(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(litellm_runner.asyncio, "sleep", fake_sleep)
+    model = _stub_model(rate_limit_every=1, rate_limit_burst=1, retry_after_seconds=0.0)
+
+    ok = await litellm_runner.call_model(model, "Q", TEMPLATE)
+    limited_then_ok = await litellm_runner.call_model(model, "Q", TEMPLATE)
+
+    assert len(ok["response_text"].split()) == 200
+    assert ok["metadata"]["completion_tokens"] == 200
+    assert ok["metadata"]["cost_usd"] == 0.0
+    assert limited_then_ok["response_text"]
+    # One retry backoff; the stub's own zero-latency sleeps aside.
+    assert len([s for s in sleeps if s > 0]) == 1
+    assert transport.get_transport().stubs["fast"].calls == 3
+    await transport.close_transport()
+
+
+@pytest.mark.asyncio
+async def test_call_model_streams_from_the_stub():
+    model = _stub_model("streamed", completion_tokens=4).model_copy(
+        update={"stream": True}
+    )
+
+    result = await litellm_runner.call_model(model, "Q", TEMPLATE)
+
+    assert len(result["response_text"].split()) == 4
+    assert result["metadata"]["streamed"] is True
+    assert result["metadata"]["completion_tokens"] == 4
+    await transport.close_transport()
+
+
+def test_completion_kwargs_pass_the_api_base():
+    runner_transport = transport.RunnerTransport(
+        litellm=object(), client=cast(Any, None), credentials={"K": "sk"}
+    )
+    model = ModelConfig(
+        name="m",
+        provider="stub",
+        litellm_model="openai/m",
+        api_key_env="K",
+        api_base="http://127.0.0.1:8900/v1",
+    )
+
+    assert runner_transport.completion_api(model) is runner_transport.litellm
+    assert runner_transport.completion_kwargs(model) == {
+        "api_key": "sk",
+        "api_base": "http://127.0.0.1:8900/v1",
+    }
+
+
+@pytest.mark.asyncio
+async def test_stub_server_speaks_the_openai_chat_format():
+    app = build_stub_app(
+        [
+            ModelConfig(
+                name="served",
+                provider="stub",
+                litellm_model="openai/served",
+                api_key_env="K",
+                stub=StubConfig(
+                    latency_seconds=0.0,
+                    completion_tokens=3,
+                    rate_limit_every=1,
+                    retry_after_seconds=2,
+                ),
+            )
+        ]
+    )
+    request = {"model": "served", "messages": [{"role": "user", "content": "Q"}]}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://stub"
+    ) as client:
+        ok = await client.post("/v1/chat/completions", json={**request, "n": 2})
+        limited = await client.post("/v1/chat/completions", json=request)
+        streamed = await client.post(
+            "/v1/chat/completions", json={**request, "model": "other", "stream": True}
+        )
+
+    body = ok.json()
+    assert body["object"] == "chat.completion"
+    assert len(body["choices"]) == 2
+    assert body["usage"]["completion_tokens"] == 6
+    assert limited.status_code == 429
+    assert limited.headers["retry-after"] == "2"
+    events = [
+        line.removeprefix("data: ")
+        for line in streamed.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(e) for e in events[:-1]]
+    assert chunks[0]["choices"][0]["delta"]["content"]
+    assert chunks[-1]["usage"]["completion_tokens"] == 200
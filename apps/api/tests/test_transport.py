@@ -0,0 +1,92 @@
+"""Tests for the shared model-call transport."""
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+import litellm
+import pytest
+
+from src.loaders.config_loader import ModelConfig
+from src.runners import litellm_runner, transport
+from tests.conftest import (
+    FakeLiteLLMChoice,
+    FakeLiteLLMMessage,
+    FakeLiteLLMResponse,
+    LiteLLMStub,
+)
+
+
+def _model(name: str, api_key_env: str) -> ModelConfig:
+    return ModelConfig(
+        name=name, provider="p", litellm_model=f"p/{name}", api_key_env=api_key_env
+    )
+
+
+def test_resolve_credentials_reads_aliases_and_skips_missing(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-1")
+    monkeypatch.delenv("GOOGLE_AI_API_KEY", raising=False)
+    monkeypatch.setenv("GOOGLE_API_KEY", "g-1")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "  ")
+
+    credentials = transport.resolve_credentials(
+        [
+            _model("a", "OPENAI_API_KEY"),
+            _model("b", "OPENAI_API_KEY"),
+            _model("c", "GOOGLE_AI_API_KEY"),
+            _model("d", "ANTHROPIC_API_KEY"),
+        ]
+    )
+
+    assert credentials == {"OPENAI_API_KEY": "sk-1", "GOOGLE_AI_API_KEY": "g-1"}
+
+
+@pytest.mark.asyncio
+async def test_transport_is_built_once_and_shared_with_litellm(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(transport, "http2_available", lambda: False)
+    monkeypatch.setattr(
+        transport,
+        "load_app_config",
+        lambda: SimpleNamespace(models=[_model("a", "MISSING_KEY_FOR_TEST")]),
+    )
+
+    shared = transport.get_transport()
+
+    assert transport.get_transport() is shared
+    assert litellm.aclient_session is shared.client
+    assert shared.http2 is False
+    assert shared.credentials == {}
+
+    await transport.close_transport()
+    assert shared.client.is_closed
+    assert litellm.aclient_session is None
+    # Closing again is a no-op.
+    await transport.close_transport()
+
+
+@pytest.mark.asyncio
+async def test_call_model_passes_resolved_api_key(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_litellm_acompletion: LiteLLMStub,
+    model_config: Any,
+):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(
+        transport, "load_app_config", lambda: SimpleNamespace(models=[model_config])
+    )
+    mock_litellm_acompletion.set_response(
+        "openai/gpt-4o",
+        FakeLiteLLMResponse(
+            choices=[FakeLiteLLMChoice(message=FakeLiteLLMMessage(content="ok"))]
+        ),
+    )
+
+    await litellm_runner.call_model(
+        model_config, "Q", cast(Any, SimpleNamespace(template="{question}"))
+    )
+
+    assert mock_litellm_acompletion.calls[0]["api_key"] == "sk-test"
+    await transport.close_transport()
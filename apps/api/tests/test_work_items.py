@@ -0,0 +1,400 @@
+"""Tests for sharded evaluation work items."""
+
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.db.models import WorkItem
+from src.jobs import handlers, work_items
+from src.jobs.work_items import WorkItemStatus
+from tests.conftest import FakeAsyncSession, FakeExecuteResult
+
+
+def _sql(statement: Any) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class RecordingSession(FakeAsyncSession):
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.statements: list[Any] = []
+
+    async def execute(self, query: Any) -> FakeExecuteResult:
+        self.statements.append(query)
+        return await super().execute(query)
+
+
+def _item(**overrides: Any) -> WorkItem:
+    fields: dict[str, Any] = {
+        "id": uuid4(),
+        "evaluation_id": uuid4(),
+        "question_id": "Q1",
+        "model_name": "m1",
+        "status": WorkItemStatus.QUEUED,
+        "attempts": 0,
+        "max_attempts": 3,
+        "run_after": datetime.now(UTC),
+    }
+    return WorkItem(**{**fields, **overrides})
+
+
+def test_claim_query_is_scoped_and_skips_locked_rows():
+    sql = _sql(work_items.claimable_work_items_query(uuid4(), datetime.now(UTC), 50))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "work_items.evaluation_id" in sql
+    assert "lease_expires_at" in sql
+
+
+@pytest.mark.asyncio
+async def test_plan_work_items_upserts_in_chunks(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(work_items, "PLAN_CHUNK_SIZE", 2)
+    db: Any = RecordingSession()
+
+    planned = await work_items.plan_work_items(
+        db, uuid4(), [("Q1", "m1"), ("Q1", "m2"), ("Q2", "m1")]
+    )
+
+    assert planned == 3
+    assert len(db.statements) == 2
+    sql = _sql(db.statements[0])
+    assert "ON CONFLICT ON CONSTRAINT uq_work_items_evaluation_question_model" in sql
+    assert "DO UPDATE" in sql
+    assert "work_items.status NOT IN" in sql
+    # The caller commits together with its own changes.
+    assert db.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_claim_work_items_leases_and_fails_exhausted_stale_items():
+    fresh = _item()
+    stale = _item(
+        status=WorkItemStatus.RUNNING,
+        attempts=1,
+        lease_owner="dead",
+        lease_expires_at=datetime.now(UTC) - timedelta(seconds=1),
+    )
+    exhausted = _item(
+        status=WorkItemStatus.RUNNING,
+        attempts=3,
+        lease_owner="dead",
+        lease_expires_at=datetime.now(UTC) - timedelta(seconds=1),
+    )
+    db: Any = FakeAsyncSession(execute_results=[[fresh, stale, exhausted]])
+
+    claimed = await work_items.claim_work_items(db, uuid4(), "shard-1", 10, 60)
+
+    assert claimed == [fresh, stale]
+    assert fresh.status == WorkItemStatus.RUNNING
+    assert fresh.attempts == 1
+    assert stale.attempts == 2
+    assert stale.lease_owner == "shard-1"
+    assert exhausted.status == WorkItemStatus.FAILED
+    assert exhausted.last_error == "Lease expired on final attempt"
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_settle_work_items_requeues_until_attempts_run_out():
+    done, skipped = _item(attempts=1), _item(attempts=1)
+    retry, final = _item(attempts=1), _item(attempts=3)
+    db: Any = RecordingSession()
+
+    await work_items.settle_work_items(
+        db, "shard-1", [done], [skipped], [retry, final], "boom"
+    )
+
+    statuses = [
+        stmt.compile(dialect=postgresql.dialect()).params["status"]
+        for stmt in db.statements
+    ]
+    assert statuses == [
+        WorkItemStatus.SUCCEEDED,
+        WorkItemStatus.SKIPPED,
+        WorkItemStatus.FAILED,
+        WorkItemStatus.QUEUED,
+    ]
+    assert all("work_items.lease_owner = " in _sql(s) for s in db.statements)
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_finish_evaluation_only_when_no_active_items():
+    db: Any = RecordingSession(execute_results=[FakeExecuteResult(rowcount=1)])
+    assert await work_items.finish_evaluation_if_done(db, uuid4()) is True
+    assert "NOT (EXISTS" in _sql(db.statements[0])
+
+    db = RecordingSession(execute_results=[FakeExecuteResult(rowcount=0)])
+    assert await work_items.finish_evaluation_if_done(db, uuid4()) is False
+
+
+@pytest.mark.asyncio
+async def test_plan_shards_queues_missing_cells(monkeypatch: pytest.MonkeyPatch):
+    planned: list[Any] = []
+
+    async def fake_collected(_db, _eid):
+        return {("Q1", "m1", 0), ("Q1", "m1", 1), ("Q2", "m1", 0)}
+
+    async def fake_plan(_db, _eid, cells):
+        planned.extend(cells)
+        return len(cells)
+
+    monkeypatch.setattr(
+        "src.runners.litellm_runner.get_collected_samples", fake_collected
+    )
+    monkeypatch.setattr(handlers, "plan_work_items", fake_plan)
+    monkeypatch.setattr(
+        handlers,
+        "get_settings",
+        lambda: SimpleNamespace(
+            evaluation_max_shards=2, work_item_chunk_size=1, job_max_attempts=3
+        ),
+    )
+    models: Any = [SimpleNamespace(name="m1"), SimpleNamespace(name="m2")]
+    db: Any = FakeAsyncSession()
+
+    pending = await handlers.plan_shards(
+        db, uuid4(), ["Q1", "Q2", "Q3"], models, "default", 2
+    )
+
+    assert planned == [
+        ("Q1", "m2"),
+        ("Q2", "m1"),
+        ("Q2", "m2"),
+        ("Q3", "m1"),
+        ("Q3", "m2"),
+    ]
+    assert pending == 5
+    # Capped by EVALUATION_MAX_SHARDS.
+    assert [job.kind for job in db.added] == ["evaluation_shard"] * 2
+    assert db.added[0].payload["model_names"] == ["m1", "m2"]
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_shard_job_collects_claimed_items(monkeypatch: pytest.MonkeyPatch):
+    evaluation_id = uuid4()
+    ok = _item(evaluation_id=evaluation_id, question_id="Q1", attempts=1)
+    missing = _item(evaluation_id=evaluation_id, question_id="Q2", attempts=1)
+    orphan = _item(evaluation_id=evaluation_id, model_name="removed", attempts=1)
+    chunks = [[ok, missing, orphan], []]
+    calls: dict[str, Any] = {}
+    eval_obj = SimpleNamespace(
+        status="running", samples_per_question=1, budget_usd=None, priority=3
+    )
+
+    class Session(FakeAsyncSession):
+        async def get(self, _model, _id):
+            return eval_obj
+
+    @asynccontextmanager
+    async def session_factory():
+        yield Session()
+
+    async def claim(_db, _eid, owner, _limit, _lease):
+        calls["owner"] = owner
+        return chunks.pop(0)
+
+    async def count_active(_db, _eid):
+        return 0
+
+    async def fake_run_evaluation(**kwargs):
+        calls["pairs"] = [(q, m.name) for q, m in kwargs["pairs"]]
+        return []
+
+    async def fake_collected(_db, _eid, question_ids):
+        calls["question_ids"] = question_ids
+        return {("Q1", "m1", 0)}
+
+    async def settle(_db, _owner, succeeded, skipped, failed, error):
+        calls["settled"] = (succeeded, skipped, failed, error)
+
+    async def finish(_db, _eid):
+        return True
+
+    async def counts(_db, _eid):
+        return {"succeeded": 1}
+
+    model = SimpleNamespace(name="m1")
+    template = SimpleNamespace(id="default")
+    monkeypatch.setattr(
+        handlers,
+        "load_app_config",
+        lambda: SimpleNamespace(models=[model], templates=[template]),
+    )
+    monkeypatch.setattr(
+        handlers,
+        "load_all_questions",
+        lambda: [
+            SimpleNamespace(id="Q1", text="a"),
+            SimpleNamespace(id="Q2", text="b"),
+        ],
+    )
+    monkeypatch.setattr("src.db.database.async_session_factory", session_factory)
+    monkeypatch.setattr(
+        "src.runners.litellm_runner.run_evaluation", fake_run_evaluation
+    )
+    monkeypatch.setattr(
+        "src.runners.litellm_runner.get_collected_samples", fake_collected
+    )
+    monkeypatch.setattr(handlers, "claim_work_items", claim)
+    monkeypatch.setattr(handlers, "count_active_work_items", count_active)
+    monkeypatch.setattr(handlers, "settle_work_items", settle)
+    monkeypatch.setattr(handlers, "finish_evaluation_if_done", finish)
+    monkeypatch.setattr(handlers, "work_item_counts", counts)
+    job: Any = SimpleNamespace(id=uuid4(), attempts=2)
+
+    await handlers.run_shard_job(
+        {
+            "evaluation_id": str(evaluation_id),
+            "model_names": ["m1"],
+            "prompt_template": "default",
+        },
+        job,
+    )
+
+    assert calls["owner"] == f"shard:{job.id}:2"
+    assert calls["pairs"] == [("Q1", "m1"), ("Q2", "m1")]
+    assert calls["question_ids"] == {"Q1", "Q2"}
+    succeeded, skipped, failed, error = calls["settled"]
+    assert succeeded == [ok]
+    assert skipped == [orphan]
+    assert failed == [missing]
+    assert error == "No response collected"
+
+
+@pytest.mark.asyncio
+async def test_shard_reserves_each_chunk_against_the_shared_budget(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    from src.runners import budget as budget_module
+
+    evaluation_id = uuid4()
+    first = _item(evaluation_id=evaluation_id, question_id="Q1", attempts=1)
+    second = _item(evaluation_id=evaluation_id, question_id="Q2", attempts=1)
+    chunks = [[first], [second], []]
+    grants: list[tuple[float, int] | None] = [(0.2, 900), None]
+    reserved: list[tuple[int, float]] = []
+    settled: list[Any] = []
+    budgets: list[tuple[float, int, bool]] = []
+    outcomes: list[tuple[list, list, str]] = []
+    eval_obj = SimpleNamespace(
+        status="running",
+        samples_per_question=1,
+        budget_usd=None,
+        budget_tokens=1000,
+        priority=1,
+    )
+
+    class Session(FakeAsyncSession):
+        async def get(self, _model, _id):
+            return eval_obj
+
+    @asynccontextmanager
+    async def session_factory():
+        yield Session()
+
+    async def claim(_db, _eid, _owner, _limit, _lease):
+        return chunks.pop(0)
+
+    async def count_active(_db, _eid):
+        return 0
+
+    async def reserve(_db, _eid, tokens, usd):
+        reserved.append((tokens, usd))
+        return grants.pop(0)
+
+    async def settle_spend(_db, _eid, held, spent):
+        settled.append((held, spent))
+
+    async def fake_run_evaluation(**kwargs):
+        run_budget = kwargs["budget"]
+        budgets.append(
+            (run_budget.spent_usd, run_budget.spent_tokens, run_budget.exhausted)
+        )
+        if run_budget.exhausted:
+            return []
+        return [SimpleNamespace(raw_metadata={"cost_usd": 0.05, "total_tokens": 250})]
+
+    async def fake_collected(_db, _eid, question_ids):
+        return {("Q1", "m1", 0)}
+
+    async def settle_items(_db, _owner, succeeded, skipped, failed, error):
+        outcomes.append((succeeded, skipped, error))
+
+    async def finish(_db, _eid):
+        return True
+
+    async def counts(_db, _eid):
+        return {}
+
+    model = SimpleNamespace(name="m1")
+    template = SimpleNamespace(id="default")
+    monkeypatch.setattr(
+        handlers,
+        "load_app_config",
+        lambda: SimpleNamespace(models=[model], templates=[template]),
+    )
+    monkeypatch.setattr(
+        handlers,
+        "load_all_questions",
+        lambda: [
+            SimpleNamespace(id="Q1", text="a"),
+            SimpleNamespace(id="Q2", text="b"),
+        ],
+    )
+    monkeypatch.setattr("src.db.database.async_session_factory", session_factory)
+    monkeypatch.setattr(
+        "src.runners.litellm_runner.run_evaluation", fake_run_evaluation
+    )
+    monkeypatch.setattr(
+        "src.runners.litellm_runner.get_collected_samples", fake_collected
+    )
+    monkeypatch.setattr(
+        "src.runners.litellm_runner.project_spend", lambda *_args: (0.1, 400)
+    )
+    monkeypatch.setattr(budget_module, "reserve_shared_spend", reserve)
+    monkeypatch.setattr(budget_module, "settle_shared_spend", settle_spend)
+    monkeypatch.setattr(handlers, "claim_work_items", claim)
+    monkeypatch.setattr(handlers, "count_active_work_items", count_active)
+    monkeypatch.setattr(handlers, "settle_work_items", settle_items)
+    monkeypatch.setattr(handlers, "finish_evaluation_if_done", finish)
+    monkeypatch.setattr(handlers, "work_item_counts", counts)
+
+    await handlers.run_shard_job(
+        {
+            "evaluation_id": str(evaluation_id),
+            "model_names": ["m1"],
+            "prompt_template": "default",
+        },
+        cast(Any, SimpleNamespace(id=uuid4(), attempts=1)),
+    )
+
+    assert reserved == [(400, 0.1), (400, 0.1)]
+    # The chunk runs against what everyone else has committed.
+    assert budgets[0] == (pytest.approx(0.1), 500, False)
+    assert settled == [((0.1, 400), (0.05, 250))]
+    # The second chunk no longer fits: its items are skipped, not failed.
+    assert budgets[1][2] is True
+    assert outcomes[1] == ([], [second], "Budget exhausted")
+
+
+@pytest.mark.asyncio
+async def test_count_failed_samples_subtracts_what_was_collected():
+    statements: list[Any] = []
+
+    class RecordingSession(FakeAsyncSession):
+        async def execute(self, query: Any, params: Any = None) -> Any:
+            statements.append(query)
+            return await super().execute(query, params)
+
+    db = RecordingSession(execute_results=[FakeExecuteResult(scalar=5)])
+
+    assert await work_items.count_failed_samples(cast(Any, db), uuid4(), 3) == 5
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "greatest(%(param_1)s - (SELECT count(responses.id)" in sql
+    assert "work_items.status = %(status_1)s" in sql
@@ -0,0 +1,155 @@
+"""Tests for write-behind persistence of collected responses."""
+
+import asyncio
+from typing import Any, cast
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.db.models import Response as ResponseModel
+from src.runners.runtime_stats import RuntimeStatsCollector
+from src.runners.write_behind import ResponseWriter
+from tests.conftest import FakeAsyncSession
+
+
+def _response(question_id: str = "Q1") -> ResponseModel:
+    return ResponseModel(
+        id=uuid4(),
+        evaluation_id=uuid4(),
+        question_id=question_id,
+        model_name="m",
+        sample_index=0,
+        response_text="ok",
+        source="api",
+        raw_metadata={},
+    )
+
+
+def _writer(db: Any, **overrides: Any) -> ResponseWriter:
+    options = {"batch_size": 2, "flush_interval_seconds": 60.0, "max_pending": 100}
+    return ResponseWriter(
+        cast(Any, db), uuid4(), RuntimeStatsCollector(), **{**options, **overrides}
+    )
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_written_in_one_insert_each():
+    db = FakeAsyncSession()
+    writer = _writer(db)
+    writer.start()
+
+    writer.put(_response("Q1"))
+    await _settle()
+    assert db.inserted == []
+    writer.put(_response("Q2"))
+    await _settle()
+    assert [r["question_id"] for r in db.inserted] == ["Q1", "Q2"]
+    assert db.commits == 1
+
+    writer.put(_response("Q3"))
+    await writer.close()
+
+    assert [r["question_id"] for r in db.inserted] == ["Q1", "Q2", "Q3"]
+    assert (db.commits, writer.batches, writer.rows_written) == (2, 2, 3)
+    assert db.added == []
+
+
+@pytest.mark.asyncio
+async def test_partial_batches_are_written_after_the_interval():
+    db = FakeAsyncSession()
+    writer = _writer(db, batch_size=50, flush_interval_seconds=0.01)
+    writer.start()
+
+    writer.put(_response())
+    await asyncio.sleep(0.05)
+
+    assert len(db.inserted) == 1
+    await writer.close()
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatch_waits_while_the_database_falls_behind():
+    release = asyncio.Event()
+
+    class SlowSession(FakeAsyncSession):
+        async def commit(self) -> None:
+            await release.wait()
+            await super().commit()
+
+    db = SlowSession()
+    writer = _writer(db, batch_size=1, max_pending=2)
+    writer.start()
+    writer.put(_response("Q1"))
+    writer.put(_response("Q2"))
+    await _settle()
+
+    waiter = asyncio.create_task(writer.wait_for_room())
+    await _settle()
+    assert not waiter.done()
+    assert writer.pending == 2
+
+    release.set()
+    await asyncio.wait_for(waiter, timeout=1)
+    await writer.close()
+    assert len(db.inserted) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_surfaces_to_the_run():
+    db = FakeAsyncSession(commit_error=ConnectionError("db down"))
+    writer = _writer(db, batch_size=1)
+    writer.start()
+
+    writer.put(_response())
+    await _settle()
+
+    with pytest.raises(ConnectionError, match="db down"):
+        writer.put(_response())
+    with pytest.raises(ConnectionError, match="db down"):
+        await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows_for_the_next_attempt():
+    db = FakeAsyncSession(commit_error=ConnectionError("db down"))
+    writer = _writer(db, batch_size=50)
+    writer.put(_response("Q1"))
+    writer.put(_response("Q2"))
+    writer.runtime_stats.record_call("m", {"latency_seconds": 0.5})
+
+    with pytest.raises(ConnectionError, match="db down"):
+        await writer.flush()
+
+    assert db.rollbacks == 1
+    assert writer.pending == 2
+    assert writer.runtime_stats.pending["m"].calls == 1
+
+    await writer.flush()
+
+    assert (writer.batches, writer.rows_written) == (1, 2)
+    assert [r["question_id"] for r in db.inserted[-2:]] == ["Q1", "Q2"]
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_skips_samples_that_are_already_stored():
+    statements: list[Any] = []
+
+    class RecordingSession(FakeAsyncSession):
+        async def execute(self, query: Any, params: Any = None) -> Any:
+            statements.append(query)
+            return await super().execute(query, params)
+
+    writer = _writer(RecordingSession())
+    writer.put(_response())
+    await writer.flush()
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_responses_evaluation_sample DO NOTHING" in sql
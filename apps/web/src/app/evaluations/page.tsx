@@ -19,6 +19,14 @@ const STATUS_LABELS: Record<string, { label: string; className: string }> = {
     label: "Running",
     className: "bg-blue-100 text-blue-800",
   },
+  paused: {
+    label: "Paused",
+    className: "bg-orange-100 text-orange-800",
+  },
+  cancelled: {
+    label: "Cancelled",
+    className: "bg-red-100 text-red-800",
+  },
   reviewing: {
     label: "Reviewing",
     className: "bg-emerald-100 text-emerald-800",
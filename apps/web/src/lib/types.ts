@@ -3,7 +3,14 @@
 export interface Evaluation {
   id: string;
   name: string;
-  status: "created" | "running" | "collecting" | "reviewing" | "complete";
+  status:
+    | "created"
+    | "running"
+    | "collecting"
+    | "paused"
+    | "cancelled"
+    | "reviewing"
+    | "complete";
   perspective: string;
   scoring_dimensions: string[];
   model_list: string[];